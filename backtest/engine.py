@@ -17,7 +17,7 @@ Design Reference: docs/specs/planned/v0.3_short_leverage_spec.md §3
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Type, Optional, Literal
+from typing import Any, Dict, List, Type, Optional, Literal
 import pandas as pd
 import inspect
 from backtest.broker import SimulatedBroker, Trade, DirectionType
@@ -88,22 +88,27 @@ class _V05StrategyWrapper:
     3. Converts signals to buy/sell actions via on_bar()
     """
 
-    def __init__(self, strategy_cls: Type, broker: SimulatedBroker, data: pd.DataFrame):
+    def __init__(self, strategy_cls: Type, broker: SimulatedBroker, data: pd.DataFrame,
+                 strategy_params: Optional[Dict[str, Any]] = None):
         """Initialize wrapper
 
         Args:
             strategy_cls: v0.5 strategy class
             broker: Simulated broker instance
             data: OHLCV DataFrame
+            strategy_params: Parameter overrides (validated, defaults fill the rest)
         """
         # Create v0.5 strategy instance (no parameters)
         self.strategy = strategy_cls()
         self.broker = broker
         self.data = data
 
-        # Get default parameters
-        param_specs = self.strategy.get_parameters()
-        params = {name: spec.default_value for name, spec in param_specs.items()}
+        # Get parameters (defaults unless overridden)
+        if strategy_params:
+            params = self.strategy.validate_parameters(strategy_params)
+        else:
+            param_specs = self.strategy.get_parameters()
+            params = {name: spec.default_value for name, spec in param_specs.items()}
 
         # Generate signals upfront (v0.5 strategies use vectorized signal generation)
         data_dict = {'ohlcv': data}
@@ -164,7 +169,8 @@ def run_backtest(
     position_sizer: Optional[BasePositionSizer] = None,
     stop_loss_pct: Optional[float] = None,
     take_profit_pct: Optional[float] = None,
-    leverage: float = 1.0  # v0.3 新增
+    leverage: float = 1.0,  # v0.3 新增
+    strategy_params: Optional[Dict[str, Any]] = None  # v0.5 新增
 ) -> BacktestResult:
     """
     Run backtest with position sizing, stop-loss, and take-profit support
@@ -182,6 +188,9 @@ def run_backtest(
         stop_loss_pct: Stop loss percentage (e.g., 0.02 = 2%)
         take_profit_pct: Take profit percentage (e.g., 0.05 = 5%)
         leverage: Leverage multiplier (default 1.0, range 1-100) - v0.3
+        strategy_params: Strategy parameters - v0.5
+            (v0.5 strategies: validated against get_parameters();
+             v0.3 strategies: passed as constructor keyword arguments)
 
     Returns:
         BacktestResult containing equity curve, trades, metrics, and trade log
@@ -229,10 +238,10 @@ def run_backtest(
 
     if is_v05:
         # v0.5 Strategy API v2.0: Use wrapper to adapt to v0.3 backtest engine
-        strategy = _V05StrategyWrapper(strategy_cls, broker, data)
+        strategy = _V05StrategyWrapper(strategy_cls, broker, data, strategy_params)
     else:
         # v0.3 Legacy API: Direct instantiation with broker and data
-        strategy = strategy_cls(broker=broker, data=data)
+        strategy = strategy_cls(broker=broker, data=data, **(strategy_params or {}))
 
     # Track position for SL/TP and MAE/MFE
     position_tracker = _PositionTracker()
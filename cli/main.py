@@ -22,6 +22,7 @@ Design Reference:
 """
 
 import click
+import os
 import sys
 from pathlib import Path
 from typing import Dict, Any
@@ -29,20 +30,9 @@ from typing import Dict, Any
 # 添加項目根目錄到 Python 路徑 (v0.5 修復)
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from execution_engine.portfolio_runner import RunConfig, run_portfolio, load_configs_from_yaml
-from reports.text_reporter import render_single, render_portfolio
-from data.storage import load_ohlcv
-from strategies.registry import get_strategy, list_strategies
-from backtest.engine import run_backtest
-
-# v0.4 新增導入
-from cli.dynamic_params import (
-    DynamicCLI,
-    extract_strategy_params,
-    validate_and_convert_params,
-    format_strategy_help
-)
-from cli.parameter_validator import ParameterValidator, BacktestConfigValidator
+# v0.5: 子系統（回測引擎、執行引擎、策略註冊表、報表、數據存儲）在需要它們的
+# 命令內才導入，讓 --help、list 等輕量命令不必載入 pandas 與整個回測引擎。
+# 腳本化工作流程會大量呼叫 CLI，啟動時間見 cli/startup_benchmark.py
 
 
 @click.group()
@@ -90,13 +80,19 @@ def run_single(strategy, symbol, timeframe, cash, fee, leverage, stop_loss, take
     Example:
         superdog run -s simple_sma -m BTCUSDT -t 1h --sl 0.02 --tp 0.05
     """
+    from backtest.engine import run_backtest
+    from data.storage import find_data_file, load_ohlcv
+    from execution_engine.portfolio_runner import RunConfig
+    from reports.text_reporter import render_single
+    from strategies.registry import get_strategy
+
     try:
         # 1. 獲取策略
         strategy_cls = get_strategy(strategy)
 
-        # 2. 載入數據
-        data_file = f"data/raw/{symbol}_{timeframe}.csv"
-        data = load_ohlcv(data_file)
+        # 2. 載入數據（已遷移的二進位格式優先）
+        data_file = find_data_file(["data/raw"], symbol, timeframe) or f"data/raw/{symbol}_{timeframe}.csv"
+        data = load_ohlcv(str(data_file))
 
         # 3. 執行回測
         result = run_backtest(
@@ -140,16 +136,79 @@ def run_single(strategy, symbol, timeframe, cash, fee, leverage, stop_loss, take
 @click.option("-o", "--output", help="輸出報表到檔案")
 @click.option("-v", "--verbose", is_flag=True, help="顯示詳細日誌")
 @click.option("--fail-fast", is_flag=True, help="遇錯立即停止")
-def run_portfolio_cmd(config_file, output, verbose, fail_fast):
+@click.option("-j", "--workers", default=1, type=int, help="並行進程數 (默認: 1)")
+@click.option("--journal", "journal_path", help="執行日誌路徑（指定時記錄每個完成的回測）")
+@click.option("--resume", is_flag=True, help="從執行日誌續跑，跳過已完成的回測 (默認日誌: <配置檔案>.journal.jsonl)")
+@click.option("--cost-history", "cost_history_path",
+              help="成本歷史路徑（指定時載入並在執行後保存各策略耗時，用於排程）")
+@click.option("--batch-size", default=1000, type=int, help="每批次建立並執行的配置數量 (默認: 1000)")
+def run_portfolio_cmd(config_file, output, verbose, fail_fast, workers, journal_path, resume,
+                      cost_history_path, batch_size):
     """
     執行批量回測（從 YAML 配置）
 
+    指定 --journal 或 --resume 時，每個完成的回測都會寫入執行日誌；
+    中斷後使用 --resume 只執行尚未完成的回測。不續跑時已有的日誌改名為 .bak 保留。
+    指定 --cost-history 時，各策略的執行耗時保存到該文件，之後的批量回測據此排程（最長任務優先）。
+    搜索空間惰性展開，每次只建立 --batch-size 個配置並在批次內排程。
+
     Example:
         superdog portfolio -c configs/multi_strategy.yml -o report.txt
+        superdog portfolio -c configs/multi_strategy.yml -j 8
+        superdog portfolio -c configs/multi_strategy.yml -j 8 --journal results/sweep.journal.jsonl
+        superdog portfolio -c configs/multi_strategy.yml -j 8 --resume
     """
+    from execution_engine.portfolio_runner import (
+        count_configs_from_yaml, iter_configs_from_yaml, run_portfolio_batches
+    )
+    from execution_engine.run_journal import RunJournal
+    from execution_engine.scheduler import CostModel
+    from reports.text_reporter import render_portfolio
+
+    if resume and not journal_path:
+        journal_path = f"{os.path.splitext(config_file)[0]}.journal.jsonl"
+
     try:
-        configs = load_configs_from_yaml(config_file)
-        result = run_portfolio(configs, verbose=verbose, fail_fast=fail_fast)
+        # 只解析規格檢查 YAML 格式，不展開搜索空間
+        planned = count_configs_from_yaml(config_file)
+        if verbose:
+            click.echo(f"Loaded {config_file}: up to {planned} configs, batches of {batch_size}")
+
+        journal = None
+        if journal_path:
+            if not resume and os.path.exists(journal_path):
+                os.replace(journal_path, journal_path + ".bak")
+                click.echo(f"Previous journal moved to {journal_path}.bak")
+            journal = RunJournal(journal_path)
+        cost_model = None
+        if cost_history_path:
+            try:
+                cost_model = CostModel(history_path=cost_history_path)
+            except (ValueError, KeyError, TypeError) as e:
+                click.echo(f"Warning: ignoring unreadable cost history {cost_history_path}: {e}", err=True)
+                cost_model = CostModel()
+        configs = iter_configs_from_yaml(config_file)
+        counts = {"total": 0, "done": 0}
+        if resume:
+            click.echo(f"Resuming from {journal_path}: {len(journal)} runs in journal")
+            configs = _count_resumed(configs, journal, counts)
+
+        result = run_portfolio_batches(
+            configs,
+            batch_size=batch_size,
+            verbose=verbose,
+            fail_fast=fail_fast,
+            max_workers=workers,
+            cost_model=cost_model,
+            journal=journal
+        )
+        if resume:
+            click.echo(f"Resumed {counts['done']}/{counts['total']} runs already completed")
+        if cost_model is not None:
+            try:
+                cost_model.save(cost_history_path)
+            except OSError as e:
+                click.echo(f"Warning: cannot save cost history to {cost_history_path}: {e}", err=True)
         report = render_portfolio(result)
 
         if output:
@@ -164,6 +223,112 @@ def run_portfolio_cmd(config_file, output, verbose, fail_fast):
         raise click.Abort()
 
 
+def _count_resumed(configs, journal, counts):
+    """在執行的同一次展開中統計配置總數與日誌中已完成的數量"""
+    for config in configs:
+        counts["total"] += 1
+        if journal.is_completed(config):
+            counts["done"] += 1
+        yield config
+
+
+@cli.command(name="migrate")
+@click.option("-d", "--dir", "directories", multiple=True, help="要遷移的目錄（可重複，默認: historical/binance 與 raw）")
+@click.option("-f", "--format", "file_format",
+              type=click.Choice(['parquet', 'feather', 'mmap']),
+              default='parquet',
+              help="目標格式 (默認: parquet)")
+@click.option("--overwrite", is_flag=True, help="覆寫已存在的二進位文件")
+@click.option("--remove-csv", is_flag=True, help="遷移並核對成功後刪除原 CSV")
+def migrate_data_cmd(directories, file_format, overwrite, remove_csv):
+    """
+    把 OHLCV CSV 批量遷移為二進位列式格式
+
+    遷移後 run / portfolio / DataPipeline 會自動優先載入二進位文件。
+
+    Example:
+        superdog migrate
+        superdog migrate -d data/raw -f feather --overwrite
+    """
+    from data.storage import OHLCVStorage
+
+    try:
+        storage = OHLCVStorage()
+        results = storage.migrate_to_binary(
+            directories=list(directories) or None,
+            file_format=file_format,
+            overwrite=overwrite,
+            remove_csv=remove_csv
+        )
+
+        for item in results:
+            if item['status'] == 'migrated':
+                click.echo(f"✓ {item['csv']} -> {item['output']} ({item['rows']} rows)")
+            elif item['status'] == 'skipped':
+                click.echo(f"- {item['csv']} (已存在 {item['output']}，使用 --overwrite 覆寫)")
+            else:
+                click.echo(f"✗ {item['csv']}: {item['error']}", err=True)
+
+        migrated = sum(1 for item in results if item['status'] == 'migrated')
+        failed = sum(1 for item in results if item['status'] == 'failed')
+        click.echo(f"Migrated {migrated}/{len(results)} files")
+        if failed:
+            raise click.Abort()
+
+    except click.Abort:
+        raise
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+
+
+@cli.command(name="download")
+@click.option("-m", "--symbol", "symbols", multiple=True, required=True, help="交易對（可重複，例如: -m BTCUSDT -m ETHUSDT）")
+@click.option("-t", "--timeframe", "timeframes", multiple=True, required=True, help="時間週期（可重複）")
+@click.option("--start", "start_date", required=True, help="沒有已存數據時的起始日期 (YYYY-MM-DD)")
+@click.option("--end", "end_date", help="結束日期 (默認: 現在，只保存已收盤 K 線)")
+@click.option("-d", "--dir", "directory", help="保存目錄 (默認: historical/binance)")
+@click.option("-f", "--format", "file_format",
+              type=click.Choice(['csv', 'parquet', 'feather']),
+              default='csv',
+              help="文件格式 (默認: csv)")
+@click.option("-j", "--workers", default=4, type=int, help="並發下載線程數 (默認: 4)")
+@click.option("-r", "--range-workers", default=1, type=int, help="單個交易對按時間區段並行分頁的線程數 (默認: 1)")
+def download_data_cmd(symbols, timeframes, start_date, end_date, directory, file_format, workers, range_workers):
+    """
+    並發下載 / 增量更新多個交易對的 OHLCV 數據
+
+    所有線程共享同一個按請求權重計算的令牌桶限流器；已有數據的文件只追加新 K 線。
+
+    Example:
+        superdog download -m BTCUSDT -m ETHUSDT -t 1h -t 4h --start 2020-01-01
+        superdog download -m SOLUSDT -t 1m --start 2019-01-01 -r 8
+    """
+    from data.bulk_downloader import BulkDownloader, build_download_tasks
+
+    try:
+        tasks = build_download_tasks(list(symbols), list(timeframes), directory, file_format)
+        results = BulkDownloader(max_workers=workers, range_workers=range_workers).download(tasks, start_date, end_date)
+
+        for result in results:
+            task = result.task
+            if result.success:
+                click.echo(f"✓ {task.symbol} {task.timeframe}: +{result.new_rows} rows -> {task.save_path}")
+            else:
+                click.echo(f"✗ {task.symbol} {task.timeframe}: {result.error}", err=True)
+
+        failed = sum(1 for result in results if not result.success)
+        click.echo(f"Downloaded {len(results) - failed}/{len(results)} datasets")
+        if failed:
+            raise click.Abort()
+
+    except click.Abort:
+        raise
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+
+
 @cli.command(name="list")
 @click.option("--detailed", is_flag=True, help="顯示詳細信息（包含參數）")
 def list_strategies_cmd(detailed):
@@ -174,6 +339,8 @@ def list_strategies_cmd(detailed):
         superdog list
         superdog list --detailed
     """
+    from strategies.registry import get_strategy, list_strategies
+
     strategies = list_strategies()
 
     click.echo("Available Strategies:")
@@ -224,6 +391,9 @@ def strategy_info_cmd(strategy):
         superdog info -s simple_sma
         superdog info -s kawamoku_demo
     """
+    from cli.dynamic_params import format_strategy_help
+    from strategies.registry import get_strategy, list_strategies
+
     try:
         # 載入策略
         strategy_cls = get_strategy(strategy)
@@ -0,0 +1,271 @@
+"""
+CLI Startup Benchmark v0.5
+
+量測 CLI 冷啟動時間與導入圖，並與 JSON 基準比較
+
+腳本化工作流程會呼叫 CLI 數千次，每次呼叫都要付出 Python 啟動與模組導入的
+成本。這個工具對 superdog_cli.py 與 cli/main.py 的每個子命令：
+- 在新的子進程中執行數次，記錄最短的牆鐘時間（冷啟動）
+- 以 python -X importtime 執行一次，記錄導入的模組數、總導入時間與最慢的頂層導入
+- 與基準文件中的預算比較，超出預算時以非零狀態退出
+
+Version: v0.5
+
+Usage:
+    python -m cli.startup_benchmark                 # 與基準比較，超出預算則失敗
+    python -m cli.startup_benchmark --update        # 重新量測並寫入基準
+    python -m cli.startup_benchmark -c list -c run  # 只量測名稱包含 list 或 run 的項目
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import click
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "startup_baseline.json"
+
+# 寫入基準時預算 = 量測值 × HEADROOM（不低於 MIN_BUDGET_MS），吸收機器間與運行間的波動
+HEADROOM = 2.0
+MIN_BUDGET_MS = 200.0
+TOP_IMPORTS = 5
+
+
+@dataclass
+class StartupCase:
+    """一個要量測的 CLI 呼叫
+
+    Attributes:
+        name: 項目名稱（基準文件的鍵）
+        argv: 傳給 python 的參數（相對於項目根目錄）
+        budget_ms: 冷啟動時間預算（毫秒），None 表示只記錄不檢查
+    """
+    name: str
+    argv: List[str]
+    budget_ms: Optional[float] = None
+
+
+@dataclass
+class StartupMeasurement:
+    """一個項目的量測結果
+
+    Attributes:
+        name: 項目名稱
+        wall_ms: 多次執行中最短的牆鐘時間（毫秒）
+        import_ms: -X importtime 回報的頂層導入累計時間（毫秒）
+        modules: 導入的模組數
+        top_imports: 最慢的頂層導入 {模組: 毫秒}
+        returncode: 子進程的退出狀態
+    """
+    name: str
+    wall_ms: float
+    import_ms: float
+    modules: int
+    top_imports: Dict[str, float] = field(default_factory=dict)
+    returncode: int = 0
+
+
+def default_cases() -> List[StartupCase]:
+    """默認量測項目：互動式入口、CLI 群組、list 與每個子命令的 --help"""
+    from cli.main import cli
+
+    cases = [
+        StartupCase("superdog_cli", ["-c", "import superdog_cli"]),
+        StartupCase("cli --help", ["cli/main.py", "--help"]),
+        StartupCase("cli list", ["cli/main.py", "list"]),
+    ]
+    for name in sorted(cli.commands):
+        cases.append(StartupCase(f"cli {name} --help", ["cli/main.py", name, "--help"]))
+    return cases
+
+
+def parse_importtime(stderr: str) -> Dict[str, Any]:
+    """解析 python -X importtime 的輸出
+
+    每行格式為 "import time: <self us> | <cumulative us> | <縮排><模組>"，
+    縮排表示巢狀深度；頂層導入（無縮排）的累計時間加總即為總導入時間。
+
+    Args:
+        stderr: 子進程的 stderr
+
+    Returns:
+        {'import_ms', 'modules', 'top_imports'}
+    """
+    top_level = []
+    modules = 0
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表頭 "self [us] | cumulative | imported package"
+
+        modules += 1
+        name = parts[2].rstrip()
+        # 名稱欄固定以一個空格開頭，之後每層巢狀多兩個空格
+        if len(name) - len(name.lstrip()) == 1:
+            top_level.append((name.strip(), int(parts[1])))
+
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return {
+        'import_ms': sum(us for _, us in top_level) / 1000,
+        'modules': modules,
+        'top_imports': {name: round(us / 1000, 1) for name, us in top_level[:TOP_IMPORTS]},
+    }
+
+
+def measure(case: StartupCase, repeats: int = 5, python: Optional[str] = None) -> StartupMeasurement:
+    """在新的子進程中量測一個項目
+
+    Args:
+        case: 量測項目
+        repeats: 冷啟動重複次數（取最短時間，排除排程雜訊）
+        python: Python 解釋器（默認為當前解釋器）
+
+    Returns:
+        StartupMeasurement
+    """
+    python = python or sys.executable
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    run_kwargs = dict(cwd=PROJECT_ROOT, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+
+    timings = []
+    returncode = 0
+    for _ in range(max(1, repeats)):
+        started = time.perf_counter()
+        completed = subprocess.run([python, *case.argv], **run_kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+        returncode = completed.returncode
+
+    profiled = subprocess.run([python, "-X", "importtime", *case.argv], **run_kwargs)
+    imports = parse_importtime(profiled.stderr)
+
+    return StartupMeasurement(
+        name=case.name,
+        wall_ms=round(min(timings), 1),
+        import_ms=round(imports['import_ms'], 1),
+        modules=imports['modules'],
+        top_imports=imports['top_imports'],
+        returncode=returncode,
+    )
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    """載入基準文件（不存在時返回空基準）"""
+    if not path.exists():
+        return {'cases': {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(
+    measurements: Sequence[StartupMeasurement],
+    cases: Sequence[StartupCase],
+    path: Path = BASELINE_PATH,
+    baseline: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """把量測結果寫入基準文件
+
+    已有預算的項目保留原預算（預算只能手動調整），新項目的預算為
+    量測值 × HEADROOM。
+
+    Returns:
+        寫入的基準
+    """
+    baseline = baseline if baseline is not None else load_baseline(path)
+    entries = baseline.setdefault('cases', {})
+    argv_by_name = {case.name: case.argv for case in cases}
+
+    for m in measurements:
+        previous = entries.get(m.name, {})
+        budget = previous.get('budget_ms') or max(MIN_BUDGET_MS, round(m.wall_ms * HEADROOM, -1))
+        entries[m.name] = {
+            'argv': argv_by_name[m.name],
+            'budget_ms': budget,
+            'wall_ms': m.wall_ms,
+            'import_ms': m.import_ms,
+            'modules': m.modules,
+            'top_imports': m.top_imports,
+        }
+
+    baseline['python'] = f"{sys.version_info.major}.{sys.version_info.minor}"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return baseline
+
+
+def cases_from_baseline(baseline: Dict[str, Any]) -> List[StartupCase]:
+    """從基準文件建立量測項目（帶預算）"""
+    return [
+        StartupCase(name, entry['argv'], entry.get('budget_ms'))
+        for name, entry in baseline.get('cases', {}).items()
+    ]
+
+
+def check_budgets(measurements: Sequence[StartupMeasurement], cases: Sequence[StartupCase]) -> List[str]:
+    """檢查量測結果是否超出預算
+
+    Returns:
+        失敗訊息列表（空列表表示全部通過）
+    """
+    budgets = {case.name: case.budget_ms for case in cases}
+    failures = []
+    for m in measurements:
+        if m.returncode != 0:
+            failures.append(f"{m.name}: exited with status {m.returncode}")
+        budget = budgets.get(m.name)
+        if budget is not None and m.wall_ms > budget:
+            failures.append(f"{m.name}: {m.wall_ms:.0f} ms exceeds budget {budget:.0f} ms")
+    return failures
+
+
+@click.command()
+@click.option("-c", "--case", "names", multiple=True, help="只量測名稱包含此字串的項目（可重複）")
+@click.option("-n", "--repeats", default=5, type=int, help="每個項目的冷啟動次數 (默認: 5)")
+@click.option("--update", is_flag=True, help="把量測結果寫入基準文件")
+@click.option("--baseline", "baseline_path", type=click.Path(path_type=Path), default=BASELINE_PATH,
+              help="基準文件路徑")
+def main(names, repeats, update, baseline_path):
+    """量測 CLI 冷啟動時間與導入圖，超出預算時失敗"""
+    baseline = load_baseline(baseline_path)
+
+    # 基準中的項目帶預算；新的子命令以默認項目補上
+    cases = cases_from_baseline(baseline)
+    known = {case.name for case in cases}
+    cases += [case for case in default_cases() if case.name not in known]
+    if names:
+        cases = [case for case in cases if any(name in case.name for name in names)]
+
+    measurements = []
+    for case in cases:
+        m = measure(case, repeats=repeats)
+        measurements.append(m)
+        budget = f"{case.budget_ms:.0f}" if case.budget_ms is not None else "-"
+        slowest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in list(m.top_imports.items())[:3])
+        click.echo(f"{m.name:<28} {m.wall_ms:7.0f} ms / {budget:>5} ms  "
+                   f"{m.modules:4d} modules  {m.import_ms:6.0f} ms imports  [{slowest}]")
+
+    if update:
+        save_baseline(measurements, cases, baseline_path, baseline)
+        click.echo(f"Baseline written to {baseline_path}")
+        return
+
+    failures = check_budgets(measurements, cases)
+    for message in failures:
+        click.echo(f"✗ {message}", err=True)
+    if failures:
+        sys.exit(1)
+    click.echo(f"All {len(measurements)} startup budgets met")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Bulk OHLCV Downloader v0.5
+
+多交易對 / 多週期並發下載器
+
+所有下載線程共享同一個令牌桶限流器（TokenBucket），按交易所的請求權重扣除令牌，
+取代 OHLCVFetcher 在每頁之間固定 sleep(rateLimit) 的做法，充分利用允許的請求額度。
+
+特性：
+- ThreadPoolExecutor 並發下載，每個交易對完成後立即寫入（增量追加）
+- 令牌桶模擬交易所的權重限額（默認 Binance 1200 weight / 分鐘）
+- 失敗的請求以指數退避 + 隨機抖動重試
+- exchange 只需實作 ccxt 的 fetch_ohlcv 介面，測試時可替換為本地模擬交易所
+
+Version: v0.5
+
+Example:
+    >>> downloader = BulkDownloader(max_workers=4)
+    >>> tasks = build_download_tasks(["BTCUSDT", "ETHUSDT"], ["1h", "4h"])
+    >>> results = downloader.download(tasks, start_date="2020-01-01")
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from data_config import config
+from data.fetcher import OHLCVFetcher
+from data.symbol_manager import get_symbol_manager
+
+logger = logging.getLogger(__name__)
+
+# Binance 現貨 REST API 每分鐘權重上限
+BINANCE_WEIGHT_PER_MINUTE = 1200
+
+
+class TokenBucket:
+    """線程安全的令牌桶限流器
+
+    令牌以 refill_rate（每秒）持續補充，最多累積 capacity 個。
+    acquire() 先預扣令牌（允許透支），再在鎖外等待透支部分補回，
+    因此多個線程按請求順序排隊，不會同時醒來搶令牌。
+
+    Args:
+        capacity: 桶容量（允許的突發權重）
+        refill_rate: 每秒補充的令牌數
+        clock: 單調時鐘（測試時可替換）
+        sleep: 休眠函數（測試時可替換）
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        if capacity <= 0 or refill_rate <= 0:
+            raise ValueError("capacity and refill_rate must be positive")
+
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+        # 統計
+        self.acquired = 0.0
+        self.waited = 0.0
+
+    @classmethod
+    def per_minute(cls, weight_per_minute: float, burst: Optional[float] = None, **kwargs) -> "TokenBucket":
+        """按「每分鐘權重上限」建立限流器（默認突發量等於每分鐘上限）"""
+        return cls(
+            capacity=burst if burst is not None else weight_per_minute,
+            refill_rate=weight_per_minute / 60.0,
+            **kwargs
+        )
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._updated = now
+
+    @property
+    def available(self) -> float:
+        """目前可用的令牌數（透支時為負數）"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, weight: float = 1) -> bool:
+        """不等待地嘗試取得令牌"""
+        with self._lock:
+            self._refill()
+            if self._tokens < weight:
+                return False
+            self._tokens -= weight
+            self.acquired += weight
+            return True
+
+    def acquire(self, weight: float = 1) -> float:
+        """
+        取得令牌（不足時阻塞等待）
+
+        Args:
+            weight: 請求權重
+
+        Returns:
+            float: 實際等待的秒數
+
+        Raises:
+            ValueError: weight 超過桶容量（永遠無法滿足）
+        """
+        if weight > self.capacity:
+            raise ValueError(f"weight {weight} exceeds bucket capacity {self.capacity}")
+
+        with self._lock:
+            self._refill()
+            self._tokens -= weight
+            self.acquired += weight
+            wait = -self._tokens / self.refill_rate if self._tokens < 0 else 0.0
+            self.waited += wait
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+@dataclass
+class DownloadTask:
+    """單個下載任務
+
+    Attributes:
+        symbol: 交易對（BTCUSDT 或 BTC/USDT 皆可）
+        timeframe: 時間週期
+        save_path: 數據文件路徑（副檔名決定格式）
+    """
+    symbol: str
+    timeframe: str
+    save_path: str
+
+    @property
+    def market_symbol(self) -> str:
+        """ccxt 格式的交易對（BTC/USDT）"""
+        if "/" in self.symbol:
+            return self.symbol
+        base, quote = get_symbol_manager().parse_symbol(self.symbol)
+        return f"{base}/{quote}" if quote != "UNKNOWN" else self.symbol
+
+
+@dataclass
+class DownloadResult:
+    """單個下載任務的結果"""
+    task: DownloadTask
+    success: bool
+    new_rows: int = 0
+    full_download: bool = False
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+def build_download_tasks(
+    symbols: List[str],
+    timeframes: List[str],
+    directory: Optional[str] = None,
+    file_format: str = "csv"
+) -> List[DownloadTask]:
+    """
+    建立交易對 × 週期的下載任務
+
+    Args:
+        symbols: 交易對列表（BTCUSDT 或 BTC/USDT）
+        timeframes: 週期列表
+        directory: 保存目錄（默認 config.historical_data / "binance"）
+        file_format: 文件格式（csv / parquet / feather）
+
+    Returns:
+        List[DownloadTask]
+    """
+    directory = Path(directory) if directory else config.historical_data / "binance"
+    return [
+        DownloadTask(
+            symbol=symbol,
+            timeframe=timeframe,
+            save_path=str(directory / f"{symbol.replace('/', '')}_{timeframe}.{file_format}")
+        )
+        for symbol in symbols
+        for timeframe in timeframes
+    ]
+
+
+class BulkDownloader:
+    """多交易對並發下載器
+
+    Args:
+        exchange_name: 交易所名稱（未提供 fetcher 時使用）
+        fetcher: 已建立的 OHLCVFetcher（可選，測試時可注入模擬交易所）
+        limiter: 共享令牌桶（默認 Binance 每分鐘 1200 權重）
+        max_workers: 並發線程數
+        max_retries: 單次請求的最大重試次數
+        range_workers: 單個任務內按時間區段並行分頁的線程數（首次下載長歷史時有效）
+        on_complete: 每個任務完成後的回調（在主線程調用）
+    """
+
+    def __init__(
+        self,
+        exchange_name: str = "binance",
+        fetcher: Optional[OHLCVFetcher] = None,
+        limiter: Optional[TokenBucket] = None,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        range_workers: int = 1,
+        on_complete: Optional[Callable[[DownloadResult], None]] = None
+    ):
+        self.fetcher = fetcher if fetcher is not None else OHLCVFetcher(exchange_name)
+        self.limiter = limiter if limiter is not None else TokenBucket.per_minute(BINANCE_WEIGHT_PER_MINUTE)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.range_workers = max(1, range_workers)
+        self.on_complete = on_complete
+
+        # 由共享令牌桶取代 ccxt 內建的逐請求限流
+        self.fetcher.rate_limiter = self.limiter
+        if hasattr(self.fetcher.exchange, "enableRateLimit"):
+            self.fetcher.exchange.enableRateLimit = False
+
+    def download(
+        self,
+        tasks: List[DownloadTask],
+        start_date: str,
+        end_date: Optional[str] = None
+    ) -> List[DownloadResult]:
+        """
+        並發執行下載任務（增量更新：已有數據的文件只追加新 K 線）
+
+        Args:
+            tasks: 下載任務
+            start_date: 沒有已存數據時的起始日期 'YYYY-MM-DD'
+            end_date: 結束日期（默認為當前時間，只保存已收盤 K 線）
+
+        Returns:
+            與 tasks 順序一致的結果列表
+        """
+        if not tasks:
+            return []
+
+        logger.info(f"開始並發下載 {len(tasks)} 個任務（{self.max_workers} 線程）")
+        results: List[Optional[DownloadResult]] = [None] * len(tasks)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            futures = {
+                executor.submit(self._run_task, task, start_date, end_date): position
+                for position, task in enumerate(tasks)
+            }
+
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+
+                if result.success:
+                    logger.info(
+                        f"✓ {result.task.symbol} {result.task.timeframe}: "
+                        f"+{result.new_rows} 根 K 線 ({result.elapsed:.1f}s)"
+                    )
+                else:
+                    logger.error(f"✗ {result.task.symbol} {result.task.timeframe}: {result.error}")
+
+                if self.on_complete is not None:
+                    self.on_complete(result)
+
+        return results
+
+    def _run_task(self, task: DownloadTask, start_date: str, end_date: Optional[str]) -> DownloadResult:
+        started = time.perf_counter()
+        try:
+            summary = self.fetcher.update_ohlcv(
+                symbol=task.market_symbol,
+                timeframe=task.timeframe,
+                save_path=task.save_path,
+                start_date=start_date,
+                end_date=end_date,
+                max_retries=self.max_retries,
+                workers=self.range_workers
+            )
+            return DownloadResult(
+                task=task,
+                success=True,
+                new_rows=summary["new_rows"],
+                full_download=summary["full_download"],
+                elapsed=time.perf_counter() - started
+            )
+        except Exception as e:
+            return DownloadResult(
+                task=task,
+                success=False,
+                error=str(e),
+                elapsed=time.perf_counter() - started
+            )
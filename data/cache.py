@@ -0,0 +1,235 @@
+"""
+Data Cache v0.5
+
+按記憶體預算淘汰的 LRU 數據快取
+
+這個模組提供：
+- 以 bytes 為預算的 LRU 淘汰（可同時限制項目數）
+- 每個項目只在寫入時估算一次大小，統計時不再逐個計算 memory_usage
+- 命中 / 未命中 / 淘汰計數
+- 淘汰回調（例如記錄日誌或寫入二級快取）
+- 線程安全（多個線程共享同一個 DataPipeline）
+
+記憶體映射數據集（MemmapOHLCV）由作業系統頁快取管理，不計入記憶體預算，
+只在統計中單獨報告映射大小。
+
+Version: v0.5
+
+Example:
+    >>> cache = DataCache(max_bytes=512 * 1024 * 1024)
+    >>> cache.put("BTCUSDT_1h", df)
+    >>> df = cache.get("BTCUSDT_1h")
+    >>> cache.stats()["hit_rate"]
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from data.memmap_store import MemmapOHLCV
+
+logger = logging.getLogger(__name__)
+
+# 全局 DataPipeline 的默認記憶體上限（MB）
+DEFAULT_CACHE_MAX_MB = 2048
+
+# 淘汰回調：(key, value, reason)，reason 為 'capacity' / 'replaced' / 'removed' / 'cleared'
+EvictionCallback = Callable[[str, Any, str], None]
+
+
+def estimate_nbytes(value: Any) -> int:
+    """
+    估算快取項目佔用的記憶體（bytes）
+
+    OHLCV DataFrame 全是數值欄位，memory_usage(deep=False) 已是精確值；
+    只有存在 object 欄位時才使用 deep=True。
+    """
+    if isinstance(value, MemmapOHLCV):
+        return 0
+    if isinstance(value, pd.DataFrame):
+        deep = any(dtype == object for dtype in value.dtypes)
+        return int(value.memory_usage(index=True, deep=deep).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=value.dtype == object))
+    return int(getattr(value, "nbytes", 0))
+
+
+class DataCache:
+    """按記憶體預算淘汰的 LRU 快取
+
+    Args:
+        max_bytes: 記憶體上限（None 表示不限制）
+        max_items: 項目數上限（None 表示不限制）
+        on_evict: 淘汰回調（可選，也可用 add_eviction_callback 追加）
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_items: Optional[int] = None,
+        on_evict: Optional[EvictionCallback] = None
+    ):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._callbacks: List[EvictionCallback] = [on_evict] if on_evict else []
+        self._lock = threading.RLock()
+
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str) -> Any:
+        """讀取項目（不更新 LRU 順序與統計）"""
+        return self._entries[key]
+
+    def keys(self) -> List[str]:
+        """按最近使用順序排列的鍵（最舊在前）"""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def values(self) -> List[Any]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def add_eviction_callback(self, callback: EvictionCallback) -> None:
+        """追加淘汰回調"""
+        self._callbacks.append(callback)
+
+    # === 讀寫 ===
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """讀取項目並標記為最近使用"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key: str, value: Any, nbytes: Optional[int] = None) -> bool:
+        """
+        寫入項目，超出預算時淘汰最久未使用的項目
+
+        Args:
+            key: 快取鍵
+            value: 快取值
+            nbytes: 佔用大小（默認由 estimate_nbytes 估算）
+
+        Returns:
+            bool: 是否已快取（單個項目超過 max_bytes 時不快取）
+        """
+        size = estimate_nbytes(value) if nbytes is None else int(nbytes)
+
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                evicted.append(self._remove(key) + ("replaced",))
+
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejected += 1
+                logger.warning(
+                    f"Not caching {key}: {size / 1024 / 1024:.1f} MB exceeds "
+                    f"cache limit {self.max_bytes / 1024 / 1024:.1f} MB"
+                )
+                stored = False
+            else:
+                self._entries[key] = value
+                self._sizes[key] = size
+                self.total_bytes += size
+                evicted.extend(self._evict_over_budget())
+                stored = True
+
+        self._notify(evicted)
+        return stored
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """移除項目（觸發 'removed' 回調）"""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            evicted = self._remove(key)
+        self._notify([evicted + ("removed",)])
+        return evicted[1]
+
+    def clear(self) -> None:
+        """清空快取（觸發 'cleared' 回調，統計計數保留）"""
+        with self._lock:
+            evicted = [(key, value, "cleared") for key, value in self._entries.items()]
+            self._entries.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
+        self._notify(evicted)
+
+    def resize(self, max_bytes: Optional[int] = None, max_items: Optional[int] = None) -> None:
+        """調整上限並立即淘汰超出的項目"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.max_items = max_items
+            evicted = self._evict_over_budget()
+        self._notify(evicted)
+
+    # === 統計 ===
+
+    def stats(self) -> Dict[str, Any]:
+        """快取統計（O(項目數)，不重新計算 DataFrame 大小）"""
+        with self._lock:
+            mapped_bytes = sum(
+                value.nbytes for value in self._entries.values()
+                if isinstance(value, MemmapOHLCV)
+            )
+            requests = self.hits + self.misses
+            return {
+                'count': len(self._entries),
+                'keys': list(self._entries.keys()),
+                'bytes': self.total_bytes,
+                'mapped_bytes': mapped_bytes,
+                'max_bytes': self.max_bytes,
+                'max_items': self.max_items,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'rejected': self.rejected,
+            }
+
+    # === 內部 ===
+
+    def _remove(self, key: str):
+        value = self._entries.pop(key)
+        self.total_bytes -= self._sizes.pop(key)
+        return key, value
+
+    def _evict_over_budget(self) -> list:
+        evicted = []
+        while self._entries and (
+            (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+            or (self.max_items is not None and len(self._entries) > self.max_items)
+        ):
+            key = next(iter(self._entries))
+            evicted.append(self._remove(key) + ("capacity",))
+            self.evictions += 1
+            logger.debug(f"Evicted {key} from data cache")
+        return evicted
+
+    def _notify(self, evicted: list) -> None:
+        # 在鎖外調用回調，避免回調再次訪問快取時死鎖
+        for key, value, reason in evicted:
+            for callback in self._callbacks:
+                try:
+                    callback(key, value, reason)
+                except Exception as e:
+                    logger.warning(f"Cache eviction callback failed for {key}: {e}")
@@ -9,7 +9,7 @@ Supported Exchanges:
 - OKX (Phase B)
 """
 
-from .base_connector import ExchangeConnector, ExchangeAPIError, DataFormatError
+from .base_connector import ExchangeConnector, ExchangeAPIError, DataFormatError, LazyConnectors
 from .binance_connector import BinanceConnector
 from .bybit_connector import BybitConnector
 from .okx_connector import OKXConnector
@@ -18,6 +18,7 @@ __all__ = [
     'ExchangeConnector',
     'ExchangeAPIError',
     'DataFormatError',
+    'LazyConnectors',
     'BinanceConnector',
     'BybitConnector',
     'OKXConnector'
@@ -7,8 +7,10 @@ Version: v0.5
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator
+import threading
 import pandas as pd
 
 
@@ -191,3 +193,49 @@ class ExchangeConnector(ABC):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(name='{self.name}')"
+
+
+class LazyConnectors(Mapping):
+    """按需建立的連接器字典
+
+    v0.5: 連接器在建構時會建立 requests Session，數據處理器只在第一次
+    實際使用某個交易所時才建立對應的連接器。行為與普通 Dict 相同
+    （in / keys / len 不會觸發建立）。
+
+    Args:
+        factories: 交易所名稱 -> 連接器類別（或無參數的工廠函數）
+
+    Example:
+        >>> connectors = LazyConnectors({'binance': BinanceConnector, 'okx': OKXConnector})
+        >>> 'okx' in connectors          # 不會建立連接器
+        >>> connectors['binance']        # 第一次存取時建立
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], ExchangeConnector]]):
+        self._factories = dict(factories)
+        self._instances: Dict[str, ExchangeConnector] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> ExchangeConnector:
+        connector = self._instances.get(name)
+        if connector is not None:
+            return connector
+
+        factory = self._factories[name]
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = factory()
+            return self._instances[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def created(self) -> Dict[str, ExchangeConnector]:
+        """已建立的連接器"""
+        return dict(self._instances)
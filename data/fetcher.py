@@ -3,16 +3,36 @@ Data Fetcher Module v0.1
 
 負責從交易所下載歷史 OHLCV 數據。
 使用 ccxt 庫與 Binance 交易所互動。
+
+v0.5 Updates:
+- 增量更新模式（update_ohlcv）：讀取最後儲存的時間戳，只下載更新的已收盤 K 線並追加
+- 分頁結果以 numpy 陣列累積，最後一次性轉換為 DataFrame
+- 可共享的 TokenBucket 限流器（rate_limiter），以請求權重取代固定的 rateLimit 休眠
+- 重試退避加入隨機抖動（jitter），避免並發請求同時重試
+- 長歷史下載可按整頁切分時間範圍並行分頁（workers），拼接後按 timestamp 去重
+- 缺口回補（repair_gaps）：按補洞計劃只下載覆蓋缺口的最少頁數，只寫入缺失的 K 線
 """
 
 import ccxt
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Any, List, Tuple, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
 import time
 import logging
 from pathlib import Path
 
+from data.storage import OHLCV_COLUMNS, OHLCVStorage, normalize_ohlcv, storage_format
+from utils.database import parse_ohlcv_path, record_appended, record_dataset
+
+if TYPE_CHECKING:
+    from data.partitioned_store import PartitionedOHLCVStore
+    from data.bulk_downloader import TokenBucket
+    from data.quality.gaps import RepairRange
+
 # 設定日誌
 logging.basicConfig(
     level=logging.INFO,
@@ -20,10 +40,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 每次請求的 K 線數量（ccxt / Binance 單次上限）
+PAGE_LIMIT = 1000
+
+
+def kline_request_weight(limit: int) -> int:
+    """
+    Binance K 線請求的權重（依 limit 分級）
+
+    Args:
+        limit: 單次請求的 K 線數量
+
+    Returns:
+        int: 請求權重
+    """
+    if limit <= 100:
+        return 1
+    if limit <= 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
 
 class OHLCVFetcher:
     """OHLCV 數據下載器"""
 
+    # v0.5: 共享限流器（設置後每次請求前按權重取得令牌，不再固定休眠）
+    rate_limiter: Optional["TokenBucket"] = None
+
+    # v0.5: 重試退避參數（秒）
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 30.0
+
     def __init__(self, exchange_name: str = "binance"):
         """
         初始化 OHLCV Fetcher
@@ -62,7 +111,8 @@ class OHLCVFetcher:
         start_date: str,
         end_date: str,
         save_path: str,
-        max_retries: int = 3
+        max_retries: int = 3,
+        workers: int = 1
     ) -> str:
         """
         下載 OHLCV 數據並儲存為 CSV
@@ -74,6 +124,7 @@ class OHLCVFetcher:
             end_date: 結束日期，格式 'YYYY-MM-DD'
             save_path: CSV 儲存路徑
             max_retries: API 錯誤時的最大重試次數
+            workers: 並行下載的區段線程數（v0.5，默認 1 為順序分頁）
 
         Returns:
             str: CSV 檔案路徑
@@ -88,12 +139,287 @@ class OHLCVFetcher:
         start_ts = self._date_to_milliseconds(start_date)
         end_ts = self._date_to_milliseconds(end_date)
 
+        df = self._fetch_range(symbol, timeframe, start_ts, end_ts, max_retries, workers)
+        if df.empty:
+            raise Exception("未能下載任何數據")
+
+        # 儲存（格式根據副檔名判斷，默認 CSV）
+        self._save_atomic(df, save_path)
+        logger.info(f"數據已儲存至: {save_path}")
+        logger.info(f"總共 {len(df)} 根 K 線")
+
+        return save_path
+
+    def update_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str,
+        save_path: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        store: Optional["PartitionedOHLCVStore"] = None,
+        max_retries: int = 3,
+        workers: int = 1
+    ) -> Dict[str, Any]:
+        """
+        v0.5: 增量更新 OHLCV 數據
+
+        讀取已儲存數據的最後時間戳，只下載之後的 K 線並追加：
+        - CSV：只讀取文件尾部，新數據以單次寫入追加（不重寫整個文件）
+        - Parquet / Feather / mmap：讀取後原子替換
+        - 分區存儲（store）：只重寫受影響的分區
+
+        未指定 end_date 時只保存已收盤的 K 線，避免把未完成的 K 線寫入歷史數據。
+        尚無數據時從 start_date 開始完整下載。
+
+        Args:
+            symbol: 交易對符號，例如 'BTC/USDT'
+            timeframe: 時間週期，例如 '1h'
+            save_path: 數據文件路徑（與 store 二選一）
+            start_date: 沒有已存數據時的起始日期，格式 'YYYY-MM-DD'
+            end_date: 結束日期（默認為當前時間）
+            store: 分區存儲（可選），symbol 以去除 '/' 的形式存放（BTC/USDT -> BTCUSDT）
+            max_retries: API 錯誤時的最大重試次數
+            workers: 並行下載的區段線程數（首次完整下載長歷史時使用）
+
+        Returns:
+            {'symbol', 'timeframe', 'new_rows', 'last_timestamp', 'full_download'}
+
+        Raises:
+            ValueError: 參數無效，或沒有已存數據且未提供 start_date
+        """
+        if (save_path is None) == (store is None):
+            raise ValueError("Exactly one of save_path or store is required")
+
+        store_symbol = symbol.replace("/", "")
+        timeframe_ms = self._timeframe_to_milliseconds(timeframe)
+
+        if store is not None:
+            last_ts = self._last_partition_timestamp(store, store_symbol, timeframe)
+        else:
+            last_ts = self._last_stored_timestamp(save_path)
+
+        if last_ts is None:
+            if not start_date:
+                raise ValueError(f"No stored data for {symbol} {timeframe}; start_date is required")
+            start_ts = self._date_to_milliseconds(start_date)
+        else:
+            start_ts = last_ts + timeframe_ms
+
+        if end_date:
+            end_ts = self._date_to_milliseconds(end_date)
+        else:
+            # 只保存已收盤的 K 線：開盤時間 + 週期 <= 現在
+            end_ts = int(time.time() * 1000) - timeframe_ms + 1
+
+        result = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'new_rows': 0,
+            'last_timestamp': last_ts,
+            'full_download': last_ts is None,
+        }
+
+        if start_ts >= end_ts:
+            logger.info(f"{symbol} {timeframe} 已是最新")
+            return result
+
+        logger.info(
+            f"增量更新 {symbol} {timeframe}: 從 {self._milliseconds_to_date(start_ts)} 開始"
+        )
+        df = self._fetch_range(symbol, timeframe, start_ts, end_ts, max_retries, workers)
+        if df.empty:
+            return result
+
+        if store is not None:
+            store.append(store_symbol, timeframe, df)
+        elif last_ts is not None and storage_format(save_path) == 'csv':
+            self._append_csv(df, save_path)
+        elif last_ts is not None:
+            storage = OHLCVStorage()
+            existing = storage.load_ohlcv(save_path)
+            storage.save_ohlcv(pd.concat([existing.reset_index(drop=True), df], ignore_index=True), save_path)
+        else:
+            self._save_atomic(df, save_path)
+
+        result.update(new_rows=len(df), last_timestamp=int(df['timestamp'].iloc[-1]))
+        logger.info(f"{symbol} {timeframe} 新增 {len(df)} 根 K 線")
+        return result
+
+    def repair_gaps(
+        self,
+        symbol: str,
+        timeframe: str,
+        save_path: Optional[str] = None,
+        store: Optional["PartitionedOHLCVStore"] = None,
+        max_retries: int = 3,
+        plan: Optional[List["RepairRange"]] = None
+    ) -> Dict[str, Any]:
+        """
+        v0.5: 回補已儲存數據中的時間缺口
+
+        向量化檢測缺口後按補洞計劃（plan_gap_repairs）只下載覆蓋缺口的最少頁數，
+        並且只寫入原本缺失的 K 線（不覆蓋已有數據）。交易所本身停機造成的缺口
+        下載不到數據，會計入 remaining_bars。
+
+        Args:
+            symbol: 交易對符號，例如 'BTC/USDT'
+            timeframe: 時間週期，例如 '1m'
+            save_path: 數據文件路徑（與 store 二選一）
+            store: 分區存儲（可選）
+            max_retries: API 錯誤時的最大重試次數
+            plan: 預先計算的補洞計劃（默認根據已存數據計算）
+
+        Returns:
+            {'symbol', 'timeframe', 'gaps', 'missing_bars', 'ranges', 'requests',
+             'filled_rows', 'remaining_bars'}
+
+        Raises:
+            ValueError: 參數無效
+        """
+        from data.quality.gaps import detect_time_gaps, plan_gap_repairs
+
+        if (save_path is None) == (store is None):
+            raise ValueError("Exactly one of save_path or store is required")
+
+        store_symbol = symbol.replace("/", "")
+        if store is not None:
+            existing = store.load(store_symbol, timeframe)
+        else:
+            existing = OHLCVStorage().load_ohlcv(save_path, convert_to_datetime=False)
+
+        gaps = detect_time_gaps(existing['timestamp'].to_numpy(), self._timeframe_to_milliseconds(timeframe))
+        if plan is None:
+            plan = plan_gap_repairs(gaps, PAGE_LIMIT)
+
+        result = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'gaps': len(gaps),
+            'missing_bars': gaps.total_missing,
+            'ranges': len(plan),
+            'requests': sum(r.requests for r in plan),
+            'filled_rows': 0,
+            'remaining_bars': gaps.total_missing,
+        }
+        if not plan:
+            logger.info(f"{symbol} {timeframe} 沒有時間缺口")
+            return result
+
+        logger.info(
+            f"{symbol} {timeframe}: {len(gaps)} 個缺口（{gaps.total_missing} 根 K 線），"
+            f"合併為 {len(plan)} 個下載範圍"
+        )
+        pages = []
+        for repair in plan:
+            pages.extend(
+                self._fetch_pages(symbol, timeframe, repair.start, repair.end, max_retries, self.rate_limiter)
+            )
+
+        # 合併範圍內的已有 K 線不重寫
+        fetched = self._pages_to_frame(pages)
+        filled = fetched[gaps.contains(fetched['timestamp'].to_numpy())]
+        if filled.empty:
+            return result
+
+        if store is not None:
+            store.append(store_symbol, timeframe, filled)
+        else:
+            merged = pd.concat([existing[OHLCV_COLUMNS].reset_index(drop=True), filled], ignore_index=True)
+            self._save_atomic(normalize_ohlcv(merged), save_path)
+
+        result.update(filled_rows=len(filled), remaining_bars=gaps.total_missing - len(filled))
+        logger.info(f"{symbol} {timeframe} 回補 {len(filled)} 根 K 線")
+        return result
+
+    def _fetch_range(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ts: int,
+        end_ts: int,
+        max_retries: int = 3,
+        workers: int = 1
+    ) -> pd.DataFrame:
+        """
+        分頁下載 [start_ts, end_ts) 的 K 線
+
+        workers > 1 時，由於週期固定，可預先把時間範圍按整頁切成獨立區段，
+        多個區段並行分頁下載，最後拼接並按 timestamp 去重。
+
+        Returns:
+            排序、去重後的 DataFrame（timestamp 為 int64，可能為空）
+
+        Raises:
+            Exception: 當達到最大重試次數仍失敗時
+        """
+        timeframe_ms = self._timeframe_to_milliseconds(timeframe)
+        chunks = self._split_range(start_ts, end_ts, timeframe_ms, workers)
+
+        if len(chunks) <= 1:
+            pages = self._fetch_pages(symbol, timeframe, start_ts, end_ts, max_retries, self.rate_limiter)
+        else:
+            limiter = self.rate_limiter or self._default_rate_limiter(workers)
+            logger.info(f"{symbol} {timeframe}: 分為 {len(chunks)} 個區段並行下載（{workers} 線程）")
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._fetch_pages, symbol, timeframe, chunk_start, chunk_end, max_retries, limiter
+                    )
+                    for chunk_start, chunk_end in chunks
+                ]
+                pages = [page for future in futures for page in future.result()]
+
+        return self._pages_to_frame(pages)
+
+    def _split_range(self, start_ts: int, end_ts: int, timeframe_ms: int, workers: int) -> List[Tuple[int, int]]:
+        """
+        把 [start_ts, end_ts) 切成對齊整頁的區段
+
+        區段數約為 workers 的兩倍，讓提早結束的區段（例如上市前沒有數據）
+        不會讓其他線程閒置；每個區段最多多出一次不滿頁的請求。
+        """
+        page_ms = PAGE_LIMIT * timeframe_ms
+        total_pages = -(-(end_ts - start_ts) // page_ms)
+        if workers <= 1 or total_pages <= 1:
+            return [(start_ts, end_ts)]
+
+        chunk_pages = -(-total_pages // (workers * 2))
+        bounds = list(range(start_ts, end_ts, chunk_pages * page_ms)) + [end_ts]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _default_rate_limiter(self, workers: int) -> "TokenBucket":
+        """
+        沒有共享限流器時，按交易所的 rateLimit 建立臨時令牌桶
+
+        總請求速率與逐頁 sleep(rateLimit) 相同，並行只用來隱藏請求延遲。
+        """
+        from data.bulk_downloader import TokenBucket
+
+        weight = kline_request_weight(PAGE_LIMIT)
+        return TokenBucket(
+            capacity=weight * workers,
+            refill_rate=weight * 1000.0 / max(self.exchange.rateLimit, 1)
+        )
+
+    def _fetch_pages(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ts: int,
+        end_ts: int,
+        max_retries: int,
+        limiter: Optional["TokenBucket"]
+    ) -> List[np.ndarray]:
+        """順序分頁下載 [start_ts, end_ts)，返回每頁的 numpy 陣列"""
         # 計算每次請求的時間範圍（避免單次請求過大）
         # ccxt 通常限制單次請求最多 1000 根 K 線
         timeframe_ms = self._timeframe_to_milliseconds(timeframe)
-        limit = 1000  # 每次請求的 K 線數量
+        limit = PAGE_LIMIT  # 每次請求的 K 線數量
 
-        all_ohlcv = []
+        pages = []
+        total = 0
         current_ts = start_ts
 
         while current_ts < end_ts:
@@ -103,29 +429,23 @@ class OHLCVFetcher:
             while retry_count < max_retries and not success:
                 try:
                     # 下載數據
-                    ohlcv = self.exchange.fetch_ohlcv(
-                        symbol=symbol,
-                        timeframe=timeframe,
-                        since=current_ts,
-                        limit=limit
-                    )
+                    ohlcv = self._request_page(symbol, timeframe, current_ts, limit, limiter)
 
                     if not ohlcv:
                         logger.warning(f"沒有取得數據，時間戳: {current_ts}")
                         break
 
                     # 過濾超出結束時間的數據
-                    filtered_ohlcv = [
-                        candle for candle in ohlcv
-                        if candle[0] < end_ts
-                    ]
-
-                    if filtered_ohlcv:
-                        all_ohlcv.extend(filtered_ohlcv)
-                        last_ts = filtered_ohlcv[-1][0]
+                    page = np.asarray(ohlcv, dtype=np.float64)
+                    page = page[page[:, 0] < end_ts]
+
+                    if len(page):
+                        pages.append(page)
+                        total += len(page)
+                        last_ts = int(page[-1, 0])
                         logger.info(
-                            f"已下載 {len(filtered_ohlcv)} 根 K 線，"
-                            f"累計: {len(all_ohlcv)} 根，"
+                            f"已下載 {len(page)} 根 K 線，"
+                            f"累計: {total} 根，"
                             f"最後時間: {self._milliseconds_to_date(last_ts)}"
                         )
                         current_ts = last_ts + timeframe_ms
@@ -134,8 +454,9 @@ class OHLCVFetcher:
 
                     success = True
 
-                    # 避免請求過快
-                    time.sleep(self.exchange.rateLimit / 1000)
+                    # 避免請求過快（使用共享限流器時由令牌桶控制）
+                    if limiter is None:
+                        time.sleep(self.exchange.rateLimit / 1000)
 
                 except Exception as e:
                     retry_count += 1
@@ -143,7 +464,7 @@ class OHLCVFetcher:
                         f"API 請求失敗 (重試 {retry_count}/{max_retries}): {e}"
                     )
                     if retry_count < max_retries:
-                        time.sleep(2 ** retry_count)  # 指數退避
+                        time.sleep(self._retry_delay(retry_count))  # 指數退避 + 抖動
                     else:
                         logger.error(f"達到最大重試次數，放棄請求")
                         raise Exception(f"API 請求失敗: {e}")
@@ -151,30 +472,169 @@ class OHLCVFetcher:
             if not success:
                 break
 
-        if not all_ohlcv:
-            raise Exception("未能下載任何數據")
+        return pages
 
-        # 轉換為 DataFrame
-        df = pd.DataFrame(
-            all_ohlcv,
-            columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-        )
+    def _pages_to_frame(self, pages: List[np.ndarray]) -> pd.DataFrame:
+        """把分頁陣列一次性轉換為 DataFrame（排序、去重）"""
+        if not pages:
+            return pd.DataFrame(columns=OHLCV_COLUMNS).astype(
+                {'timestamp': 'int64', **{c: 'float64' for c in OHLCV_COLUMNS[1:]}}
+            )
+
+        data = np.concatenate(pages)
+        df = pd.DataFrame(data[:, 1:6], columns=OHLCV_COLUMNS[1:])
+        df.insert(0, 'timestamp', data[:, 0].astype(np.int64))
 
-        # 移除重複的時間戳（如果有）
+        # 移除重複的時間戳（如果有）並排序
         df = df.drop_duplicates(subset=['timestamp'], keep='first')
+        return df.sort_values('timestamp').reset_index(drop=True)
+
+    def _request_page(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: int,
+        limit: int,
+        limiter: Optional["TokenBucket"] = None
+    ) -> list:
+        """發出單次 K 線請求（有限流器時先按請求權重取得令牌）"""
+        if limiter is not None:
+            limiter.acquire(kline_request_weight(limit))
+        return self.exchange.fetch_ohlcv(
+            symbol=symbol,
+            timeframe=timeframe,
+            since=since,
+            limit=limit
+        )
 
-        # 排序
-        df = df.sort_values('timestamp').reset_index(drop=True)
+    def _retry_delay(self, retry_count: int) -> float:
+        """
+        第 retry_count 次重試前的等待時間
 
-        # 確保目錄存在
+        指數退避上限為 retry_max_delay，並在 [50%, 100%] 範圍內隨機抖動，
+        避免多個並發下載在同一時間重試。
+        """
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** retry_count)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _save_atomic(self, df: pd.DataFrame, save_path: str) -> None:
+        """寫入臨時文件後原子替換（格式根據副檔名判斷）"""
         Path(save_path).parent.mkdir(parents=True, exist_ok=True)
 
-        # 儲存為 CSV
-        df.to_csv(save_path, index=False)
-        logger.info(f"數據已儲存至: {save_path}")
-        logger.info(f"總共 {len(df)} 根 K 線")
+        if storage_format(save_path) != 'csv':
+            # 二進位格式由 OHLCVStorage 負責原子寫入
+            OHLCVStorage().save_ohlcv(df, save_path)
+            return
+
+        tmp_path = f"{save_path}.tmp"
+        df[OHLCV_COLUMNS].to_csv(tmp_path, index=False)
+        os.replace(tmp_path, save_path)
+
+        # v0.5: 記錄到數據目錄（二進位格式由 save_ohlcv 記錄）
+        info = parse_ohlcv_path(save_path)
+        if info is not None:
+            record_dataset(save_path, 'ohlcv', df=df, **info)
+
+    def _append_csv(self, df: pd.DataFrame, save_path: str) -> None:
+        """以單次寫入把新 K 線追加到 CSV 末尾並 fsync（欄位順序與文件標題行相同）"""
+        header = self._csv_header(save_path)
+        frame = df
+        if 'datetime' in header and 'datetime' not in df.columns:
+            # save_ohlcv(include_datetime=True) 保存的文件
+            frame = df.assign(datetime=pd.to_datetime(df['timestamp'], unit='ms', utc=True))
+        missing = [column for column in header if column not in frame.columns]
+        if missing:
+            raise ValueError(f"Cannot append to {save_path}: missing columns {missing}")
+
+        payload = frame[header].to_csv(index=False, header=False)
+        with open(save_path, 'a', encoding='utf-8', newline='') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # v0.5: 在數據目錄的記錄上擴展時間範圍與行數
+        info = parse_ohlcv_path(save_path)
+        if info is not None:
+            record_appended(save_path, 'ohlcv', df=df, appended_bytes=len(payload.encode('utf-8')), **info)
+
+    @staticmethod
+    def _csv_header(save_path: str) -> List[str]:
+        """CSV 文件標題行的欄位名稱"""
+        with open(save_path, 'r', encoding='utf-8') as f:
+            return [column.strip() for column in f.readline().split(',')]
+
+    def _last_stored_timestamp(self, save_path: str) -> Optional[int]:
+        """
+        讀取數據文件的最後時間戳（文件不存在或沒有數據時返回 None）
 
-        return save_path
+        CSV 只讀取文件尾部，timestamp 欄位的位置由標題行決定；若最後一行不完整
+        （上次寫入被中斷），會截斷該行
+
+        Raises:
+            ValueError: CSV 沒有 timestamp 欄位或最後的完整行無法解析
+                （避免誤判為沒有數據而重新下載並覆蓋文件）
+        """
+        path = Path(save_path)
+        if not path.exists():
+            return None
+
+        file_format = storage_format(save_path)
+        if file_format != 'csv':
+            df = OHLCVStorage().load_ohlcv(save_path, convert_to_datetime=False)
+            return int(df['timestamp'].iloc[-1]) if len(df) else None
+
+        header = self._csv_header(save_path)
+        if 'timestamp' not in header:
+            raise ValueError(f"{save_path} has no timestamp column")
+        column = header.index('timestamp')
+
+        with open(path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            block = 4096
+
+            while True:
+                offset = max(size - block, 0)
+                f.seek(offset)
+                lines = f.read().split(b'\n')
+
+                # 每一行相對於 offset 的起點
+                starts = np.concatenate([[0], np.cumsum([len(line) + 1 for line in lines])[:-1]])
+
+                for k in range(len(lines) - 1, -1, -1):
+                    if k == 0:
+                        if offset > 0:
+                            break  # 第一段可能只是半行，擴大讀取範圍
+                        return None  # 只有標題行
+                    line = lines[k]
+                    # 沒有以換行結尾的最後一行是中斷寫入留下的不完整行
+                    if k == len(lines) - 1 or not line.strip():
+                        continue
+                    try:
+                        timestamp = int(float(line.split(b',')[column]))
+                    except (ValueError, IndexError):
+                        raise ValueError(f"Cannot parse last row of {save_path}: {line[:80]!r}")
+
+                    good_end = offset + int(starts[k]) + len(line) + 1
+                    if good_end < size:
+                        logger.warning(f"截斷 {save_path} 尾部不完整的 {size - good_end} bytes")
+                        f.truncate(good_end)
+                    return timestamp
+
+                if offset == 0:
+                    return None
+                block *= 2
+
+    def _last_partition_timestamp(
+        self,
+        store: "PartitionedOHLCVStore",
+        symbol: str,
+        timeframe: str
+    ) -> Optional[int]:
+        """從分區存儲的 manifest 讀取最後時間戳"""
+        if not store.exists(symbol, timeframe):
+            return None
+        partitions = store.read_manifest(symbol, timeframe)["partitions"]
+        return partitions[-1]["end"] if partitions else None
 
     def _date_to_milliseconds(self, date_str: str) -> int:
         """
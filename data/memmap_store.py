@@ -0,0 +1,226 @@
+"""
+Memory-Mapped OHLCV Store v0.5
+
+記憶體映射的 OHLCV 數據集 - 每個欄位一個 .npy 文件
+
+目錄格式（SYMBOL_TIMEFRAME.mmap/）：
+    meta.json         版本、行數、欄位、時間範圍
+    timestamp.npy     int64 毫秒時間戳（已排序、無重複）
+    open.npy ...      float64 OHLCV 欄位
+
+這個模組提供：
+- O(1) 開啟數據集（np.load mmap_mode='r'，只讀取文件頭）
+- searchsorted 日期切片，返回零拷貝視圖
+- 多個進程共享同一份作業系統頁快取
+- 轉換為 DataFrame 時 OHLCV 欄位不複製（只有時間索引會按需生成）
+
+Version: v0.5
+
+Example:
+    >>> save_memmap_ohlcv(df, "data/raw/BTCUSDT_1m.mmap")
+    >>> dataset = MemmapOHLCV.open("data/raw/BTCUSDT_1m.mmap")
+    >>> window = dataset.slice("2024-01-01", "2024-01-31")  # 零拷貝
+    >>> df = window.to_frame()
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from data.storage import OHLCV_COLUMNS, to_utc_timestamp
+
+# 數據集格式版本
+MEMMAP_VERSION = 1
+
+# 元數據文件名
+META_FILE = "meta.json"
+
+
+class MemmapOHLCV:
+    """記憶體映射的 OHLCV 數據集
+
+    所有欄位都是 numpy 陣列（通常是只讀的 np.memmap），
+    slice() 返回共享同一份記憶體的新數據集。
+
+    Args:
+        columns: 欄位名 -> 陣列（必須包含 OHLCV_COLUMNS，長度一致）
+        path: 數據集目錄（可選，僅用於顯示）
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], path: Optional[Union[str, Path]] = None):
+        lengths = {len(array) for array in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Column lengths differ: {lengths}")
+
+        missing = set(OHLCV_COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+
+        self.columns = columns
+        self.path = Path(path) if path is not None else None
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "MemmapOHLCV":
+        """開啟數據集（只映射文件，不讀取數據）
+
+        Raises:
+            FileNotFoundError: 目錄或元數據不存在
+            ValueError: 版本不支援或文件損壞
+        """
+        path = Path(path)
+        meta_path = path / META_FILE
+        if not meta_path.exists():
+            raise FileNotFoundError(f"Memmap dataset not found: {path}")
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta.get("version") != MEMMAP_VERSION:
+            raise ValueError(f"Unsupported memmap dataset version: {meta.get('version')}")
+
+        columns = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r")
+            for name in meta["columns"]
+        }
+
+        dataset = cls(columns, path=path)
+        if len(dataset) != meta["rows"]:
+            raise ValueError(f"Corrupted memmap dataset {path}: expected {meta['rows']} rows, got {len(dataset)}")
+        return dataset
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __repr__(self) -> str:
+        return f"<MemmapOHLCV: {len(self)} rows, path={self.path}>"
+
+    @property
+    def nbytes(self) -> int:
+        """映射的數據大小（bytes）"""
+        return sum(array.nbytes for array in self.columns.values())
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """int64 毫秒時間戳"""
+        return self.columns["timestamp"]
+
+    # === 切片 ===
+
+    def iloc(self, rows) -> "MemmapOHLCV":
+        """按行位置切片（零拷貝）"""
+        return MemmapOHLCV({name: array[rows] for name, array in self.columns.items()}, path=self.path)
+
+    def slice_indices(self, start=None, end=None) -> slice:
+        """返回 [start, end] 日期範圍（兩端包含）對應的行切片"""
+        timestamps = self.timestamps
+        left = 0
+        right = len(timestamps)
+        if start is not None:
+            left = int(np.searchsorted(timestamps, _to_ms(start), side="left"))
+        if end is not None:
+            right = int(np.searchsorted(timestamps, _to_ms(end), side="right"))
+        return slice(left, max(left, right))
+
+    def slice(self, start=None, end=None) -> "MemmapOHLCV":
+        """按日期範圍切片（零拷貝）
+
+        Args:
+            start: 開始時間（包含），str / Timestamp / None
+            end: 結束時間（包含），str / Timestamp / None
+
+        Returns:
+            共享記憶體的新數據集
+        """
+        rows = self.slice_indices(start, end)
+        return self.iloc(rows)
+
+    # === 轉換 ===
+
+    def to_frame(self, include_timestamp: bool = True, timezone: str = "UTC") -> pd.DataFrame:
+        """轉換為 DataFrame（datetime 索引）
+
+        OHLCV 欄位是底層陣列的 ndarray 視圖，不複製；時間索引由 timestamp 生成。
+        返回的 DataFrame 為只讀視圖，不應原地修改。
+
+        Args:
+            include_timestamp: 是否保留 timestamp 欄位（與 load_ohlcv 的輸出一致）
+            timezone: 時區
+        """
+        index = pd.DatetimeIndex(
+            pd.to_datetime(np.asarray(self.timestamps), unit="ms", utc=True),
+            name="datetime"
+        )
+        if timezone != "UTC":
+            index = index.tz_convert(timezone)
+
+        names = OHLCV_COLUMNS if include_timestamp else OHLCV_COLUMNS[1:]
+        return pd.DataFrame(
+            {name: self.columns[name].view(np.ndarray) for name in names},
+            index=index,
+            copy=False
+        )
+
+
+def _to_ms(value) -> int:
+    """轉換為 UTC 毫秒時間戳"""
+    return to_utc_timestamp(value).value // 1_000_000
+
+
+def save_memmap_ohlcv(df: pd.DataFrame, path: Union[str, Path]) -> str:
+    """寫入記憶體映射數據集
+
+    df 必須包含 OHLCV_COLUMNS（timestamp 為 int64 毫秒，已排序、無重複），
+    通常由 OHLCVStorage.save_ohlcv 整理後調用。
+    先寫入臨時目錄再替換，避免讀取到寫了一半的數據集。
+
+    Args:
+        df: OHLCV DataFrame
+        path: 數據集目錄
+
+    Returns:
+        str: 數據集目錄
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    timestamps = df["timestamp"].to_numpy(dtype=np.int64)
+    if len(timestamps) > 1 and not np.all(np.diff(timestamps) > 0):
+        raise ValueError("timestamp must be strictly increasing")
+
+    for name in OHLCV_COLUMNS:
+        dtype = np.int64 if name == "timestamp" else np.float64
+        np.save(tmp_path / f"{name}.npy", np.ascontiguousarray(df[name].to_numpy(dtype=dtype)))
+
+    meta = {
+        "version": MEMMAP_VERSION,
+        "rows": len(df),
+        "columns": OHLCV_COLUMNS,
+        "start": int(timestamps[0]) if len(timestamps) else None,
+        "end": int(timestamps[-1]) if len(timestamps) else None,
+    }
+    with open(tmp_path / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # 目錄無法原子覆蓋：先移走舊目錄再改名
+    if path.exists():
+        old_path = path.with_name(path.name + ".old")
+        if old_path.exists():
+            shutil.rmtree(old_path)
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path)
+    else:
+        os.replace(tmp_path, path)
+
+    return str(path)
@@ -0,0 +1,327 @@
+"""
+Partitioned OHLCV Store v0.5
+
+按時間分區的 OHLCV 歷史數據存儲
+
+目錄格式（默認位於 config.historical_data / "binance"）：
+    {root}/{SYMBOL}/{TIMEFRAME}/manifest.json
+    {root}/{SYMBOL}/{TIMEFRAME}/2024-01.parquet
+    {root}/{SYMBOL}/{TIMEFRAME}/2024-02.parquet
+    ...
+
+manifest.json 記錄分區粒度（month / year）以及每個分區的時間範圍與行數。
+
+這個模組提供：
+- 分區裁剪：帶 start_date / end_date 的載入只開啟相關分區
+- 增量追加：只重寫受影響的分區（通常只有最新一個）
+- 從單一數據文件（CSV / Parquet / Feather / mmap）導入
+- 逐分區讀取（iter_partitions），處理大於記憶體的數據集
+
+Version: v0.5
+
+Example:
+    >>> store = PartitionedOHLCVStore()
+    >>> store.import_file("BTCUSDT", "1m", "data/raw/BTCUSDT_1m.csv")
+    >>> df = store.load("BTCUSDT", "1m", start_date="2024-10-01", end_date="2024-12-31")
+    >>> store.append("BTCUSDT", "1m", new_bars)
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from data_config import config
+from data.storage import (
+    OHLCVStorage, OHLCV_COLUMNS, normalize_ohlcv, slice_date_range, to_utc_timestamp
+)
+from utils.database import record_dataset
+
+logger = logging.getLogger(__name__)
+
+# manifest 格式版本
+MANIFEST_VERSION = 1
+
+# manifest 文件名
+MANIFEST_FILE = "manifest.json"
+
+# 支援的分區粒度
+GRANULARITIES = ("month", "year")
+
+
+class PartitionedOHLCVStore:
+    """按時間分區的 OHLCV 存儲
+
+    Args:
+        root: 存儲根目錄（默認 config.historical_data / "binance"）
+        granularity: 新數據集的默認分區粒度（'month' 或 'year'）
+    """
+
+    def __init__(self, root: Optional[Union[str, Path]] = None, granularity: str = "month"):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+
+        self.root = Path(root) if root is not None else config.historical_data / "binance"
+        self.granularity = granularity
+        self._storage = OHLCVStorage(data_dir=self.root)
+
+    # === 路徑與 manifest ===
+
+    def dataset_dir(self, symbol: str, timeframe: str) -> Path:
+        """數據集目錄"""
+        return self.root / symbol / timeframe
+
+    def exists(self, symbol: str, timeframe: str) -> bool:
+        """數據集是否存在"""
+        return (self.dataset_dir(symbol, timeframe) / MANIFEST_FILE).exists()
+
+    def read_manifest(self, symbol: str, timeframe: str) -> Dict:
+        """讀取 manifest
+
+        Raises:
+            FileNotFoundError: 數據集不存在
+        """
+        path = self.dataset_dir(symbol, timeframe) / MANIFEST_FILE
+        if not path.exists():
+            raise FileNotFoundError(f"Partitioned dataset not found: {path.parent}")
+
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {manifest.get('version')}")
+        return manifest
+
+    def _write_manifest(self, symbol: str, timeframe: str, manifest: Dict) -> None:
+        path = self.dataset_dir(symbol, timeframe) / MANIFEST_FILE
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+        # v0.5: 記錄到數據目錄（整個分區數據集一條記錄）
+        partitions = manifest["partitions"]
+        record_dataset(
+            path.parent, "ohlcv", symbol,
+            timeframe=timeframe,
+            exchange=self.root.name,
+            start=min((p["start"] for p in partitions), default=None),
+            end=max((p["end"] for p in partitions), default=None),
+            rows=sum(p["rows"] for p in partitions),
+        )
+
+    def partitions(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date=None,
+        end_date=None
+    ) -> List[Dict]:
+        """返回與 [start_date, end_date] 重疊的分區（按時間排序）"""
+        manifest = self.read_manifest(symbol, timeframe)
+        start_ms = _to_ms(start_date) if start_date is not None else None
+        end_ms = _to_ms(end_date) if end_date is not None else None
+
+        return [
+            partition for partition in manifest["partitions"]
+            if (start_ms is None or partition["end"] >= start_ms)
+            and (end_ms is None or partition["start"] <= end_ms)
+        ]
+
+    # === 讀取 ===
+
+    def load(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date=None,
+        end_date=None
+    ) -> pd.DataFrame:
+        """載入數據（只開啟與日期範圍重疊的分區）
+
+        Returns:
+            與 load_ohlcv 相同格式的 DataFrame（datetime 索引 + timestamp/OHLCV 欄位）
+        """
+        dataset_dir = self.dataset_dir(symbol, timeframe)
+        selected = self.partitions(symbol, timeframe, start_date, end_date)
+
+        frames = [
+            pd.read_parquet(dataset_dir / partition["file"], columns=OHLCV_COLUMNS)
+            for partition in selected
+        ]
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+        else:
+            df = pd.DataFrame({
+                name: pd.Series(dtype="int64" if name == "timestamp" else "float64")
+                for name in OHLCV_COLUMNS
+            })
+
+        df = slice_date_range(_with_datetime_index(df), start_date, end_date)
+
+        logger.debug(
+            f"Loaded {len(df)} bars for {symbol} ({timeframe}) from "
+            f"{len(selected)} partition(s)"
+        )
+        return df
+
+    def iter_partitions(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date=None,
+        end_date=None
+    ) -> Iterator[pd.DataFrame]:
+        """逐個分區載入（格式與 load 相同），記憶體中一次只有一個分區
+
+        用於處理大於記憶體的數據集（如 data.streaming_resample）。
+        """
+        dataset_dir = self.dataset_dir(symbol, timeframe)
+        for partition in self.partitions(symbol, timeframe, start_date, end_date):
+            df = pd.read_parquet(dataset_dir / partition["file"], columns=OHLCV_COLUMNS)
+            df = slice_date_range(_with_datetime_index(df), start_date, end_date)
+            if not df.empty:
+                yield df
+
+    # === 寫入 ===
+
+    def write(
+        self,
+        symbol: str,
+        timeframe: str,
+        df: pd.DataFrame,
+        granularity: Optional[str] = None
+    ) -> Dict:
+        """寫入完整數據集（覆蓋已有分區）
+
+        Returns:
+            新的 manifest
+        """
+        granularity = granularity or self.granularity
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+
+        dataset_dir = self.dataset_dir(symbol, timeframe)
+        dataset_dir.mkdir(parents=True, exist_ok=True)
+
+        old_files = set()
+        if self.exists(symbol, timeframe):
+            old_files = {p["file"] for p in self.read_manifest(symbol, timeframe)["partitions"]}
+
+        partitions = self._write_partitions(dataset_dir, normalize_ohlcv(df), granularity)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "granularity": granularity,
+            "partitions": partitions,
+        }
+        self._write_manifest(symbol, timeframe, manifest)
+
+        # manifest 更新後再刪除不再使用的分區
+        for file_name in old_files - {p["file"] for p in partitions}:
+            (dataset_dir / file_name).unlink(missing_ok=True)
+
+        logger.info(f"Wrote {symbol} ({timeframe}): {len(partitions)} partition(s)")
+        return manifest
+
+    def append(self, symbol: str, timeframe: str, df: pd.DataFrame) -> List[str]:
+        """追加數據，只重寫受影響的分區
+
+        新數據與已有數據時間戳重複時，以新數據為準。
+
+        Returns:
+            被重寫的分區鍵列表
+        """
+        if not self.exists(symbol, timeframe):
+            manifest = self.write(symbol, timeframe, df)
+            return [p["key"] for p in manifest["partitions"]]
+
+        new = normalize_ohlcv(df)
+        if new.empty:
+            return []
+
+        manifest = self.read_manifest(symbol, timeframe)
+        granularity = manifest["granularity"]
+        dataset_dir = self.dataset_dir(symbol, timeframe)
+        existing = {p["key"]: p for p in manifest["partitions"]}
+
+        rewritten = []
+        for key, chunk in split_by_partition(new, granularity):
+            if key in existing:
+                old = pd.read_parquet(dataset_dir / existing[key]["file"], columns=OHLCV_COLUMNS)
+                chunk = normalize_ohlcv(pd.concat([old, chunk], ignore_index=True))
+            existing[key] = self._write_partition(dataset_dir, key, chunk)
+            rewritten.append(key)
+
+        manifest["partitions"] = [existing[key] for key in sorted(existing)]
+        self._write_manifest(symbol, timeframe, manifest)
+
+        logger.info(f"Appended {len(new)} bars to {symbol} ({timeframe}), rewrote {rewritten}")
+        return rewritten
+
+    def import_file(
+        self,
+        symbol: str,
+        timeframe: str,
+        file_path: Union[str, Path],
+        granularity: Optional[str] = None
+    ) -> Dict:
+        """從單一數據文件導入（CSV / Parquet / Feather / mmap）"""
+        df = self._storage.load_ohlcv(str(file_path))
+        return self.write(symbol, timeframe, df, granularity)
+
+    def _write_partitions(self, dataset_dir: Path, df: pd.DataFrame, granularity: str) -> List[Dict]:
+        return [
+            self._write_partition(dataset_dir, key, chunk)
+            for key, chunk in split_by_partition(df, granularity)
+        ]
+
+    def _write_partition(self, dataset_dir: Path, key: str, chunk: pd.DataFrame) -> Dict:
+        file_name = f"{key}.parquet"
+        self._storage.save_ohlcv(chunk, str(dataset_dir / file_name))
+        return {
+            "key": key,
+            "file": file_name,
+            "start": int(chunk["timestamp"].iloc[0]),
+            "end": int(chunk["timestamp"].iloc[-1]),
+            "rows": len(chunk),
+        }
+
+
+def _to_ms(value) -> int:
+    """轉換為 UTC 毫秒時間戳"""
+    return to_utc_timestamp(value).value // 1_000_000
+
+
+def _with_datetime_index(df: pd.DataFrame) -> pd.DataFrame:
+    """以 timestamp（毫秒）建立 UTC datetime 索引"""
+    df.index = pd.DatetimeIndex(pd.to_datetime(df["timestamp"], unit="ms", utc=True), name="datetime")
+    return df
+
+
+def split_by_partition(df: pd.DataFrame, granularity: str):
+    """按分區鍵切分已排序的數據（'2024-01' 或 '2024'）"""
+    if df.empty:
+        return
+
+    datetimes = pd.to_datetime(df["timestamp"].to_numpy(), unit="ms", utc=True)
+    if granularity == "month":
+        codes = datetimes.year * 100 + datetimes.month
+    else:
+        codes = datetimes.year
+    codes = np.asarray(codes)
+
+    # 數據已排序，分區是連續區段
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(codes)]])
+
+    for start, end in zip(starts, ends):
+        code = int(codes[start])
+        key = f"{code // 100:04d}-{code % 100:02d}" if granularity == "month" else f"{code:04d}"
+        yield key, df.iloc[start:end].reset_index(drop=True)
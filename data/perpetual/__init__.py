@@ -9,10 +9,13 @@ Modules:
 - basis: 期現基差計算 (Phase B)
 - liquidations: 爆倉數據監控 (Phase B)
 - long_short_ratio: 多空持倉比分析 (Phase B)
+- segment_store: 存儲文件的 manifest 索引與壓實
 
 Version: v0.5 Phase B
 """
 
+from .segment_store import SegmentStore
+
 from .funding_rate import (
     FundingRateData,
     fetch_funding_rate,
@@ -60,5 +63,7 @@ __all__ = [
     'calculate_panic_index',
     'LongShortRatioData',
     'fetch_long_short_ratio',
-    'calculate_sentiment'
+    'calculate_sentiment',
+    # Storage
+    'SegmentStore'
 ]
@@ -17,6 +17,7 @@ Author: SuperDog Quant Team
 
 import logging
 from datetime import datetime, timedelta
+from functools import cached_property
 from typing import Optional, Dict, Any, Union, List
 from pathlib import Path
 
@@ -24,6 +25,7 @@ import pandas as pd
 import numpy as np
 
 from data.exchanges import BinanceConnector
+from data.perpetual.segment_store import SegmentStore
 
 logger = logging.getLogger(__name__)
 
@@ -60,17 +62,19 @@ class BasisData:
                 # 回退到項目目錄
                 storage_path = Path.cwd() / 'data_storage' / 'perpetual' / 'basis'
 
+        # v0.5: 存儲目錄在第一次保存時才建立
         self.storage_path = storage_path
-        self.storage_path.mkdir(parents=True, exist_ok=True)
-
-        # 交易所連接器
-        self.binance = BinanceConnector()
 
         # 數據快取
         self._cache: Dict[str, pd.DataFrame] = {}
 
         logger.info(f"BasisData initialized with storage at {self.storage_path}")
 
+    @cached_property
+    def binance(self) -> BinanceConnector:
+        """交易所連接器（v0.5: 第一次使用時才建立）"""
+        return BinanceConnector()
+
     def calculate_basis(
         self,
         perp_price: Union[pd.Series, float],
@@ -407,7 +411,7 @@ class BasisData:
 
         # 創建交易所目錄
         exchange_dir = self.storage_path / exchange
-        exchange_dir.mkdir(exist_ok=True)
+        exchange_dir.mkdir(parents=True, exist_ok=True)
 
         # 生成文件名
         start_date = df['timestamp'].min().strftime('%Y%m%d')
@@ -415,9 +419,9 @@ class BasisData:
         filename = f"{symbol}_basis_{start_date}_{end_date}.{format}"
         filepath = exchange_dir / filename
 
-        # 保存
+        # 保存（parquet 登記到 manifest，並壓實與已有文件重疊的範圍）
         if format == 'parquet':
-            df.to_parquet(filepath, compression='snappy', index=False)
+            filepath = self._segments(symbol, exchange).write(df, filepath)
         elif format == 'csv':
             df.to_csv(filepath, index=False)
         else:
@@ -451,33 +455,24 @@ class BasisData:
             logger.warning(f"No data found for {exchange}")
             return pd.DataFrame()
 
-        # 查找匹配的文件
-        pattern = f"{symbol}_basis_*.parquet"
-        files = list(exchange_dir.glob(pattern))
-
-        if not files:
+        segments = self._segments(symbol, exchange)
+        if not segments.files():
             logger.warning(f"No basis data files found for {symbol}")
             return pd.DataFrame()
 
-        # 載入所有匹配的文件
-        dfs = []
-        for file in files:
-            df = pd.read_parquet(file)
-            dfs.append(df)
-
-        df = pd.concat(dfs, ignore_index=True)
-        df = df.sort_values('timestamp').drop_duplicates('timestamp')
-
-        # 篩選日期範圍
-        if start_date:
-            df = df[df['timestamp'] >= pd.to_datetime(start_date)]
-        if end_date:
-            df = df[df['timestamp'] <= pd.to_datetime(end_date)]
+        # 只讀取與日期範圍重疊的分段，並在 timestamp 上下推過濾
+        df = segments.read(start_date, end_date)
 
         logger.info(f"Loaded {len(df)} basis records for {symbol}")
 
         return df
 
+    def _segments(self, symbol: str, exchange: str) -> SegmentStore:
+        """基差數據集的 manifest 索引分段"""
+        return SegmentStore(
+            self.storage_path / exchange, f"{symbol}_basis", source="basis", symbol=symbol
+        )
+
 
 # 便捷函數
 def calculate_basis(
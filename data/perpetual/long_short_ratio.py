@@ -22,7 +22,9 @@ from pathlib import Path
 import pandas as pd
 import numpy as np
 
-from data.exchanges import BinanceConnector, BybitConnector, OKXConnector
+from data.exchanges import BinanceConnector, BybitConnector, OKXConnector, LazyConnectors
+from data.perpetual.segment_store import SegmentStore
+from utils.database import PERPETUAL_SOURCES
 
 logger = logging.getLogger(__name__)
 
@@ -57,15 +59,15 @@ class LongShortRatioData:
             else:
                 storage_path = Path.cwd() / 'data_storage' / 'perpetual' / 'long_short_ratio'
 
+        # v0.5: 存儲目錄在第一次保存時才建立
         self.storage_path = storage_path
-        self.storage_path.mkdir(parents=True, exist_ok=True)
 
-        # 交易所連接器
-        self.connectors = {
-            'binance': BinanceConnector(),
-            'bybit': BybitConnector(),
-            'okx': OKXConnector()
-        }
+        # 交易所連接器（v0.5: 第一次使用時才建立）
+        self.connectors = LazyConnectors({
+            'binance': BinanceConnector,
+            'bybit': BybitConnector,
+            'okx': OKXConnector
+        })
 
         # 數據快取
         self._cache: Dict[str, pd.DataFrame] = {}
@@ -356,7 +358,7 @@ class LongShortRatioData:
             return None
 
         exchange_dir = self.storage_path / exchange
-        exchange_dir.mkdir(exist_ok=True)
+        exchange_dir.mkdir(parents=True, exist_ok=True)
 
         start_date = df['timestamp'].min().strftime('%Y%m%d')
         end_date = df['timestamp'].max().strftime('%Y%m%d')
@@ -364,7 +366,7 @@ class LongShortRatioData:
         filepath = exchange_dir / filename
 
         if format == 'parquet':
-            df.to_parquet(filepath, compression='snappy', index=False)
+            filepath = self._segments(symbol, exchange).write(df, filepath)
         elif format == 'csv':
             df.to_csv(filepath, index=False)
         else:
@@ -388,30 +390,24 @@ class LongShortRatioData:
             logger.warning(f"No data found for {exchange}")
             return pd.DataFrame()
 
-        pattern = f"{symbol}_long_short_ratio_*.parquet"
-        files = list(exchange_dir.glob(pattern))
-
-        if not files:
+        segments = self._segments(symbol, exchange)
+        if not segments.files():
             logger.warning(f"No long/short ratio data files found for {symbol}")
             return pd.DataFrame()
 
-        dfs = []
-        for file in files:
-            df = pd.read_parquet(file)
-            dfs.append(df)
-
-        df = pd.concat(dfs, ignore_index=True)
-        df = df.sort_values('timestamp').drop_duplicates('timestamp')
-
-        if start_date:
-            df = df[df['timestamp'] >= pd.to_datetime(start_date)]
-        if end_date:
-            df = df[df['timestamp'] <= pd.to_datetime(end_date)]
+        df = segments.read(start_date, end_date)
 
         logger.info(f"Loaded {len(df)} long/short ratio records for {symbol}")
 
         return df
 
+    def _segments(self, symbol: str, exchange: str) -> SegmentStore:
+        """多空比數據集的 manifest 索引分段"""
+        return SegmentStore(
+            self.storage_path / exchange, f"{symbol}_long_short_ratio",
+            source=PERPETUAL_SOURCES["long_short_ratio"], symbol=symbol
+        )
+
 
 # 便捷函數
 def fetch_long_short_ratio(
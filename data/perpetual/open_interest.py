@@ -20,8 +20,9 @@ from typing import Optional, List, Dict, Any, Union
 from pathlib import Path
 import logging
 
-from data.exchanges.base_connector import ExchangeConnector
+from data.exchanges.base_connector import ExchangeConnector, LazyConnectors
 from data.exchanges.binance_connector import BinanceConnector
+from data.perpetual.segment_store import SegmentStore
 
 logger = logging.getLogger(__name__)
 
@@ -44,13 +45,13 @@ class OpenInterestData:
         Args:
             storage_path: 數據存儲路徑（默認使用 SSD）
         """
+        # v0.5: 存儲目錄在第一次保存時才建立
         self.storage_path = storage_path or Path("/Volumes/權志龍的寶藏/SuperDogData/perpetual/open_interest")
-        self.storage_path.mkdir(parents=True, exist_ok=True)
 
-        # 初始化交易所連接器
-        self.connectors: Dict[str, ExchangeConnector] = {
-            'binance': BinanceConnector()
-        }
+        # 初始化交易所連接器（v0.5: 第一次使用時才建立）
+        self.connectors: Dict[str, ExchangeConnector] = LazyConnectors({
+            'binance': BinanceConnector
+        })
 
         # 數據快取
         self._cache: Dict[str, pd.DataFrame] = {}
@@ -406,7 +407,7 @@ class OpenInterestData:
         """
         # 創建存儲目錄
         exchange_dir = self.storage_path / exchange
-        exchange_dir.mkdir(exist_ok=True)
+        exchange_dir.mkdir(parents=True, exist_ok=True)
 
         # 生成文件名（包含時間範圍）
         if not df.empty:
@@ -418,9 +419,9 @@ class OpenInterestData:
 
         file_path = exchange_dir / filename
 
-        # 保存數據
+        # 保存數據（parquet 登記到 manifest，並壓實與已有文件重疊的範圍）
         if format == 'parquet':
-            df.to_parquet(file_path, index=False, compression='snappy')
+            file_path = self._segments(symbol, exchange, interval).write(df, file_path)
         elif format == 'csv':
             df.to_csv(file_path, index=False)
         else:
@@ -456,45 +457,25 @@ class OpenInterestData:
             logger.warning(f"No data directory found for {exchange}")
             return pd.DataFrame()
 
-        # 查找匹配的文件
-        pattern = f"{symbol}_open_interest_{interval}"
-        if start_date and end_date:
-            pattern += f"_{start_date}_{end_date}"
-        pattern += ".parquet"
-
-        matching_files = list(exchange_dir.glob(pattern))
-
-        if not matching_files:
-            # 嘗試通配符模式
-            pattern = f"{symbol}_open_interest_{interval}*.parquet"
-            matching_files = list(exchange_dir.glob(pattern))
-
-        if not matching_files:
+        segments = self._segments(symbol, exchange, interval)
+        if not segments.files():
             logger.warning(f"No open interest data found for {symbol} on {exchange}")
             return pd.DataFrame()
 
-        # 加載並合併所有匹配的文件
-        all_data = []
-        for file_path in matching_files:
-            df = pd.read_parquet(file_path)
-            all_data.append(df)
-
-        combined = pd.concat(all_data, ignore_index=True)
-        combined = combined.sort_values('timestamp').reset_index(drop=True)
-
-        # 如果指定了日期範圍，過濾數據
-        if start_date or end_date:
-            if start_date:
-                start_dt = pd.to_datetime(start_date)
-                combined = combined[combined['timestamp'] >= start_dt]
-            if end_date:
-                end_dt = pd.to_datetime(end_date)
-                combined = combined[combined['timestamp'] <= end_dt]
+        # 只讀取與日期範圍重疊的分段，並在 timestamp 上下推過濾
+        combined = segments.read(start_date, end_date)
 
         logger.info(f"Loaded {len(combined)} open interest records from storage")
 
         return combined
 
+    def _segments(self, symbol: str, exchange: str, interval: str) -> SegmentStore:
+        """持倉量數據集（按時間間隔區分）的 manifest 索引分段"""
+        return SegmentStore(
+            self.storage_path / exchange, f"{symbol}_open_interest_{interval}",
+            source="open_interest", symbol=symbol, timeframe=interval
+        )
+
     def clear_cache(self):
         """清除數據快取"""
         self._cache.clear()
@@ -0,0 +1,367 @@
+"""
+Perpetual Segment Store v0.5
+
+永續數據文件的 manifest 索引與分段壓實
+
+數據處理器按 {SYMBOL}_{數據類型}_{開始}_{結束}.parquet 保存每次抓取的結果，
+同一數據集會累積許多時間範圍互相重疊的文件。這個模組為每個數據集維護一個
+manifest（文件 -> 時間範圍、行數），並提供：
+
+- 範圍裁剪：只讀取與請求範圍重疊的分段，並在 timestamp 上做 Parquet 謂詞下推
+- 壓實：把時間範圍重疊的文件合併為不重疊、已排序、已去重的分段
+- 與磁碟同步：manifest 之外寫入或被改寫的文件會在下次讀取時自動索引
+
+manifest 位於 {exchange_dir}/{dataset}.manifest.json，例如：
+    data/perpetual/funding_rate/binance/BTCUSDT_funding_rate.manifest.json
+
+Version: v0.5
+
+Example:
+    >>> store = SegmentStore(Path("data/perpetual/funding_rate/binance"), "BTCUSDT_funding_rate")
+    >>> store.compact()
+    >>> df = store.read(start="20240101", end="20240131")
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.database import record_dataset
+
+logger = logging.getLogger(__name__)
+
+# manifest 格式版本
+MANIFEST_VERSION = 1
+
+# 壓實後分段的 row group 大小（謂詞下推以 row group 為單位跳過數據）
+ROW_GROUP_SIZE = 50_000
+
+_EMPTY_TIMESTAMPS = pd.Series(dtype='datetime64[ns]')
+
+
+class SegmentStore:
+    """一個交易所目錄下單一數據集的 manifest 索引分段
+
+    Args:
+        directory: 交易所目錄（例如 storage_path / 'binance'）
+        dataset: 數據集名稱，即文件名前綴（例如 'BTCUSDT_funding_rate'）
+        dedup_columns: 去重鍵（默認 timestamp；None 表示整行相同才視為重複）
+        source: 數據源（例如 'funding_rate'；提供時 manifest 更新會記錄到數據目錄）
+        symbol: 交易對（數據目錄記錄）
+        timeframe: 時間間隔（數據目錄記錄，可選）
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        dataset: str,
+        dedup_columns: Optional[Sequence[str]] = ('timestamp',),
+        source: Optional[str] = None,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None
+    ):
+        self.directory = Path(directory)
+        self.dataset = dataset
+        self.dedup_columns = list(dedup_columns) if dedup_columns else None
+        self.manifest_path = self.directory / f"{dataset}.manifest.json"
+        self.source = source
+        self.symbol = symbol
+        self.timeframe = timeframe
+
+    # === manifest ===
+
+    def files(self) -> List[Path]:
+        """磁碟上屬於此數據集的 Parquet 文件"""
+        files = list(self.directory.glob(f"{self.dataset}_*.parquet"))
+        single = self.directory / f"{self.dataset}.parquet"
+        if single.exists():
+            files.append(single)
+        return sorted(files)
+
+    def refresh(self) -> Dict:
+        """讀取 manifest 並與磁碟同步
+
+        新增或被改寫（大小 / 修改時間不同）的文件重新索引，已刪除的文件從
+        manifest 移除；有變更時寫回 manifest。
+
+        Returns:
+            manifest
+        """
+        manifest = self._read_manifest()
+        known = {segment['file']: segment for segment in manifest['segments']}
+
+        segments = []
+        changed = []
+        for path in self.files():
+            stat = path.stat()
+            segment = known.pop(path.name, None)
+            if segment is not None and (segment['size'], segment['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                segments.append(segment)
+            else:
+                changed.append((stat.st_mtime_ns, path))
+
+        if not changed and not known:
+            return manifest
+
+        # 按修改時間分配序號：序號較大的文件在去重時優先
+        for _, path in sorted(changed):
+            segments.append(self._index_file(path, manifest))
+
+        manifest['segments'] = segments
+        self._write_manifest(manifest)
+        return manifest
+
+    def write(self, df: pd.DataFrame, path: Path) -> Path:
+        """寫入一個新文件、登記到 manifest，並壓實與已有分段重疊的範圍
+
+        已存在同名文件時改用帶序號的文件名，不覆蓋已有分段（重疊的數據由
+        壓實合併，重複時以新數據為準）。
+
+        Args:
+            df: 數據（含 timestamp 欄位）
+            path: 文件路徑（{dataset}_{開始}_{結束}.parquet）
+
+        Returns:
+            包含這批數據的分段路徑（壓實後可能是合併後的新文件）
+        """
+        path = self._free_path(Path(path).stem, reusable=set())
+        self.directory.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, index=False, compression='snappy')
+        self.add(path, df)
+
+        if self.compact() and not path.exists() and len(df):
+            first = df['timestamp'].min()
+            path = self.directory / self.segments(first, first)[0]['file']
+        return path
+
+    def add(self, path: Path, df: pd.DataFrame) -> Dict:
+        """登記剛寫入的文件（使用記憶體中的數據計算範圍，不重新讀取文件）
+
+        Returns:
+            新的分段記錄
+        """
+        path = Path(path)
+        manifest = self._read_manifest()
+        timestamps = df['timestamp'] if 'timestamp' in df.columns else _EMPTY_TIMESTAMPS
+        segment = self._segment_entry(path, timestamps, manifest)
+
+        manifest['segments'] = [s for s in manifest['segments'] if s['file'] != path.name] + [segment]
+        self._write_manifest(manifest)
+        return segment
+
+    def segments(self, start=None, end=None) -> List[Dict]:
+        """返回與 [start, end] 重疊的非空分段（按開始時間排序）"""
+        manifest = self.refresh()
+        start_ms = _to_ms(start) if start is not None else None
+        end_ms = _to_ms(end) if end is not None else None
+
+        selected = [
+            segment for segment in manifest['segments']
+            if segment['rows'] > 0
+            and (start_ms is None or segment['end'] >= start_ms)
+            and (end_ms is None or segment['start'] <= end_ms)
+        ]
+        return sorted(selected, key=lambda s: (s['start'], s['seq']))
+
+    # === 讀取 ===
+
+    def read(self, start=None, end=None) -> pd.DataFrame:
+        """讀取 [start, end]（兩端包含）範圍內的數據
+
+        只開啟重疊的分段並在 timestamp 上下推過濾；分段互不重疊且已排序時
+        直接按順序拼接，否則（尚未壓實）拼接後排序並去重。
+
+        Returns:
+            按 timestamp 排序的 DataFrame（沒有任何分段時為空 DataFrame）
+        """
+        selected = self.segments(start, end)
+        if not selected:
+            return pd.DataFrame()
+
+        if _is_disjoint(selected):
+            frames = [self._read_segment(segment, start, end) for segment in selected]
+            return pd.concat(frames, ignore_index=True)
+
+        # 按寫入順序拼接，去重時保留較新的數據
+        ordered = sorted(selected, key=lambda s: s['seq'])
+        frames = [self._read_segment(segment, start, end) for segment in ordered]
+        return self._merge(frames)
+
+    # === 壓實 ===
+
+    def compact(self) -> List[str]:
+        """把時間範圍重疊（或內部未排序）的分段合併為不重疊、已排序、已去重的分段
+
+        互不重疊且已排序的分段保持不變。
+
+        Returns:
+            新寫入的分段文件名
+        """
+        manifest = self.refresh()
+        groups = _overlap_groups(self.segments())
+        groups = [group for group in groups if len(group) > 1 or not group[0]['sorted']]
+        if not groups:
+            return []
+
+        replaced = set()
+        new_segments = []
+        for group in groups:
+            ordered = sorted(group, key=lambda s: s['seq'])
+            merged = self._merge([pd.read_parquet(self.directory / s['file']) for s in ordered])
+
+            group_files = {s['file'] for s in group}
+            timestamps = merged['timestamp']
+            path = self._free_path(
+                f"{self.dataset}_{timestamps.min():%Y%m%d}_{timestamps.max():%Y%m%d}", group_files
+            )
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            merged.to_parquet(tmp_path, index=False, compression='snappy', row_group_size=ROW_GROUP_SIZE)
+            os.replace(tmp_path, path)
+
+            replaced |= group_files
+            new_segments.append(self._segment_entry(path, merged['timestamp'], manifest))
+
+        new_files = {segment['file'] for segment in new_segments}
+        manifest['segments'] = [
+            segment for segment in manifest['segments'] if segment['file'] not in replaced
+        ] + new_segments
+        self._write_manifest(manifest)
+
+        # manifest 更新後再刪除被合併的文件
+        for file_name in replaced - new_files:
+            (self.directory / file_name).unlink(missing_ok=True)
+
+        logger.info(
+            f"Compacted {self.dataset}: {len(replaced)} file(s) -> {len(new_segments)} segment(s)"
+        )
+        return sorted(new_files)
+
+    # === 內部 ===
+
+    def _read_manifest(self) -> Dict:
+        if not self.manifest_path.exists():
+            return {'version': MANIFEST_VERSION, 'dataset': self.dataset, 'next_seq': 0, 'segments': []}
+
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {manifest.get('version')}")
+        return manifest
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+        # v0.5: 記錄到數據目錄（整個數據集一條記錄）
+        if self.source is not None:
+            segments = [segment for segment in manifest['segments'] if segment['rows'] > 0]
+            record_dataset(
+                self.manifest_path, self.source, self.symbol,
+                timeframe=self.timeframe,
+                exchange=self.directory.name,
+                start=min((s['start'] for s in segments), default=None),
+                end=max((s['end'] for s in segments), default=None),
+                rows=sum(s['rows'] for s in segments),
+            )
+
+    def _index_file(self, path: Path, manifest: Dict) -> Dict:
+        """讀取文件的 timestamp 欄位建立分段記錄（無法讀取的文件記為空分段）"""
+        try:
+            timestamps = pq.read_table(path, columns=['timestamp']).column('timestamp').to_pandas()
+        except Exception as e:
+            logger.warning(f"Cannot index {path.name}: {e}")
+            timestamps = _EMPTY_TIMESTAMPS
+        return self._segment_entry(path, timestamps, manifest)
+
+    def _segment_entry(self, path: Path, timestamps: pd.Series, manifest: Dict) -> Dict:
+        stat = path.stat()
+        seq = manifest['next_seq']
+        manifest['next_seq'] = seq + 1
+
+        timestamps = pd.Series(timestamps)
+        tz = getattr(timestamps.dt, 'tz', None) if len(timestamps) else None
+        return {
+            'file': path.name,
+            'start': _to_ms(timestamps.min()) if len(timestamps) else None,
+            'end': _to_ms(timestamps.max()) if len(timestamps) else None,
+            'rows': len(timestamps),
+            'sorted': bool(timestamps.is_monotonic_increasing),
+            'tz': str(tz) if tz is not None else None,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'seq': seq,
+        }
+
+    def _free_path(self, name: str, reusable: set) -> Path:
+        """{name}.parquet，已被其他分段使用時加上序號（reusable 中的文件可覆蓋）"""
+        path = self.directory / f"{name}.parquet"
+        suffix = 1
+        while path.exists() and path.name not in reusable:
+            path = self.directory / f"{name}_{suffix}.parquet"
+            suffix += 1
+        return path
+
+    def _read_segment(self, segment: Dict, start, end) -> pd.DataFrame:
+        """讀取一個分段，範圍未完全覆蓋時在 timestamp 上下推過濾"""
+        path = self.directory / segment['file']
+        filters = []
+        if start is not None and _to_ms(start) > segment['start']:
+            filters.append(('timestamp', '>=', _bound(start, segment['tz'])))
+        if end is not None and _to_ms(end) < segment['end']:
+            filters.append(('timestamp', '<=', _bound(end, segment['tz'])))
+        return pd.read_parquet(path, filters=filters or None)
+
+    def _merge(self, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """拼接（按寫入順序）、穩定排序並去重，重複時保留較新的數據"""
+        df = pd.concat(frames, ignore_index=True)
+        df = df.sort_values('timestamp', kind='stable')
+        df = df.drop_duplicates(subset=self.dedup_columns, keep='last')
+        return df.reset_index(drop=True)
+
+
+def _to_ms(value) -> int:
+    """轉換為 UTC 毫秒時間戳（無時區的值視為 UTC）"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return ts.value // 1_000_000
+
+
+def _bound(value, tz: Optional[str]) -> pd.Timestamp:
+    """把過濾邊界轉換為與欄位相同的時區（無時區欄位使用無時區的 UTC 時間）"""
+    ts = pd.Timestamp(value)
+    if tz is None:
+        return ts.tz_convert('UTC').tz_localize(None) if ts.tzinfo is not None else ts
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return ts.tz_convert(tz)
+
+
+def _is_disjoint(segments: List[Dict]) -> bool:
+    """按開始時間排序的分段是否互不重疊且各自已排序"""
+    return all(segment['sorted'] for segment in segments) and all(
+        prev['end'] < curr['start'] for prev, curr in zip(segments, segments[1:])
+    )
+
+
+def _overlap_groups(segments: List[Dict]) -> List[List[Dict]]:
+    """把按開始時間排序的分段分為時間範圍互相重疊（可傳遞）的組"""
+    groups: List[List[Dict]] = []
+    group_end = None
+    for segment in segments:
+        if groups and segment['start'] <= group_end:
+            groups[-1].append(segment)
+            group_end = max(group_end, segment['end'])
+        else:
+            groups.append([segment])
+            group_end = segment['end']
+    return groups
@@ -10,29 +10,59 @@ Data Pipeline v0.5
 - 數據快取機制
 - 與 SSD 環境無縫整合
 - v0.5: 支援資金費率和持倉量數據
+- v0.5: 分區歷史數據（分區裁剪）、記憶體映射與二進位數據文件
+- v0.5: 按記憶體預算淘汰的 LRU 快取（命中率、淘汰統計與淘汰回調）
+- v0.5: 已驗證 OHLCV 的持久化快取（數據源未變時跳過品質檢查）
+- v0.5: 並行載入策略的所有數據需求（load_strategy_data_concurrent，支援超時）
+- v0.5: 多交易對 / 預載入並行化，以及背景預取後續數據集（prefetch）
+- v0.5: 全局管道與永續數據處理器延遲建立（import 無副作用）
+- v0.5: 多時間週期金字塔（更高時間週期從基準數據一次聚合並快取，load_timeframes）
 
 Version: v0.5 (upgraded from v0.4)
 Design Reference: docs/specs/planned/v0.5_perpetual_data_ecosystem_spec.md
 """
 
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
 from pathlib import Path
 from dataclasses import dataclass
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 import logging
+import threading
+import time
 
 from strategies.api_v2 import BaseStrategy, DataSource, DataRequirement
 from data.timeframe_manager import TimeframeManager, Timeframe
 from data.symbol_manager import SymbolManager
 from data_config import config
 
-# v0.5: Import perpetual data modules
-from data.perpetual import FundingRateData, OpenInterestData
-from data.quality import DataQualityController
+from data.quality import DataQualityController, ValidatedOHLCVCache
+from data.storage import OHLCVStorage, find_data_file, storage_format, slice_date_range
+from data.memmap_store import MemmapOHLCV
+from data.partitioned_store import PartitionedOHLCVStore
+from data.cache import DataCache, EvictionCallback, DEFAULT_CACHE_MAX_MB
+from data.prefetch import DataPrefetcher, PrefetchLoader, PrefetchRequest
+from utils.database import QUALITY_FAILED, QUALITY_PASSED, get_catalog
+
+if TYPE_CHECKING:
+    from data.perpetual import (
+        FundingRateData, OpenInterestData, BasisData, LiquidationData, LongShortRatioData
+    )
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# 支援的數據源：DataSource -> (結果鍵, 錯誤訊息中的名稱)
+REQUIREMENT_KEYS = {
+    DataSource.OHLCV: ('ohlcv', 'OHLCV'),
+    DataSource.FUNDING_RATE: ('funding_rate', 'funding rate'),
+    DataSource.OPEN_INTEREST: ('open_interest', 'open interest'),
+    DataSource.BASIS: ('basis', 'basis'),
+    DataSource.LIQUIDATIONS: ('liquidations', 'liquidations'),
+    DataSource.LONG_SHORT_RATIO: ('long_short_ratio', 'long/short ratio'),
+}
+
 
 @dataclass
 class DataLoadResult:
@@ -86,12 +116,24 @@ class DataPipeline:
         ...     signals = strategy.compute_signals(data, params)
     """
 
-    def __init__(self, data_dir: Optional[Path] = None, enable_cache: bool = True):
+    def __init__(
+        self,
+        data_dir: Optional[Path] = None,
+        enable_cache: bool = True,
+        cache_max_mb: Optional[float] = DEFAULT_CACHE_MAX_MB,
+        cache_max_items: Optional[int] = None,
+        on_cache_evict: Optional[EvictionCallback] = None,
+        enable_validated_cache: bool = True
+    ):
         """初始化數據管道
 
         Args:
             data_dir: 數據目錄路徑（默認使用 SSD 配置）
             enable_cache: 是否啟用數據快取
+            cache_max_mb: 快取記憶體上限（MB，None 表示不限制）
+            cache_max_items: 快取項目數上限（None 表示不限制）
+            on_cache_evict: 快取淘汰回調 (key, value, reason)
+            enable_validated_cache: 是否把驗證後的 OHLCV 持久化到 data_dir/cache/validated_ohlcv
         """
         self.data_dir = data_dir or config.data_root
         self.enable_cache = enable_cache
@@ -100,24 +142,62 @@ class DataPipeline:
         self.timeframe_manager = TimeframeManager()
         self.symbol_manager = SymbolManager()
 
-        # v0.5 Phase A: 初始化永續數據處理器
-        self.funding_rate_data = FundingRateData()
-        self.open_interest_data = OpenInterestData()
-
-        # v0.5 Phase B: 初始化新增數據處理器
-        from data.perpetual import BasisData, LiquidationData, LongShortRatioData
-        self.basis_data = BasisData()
-        self.liquidation_data = LiquidationData()
-        self.long_short_ratio_data = LongShortRatioData()
+        # v0.5: 永續數據處理器（funding_rate_data 等）在第一次使用時才建立，見下方屬性
 
         # v0.5: 初始化數據品質控制器
         self.quality_controller = DataQualityController(strict_mode=False)
 
-        # 數據快取
-        self._cache: Dict[str, pd.DataFrame] = {}
+        # v0.5: 已驗證 OHLCV 的磁碟快取（鍵包含數據源指紋與控制器設定）
+        self.validated_cache = (
+            ValidatedOHLCVCache(self.data_dir / "cache" / "validated_ohlcv")
+            if enable_validated_cache else None
+        )
+
+        # v0.5: 按時間分區的歷史數據
+        self.partitioned_store = PartitionedOHLCVStore(root=self.data_dir / "historical" / "binance")
+
+        # 數據快取（v0.5: 按記憶體預算淘汰的 LRU）
+        self._cache = DataCache(
+            max_bytes=_mb_to_bytes(cache_max_mb),
+            max_items=cache_max_items,
+            on_evict=on_cache_evict
+        )
 
         logger.info(f"DataPipeline v0.5 initialized with data_dir: {self.data_dir}")
 
+    # === v0.5: 永續數據處理器（延遲建立） ===
+    # 建立處理器會匯入 requests 與交易所連接器，只載入 OHLCV 的調用不需要負擔
+
+    @cached_property
+    def funding_rate_data(self) -> "FundingRateData":
+        """資金費率數據處理器（Phase A）"""
+        from data.perpetual import FundingRateData
+        return FundingRateData()
+
+    @cached_property
+    def open_interest_data(self) -> "OpenInterestData":
+        """持倉量數據處理器（Phase A）"""
+        from data.perpetual import OpenInterestData
+        return OpenInterestData()
+
+    @cached_property
+    def basis_data(self) -> "BasisData":
+        """期現基差數據處理器（Phase B）"""
+        from data.perpetual import BasisData
+        return BasisData()
+
+    @cached_property
+    def liquidation_data(self) -> "LiquidationData":
+        """爆倉數據處理器（Phase B）"""
+        from data.perpetual import LiquidationData
+        return LiquidationData()
+
+    @cached_property
+    def long_short_ratio_data(self) -> "LongShortRatioData":
+        """多空持倉比數據處理器（Phase B）"""
+        from data.perpetual import LongShortRatioData
+        return LongShortRatioData()
+
     def load_strategy_data(
         self,
         strategy: BaseStrategy,
@@ -168,139 +248,223 @@ class DataPipeline:
         loaded_data = {}
 
         for req in requirements:
+            if req.source not in REQUIREMENT_KEYS:
+                if not self._record_requirement(result, loaded_data, req, symbol):
+                    return result
+                continue
+
             try:
-                if req.source == DataSource.OHLCV:
-                    # 載入 OHLCV 數據
-                    data = self._load_ohlcv(
-                        symbol, timeframe, req.timeframes, start_date, end_date
-                    )
-
-                    if data is not None:
-                        loaded_data['ohlcv'] = data
-                    elif req.required:
-                        result.success = False
-                        result.error = f"Required OHLCV data not found for {symbol}"
-                        return result
-                    else:
-                        result.warnings.append(
-                            f"Optional OHLCV data not found for {symbol}"
-                        )
-
-                elif req.source == DataSource.FUNDING_RATE:
-                    # v0.5 Phase A: 載入資金費率數據
-                    data = self._load_funding_rate(
-                        symbol, timeframe, start_date, end_date
-                    )
-
-                    if data is not None:
-                        # 數據品質檢查
-                        quality_result = self.quality_controller.check_funding_rate(data)
-                        if not quality_result.passed:
-                            logger.warning(f"Funding rate quality check failed: {quality_result.get_summary()}")
-
-                        loaded_data['funding_rate'] = data
-                    elif req.required:
-                        result.success = False
-                        result.error = f"Required funding rate data not found for {symbol}"
-                        return result
-                    else:
-                        result.warnings.append(
-                            f"Optional funding rate data not found for {symbol}"
-                        )
-
-                elif req.source == DataSource.OPEN_INTEREST:
-                    # v0.5 Phase A: 載入持倉量數據
-                    data = self._load_open_interest(
-                        symbol, timeframe, start_date, end_date
-                    )
-
-                    if data is not None:
-                        # 數據品質檢查
-                        quality_result = self.quality_controller.check_open_interest(data)
-                        if not quality_result.passed:
-                            logger.warning(f"Open interest quality check failed: {quality_result.get_summary()}")
-
-                        loaded_data['open_interest'] = data
-                    elif req.required:
-                        result.success = False
-                        result.error = f"Required open interest data not found for {symbol}"
-                        return result
-                    else:
-                        result.warnings.append(
-                            f"Optional open interest data not found for {symbol}"
-                        )
-
-                elif req.source == DataSource.BASIS:
-                    # v0.5 Phase B: 載入期現基差數據
-                    data = self._load_basis(
-                        symbol, timeframe, start_date, end_date
-                    )
-
-                    if data is not None:
-                        loaded_data['basis'] = data
-                    elif req.required:
-                        result.success = False
-                        result.error = f"Required basis data not found for {symbol}"
-                        return result
-                    else:
-                        result.warnings.append(
-                            f"Optional basis data not found for {symbol}"
-                        )
-
-                elif req.source == DataSource.LIQUIDATIONS:
-                    # v0.5 Phase B: 載入爆倉數據
-                    data = self._load_liquidations(
-                        symbol, timeframe, start_date, end_date
-                    )
-
-                    if data is not None:
-                        loaded_data['liquidations'] = data
-                    elif req.required:
-                        result.success = False
-                        result.error = f"Required liquidations data not found for {symbol}"
+                data = self._load_requirement(req, symbol, timeframe, start_date, end_date)
+            except Exception as e:
+                if not self._record_requirement(result, loaded_data, req, symbol, error=e):
+                    return result
+                continue
+
+            if not self._record_requirement(result, loaded_data, req, symbol, data=data, timeframe=timeframe):
+                return result
+
+        return self._finalize_result(result, loaded_data, symbol, timeframe)
+
+    def load_strategy_data_concurrent(
+        self,
+        strategy: BaseStrategy,
+        symbol: str,
+        timeframe: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        timeout: Optional[float] = None,
+        source_timeouts: Optional[Dict[DataSource, float]] = None,
+        max_workers: Optional[int] = None
+    ) -> DataLoadResult:
+        """v0.5: 並行載入策略所需的所有數據
+
+        與 load_strategy_data 相同的 required / optional 語義與錯誤訊息，但所有
+        DataRequirement 同時開始載入（磁碟讀取與 API 請求的延遲互相重疊），
+        結果按需求順序組裝。超時的數據源視為載入失敗：必要數據源使整體失敗，
+        可選數據源記入 warnings。超時的載入線程無法中斷，會在背景完成
+        （完成後仍會寫入快取），但不會阻塞本次調用。
+
+        Args:
+            strategy: 策略實例
+            symbol: 交易對（如 BTCUSDT）
+            timeframe: 時間週期（如 1h）
+            start_date: 開始日期（可選）
+            end_date: 結束日期（可選）
+            timeout: 整體超時秒數（None 表示不限制）
+            source_timeouts: 各數據源的超時秒數（如 {DataSource.FUNDING_RATE: 5.0}）
+            max_workers: 線程數（默認為需求數量）
+
+        Returns:
+            DataLoadResult；metadata['load_seconds'] 記錄各數據源的載入耗時
+
+        Example:
+            >>> result = pipeline.load_strategy_data_concurrent(
+            ...     strategy, "BTCUSDT", "1h", "2024-01-01", "2024-06-30",
+            ...     source_timeouts={DataSource.LIQUIDATIONS: 10.0}
+            ... )
+        """
+        result = DataLoadResult(success=True)
+
+        if not self.symbol_manager.validate_symbol(symbol):
+            result.success = False
+            result.error = f"Invalid symbol: {symbol}"
+            return result
+
+        if not self.timeframe_manager.validate_timeframe(timeframe):
+            result.success = False
+            result.error = f"Invalid timeframe: {timeframe}"
+            return result
+
+        requirements = strategy.get_data_requirements()
+        supported = [req for req in requirements if req.source in REQUIREMENT_KEYS]
+        source_timeouts = source_timeouts or {}
+
+        def timed_load(req):
+            started = time.perf_counter()
+            data = self._load_requirement(req, symbol, timeframe, start_date, end_date)
+            return data, time.perf_counter() - started
+
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(len(supported), 1),
+            thread_name_prefix="pipeline-load"
+        )
+        futures = {id(req): executor.submit(timed_load, req) for req in supported}
+
+        loaded_data = {}
+        load_seconds = {}
+        try:
+            for req in requirements:
+                if req.source not in REQUIREMENT_KEYS:
+                    if not self._record_requirement(result, loaded_data, req, symbol):
                         return result
-                    else:
-                        result.warnings.append(
-                            f"Optional liquidations data not found for {symbol}"
-                        )
-
-                elif req.source == DataSource.LONG_SHORT_RATIO:
-                    # v0.5 Phase B: 載入多空持倉比數據
-                    data = self._load_long_short_ratio(
-                        symbol, timeframe, start_date, end_date
-                    )
-
-                    if data is not None:
-                        loaded_data['long_short_ratio'] = data
-                    elif req.required:
-                        result.success = False
-                        result.error = f"Required long/short ratio data not found for {symbol}"
+                    continue
+
+                wait = _remaining_timeout(started, timeout, source_timeouts.get(req.source))
+                try:
+                    data, seconds = futures[id(req)].result(timeout=wait)
+                except FuturesTimeoutError:
+                    error = TimeoutError(f"timed out after {time.monotonic() - started:.1f}s")
+                    if not self._record_requirement(result, loaded_data, req, symbol, error=error):
                         return result
-                    else:
-                        result.warnings.append(
-                            f"Optional long/short ratio data not found for {symbol}"
-                        )
-
-                else:
-                    # 未支援的數據源
-                    if req.required:
-                        result.success = False
-                        result.error = f"Data source {req.source.value} not supported yet"
+                    continue
+                except Exception as e:
+                    if not self._record_requirement(result, loaded_data, req, symbol, error=e):
                         return result
-                    else:
-                        result.warnings.append(
-                            f"Data source {req.source.value} not supported yet, skipping"
-                        )
+                    continue
 
-            except Exception as e:
-                logger.error(f"Error loading data for {req.source.value}: {e}")
-                if req.required:
-                    result.success = False
-                    result.error = f"Error loading {req.source.value}: {str(e)}"
+                load_seconds[REQUIREMENT_KEYS[req.source][0]] = seconds
+                if not self._record_requirement(result, loaded_data, req, symbol, data=data, timeframe=timeframe):
                     return result
-                else:
-                    result.warnings.append(f"Error loading optional {req.source.value}: {str(e)}")
+        finally:
+            # 不等待超時或已不需要的載入
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        result = self._finalize_result(result, loaded_data, symbol, timeframe)
+        result.metadata['load_seconds'] = load_seconds
+        return result
+
+    def _load_requirement(
+        self,
+        req: DataRequirement,
+        symbol: str,
+        timeframe: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """載入單個數據需求（沒有數據時返回 None）"""
+        if req.source == DataSource.OHLCV:
+            if req.timeframe and req.timeframe != timeframe:
+                # v0.5: 其他時間週期從主時間週期的金字塔取得（與其他需求共用快取）
+                views = self.load_timeframes(symbol, timeframe, [req.timeframe], start_date, end_date)
+                return views.get(req.timeframe)
+            return self._load_ohlcv(symbol, timeframe, None, start_date, end_date)
+
+        if req.source == DataSource.FUNDING_RATE:
+            # v0.5 Phase A: 載入資金費率數據
+            data = self._load_funding_rate(symbol, timeframe, start_date, end_date)
+            if data is not None:
+                # 數據品質檢查
+                quality_result = self.quality_controller.check_funding_rate(data)
+                if not quality_result.passed:
+                    logger.warning(f"Funding rate quality check failed: {quality_result.get_summary()}")
+            return data
+
+        if req.source == DataSource.OPEN_INTEREST:
+            # v0.5 Phase A: 載入持倉量數據
+            data = self._load_open_interest(symbol, timeframe, start_date, end_date)
+            if data is not None:
+                # 數據品質檢查
+                quality_result = self.quality_controller.check_open_interest(data)
+                if not quality_result.passed:
+                    logger.warning(f"Open interest quality check failed: {quality_result.get_summary()}")
+            return data
+
+        # v0.5 Phase B: 期現基差、爆倉、多空持倉比
+        loaders = {
+            DataSource.BASIS: self._load_basis,
+            DataSource.LIQUIDATIONS: self._load_liquidations,
+            DataSource.LONG_SHORT_RATIO: self._load_long_short_ratio,
+        }
+        return loaders[req.source](symbol, timeframe, start_date, end_date)
 
+    def _record_requirement(
+        self,
+        result: DataLoadResult,
+        loaded_data: Dict[str, pd.DataFrame],
+        req: DataRequirement,
+        symbol: str,
+        data: Optional[pd.DataFrame] = None,
+        error: Optional[Exception] = None,
+        timeframe: Optional[str] = None
+    ) -> bool:
+        """按 required / optional 語義記錄單個需求的載入結果
+
+        OHLCV 需求指定了主時間週期（timeframe）以外的時間週期時，數據記錄在
+        'ohlcv_{時間週期}'（如 'ohlcv_4h'），'ohlcv' 保持為主時間週期。
+
+        Returns:
+            False 表示必要數據缺失，result 已標記失敗，應立即返回
+        """
+        if error is not None:
+            logger.error(f"Error loading data for {req.source.value}: {error}")
+            if req.required:
+                result.success = False
+                result.error = f"Error loading {req.source.value}: {str(error)}"
+                return False
+            result.warnings.append(f"Error loading optional {req.source.value}: {str(error)}")
+            return True
+
+        if req.source not in REQUIREMENT_KEYS:
+            # 未支援的數據源
+            if req.required:
+                result.success = False
+                result.error = f"Data source {req.source.value} not supported yet"
+                return False
+            result.warnings.append(f"Data source {req.source.value} not supported yet, skipping")
+            return True
+
+        key, label = REQUIREMENT_KEYS[req.source]
+        if req.source == DataSource.OHLCV and req.timeframe and timeframe and req.timeframe != timeframe:
+            key, label = f"ohlcv_{req.timeframe}", f"{req.timeframe} OHLCV"
+        if data is not None:
+            loaded_data[key] = data
+        elif req.required:
+            result.success = False
+            result.error = f"Required {label} data not found for {symbol}"
+            return False
+        else:
+            result.warnings.append(f"Optional {label} data not found for {symbol}")
+        return True
+
+    def _finalize_result(
+        self,
+        result: DataLoadResult,
+        loaded_data: Dict[str, pd.DataFrame],
+        symbol: str,
+        timeframe: str
+    ) -> DataLoadResult:
+        """驗證數據完整性並添加元數據"""
         # 5. 驗證數據完整性
         if not loaded_data:
             result.success = False
@@ -318,6 +482,17 @@ class DataPipeline:
                 'timeframe': timeframe
             }
 
+            # v0.5: 其他時間週期映射到主時間週期（只使用已收盤的 K 線，無前視偏差）
+            alignments = {
+                key[len('ohlcv_'):]: self.timeframe_manager.build_alignment(
+                    df.index, timeframe, other.index, key[len('ohlcv_'):]
+                )
+                for key, other in loaded_data.items()
+                if key.startswith('ohlcv_')
+            }
+            if alignments:
+                result.metadata['alignments'] = alignments
+
         result.data = loaded_data
 
         logger.info(
@@ -340,38 +515,233 @@ class DataPipeline:
         Args:
             symbol: 交易對
             timeframe: 主要時間週期
-            required_timeframes: 需要的其他時間週期（可選）
+            required_timeframes: 需要的其他時間週期（可選，v0.5: 從主時間週期建立金字塔並存入快取）
             start_date: 開始日期（可選）
             end_date: 結束日期（可選）
 
         Returns:
             OHLCV DataFrame 或 None
         """
-        # 1. 檢查快取
+        df = self._load_base_ohlcv(symbol, timeframe, start_date, end_date)
+
+        if df is not None and required_timeframes:
+            self._pyramid_views(symbol, timeframe, df, required_timeframes, start_date, end_date)
+
+        return df
+
+    def load_timeframes(
+        self,
+        symbol: str,
+        base_timeframe: str,
+        timeframes: Iterable[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """v0.5: 載入多個時間週期的 OHLCV（更高時間週期從基準數據聚合）
+
+        比基準時間週期大的時間週期由 TimeframeManager.build_pyramid 一次聚合，
+        結果按 (交易對, 基準時間週期, 日期範圍) 存入快取，之後需要同一視圖的
+        策略直接重用，不再載入基準數據或重新聚合。比基準小的時間週期無法聚合，
+        直接載入其數據文件。
+
+        Args:
+            symbol: 交易對
+            base_timeframe: 基準時間週期（如 1m / 1h）
+            timeframes: 需要的時間週期（如 ["1h", "4h", "1d"]）
+            start_date: 開始日期（可選）
+            end_date: 結束日期（可選）
+
+        Returns:
+            {時間週期: OHLCV DataFrame}；沒有數據的時間週期不包含在結果中
+
+        Example:
+            >>> views = pipeline.load_timeframes("BTCUSDT", "1m", ["1h", "4h", "1d"])
+            >>> daily = views["1d"]
+        """
+        compatible = set(self.timeframe_manager.get_compatible_timeframes(base_timeframe))
+        timeframes = list(dict.fromkeys(timeframes))
+        higher = [tf for tf in timeframes if tf in compatible and tf != base_timeframe]
+
+        views = {}
+        if self.enable_cache:
+            for tf in higher:
+                cached = self._cache.get(self._pyramid_cache_key(symbol, base_timeframe, tf, start_date, end_date))
+                if cached is not None:
+                    views[tf] = cached
+
+        if base_timeframe in timeframes or len(views) < len(higher):
+            base = self._load_ohlcv(symbol, base_timeframe, None, start_date, end_date)
+            if base is not None:
+                if base_timeframe in timeframes:
+                    views[base_timeframe] = base
+                missing = [tf for tf in higher if tf not in views]
+                views.update(self._pyramid_views(symbol, base_timeframe, base, missing, start_date, end_date))
+
+        for tf in timeframes:
+            if tf not in compatible:
+                df = self._load_ohlcv(symbol, tf, None, start_date, end_date)
+                if df is not None:
+                    views[tf] = df
+
+        return {tf: views[tf] for tf in timeframes if tf in views}
+
+    def _pyramid_views(
+        self,
+        symbol: str,
+        base_timeframe: str,
+        base: pd.DataFrame,
+        timeframes: Iterable[str],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> Dict[str, pd.DataFrame]:
+        """從已載入的基準數據取得更高時間週期（未快取的一次聚合並存入快取）"""
+        compatible = set(self.timeframe_manager.get_compatible_timeframes(base_timeframe))
+        targets = [tf for tf in dict.fromkeys(timeframes) if tf in compatible and tf != base_timeframe]
+
+        views = {}
+        missing = []
+        for tf in targets:
+            key = self._pyramid_cache_key(symbol, base_timeframe, tf, start_date, end_date)
+            cached = self._cache.get(key) if self.enable_cache else None
+            if cached is not None:
+                views[tf] = cached
+            else:
+                missing.append(tf)
+
+        if missing:
+            built = self.timeframe_manager.build_pyramid(base, base_timeframe, missing)
+            for tf, df in built.items():
+                if self.enable_cache:
+                    self._cache.put(self._pyramid_cache_key(symbol, base_timeframe, tf, start_date, end_date), df)
+                views[tf] = df
+            logger.debug(f"Built {', '.join(missing)} from {symbol} {base_timeframe}")
+
+        return views
+
+    @staticmethod
+    def _pyramid_cache_key(
+        symbol: str,
+        base_timeframe: str,
+        timeframe: str,
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> str:
+        return f"{symbol}_{base_timeframe}>{timeframe}_{start_date or ''}_{end_date or ''}"
+
+    def _load_base_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """載入單一時間週期的 OHLCV 數據（快取、驗證快取、日期範圍與驗證）
+
+        單一文件數據集：記憶體快取與驗證快取都保存已驗證的完整數據集，按日期範圍切片，
+        因此不同日期範圍共用同一條目。記憶體映射數據集：快取映射本身，只轉換所需窗口；
+        驗證快取只保存窗口的檢查結果（不以 Parquet 副本取代零拷貝窗口）。
+        """
+        # v0.5: 分區數據集只讀取與日期範圍重疊的分區（快取鍵包含日期範圍）
+        if self.partitioned_store.exists(symbol, timeframe):
+            return self._load_ohlcv_partitioned(symbol, timeframe, start_date, end_date)
+
+        source = self._find_ohlcv_file(symbol, timeframe)
+        if source is not None and storage_format(source) == 'mmap':
+            return self._load_ohlcv_window(symbol, timeframe, source, start_date, end_date)
+
+        # 1. 記憶體快取（已驗證的完整數據集）
         cache_key = f"{symbol}_{timeframe}"
-        if self.enable_cache and cache_key in self._cache:
+        df = self._cache.get(cache_key) if self.enable_cache else None
+        if df is not None:
             logger.debug(f"Loading {cache_key} from cache")
-            df = self._cache[cache_key]
         else:
-            # 2. 從文件載入
-            df = self._load_ohlcv_from_file(symbol, timeframe)
-
+            # 2. 驗證快取命中時不需要載入原始數據，也不需要重新驗證
+            df = self._get_validated(source, None, None)
             if df is None:
-                return None
+                # 3. 從文件載入並驗證
+                df = self._load_ohlcv_from_file(symbol, timeframe)
+                if df is None:
+                    return None
+                df = self._validate_ohlcv(df, source)
 
-            # 3. 存入快取
+            # 4. 存入快取
+            if self.enable_cache:
+                self._cache.put(cache_key, df)
+
+        # 5. 過濾日期範圍（searchsorted 切片）
+        return slice_date_range(df, start_date, end_date)
+
+    def _load_ohlcv_window(
+        self,
+        symbol: str,
+        timeframe: str,
+        source: Path,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """從記憶體映射數據集載入日期範圍窗口
+
+        窗口的檢查結果已在驗證快取中且通過時直接返回窗口；未通過時只重新清理，
+        沒有結果時檢查（必要時清理）並保存結果。
+        """
+        cache_key = f"{symbol}_{timeframe}"
+        dataset = self._cache.get(cache_key) if self.enable_cache else None
+        if dataset is not None:
+            logger.debug(f"Loading {cache_key} from cache")
+        else:
+            dataset = self._load_ohlcv_from_file(symbol, timeframe)
+            if dataset is None:
+                return None
             if self.enable_cache:
-                self._cache[cache_key] = df
+                self._cache.put(cache_key, dataset)
+
+        df = dataset.slice(start_date, end_date).to_frame(include_timestamp=False)
+
+        quality_result = None
+        if self.validated_cache is not None:
+            quality_result = self.validated_cache.get_result(
+                source, self._validation_settings(), start_date, end_date
+            )
+        if quality_result is None:
+            return self._validate_ohlcv(df, source, start_date, end_date, persist=False)
+        if quality_result.passed:
+            return df
+        return self.quality_controller.clean_ohlcv(df, auto_fix=True)
+
+    def _load_ohlcv_partitioned(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """從分區數據集載入 OHLCV 數據（分區裁剪）
 
-        # 4. 過濾日期範圍
-        if start_date:
-            df = df[df.index >= pd.Timestamp(start_date)]
-        if end_date:
-            df = df[df.index <= pd.Timestamp(end_date)]
+        記憶體快取與驗證快取都保存已驗證的數據，鍵包含日期範圍（只讀取範圍內的分區）。
+        """
+        source = self.partitioned_store.dataset_dir(symbol, timeframe)
 
-        # 5. 數據驗證
-        df = self._validate_ohlcv(df)
+        cache_key = f"{symbol}_{timeframe}"
+        if start_date or end_date:
+            cache_key += f"_{start_date or ''}_{end_date or ''}"
 
+        df = self._cache.get(cache_key) if self.enable_cache else None
+        if df is not None:
+            logger.debug(f"Loading {cache_key} from cache")
+            return df
+
+        df = self._get_validated(source, start_date, end_date)
+        if df is None:
+            try:
+                df = self.partitioned_store.load(symbol, timeframe, start_date, end_date)
+            except Exception as e:
+                logger.error(f"Error loading partitions for {symbol} {timeframe}: {e}")
+                return None
+
+            df = self._validate_ohlcv(df[['open', 'high', 'low', 'close', 'volume']], source, start_date, end_date)
+
+        if self.enable_cache:
+            self._cache.put(cache_key, df)
         return df
 
     def _load_ohlcv_from_file(
@@ -384,23 +754,25 @@ class DataPipeline:
             timeframe: 時間週期
 
         Returns:
-            OHLCV DataFrame 或 None
+            OHLCV DataFrame、MemmapOHLCV（.mmap 數據集，零拷貝）或 None
         """
-        # 構建文件路徑（兼容 SSD 環境）
-        # 檢查歷史數據目錄（binance）
-        file_path = self.data_dir / "historical" / "binance" / f"{symbol}_{timeframe}.csv"
+        file_path = self._find_ohlcv_file(symbol, timeframe)
 
-        # 如果不存在，嘗試 raw 目錄（向後兼容）
-        if not file_path.exists():
-            file_path = self.data_dir / "raw" / f"{symbol}_{timeframe}.csv"
-
-        if not file_path.exists():
-            logger.warning(f"Data file not found: {file_path}")
+        if file_path is None:
+            logger.warning(f"Data file not found: {self.data_dir / 'raw' / f'{symbol}_{timeframe}.csv'}")
             return None
 
         try:
-            # 載入數據
-            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+            # 載入數據（二進位列式格式不需要解析文本）
+            file_format = storage_format(file_path)
+            if file_format == 'mmap':
+                dataset = MemmapOHLCV.open(file_path)
+                logger.debug(f"Mapped {len(dataset)} bars from {file_path}")
+                return dataset
+            if file_format == 'csv':
+                df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+            else:
+                df = OHLCVStorage(self.data_dir).load_ohlcv(str(file_path))
 
             # 確保列名正確
             expected_columns = ['open', 'high', 'low', 'close', 'volume']
@@ -420,11 +792,54 @@ class DataPipeline:
             logger.error(f"Error loading {file_path}: {e}")
             return None
 
-    def _validate_ohlcv(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _find_ohlcv_file(self, symbol: str, timeframe: str) -> Optional[Path]:
+        """查找 OHLCV 數據文件（不存在時返回 None）"""
+        # 構建文件路徑（兼容 SSD 環境）
+        # 檢查歷史數據目錄（binance），再嘗試 raw 目錄（向後兼容）；二進位格式優先
+        return find_data_file(
+            [self.data_dir / "historical" / "binance", self.data_dir / "raw"],
+            symbol,
+            timeframe
+        )
+
+    def _validation_settings(self) -> Dict[str, any]:
+        """影響驗證結果的設定（驗證快取鍵的一部分）"""
+        return {**self.quality_controller.settings(), 'auto_fix': True}
+
+    def _get_validated(
+        self,
+        source: Optional[Path],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> Optional[pd.DataFrame]:
+        """從驗證快取讀取（未啟用、沒有數據源或未命中時返回 None）"""
+        if self.validated_cache is None or source is None:
+            return None
+
+        hit = self.validated_cache.get(source, self._validation_settings(), start_date, end_date)
+        if hit is None:
+            return None
+
+        df, quality_result = hit
+        logger.debug(f"Loaded validated OHLCV from cache ({source}): {quality_result.get_summary()}")
+        return df
+
+    def _validate_ohlcv(
+        self,
+        df: pd.DataFrame,
+        source: Optional[Path] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        persist: bool = True
+    ) -> pd.DataFrame:
         """驗證和清理 OHLCV 數據
 
         Args:
             df: OHLCV DataFrame
+            source: 數據源路徑（提供時把結果寫入驗證快取）
+            start_date: 開始日期（驗證快取鍵）
+            end_date: 結束日期（驗證快取鍵）
+            persist: 是否把清理後的數據寫入驗證快取（False 時只保存檢查結果）
 
         Returns:
             清理後的 DataFrame
@@ -438,8 +853,29 @@ class DataPipeline:
             df = self.quality_controller.clean_ohlcv(df, auto_fix=True)
             logger.info(f"OHLCV data cleaned, {len(df)} rows remaining")
 
+        if self.validated_cache is not None and source is not None:
+            if persist:
+                self.validated_cache.put(
+                    source, self._validation_settings(), df, quality_result, start_date, end_date
+                )
+            else:
+                self.validated_cache.put_result(
+                    source, self._validation_settings(), quality_result, start_date, end_date
+                )
+
+        # v0.5: 完整數據集的檢查結果記錄到數據目錄
+        if source is not None and start_date is None and end_date is None:
+            self._record_quality(source, quality_result.passed)
+
         return df
 
+    def _record_quality(self, source: Path, passed: bool) -> None:
+        """把數據集的品質狀態寫入數據目錄（失敗只記錄警告）"""
+        try:
+            get_catalog().set_quality(source, QUALITY_PASSED if passed else QUALITY_FAILED)
+        except Exception as e:
+            logger.warning(f"Cannot record quality status for {source}: {e}")
+
     def _load_funding_rate(
         self,
         symbol: str,
@@ -641,7 +1077,8 @@ class DataPipeline:
         symbols: List[str],
         timeframe: str,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        max_workers: int = 1
     ) -> Dict[str, DataLoadResult]:
         """載入多個交易對的數據
 
@@ -651,6 +1088,7 @@ class DataPipeline:
             timeframe: 時間週期
             start_date: 開始日期（可選）
             end_date: 結束日期（可選）
+            max_workers: 並行載入的線程數（v0.5，默認 1 為順序載入）
 
         Returns:
             字典，鍵為交易對，值為 DataLoadResult
@@ -664,12 +1102,12 @@ class DataPipeline:
             ...     if result.success:
             ...         print(f"{symbol}: {result.metadata['rows']} bars")
         """
-        results = {}
-
-        for symbol in symbols:
-            results[symbol] = self.load_strategy_data(
-                strategy, symbol, timeframe, start_date, end_date
-            )
+        loaded = self._map_parallel(
+            lambda symbol: self.load_strategy_data(strategy, symbol, timeframe, start_date, end_date),
+            symbols,
+            max_workers
+        )
+        results = dict(zip(symbols, loaded))
 
         # 統計
         successful = sum(1 for r in results.values() if r.success)
@@ -692,35 +1130,54 @@ class DataPipeline:
     def get_cache_stats(self) -> Dict[str, any]:
         """獲取快取統計信息
 
+        項目大小在寫入快取時已估算，這裡不會逐個重新計算 DataFrame 的記憶體。
+
         Returns:
-            快取統計字典
+            快取統計字典（count, keys, memory_mb, mapped_mb, max_mb,
+            hits, misses, hit_rate, evictions, rejected）
 
         Example:
             >>> pipeline = DataPipeline()
             >>> stats = pipeline.get_cache_stats()
-            >>> print(f"Cached items: {stats['count']}")
+            >>> print(f"Cached items: {stats['count']}, hit rate: {stats['hit_rate']:.0%}")
         """
-        total_memory = sum(
-            df.memory_usage(deep=True).sum()
-            for df in self._cache.values()
-        )
+        stats = self._cache.stats()
+        max_bytes = stats.pop('max_bytes')
 
-        return {
-            'count': len(self._cache),
-            'keys': list(self._cache.keys()),
-            'memory_mb': total_memory / 1024 / 1024
-        }
+        # 記憶體映射數據集由作業系統頁快取管理，單獨統計
+        stats['memory_mb'] = stats.pop('bytes') / 1024 / 1024
+        stats['mapped_mb'] = stats.pop('mapped_bytes') / 1024 / 1024
+        stats['max_mb'] = max_bytes / 1024 / 1024 if max_bytes is not None else None
+        return stats
+
+    def set_cache_limits(
+        self,
+        max_mb: Optional[float] = DEFAULT_CACHE_MAX_MB,
+        max_items: Optional[int] = None
+    ) -> None:
+        """調整快取上限（立即淘汰超出的項目）
+
+        Args:
+            max_mb: 記憶體上限（MB，None 表示不限制）
+            max_items: 項目數上限（None 表示不限制）
+
+        Example:
+            >>> get_pipeline().set_cache_limits(max_mb=512)
+        """
+        self._cache.resize(max_bytes=_mb_to_bytes(max_mb), max_items=max_items)
 
     def preload_data(
         self,
         symbols: List[str],
-        timeframes: List[str]
+        timeframes: List[str],
+        max_workers: int = 1
     ) -> Tuple[int, int]:
         """預載入數據到快取
 
         Args:
             symbols: 交易對列表
             timeframes: 時間週期列表
+            max_workers: 並行載入的線程數（v0.5，默認 1 為順序載入）
 
         Returns:
             (成功數量, 失敗數量)
@@ -736,29 +1193,90 @@ class DataPipeline:
             logger.warning("Cache is disabled, preload_data has no effect")
             return 0, 0
 
-        success = 0
-        failed = 0
-
-        for symbol in symbols:
-            for timeframe in timeframes:
-                df = self._load_ohlcv(symbol, timeframe)
+        evictions_before = self._cache.evictions
 
-                if df is not None:
-                    success += 1
-                else:
-                    failed += 1
+        datasets = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        # 只保留是否成功，數據本身由快取持有（可能被淘汰）
+        loaded = self._map_parallel(lambda key: self._load_ohlcv(*key) is not None, datasets, max_workers)
+        success = sum(loaded)
+        failed = len(loaded) - success
 
         logger.info(f"Preloaded {success} datasets, {failed} failed")
+
+        evicted = self._cache.evictions - evictions_before
+        if evicted:
+            logger.warning(f"Cache limit reached during preload: {evicted} dataset(s) evicted")
         return success, failed
 
+    def prefetch(
+        self,
+        schedule: Iterable[Union[PrefetchRequest, Tuple]],
+        depth: int = 2,
+        max_workers: Optional[int] = None,
+        loader: Optional[PrefetchLoader] = None
+    ) -> DataPrefetcher:
+        """v0.5: 按順序迭代數據集，並在背景預先載入後續數據集
 
-# 全局管道實例
-_global_pipeline = DataPipeline()
+        Args:
+            schedule: 數據集順序（PrefetchRequest 或 (symbol, timeframe[, start_date, end_date]) 元組）
+            depth: 背景預取的數據集數量
+            max_workers: 背景載入線程數（默認等於 depth）
+            loader: 自訂載入函數（默認載入 OHLCV）
+
+        Returns:
+            DataPrefetcher（迭代得到 (PrefetchRequest, DataFrame 或 None)）
+
+        Example:
+            >>> schedule = [(s, "1h", "2024-01-01", "2024-06-30") for s in symbols]
+            >>> with pipeline.prefetch(schedule, depth=2) as prefetcher:
+            ...     for request, df in prefetcher:
+            ...         run_backtest(df)
+        """
+        return DataPrefetcher(self, schedule, depth=depth, max_workers=max_workers, loader=loader)
+
+    def _map_parallel(self, func: Callable, items: List, max_workers: int) -> List:
+        """按 items 順序返回 func 的結果；max_workers > 1 時以線程池並行執行
+
+        載入以磁碟 I/O 與 pandas 解析為主（大部分釋放 GIL），快取為線程安全，
+        因此使用線程而不是進程（不需要在進程間複製 DataFrame）。
+        """
+        if max_workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(items)),
+            thread_name_prefix="pipeline-load"
+        ) as executor:
+            return list(executor.map(func, items))
+
+
+def _mb_to_bytes(max_mb: Optional[float]) -> Optional[int]:
+    return int(max_mb * 1024 * 1024) if max_mb is not None else None
+
+
+def _remaining_timeout(
+    started: float,
+    timeout: Optional[float],
+    source_timeout: Optional[float]
+) -> Optional[float]:
+    """從 started（time.monotonic）起算，整體超時與數據源超時中較早到期的剩餘秒數"""
+    deadlines = [
+        started + limit - time.monotonic()
+        for limit in (timeout, source_timeout) if limit is not None
+    ]
+    return max(min(deadlines), 0.0) if deadlines else None
+
+
+# 全局管道實例（整個進程共享，快取受 DEFAULT_CACHE_MAX_MB 限制；第一次調用 get_pipeline 時建立）
+_global_pipeline: Optional[DataPipeline] = None
+_global_pipeline_lock = threading.Lock()
 
 
 def get_pipeline() -> DataPipeline:
     """獲取全局數據管道實例
 
+    v0.5: 第一次調用時才建立（import 本模組不會偵測數據路徑或建立連接器）
+
     Returns:
         全局 DataPipeline 實例
 
@@ -766,6 +1284,11 @@ def get_pipeline() -> DataPipeline:
         >>> pipeline = get_pipeline()
         >>> result = pipeline.load_strategy_data(strategy, "BTCUSDT", "1h")
     """
+    global _global_pipeline
+    if _global_pipeline is None:
+        with _global_pipeline_lock:
+            if _global_pipeline is None:
+                _global_pipeline = DataPipeline()
     return _global_pipeline
 
 
@@ -0,0 +1,179 @@
+"""
+Data Prefetch v0.5
+
+背景預取即將使用的數據集
+
+參數掃描或組合回測按固定順序處理 (symbol, timeframe, 日期範圍)。回測是
+CPU 密集，而數據載入以磁碟 I/O 為主（parquet / CSV 讀取會釋放 GIL），
+所以在當前回測執行時於背景線程載入接下來的數據集，可以隱藏大部分載入延遲。
+
+這個模組提供：
+- PrefetchRequest：一個待載入的數據集
+- DataPrefetcher：按順序迭代數據集，同時保持 depth 個後續數據集在背景載入
+
+Version: v0.5
+
+Example:
+    >>> schedule = [("BTCUSDT", "1h"), ("ETHUSDT", "1h"), ("BNBUSDT", "4h", "2024-01-01", "2024-06-30")]
+    >>> with get_pipeline().prefetch(schedule, depth=2) as prefetcher:
+    ...     for request, df in prefetcher:
+    ...         run_backtest(df)   # 下一個數據集已在背景載入
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from data.pipeline import DataPipeline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PrefetchRequest:
+    """待載入的數據集
+
+    Attributes:
+        symbol: 交易對
+        timeframe: 時間週期
+        start_date: 開始日期（可選）
+        end_date: 結束日期（可選）
+    """
+    symbol: str
+    timeframe: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+    @classmethod
+    def from_item(cls, item: Union["PrefetchRequest", Tuple]) -> "PrefetchRequest":
+        """從 PrefetchRequest 或 (symbol, timeframe[, start_date[, end_date]]) 建立"""
+        if isinstance(item, cls):
+            return item
+        return cls(*item)
+
+
+# 載入函數：PrefetchRequest -> 數據（默認為 DataPipeline._load_ohlcv）
+PrefetchLoader = Callable[[PrefetchRequest], Any]
+
+
+class DataPrefetcher:
+    """按順序迭代數據集，並在背景預先載入後續數據集
+
+    迭代時保持最多 depth 個尚未交付的數據集在背景載入；交付一個數據集後
+    立即補上下一個，因此調用方處理當前數據集時，後續數據集已在載入中。
+    載入失敗的數據集交付 None（與 DataPipeline 載入器的慣例一致）。
+
+    Args:
+        pipeline: 數據管道（載入結果同時寫入其 LRU 快取）
+        schedule: 數據集順序（PrefetchRequest 或 (symbol, timeframe[, start, end]) 元組）
+        depth: 背景預取的數據集數量
+        max_workers: 背景載入線程數（默認等於 depth）
+        loader: 自訂載入函數（例如載入整個策略數據）
+    """
+
+    def __init__(
+        self,
+        pipeline: "DataPipeline",
+        schedule: Iterable[Union[PrefetchRequest, Tuple]],
+        depth: int = 2,
+        max_workers: Optional[int] = None,
+        loader: Optional[PrefetchLoader] = None
+    ):
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+
+        self.pipeline = pipeline
+        self.depth = depth
+        self.loader = loader or self._load_ohlcv
+
+        self._schedule = iter(schedule)
+        self._pending: Deque[Tuple[PrefetchRequest, Future]] = deque()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or depth,
+            thread_name_prefix="pipeline-prefetch"
+        )
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # 統計：交付時已載入完成的數量 / 需要等待的數量與總等待時間
+        self.ready = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+
+    def __enter__(self) -> "DataPrefetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Tuple[PrefetchRequest, Any]]:
+        return self
+
+    def __next__(self) -> Tuple[PrefetchRequest, Any]:
+        with self._lock:
+            self._fill()
+            if not self._pending:
+                self.close()
+                raise StopIteration
+            request, future = self._pending.popleft()
+
+            # 交付前先補上下一個，讓它與調用方的處理重疊
+            self._fill()
+
+        if future.done():
+            self.ready += 1
+        else:
+            self.waited += 1
+            started = time.perf_counter()
+            future.result()
+            self.wait_seconds += time.perf_counter() - started
+
+        return request, future.result()
+
+    def close(self) -> None:
+        """取消尚未開始的預取（已開始的載入在背景完成）"""
+        self._closed = True
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """預取統計（ready 越高表示載入延遲被隱藏得越多）"""
+        delivered = self.ready + self.waited
+        return {
+            'delivered': delivered,
+            'ready': self.ready,
+            'waited': self.waited,
+            'wait_seconds': self.wait_seconds,
+            'hit_rate': self.ready / delivered if delivered else 0.0,
+        }
+
+    # === 內部 ===
+
+    def _fill(self) -> None:
+        """提交後續數據集，直到背景中有 depth 個"""
+        while not self._closed and len(self._pending) < self.depth:
+            item = next(self._schedule, None)
+            if item is None:
+                return
+            request = PrefetchRequest.from_item(item)
+            self._pending.append((request, self._executor.submit(self._safe_load, request)))
+
+    def _safe_load(self, request: PrefetchRequest) -> Any:
+        try:
+            return self.loader(request)
+        except Exception as e:
+            logger.error(f"Prefetch failed for {request.symbol} ({request.timeframe}): {e}")
+            return None
+
+    def _load_ohlcv(self, request: PrefetchRequest) -> Any:
+        return self.pipeline._load_ohlcv(
+            request.symbol, request.timeframe,
+            start_date=request.start_date, end_date=request.end_date
+        )
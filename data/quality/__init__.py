@@ -7,6 +7,8 @@ Modules:
 - controller: 數據品質控制器
 - validators: 數據驗證器
 - cleaners: 數據清理器
+- cache: 已驗證 OHLCV 的持久化快取
+- gaps: 向量化時間缺口檢測與補洞計劃
 
 Version: v0.5
 """
@@ -15,12 +17,21 @@ from .controller import (
     DataQualityController,
     QualityCheckResult,
     QualityIssue,
-    IssueSeverity
+    IssueSeverity,
+    AffectedRows
 )
+from .cache import ValidatedOHLCVCache
+from .gaps import TimeGaps, RepairRange, detect_time_gaps, plan_gap_repairs
 
 __all__ = [
     'DataQualityController',
     'QualityCheckResult',
     'QualityIssue',
-    'IssueSeverity'
+    'IssueSeverity',
+    'AffectedRows',
+    'ValidatedOHLCVCache',
+    'TimeGaps',
+    'RepairRange',
+    'detect_time_gaps',
+    'plan_gap_repairs'
 ]
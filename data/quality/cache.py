@@ -0,0 +1,314 @@
+"""
+Validated OHLCV Cache for SuperDog v0.5
+
+持久化的「已驗證 / 已清理」OHLCV 快取
+
+DataPipeline 每次載入 OHLCV 都會執行 check_ohlcv（多次全欄掃描 + IQR 分位數），
+必要時再執行 clean_ohlcv。這個模組把驗證後的 DataFrame 與 QualityCheckResult 摘要
+寫入磁碟，之後載入同一份數據時直接讀取，完全跳過驗證。
+
+快取鍵由以下內容組成：
+- 數據源指紋：文件大小、修改時間與內容雜湊（目錄數據集為各文件的大小與修改時間）
+- 品質控制器設定（DataQualityController.settings()）
+- 日期範圍
+
+目錄格式：
+    {cache_dir}/{key}.parquet   驗證後的 DataFrame
+    {cache_dir}/{key}.json      QualityCheckResult 摘要（最後寫入，存在即代表條目完整）
+
+記憶體映射數據集不保存數據副本（零拷貝窗口比 Parquet 副本更快），
+只以 put_result / get_result 保存檢查結果，通過時直接使用原始窗口。
+
+Version: v0.5
+
+Example:
+    >>> cache = ValidatedOHLCVCache("local_data/cache/validated_ohlcv")
+    >>> hit = cache.get(source, controller.settings(), "2024-01-01", "2024-06-30")
+    >>> if hit is None:
+    ...     cache.put(source, controller.settings(), cleaned_df, quality_result, "2024-01-01", "2024-06-30")
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+from .controller import QualityCheckResult
+
+logger = logging.getLogger(__name__)
+
+# 快取格式版本
+VALIDATED_CACHE_VERSION = 1
+
+# 計算內容雜湊時的讀取塊大小
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ValidatedOHLCVCache:
+    """已驗證 OHLCV 的磁碟快取
+
+    Args:
+        cache_dir: 快取目錄
+        max_entries: 最多保留的條目數（超出時刪除最久未使用的條目）
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_entries: int = 256):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+
+        # 內容雜湊記憶：path -> (size, mtime_ns, digest)，大小與修改時間不變時不重新計算
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # === 鍵 ===
+
+    def source_fingerprint(self, source: Union[str, Path]) -> str:
+        """
+        數據源指紋
+
+        文件：大小 + 修改時間 + 內容雜湊；目錄數據集（.mmap / 分區數據集）：
+        所有文件的相對路徑、大小與修改時間（分區文件由原子替換寫入，修改時間可靠）。
+        """
+        path = Path(source)
+        if path.is_dir():
+            hasher = hashlib.blake2b(digest_size=16)
+            for file in sorted(p for p in path.rglob("*") if p.is_file()):
+                stat = file.stat()
+                hasher.update(f"{file.relative_to(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+            return hasher.hexdigest()
+
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            memo = self._digests.get(key)
+        if memo is not None and memo[:2] == (stat.st_size, stat.st_mtime_ns):
+            digest = memo[2]
+        else:
+            digest = _file_digest(path)
+            with self._lock:
+                self._digests[key] = (stat.st_size, stat.st_mtime_ns, digest)
+
+        return f"{stat.st_size}:{digest}"
+
+    def cache_key(
+        self,
+        source: Union[str, Path],
+        settings: Dict[str, Any],
+        start_date=None,
+        end_date=None,
+        result_only: bool = False
+    ) -> str:
+        """快取鍵（數據源指紋 + 控制器設定 + 日期範圍；只保存檢查結果的條目另有鍵）"""
+        fields = {
+            'version': VALIDATED_CACHE_VERSION,
+            'source': self.source_fingerprint(source),
+            'settings': settings,
+            'start': str(start_date) if start_date is not None else None,
+            'end': str(end_date) if end_date is not None else None,
+        }
+        if result_only:
+            fields['result_only'] = True
+        payload = json.dumps(fields, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    # === 讀寫 ===
+
+    def get(
+        self,
+        source: Union[str, Path],
+        settings: Dict[str, Any],
+        start_date=None,
+        end_date=None
+    ) -> Optional[Tuple[pd.DataFrame, QualityCheckResult]]:
+        """
+        讀取已驗證的數據
+
+        Returns:
+            (DataFrame, QualityCheckResult) 或 None（未命中 / 條目損壞）
+        """
+        try:
+            key = self.cache_key(source, settings, start_date, end_date)
+        except OSError:
+            return None
+
+        data_path, summary_path = self._paths(key)
+        if not summary_path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            with open(summary_path, "r", encoding="utf-8") as f:
+                summary = json.load(f)
+            df = pd.read_parquet(data_path)
+            # 更新修改時間，作為 LRU 清理依據
+            os.utime(summary_path)
+        except Exception as e:
+            logger.warning(f"Discarding corrupted validated cache entry {key}: {e}")
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return df, QualityCheckResult.from_dict(summary)
+
+    def put(
+        self,
+        source: Union[str, Path],
+        settings: Dict[str, Any],
+        df: pd.DataFrame,
+        quality_result: QualityCheckResult,
+        start_date=None,
+        end_date=None
+    ) -> Optional[str]:
+        """
+        寫入已驗證的數據
+
+        Returns:
+            快取鍵（寫入失敗時返回 None，不影響調用方）
+        """
+        try:
+            key = self.cache_key(source, settings, start_date, end_date)
+            data_path, summary_path = self._paths(key)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            # 先寫數據再寫摘要；兩者都先寫臨時文件再原子替換
+            suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp_data = data_path.with_name(data_path.name + suffix)
+            df.to_parquet(tmp_data)
+            os.replace(tmp_data, data_path)
+
+            tmp_summary = summary_path.with_name(summary_path.name + suffix)
+            with open(tmp_summary, "w", encoding="utf-8") as f:
+                json.dump(quality_result.to_dict(), f)
+            os.replace(tmp_summary, summary_path)
+        except Exception as e:
+            logger.warning(f"Failed to write validated cache for {source}: {e}")
+            return None
+
+        self._prune()
+        return key
+
+    def get_result(
+        self,
+        source: Union[str, Path],
+        settings: Dict[str, Any],
+        start_date=None,
+        end_date=None
+    ) -> Optional[QualityCheckResult]:
+        """
+        讀取只保存檢查結果的條目（不含數據副本）
+
+        Returns:
+            QualityCheckResult 或 None（未命中 / 條目損壞）
+        """
+        try:
+            key = self.cache_key(source, settings, start_date, end_date, result_only=True)
+        except OSError:
+            return None
+
+        _, summary_path = self._paths(key)
+        if not summary_path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            with open(summary_path, "r", encoding="utf-8") as f:
+                result = QualityCheckResult.from_dict(json.load(f))
+            os.utime(summary_path)
+        except Exception as e:
+            logger.warning(f"Discarding corrupted validated cache entry {key}: {e}")
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return result
+
+    def put_result(
+        self,
+        source: Union[str, Path],
+        settings: Dict[str, Any],
+        quality_result: QualityCheckResult,
+        start_date=None,
+        end_date=None
+    ) -> Optional[str]:
+        """
+        只保存檢查結果（用於記憶體映射數據集的窗口）
+
+        Returns:
+            快取鍵（寫入失敗時返回 None，不影響調用方）
+        """
+        try:
+            key = self.cache_key(source, settings, start_date, end_date, result_only=True)
+            _, summary_path = self._paths(key)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            tmp_summary = summary_path.with_name(
+                summary_path.name + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(tmp_summary, "w", encoding="utf-8") as f:
+                json.dump(quality_result.to_dict(), f)
+            os.replace(tmp_summary, summary_path)
+        except Exception as e:
+            logger.warning(f"Failed to write validated cache for {source}: {e}")
+            return None
+
+        self._prune()
+        return key
+
+    def clear(self) -> int:
+        """刪除所有條目，返回刪除的條目數"""
+        if not self.cache_dir.exists():
+            return 0
+        keys = [path.stem for path in self.cache_dir.glob("*.json")]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """快取統計"""
+        entries = list(self.cache_dir.glob("*.json")) if self.cache_dir.exists() else []
+        size = sum(p.stat().st_size for p in self.cache_dir.glob("*.parquet")) if entries else 0
+        return {
+            'entries': len(entries),
+            'disk_mb': size / 1024 / 1024,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    # === 內部 ===
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.cache_dir / f"{key}.parquet", self.cache_dir / f"{key}.json"
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+    def _prune(self) -> None:
+        """條目數超過 max_entries 時刪除最久未使用的條目"""
+        summaries = list(self.cache_dir.glob("*.json"))
+        excess = len(summaries) - self.max_entries
+        if excess <= 0:
+            return
+
+        summaries.sort(key=lambda p: p.stat().st_mtime_ns)
+        for path in summaries[:excess]:
+            self._remove(path.stem)
+
+
+def _file_digest(path: Path) -> str:
+    """文件內容雜湊（blake2b）"""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
@@ -15,12 +15,14 @@ Version: v0.5
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
 import logging
 
+from .gaps import detect_time_gaps
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,13 +33,105 @@ class IssueSeverity(Enum):
     INFO = "info"          # 信息，輕微問題
 
 
+class AffectedRows:
+    """緊湊儲存的受影響行
+
+    以行位置的連續區段（run-length ranges）或位圖（np.packbits）保存，
+    選擇兩者中佔用較小的一種；只有在需要時才展開為索引標籤。
+    行為類似原本的 List（支援 len / 迭代 / 比較），兼容舊代碼。
+
+    Args:
+        mask: 布林遮罩（長度等於數據行數）
+        index: 數據索引（展開為標籤時使用，只保存引用）
+    """
+
+    def __init__(self, mask: np.ndarray, index: Optional[pd.Index] = None):
+        mask = np.asarray(mask, dtype=bool)
+        self.index = index
+        self.total_rows = len(mask)
+        self._count = int(np.count_nonzero(mask))
+
+        edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+
+        # 每個區段 16 bytes（兩個 int64）；位圖每行 1 bit
+        if len(starts) * 16 <= (self.total_rows + 7) // 8:
+            self._starts = starts
+            self._ends = np.flatnonzero(edges == -1)
+            self._bits = None
+        else:
+            self._starts = self._ends = None
+            self._bits = np.packbits(mask)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, AffectedRows):
+            return np.array_equal(self.positions(), other.positions())
+        return self.tolist() == list(other)
+
+    def __repr__(self) -> str:
+        return f"<AffectedRows: {self._count} of {self.total_rows} rows, {self.nbytes} bytes>"
+
+    @property
+    def nbytes(self) -> int:
+        """緊湊表示佔用的記憶體"""
+        if self._bits is not None:
+            return self._bits.nbytes
+        return self._starts.nbytes + self._ends.nbytes
+
+    def ranges(self) -> np.ndarray:
+        """受影響行的位置區段，形狀 (n, 2)，每行為 [start, end)"""
+        if self._bits is not None:
+            mask = self.mask()
+            edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+            return np.column_stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)])
+        return np.column_stack([self._starts, self._ends])
+
+    def mask(self) -> np.ndarray:
+        """展開為布林遮罩"""
+        if self._bits is not None:
+            return np.unpackbits(self._bits, count=self.total_rows).astype(bool)
+        mask = np.zeros(self.total_rows, dtype=bool)
+        for start, end in zip(self._starts, self._ends):
+            mask[start:end] = True
+        return mask
+
+    def positions(self) -> np.ndarray:
+        """展開為行位置（int64 陣列）"""
+        if self._bits is not None:
+            return np.flatnonzero(self.mask())
+        if not len(self._starts):
+            return np.empty(0, dtype=np.int64)
+        lengths = self._ends - self._starts
+        offsets = np.repeat(self._starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return np.arange(self._count, dtype=np.int64) + offsets
+
+    def labels(self) -> pd.Index:
+        """展開為索引標籤"""
+        if self.index is None:
+            return pd.Index(self.positions())
+        return self.index[self.positions()]
+
+    def tolist(self) -> list:
+        """展開為索引標籤列表（與舊版 affected_rows 相同）"""
+        return self.labels().tolist()
+
+
 @dataclass
 class QualityIssue:
     """數據品質問題"""
     severity: IssueSeverity
     category: str  # 問題類別（missing_data, outlier, inconsistency, etc.）
     description: str
-    affected_rows: List[int] = field(default_factory=list)
+    affected_rows: Union[AffectedRows, List[Any]] = field(default_factory=list)  # v0.5: 緊湊儲存
     affected_columns: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
@@ -65,6 +159,47 @@ class QualityCheckResult:
     def info_count(self) -> int:
         return sum(1 for issue in self.issues if issue.severity == IssueSeverity.INFO)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """轉換為可 JSON 序列化的摘要
+
+        affected_rows 只保留數量（affected_count），不保存逐行索引。
+        """
+        return {
+            'passed': self.passed,
+            'issues': [
+                {
+                    'severity': issue.severity.value,
+                    'category': issue.category,
+                    'description': issue.description,
+                    'affected_count': len(issue.affected_rows),
+                    'affected_columns': list(issue.affected_columns),
+                    'metadata': _to_json_safe(issue.metadata),
+                }
+                for issue in self.issues
+            ],
+            'metadata': _to_json_safe(self.metadata),
+            'timestamp': self.timestamp.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QualityCheckResult":
+        """從 to_dict() 的摘要重建（affected_rows 為空列表）"""
+        return cls(
+            passed=data['passed'],
+            issues=[
+                QualityIssue(
+                    severity=IssueSeverity(issue['severity']),
+                    category=issue['category'],
+                    description=issue['description'],
+                    affected_columns=issue.get('affected_columns', []),
+                    metadata={**issue.get('metadata', {}), 'affected_count': issue.get('affected_count', 0)}
+                )
+                for issue in data.get('issues', [])
+            ],
+            metadata=data.get('metadata', {}),
+            timestamp=datetime.fromisoformat(data['timestamp']) if data.get('timestamp') else datetime.now()
+        )
+
     def get_summary(self) -> str:
         """獲取檢查結果摘要"""
         status = "PASSED" if self.passed else "FAILED"
@@ -77,6 +212,35 @@ class QualityCheckResult:
         )
 
 
+def _to_json_safe(value: Any) -> Any:
+    """把 numpy 標量、Timestamp、tuple 等轉換為 JSON 可序列化的值"""
+    if isinstance(value, dict):
+        return {str(k): _to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_safe(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _column_values(series: pd.Series) -> np.ndarray:
+    """欄位轉為 float64 陣列（數值欄位不複製）"""
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _iqr_outlier_mask(values: np.ndarray, multiplier: float) -> np.ndarray:
+    """IQR 異常值遮罩（忽略 NaN，與 Series.quantile 的線性插值一致）"""
+    finite = values[~np.isnan(values)]
+    if len(finite) == 0:
+        return np.zeros(len(values), dtype=bool)
+
+    q1, q3 = np.quantile(finite, [0.25, 0.75])
+    iqr = q3 - q1
+    return (values < q1 - multiplier * iqr) | (values > q3 + multiplier * iqr)
+
+
 class DataQualityController:
     """數據品質控制器
 
@@ -90,15 +254,35 @@ class DataQualityController:
         >>>     cleaned_df = controller.clean_ohlcv(df)
     """
 
-    def __init__(self, strict_mode: bool = False):
+    # 檢查邏輯版本（修改 check_ohlcv / clean_ohlcv 的結果時遞增，使持久化的驗證快取失效）
+    CHECK_VERSION = 2
+
+    # IQR 異常值檢測倍數
+    OUTLIER_MULTIPLIER = 3.0
+
+    # 相鄰時間差超過預期間隔（中位數）的倍數才視為時間缺口
+    GAP_THRESHOLD = 2.0
+
+    def __init__(self, strict_mode: bool = False, sample_size: Optional[int] = None):
         """初始化品質控制器
 
         Args:
             strict_mode: 嚴格模式（True = 任何問題都視為失敗）
+            sample_size: 抽樣檢查的行數（None = 檢查全部行；數據行數超過時啟用抽樣）
         """
         self.strict_mode = strict_mode
+        self.sample_size = sample_size
         self.check_history: List[QualityCheckResult] = []
 
+    def settings(self) -> Dict[str, Any]:
+        """影響檢查 / 清理結果的設定（用於驗證快取的鍵）"""
+        return {
+            'check_version': self.CHECK_VERSION,
+            'strict_mode': self.strict_mode,
+            'outlier_multiplier': self.OUTLIER_MULTIPLIER,
+            'sample_size': self.sample_size,
+        }
+
     def check_ohlcv(self, df: pd.DataFrame) -> QualityCheckResult:
         """檢查 OHLCV 數據品質
 
@@ -110,6 +294,10 @@ class DataQualityController:
         5. 異常值（統計方法）
         6. 時間序列連續性
 
+        v0.5: 所有規則直接在 numpy 陣列上以布林遮罩計算（每個欄位只轉換一次），
+        受影響行以 AffectedRows 緊湊儲存。設定 sample_size 且數據行數更多時，
+        逐行規則與 IQR 只在均勻抽樣的行上計算（結果標記為 sampled）。
+
         Args:
             df: OHLCV DataFrame
 
@@ -136,122 +324,87 @@ class DataQualityController:
                 metadata={'total_rows': len(df)}
             )
 
-        # 2. 檢查缺失值
-        for col in required_columns:
-            null_count = df[col].isnull().sum()
-            if null_count > 0:
-                null_rows = df[df[col].isnull()].index.tolist()
-                issues.append(QualityIssue(
-                    severity=IssueSeverity.CRITICAL if col != 'volume' else IssueSeverity.WARNING,
-                    category="missing_data",
-                    description=f"Found {null_count} null values in {col}",
-                    affected_rows=null_rows,
-                    affected_columns=[col],
-                    metadata={'null_count': null_count}
-                ))
+        # 抽樣模式：均勻選取行位置（固定順序，結果可重現）
+        index = df.index
+        sampled = self.sample_size is not None and len(df) > self.sample_size
+        if sampled:
+            rows = np.linspace(0, len(df) - 1, self.sample_size).astype(np.int64)
+            index = index[rows]
+        else:
+            rows = slice(None)
 
-        # 3. 檢查價格邏輯
-        # high >= low
-        invalid_high_low = df[df['high'] < df['low']]
-        if len(invalid_high_low) > 0:
-            issues.append(QualityIssue(
-                severity=IssueSeverity.CRITICAL,
-                category="price_logic",
-                description=f"Found {len(invalid_high_low)} bars where high < low",
-                affected_rows=invalid_high_low.index.tolist(),
-                affected_columns=['high', 'low']
-            ))
+        values = {col: _column_values(df[col])[rows] for col in required_columns}
+        suffix = " (sampled)" if sampled else ""
 
-        # high >= open
-        invalid_high_open = df[df['high'] < df['open']]
-        if len(invalid_high_open) > 0:
+        def add_issue(mask, severity, category, description, columns, metadata=None):
+            count = int(np.count_nonzero(mask))
+            if count == 0:
+                return
             issues.append(QualityIssue(
-                severity=IssueSeverity.CRITICAL,
-                category="price_logic",
-                description=f"Found {len(invalid_high_open)} bars where high < open",
-                affected_rows=invalid_high_open.index.tolist(),
-                affected_columns=['high', 'open']
+                severity=severity,
+                category=category,
+                description=description.format(count=count) + suffix,
+                affected_rows=AffectedRows(mask, index),
+                affected_columns=columns,
+                metadata=metadata or {}
             ))
 
-        # high >= close
-        invalid_high_close = df[df['high'] < df['close']]
-        if len(invalid_high_close) > 0:
-            issues.append(QualityIssue(
-                severity=IssueSeverity.CRITICAL,
-                category="price_logic",
-                description=f"Found {len(invalid_high_close)} bars where high < close",
-                affected_rows=invalid_high_close.index.tolist(),
-                affected_columns=['high', 'close']
-            ))
+        # 2. 檢查缺失值
+        for col in required_columns:
+            null_mask = np.isnan(values[col])
+            null_count = int(np.count_nonzero(null_mask))
+            add_issue(
+                null_mask,
+                IssueSeverity.CRITICAL if col != 'volume' else IssueSeverity.WARNING,
+                "missing_data",
+                f"Found {{count}} null values in {col}",
+                [col],
+                {'null_count': null_count}
+            )
 
-        # low <= open
-        invalid_low_open = df[df['low'] > df['open']]
-        if len(invalid_low_open) > 0:
-            issues.append(QualityIssue(
-                severity=IssueSeverity.CRITICAL,
-                category="price_logic",
-                description=f"Found {len(invalid_low_open)} bars where low > open",
-                affected_rows=invalid_low_open.index.tolist(),
-                affected_columns=['low', 'open']
-            ))
-
-        # low <= close
-        invalid_low_close = df[df['low'] > df['close']]
-        if len(invalid_low_close) > 0:
-            issues.append(QualityIssue(
-                severity=IssueSeverity.CRITICAL,
-                category="price_logic",
-                description=f"Found {len(invalid_low_close)} bars where low > close",
-                affected_rows=invalid_low_close.index.tolist(),
-                affected_columns=['low', 'close']
-            ))
+        # 3. 檢查價格邏輯（NaN 比較結果為 False，與 pandas 篩選一致）
+        o, h, l, c = values['open'], values['high'], values['low'], values['close']
+        price_rules = [
+            (h < l, "high < low", ['high', 'low']),
+            (h < o, "high < open", ['high', 'open']),
+            (h < c, "high < close", ['high', 'close']),
+            (l > o, "low > open", ['low', 'open']),
+            (l > c, "low > close", ['low', 'close']),
+        ]
+        for mask, rule, columns in price_rules:
+            add_issue(mask, IssueSeverity.CRITICAL, "price_logic",
+                      f"Found {{count}} bars where {rule}", columns)
 
         # 4. 檢查負值
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            negative_values = df[df[col] < 0]
-            if len(negative_values) > 0:
-                issues.append(QualityIssue(
-                    severity=IssueSeverity.CRITICAL,
-                    category="negative_value",
-                    description=f"Found {len(negative_values)} negative values in {col}",
-                    affected_rows=negative_values.index.tolist(),
-                    affected_columns=[col]
-                ))
+        for col in required_columns:
+            add_issue(values[col] < 0, IssueSeverity.CRITICAL, "negative_value",
+                      f"Found {{count}} negative values in {col}", [col])
 
         # 5. 檢查零值
         for col in ['open', 'high', 'low', 'close']:
-            zero_values = df[df[col] == 0]
-            if len(zero_values) > 0:
-                issues.append(QualityIssue(
-                    severity=IssueSeverity.WARNING,
-                    category="zero_value",
-                    description=f"Found {len(zero_values)} zero values in {col}",
-                    affected_rows=zero_values.index.tolist(),
-                    affected_columns=[col]
-                ))
+            add_issue(values[col] == 0, IssueSeverity.WARNING, "zero_value",
+                      f"Found {{count}} zero values in {col}", [col])
 
         # 6. 檢查異常值（使用 IQR 方法）
         for col in ['open', 'high', 'low', 'close']:
-            outliers = self._detect_outliers_iqr(df[col])
-            if len(outliers) > 0:
-                issues.append(QualityIssue(
-                    severity=IssueSeverity.WARNING,
-                    category="outlier",
-                    description=f"Found {len(outliers)} potential outliers in {col}",
-                    affected_rows=outliers.index.tolist(),
-                    affected_columns=[col],
-                    metadata={'outlier_count': len(outliers)}
-                ))
+            outlier_mask = _iqr_outlier_mask(values[col], self.OUTLIER_MULTIPLIER)
+            add_issue(outlier_mask, IssueSeverity.WARNING, "outlier",
+                      f"Found {{count}} potential outliers in {col}", [col],
+                      {'outlier_count': int(np.count_nonzero(outlier_mask))})
 
         # 7. 檢查時間序列連續性（如果有時間索引）
         if isinstance(df.index, pd.DatetimeIndex):
-            gaps = self._detect_time_gaps(df.index)
+            gaps = detect_time_gaps(df.index, threshold=self.GAP_THRESHOLD)
             if len(gaps) > 0:
                 issues.append(QualityIssue(
                     severity=IssueSeverity.INFO,
                     category="time_gap",
                     description=f"Found {len(gaps)} time gaps in data",
-                    metadata={'gaps': gaps[:10]}  # 只記錄前10個
+                    metadata={
+                        'gaps': gaps.to_tuples(10),  # 只記錄前10個
+                        'gap_count': len(gaps),
+                        'missing_bars': gaps.total_missing
+                    }
                 ))
 
         # 判斷是否通過
@@ -264,7 +417,9 @@ class DataQualityController:
             metadata={
                 'total_rows': len(df),
                 'total_columns': len(df.columns),
-                'strict_mode': self.strict_mode
+                'strict_mode': self.strict_mode,
+                'sampled': sampled,
+                'checked_rows': len(index)
             }
         )
 
@@ -507,6 +662,9 @@ class DataQualityController:
     ) -> List[tuple]:
         """檢測時間序列中的間隙
 
+        v0.5: 由向量化的 detect_time_gaps 實現；需要陣列形式或補洞計劃時
+        直接使用 data.quality.gaps。
+
         Args:
             time_index: 時間索引
             expected_freq: 預期頻率（如 '1H'）
@@ -514,29 +672,7 @@ class DataQualityController:
         Returns:
             間隙列表 [(gap_start, gap_end, gap_duration), ...]
         """
-        if len(time_index) < 2:
-            return []
-
-        # 計算時間差
-        time_diffs = time_index[1:] - time_index[:-1]
-
-        # 如果沒有指定頻率，使用中位數作為預期間隔
-        if expected_freq is None:
-            expected_interval = time_diffs.median()
-        else:
-            expected_interval = pd.Timedelta(expected_freq)
-
-        # 檢測異常大的間隙（超過預期間隔的2倍）
-        gaps = []
-        for i, diff in enumerate(time_diffs):
-            if diff > expected_interval * 2:
-                gaps.append((
-                    time_index[i],
-                    time_index[i + 1],
-                    diff
-                ))
-
-        return gaps
+        return detect_time_gaps(time_index, expected_freq, threshold=self.GAP_THRESHOLD).to_tuples()
 
     def get_check_history(self, limit: int = 10) -> List[QualityCheckResult]:
         """獲取檢查歷史"""
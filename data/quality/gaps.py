@@ -0,0 +1,226 @@
+"""
+Time Gap Detection for SuperDog v0.5
+
+向量化的時間缺口檢測與補洞計劃
+
+缺口以 int64 毫秒陣列表示（缺口前最後一根 K 線、缺口後第一根 K 線），
+整個檢測只做一次 np.diff，不逐根 K 線迭代。補洞計劃把缺口合併為最少請求數的
+時間範圍，交給 OHLCVFetcher.repair_gaps 只回補缺失的 K 線。
+
+Version: v0.5
+
+Example:
+    >>> gaps = detect_time_gaps(df['timestamp'].to_numpy(), '1m')
+    >>> print(len(gaps), gaps.total_missing)
+    >>> for r in plan_gap_repairs(gaps):
+    ...     print(r.start, r.end, r.missing_bars)
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# 補洞時單次請求的 K 線數量（與 data.fetcher.PAGE_LIMIT 相同）
+DEFAULT_PAGE_LIMIT = 1000
+
+# ccxt 格式的時間週期單位（'1M' 月份不是固定長度，不支援）
+_TIMEFRAME_UNIT_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+}
+
+TimeframeLike = Union[str, int, pd.Timedelta]
+
+
+@dataclass
+class TimeGaps:
+    """時間缺口
+
+    Attributes:
+        starts: 缺口前最後一根 K 線的時間戳（毫秒）
+        ends: 缺口後第一根 K 線的時間戳（毫秒）
+        interval_ms: 預期 K 線間隔（毫秒）
+        tz: 原始時間索引的時區（用於轉換為 Timestamp）
+    """
+    starts: np.ndarray
+    ends: np.ndarray
+    interval_ms: int
+    tz: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def missing_bars(self) -> np.ndarray:
+        """每個缺口缺少的 K 線數量"""
+        diff = self.ends - self.starts
+        return (diff + self.interval_ms - 1) // self.interval_ms - 1
+
+    @property
+    def total_missing(self) -> int:
+        """缺少的 K 線總數"""
+        return int(self.missing_bars.sum())
+
+    def contains(self, timestamps) -> np.ndarray:
+        """判斷時間戳（毫秒）是否落在某個缺口內（不含兩端已有的 K 線）"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        pos = np.searchsorted(self.starts, timestamps, side='left') - 1
+        valid = pos >= 0
+        mask = np.zeros(len(timestamps), dtype=bool)
+        mask[valid] = timestamps[valid] < self.ends[pos[valid]]
+        return mask
+
+    def to_tuples(self, limit: Optional[int] = None) -> List[tuple]:
+        """轉換為 [(gap_start, gap_end, gap_duration), ...]（Timestamp / Timedelta）"""
+        starts = self.starts[:limit]
+        ends = self.ends[:limit]
+        start_times = pd.to_datetime(starts, unit='ms', utc=self.tz is not None)
+        end_times = pd.to_datetime(ends, unit='ms', utc=self.tz is not None)
+        if self.tz is not None:
+            start_times = start_times.tz_convert(self.tz)
+            end_times = end_times.tz_convert(self.tz)
+        return [
+            (start, end, end - start)
+            for start, end in zip(start_times, end_times)
+        ]
+
+
+@dataclass
+class RepairRange:
+    """需要重新下載的時間範圍 [start, end)（毫秒）
+
+    Attributes:
+        start: 第一根缺失 K 線的時間戳
+        end: 範圍結束（不含，為最後一個缺口後第一根已有 K 線）
+        missing_bars: 範圍內缺失的 K 線數量
+        gap_count: 合併進此範圍的缺口數量
+        requests: 下載此範圍所需的請求數（按 page_limit 估算）
+    """
+    start: int
+    end: int
+    missing_bars: int
+    gap_count: int
+    requests: int
+
+
+def timeframe_to_ms(timeframe: TimeframeLike) -> int:
+    """時間週期轉換為毫秒
+
+    Args:
+        timeframe: ccxt 格式（'1m', '4h', '1d'）、pandas Timedelta 字串（'90min'）、
+            pd.Timedelta 或毫秒整數
+
+    Raises:
+        ValueError: 無法解析的時間週期
+    """
+    if isinstance(timeframe, (int, np.integer)):
+        return int(timeframe)
+    if isinstance(timeframe, str):
+        match = re.fullmatch(r'(\d+)([mhdw])', timeframe)
+        if match:
+            return int(match.group(1)) * _TIMEFRAME_UNIT_MS[match.group(2)]
+    try:
+        return int(pd.Timedelta(timeframe) // pd.Timedelta(milliseconds=1))
+    except (ValueError, TypeError):
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+def to_milliseconds(timestamps) -> np.ndarray:
+    """時間索引 / 欄位轉換為 int64 毫秒陣列（不複製已是 int64 的輸入）"""
+    if pd.api.types.is_datetime64_any_dtype(getattr(timestamps, 'dtype', None)):
+        return pd.DatetimeIndex(timestamps).as_unit('ms').asi8
+    return np.asarray(timestamps, dtype=np.int64)
+
+
+def detect_time_gaps(
+    timestamps,
+    timeframe: Optional[TimeframeLike] = None,
+    threshold: float = 1.0
+) -> TimeGaps:
+    """向量化檢測時間缺口
+
+    Args:
+        timestamps: DatetimeIndex / datetime Series / 毫秒時間戳陣列
+        timeframe: 預期 K 線間隔（None = 使用相鄰時間差的中位數）
+        threshold: 相鄰時間差超過 threshold * 間隔才視為缺口
+            （1.0 = 缺少任何一根 K 線；DataQualityController 使用 2.0）
+
+    Returns:
+        TimeGaps
+    """
+    tz = None
+    if pd.api.types.is_datetime64_any_dtype(getattr(timestamps, 'dtype', None)):
+        tz = pd.DatetimeIndex(timestamps).tz
+        tz = str(tz) if tz is not None else None
+
+    ms = to_milliseconds(timestamps)
+    if len(ms) > 1 and np.any(ms[1:] < ms[:-1]):
+        ms = np.sort(ms)
+
+    diffs = np.diff(ms)
+    if timeframe is not None:
+        interval = timeframe_to_ms(timeframe)
+    elif len(diffs):
+        interval = int(np.median(diffs))
+    else:
+        interval = 0
+
+    if len(diffs) == 0 or interval <= 0:
+        empty = np.empty(0, dtype=np.int64)
+        return TimeGaps(empty, empty.copy(), max(interval, 1), tz=tz)
+
+    positions = np.flatnonzero(diffs > interval * threshold)
+    return TimeGaps(
+        starts=ms[positions],
+        ends=ms[positions + 1],
+        interval_ms=interval,
+        tz=tz
+    )
+
+
+def plan_gap_repairs(gaps: TimeGaps, page_limit: int = DEFAULT_PAGE_LIMIT) -> List[RepairRange]:
+    """把缺口合併為最少請求數的下載範圍
+
+    每次請求最多返回 page_limit 根 K 線。相鄰缺口合併後所需的請求數
+    不多於分開下載時才合併，因此大量小缺口（交易所短暫停機）會被打包進
+    同一頁請求，而相距很遠的缺口不會拉長下載範圍。
+
+    Args:
+        gaps: detect_time_gaps 的結果
+        page_limit: 單次請求的 K 線數量
+
+    Returns:
+        RepairRange 列表（按時間排序）
+    """
+    if len(gaps) == 0:
+        return []
+
+    page_ms = page_limit * gaps.interval_ms
+    first_missing = gaps.starts + gaps.interval_ms
+    missing = gaps.missing_bars
+
+    def pages(start: int, end: int) -> int:
+        return max(1, -(-(end - start) // page_ms))
+
+    ranges = []
+    start, end = int(first_missing[0]), int(gaps.ends[0])
+    count, gap_count = int(missing[0]), 1
+
+    for i in range(1, len(gaps)):
+        gap_start, gap_end = int(first_missing[i]), int(gaps.ends[i])
+        if pages(start, gap_end) <= pages(start, end) + pages(gap_start, gap_end):
+            end = gap_end
+            count += int(missing[i])
+            gap_count += 1
+        else:
+            ranges.append(RepairRange(start, end, count, gap_count, pages(start, end)))
+            start, end = gap_start, gap_end
+            count, gap_count = int(missing[i]), 1
+
+    ranges.append(RepairRange(start, end, count, gap_count, pages(start, end)))
+    return ranges
@@ -1,8 +1,8 @@
 """
 Data Storage Module v0.4
 
-負責讀取和處理 OHLCV CSV 數據。
-將 CSV 轉換為 pandas DataFrame，並進行必要的格式化。
+負責讀取和處理 OHLCV 數據（CSV 或二進位列式格式 Parquet / Feather）。
+將數據轉換為 pandas DataFrame，並進行必要的格式化。
 
 v0.4 Updates:
 - 整合 TimeframeManager 和 SymbolManager
@@ -11,13 +11,23 @@ v0.4 Updates:
 - 增強的數據驗證和清理
 - SSD 環境支援
 
+v0.5 Updates:
+- 二進位列式存儲（Parquet / Feather，int64 timestamp + float64 OHLCV）
+- 同名數據文件優先載入二進位格式，API 不變
+- CSV → 二進位批量遷移
+- 記憶體映射數據集（.mmap 目錄，每欄一個 .npy，見 data/memmap_store.py）
+- searchsorted 日期切片（取代布林遮罩）
+- 按時間分區的歷史數據（historical/binance/SYMBOL/TIMEFRAME/，見 data/partitioned_store.py），
+  帶日期範圍的載入只讀取相關分區
+
 Version: v0.4
 Design Reference: docs/specs/planned/v0.4_strategy_api_spec.md
 """
 
+import os
 import pandas as pd
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterable, Union
 import logging
 from pathlib import Path
 
@@ -28,10 +38,138 @@ from data_config import config
 from data.timeframe_manager import TimeframeManager, Timeframe
 from data.symbol_manager import SymbolManager, SymbolInfo
 
+# v0.5: 數據目錄（保存時記錄數據集）
+from utils.database import get_catalog, parse_ohlcv_path, record_dataset
+
 # 設定日誌
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# OHLCV 標準欄位
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# v0.5: 二進位列式格式（副檔名 -> 格式名稱）
+BINARY_FORMATS = {'.mmap': 'mmap', '.parquet': 'parquet', '.feather': 'feather'}
+
+# 同一目錄下同名數據文件的載入優先順序（記憶體映射 > 二進位 > CSV）
+DATA_FILE_SUFFIXES = ['.mmap', '.parquet', '.feather', '.csv']
+
+
+def storage_format(file_path: Union[str, Path]) -> str:
+    """根據副檔名判斷存儲格式（'mmap' / 'parquet' / 'feather' / 'csv'）"""
+    return BINARY_FORMATS.get(Path(file_path).suffix.lower(), 'csv')
+
+
+def to_utc_timestamp(value) -> pd.Timestamp:
+    """轉換為 UTC Timestamp（無時區的值視為 UTC）"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        return ts.tz_localize('UTC')
+    return ts.tz_convert('UTC')
+
+
+def slice_date_range(
+    df: pd.DataFrame,
+    start_date=None,
+    end_date=None
+) -> pd.DataFrame:
+    """
+    v0.5: 按日期範圍切片（兩端包含）
+
+    對已排序的 DatetimeIndex 使用 searchsorted + iloc 切片，不建立布林遮罩；
+    無時區的日期會對齊到索引的時區。未排序的索引退回布林遮罩。
+
+    Args:
+        df: 以 DatetimeIndex 為索引的 DataFrame
+        start_date: 開始日期（可選）
+        end_date: 結束日期（可選）
+
+    Returns:
+        切片後的 DataFrame
+    """
+    if start_date is None and end_date is None:
+        return df
+
+    index = df.index
+
+    def bound(value):
+        ts = pd.Timestamp(value)
+        if index.tz is None:
+            return ts.tz_convert(None) if ts.tzinfo is not None else ts
+        return to_utc_timestamp(ts).tz_convert(index.tz)
+
+    if not index.is_monotonic_increasing:
+        mask = pd.Series(True, index=index).to_numpy()
+        if start_date is not None:
+            mask &= index >= bound(start_date)
+        if end_date is not None:
+            mask &= index <= bound(end_date)
+        return df[mask]
+
+    left = index.searchsorted(bound(start_date), side='left') if start_date is not None else 0
+    right = index.searchsorted(bound(end_date), side='right') if end_date is not None else len(index)
+    return df.iloc[left:max(left, right)]
+
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    v0.5: 整理為二進位存儲格式
+
+    int64 timestamp（毫秒）+ float64 OHLCV，移除無效行，按 timestamp 排序並去重
+    （重複時保留最後一筆）。缺少 timestamp 時從 datetime 欄位或索引推導。
+
+    Raises:
+        Exception: 缺少必要欄位
+    """
+    if isinstance(df.index, pd.DatetimeIndex):
+        df = df.reset_index()
+
+    if 'timestamp' not in df.columns:
+        if 'datetime' not in df.columns:
+            raise Exception("缺少 timestamp 或 datetime 欄位")
+        datetimes = pd.to_datetime(df['datetime'], utc=True)
+        df = df.assign(timestamp=(datetimes - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1))
+
+    missing_columns = set(OHLCV_COLUMNS) - set(df.columns)
+    if missing_columns:
+        raise Exception(f"缺少必要欄位: {missing_columns}")
+
+    out = df[OHLCV_COLUMNS].apply(pd.to_numeric, errors='coerce').dropna()
+    out = out.astype({'timestamp': 'int64', **{c: 'float64' for c in OHLCV_COLUMNS[1:]}})
+    return (
+        out.drop_duplicates(subset='timestamp', keep='last')
+        .sort_values('timestamp', kind='stable')
+        .reset_index(drop=True)
+    )
+
+
+def _record_ohlcv(file_path: Union[str, Path], df: pd.DataFrame) -> None:
+    """v0.5: 把保存的 OHLCV 文件記錄到數據目錄（文件名無法解析時跳過）"""
+    info = parse_ohlcv_path(file_path)
+    if info is not None:
+        record_dataset(file_path, 'ohlcv', df=df, **info)
+
+
+def find_data_file(
+    directories: Iterable[Union[str, Path]],
+    symbol: str,
+    timeframe: str
+) -> Optional[Path]:
+    """
+    v0.5: 查找交易對的數據文件
+
+    按目錄順序查找，同一目錄內二進位格式優先於 CSV
+
+    Returns:
+        找到的文件路徑，不存在時返回 None
+    """
+    for directory in directories:
+        for suffix in DATA_FILE_SUFFIXES:
+            file_path = Path(directory) / f"{symbol}_{timeframe}{suffix}"
+            if file_path.exists():
+                return file_path
+    return None
+
 
 class OHLCVStorage:
     """OHLCV 數據儲存與讀取器
@@ -61,10 +199,13 @@ class OHLCVStorage:
         timezone: str = 'UTC'
     ) -> pd.DataFrame:
         """
-        載入 OHLCV CSV 為 DataFrame
+        載入 OHLCV 數據為 DataFrame
+
+        根據副檔名選擇讀取方式：.mmap（記憶體映射目錄）/ .parquet / .feather
+        為二進位列式格式（已是正確類型且已排序，跳過數值轉換），其他視為 CSV。
 
         Args:
-            file_path: CSV 檔案路徑
+            file_path: 數據檔案路徑（CSV / Parquet / Feather）
             convert_to_datetime: 是否將 timestamp 轉換為 datetime
             set_datetime_index: 是否將 datetime 設為索引
             timezone: 時區，預設為 UTC
@@ -79,30 +220,11 @@ class OHLCVStorage:
         logger.info(f"載入 OHLCV 數據: {file_path}")
 
         try:
-            # 讀取 CSV
-            df = pd.read_csv(file_path)
-
-            # 驗證必要欄位
-            required_columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-            missing_columns = set(required_columns) - set(df.columns)
-            if missing_columns:
-                raise Exception(f"CSV 缺少必要欄位: {missing_columns}")
-
-            # 確保數據類型正確
-            df['timestamp'] = pd.to_numeric(df['timestamp'], errors='coerce')
-            df['open'] = pd.to_numeric(df['open'], errors='coerce')
-            df['high'] = pd.to_numeric(df['high'], errors='coerce')
-            df['low'] = pd.to_numeric(df['low'], errors='coerce')
-            df['close'] = pd.to_numeric(df['close'], errors='coerce')
-            df['volume'] = pd.to_numeric(df['volume'], errors='coerce')
-
-            # 移除包含 NaN 的行（轉換失敗的數據）
-            original_len = len(df)
-            df = df.dropna()
-            if len(df) < original_len:
-                logger.warning(
-                    f"移除了 {original_len - len(df)} 筆包含無效數據的行"
-                )
+            file_format = storage_format(file_path)
+            if file_format == 'csv':
+                df = self._read_csv(file_path)
+            else:
+                df = self._read_binary(file_path, file_format)
 
             # 轉換時間戳為 datetime
             if convert_to_datetime:
@@ -128,10 +250,11 @@ class OHLCVStorage:
                 # 不轉換時，確保欄位順序
                 df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
 
-            # 排序
+            # 排序（二進位格式寫入時已排序，檢查後跳過）
             if set_datetime_index and convert_to_datetime:
-                df = df.sort_index()
-            else:
+                if not df.index.is_monotonic_increasing:
+                    df = df.sort_index()
+            elif not df['timestamp'].is_monotonic_increasing:
                 df = df.sort_values('timestamp')
 
             logger.info(f"成功載入 {len(df)} 筆數據")
@@ -153,6 +276,60 @@ class OHLCVStorage:
             logger.error(error_msg)
             raise Exception(error_msg)
 
+    def _read_csv(self, file_path: str) -> pd.DataFrame:
+        """讀取 CSV 並轉換數值類型（移除無效行）"""
+        df = pd.read_csv(file_path)
+
+        # 驗證必要欄位
+        missing_columns = set(OHLCV_COLUMNS) - set(df.columns)
+        if missing_columns:
+            raise Exception(f"CSV 缺少必要欄位: {missing_columns}")
+
+        # 確保數據類型正確
+        for column in OHLCV_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+
+        # 移除包含 NaN 的行（轉換失敗的數據）
+        original_len = len(df)
+        df = df.dropna()
+        if len(df) < original_len:
+            logger.warning(
+                f"移除了 {original_len - len(df)} 筆包含無效數據的行"
+            )
+
+        return df
+
+    def _read_binary(self, file_path: str, file_format: str) -> pd.DataFrame:
+        """讀取 Parquet / Feather / 記憶體映射數據集（只讀取 OHLCV 欄位）"""
+        if file_format == 'mmap':
+            from data.memmap_store import MemmapOHLCV
+            return MemmapOHLCV.open(file_path).to_frame().reset_index(drop=True)
+        if file_format == 'parquet':
+            df = pd.read_parquet(file_path, columns=OHLCV_COLUMNS)
+        else:
+            df = pd.read_feather(file_path, columns=OHLCV_COLUMNS)
+
+        # 非 save_ohlcv 寫入的文件可能類型不一致，退回 CSV 的轉換流程
+        if (df['timestamp'].dtype != 'int64'
+                or any(df[column].dtype != 'float64' for column in OHLCV_COLUMNS[1:])):
+            for column in OHLCV_COLUMNS:
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+            df = df.dropna()
+
+        return df
+
+    def find_symbol_file(self, symbol: str, timeframe: str) -> Optional[Path]:
+        """
+        v0.5: 查找交易對的數據文件
+
+        依序查找 historical/binance 與 raw 目錄，二進位格式優先於 CSV
+        """
+        return find_data_file(
+            [self.data_dir / "historical" / "binance", self.data_dir / "raw"],
+            symbol,
+            timeframe
+        )
+
     def load_symbol_data(
         self,
         symbol: str,
@@ -188,25 +365,29 @@ class OHLCVStorage:
         if not self.timeframe_manager.validate_timeframe(timeframe):
             raise ValueError(f"Invalid timeframe: {timeframe}")
 
-        # 構建文件路徑
-        # 檢查歷史數據目錄（binance）
-        file_path = self.data_dir / "historical" / "binance" / f"{symbol}_{timeframe}.csv"
+        # v0.5: 分區數據集優先，只開啟與日期範圍重疊的分區
+        from data.partitioned_store import PartitionedOHLCVStore
+        partitioned = PartitionedOHLCVStore(root=self.data_dir / "historical" / "binance")
+        if partitioned.exists(symbol, timeframe):
+            df = partitioned.load(symbol, timeframe, start_date, end_date)
+            logger.info(
+                f"Loaded {len(df)} bars for {symbol} ({timeframe}) from partitions"
+            )
+            return df
 
-        # 如果不存在，嘗試 raw 目錄（向後兼容）
-        if not file_path.exists():
-            file_path = self.data_dir / "raw" / f"{symbol}_{timeframe}.csv"
+        # 查找文件：historical/binance 優先，raw 目錄向後兼容；二進位格式優先
+        file_path = self.find_symbol_file(symbol, timeframe)
 
-        if not file_path.exists():
-            raise FileNotFoundError(f"Data file not found: {file_path}")
+        if file_path is None:
+            raise FileNotFoundError(
+                f"Data file not found: {self.data_dir / 'raw' / f'{symbol}_{timeframe}.csv'}"
+            )
 
         # 載入數據
         df = self.load_ohlcv(str(file_path))
 
         # 過濾日期範圍
-        if start_date:
-            df = df[df.index >= pd.Timestamp(start_date)]
-        if end_date:
-            df = df[df.index <= pd.Timestamp(end_date)]
+        df = slice_date_range(df, start_date, end_date)
 
         logger.info(
             f"Loaded {len(df)} bars for {symbol} ({timeframe})"
@@ -313,47 +494,79 @@ class OHLCVStorage:
             self.data_dir / "raw"
         ]
 
-        available = []
+        # v0.5: 數據目錄已索引時使用查詢，不列目錄（有記錄已過期時列目錄）
+        catalog = get_catalog()
+        files = None
+        if catalog.is_indexed() and catalog.covers(self.data_dir):
+            files = self._catalog_data_files(catalog, search_dirs)
+        if files is None:
+            # 二進位格式優先（與 find_symbol_file 一致）
+            files = [
+                file_path
+                for search_dir in search_dirs if search_dir.exists()
+                for suffix in DATA_FILE_SUFFIXES
+                for file_path in search_dir.glob(f"*_*{suffix}")
+            ]
 
-        for search_dir in search_dirs:
-            if not search_dir.exists():
-                continue
+        available = []
 
-            for file_path in search_dir.glob("*_*.csv"):
-                # 解析文件名（格式：SYMBOL_TIMEFRAME.csv）
-                file_name = file_path.stem
-                parts = file_name.rsplit('_', 1)
-
-                if len(parts) == 2:
-                    symbol, timeframe = parts
-
-                    # 驗證
-                    if (self.symbol_manager.validate_symbol(symbol) and
-                        self.timeframe_manager.validate_timeframe(timeframe)):
-                        # 避免重複
-                        if not any(item['symbol'] == symbol and item['timeframe'] == timeframe for item in available):
-                            available.append({
-                                'symbol': symbol,
-                                'timeframe': timeframe,
-                                'file_path': str(file_path)
-                            })
+        for file_path in files:
+            # 解析文件名（格式：SYMBOL_TIMEFRAME.csv / .parquet / .feather）
+            file_name = file_path.stem
+            parts = file_name.rsplit('_', 1)
+
+            if len(parts) == 2:
+                symbol, timeframe = parts
+
+                # 驗證
+                if (self.symbol_manager.validate_symbol(symbol) and
+                    self.timeframe_manager.validate_timeframe(timeframe)):
+                    # 避免重複
+                    if not any(item['symbol'] == symbol and item['timeframe'] == timeframe for item in available):
+                        available.append({
+                            'symbol': symbol,
+                            'timeframe': timeframe,
+                            'file_path': str(file_path)
+                        })
 
         logger.info(f"Found {len(available)} available data files")
         return available
 
+    @staticmethod
+    def _catalog_data_files(catalog, search_dirs: List[Path]) -> Optional[List[Path]]:
+        """數據目錄中位於 search_dirs 的 OHLCV 文件（按目錄順序、二進位格式優先）
+
+        有記錄在記錄後被修改或刪除時返回 None（由調用者改為列目錄）
+        """
+        dir_order = {directory.resolve(): i for i, directory in enumerate(search_dirs)}
+        entries = [
+            entry for entry in catalog.find('ohlcv')
+            if Path(entry.path).parent in dir_order and Path(entry.path).suffix in DATA_FILE_SUFFIXES
+        ]
+        if not all(entry.is_current() for entry in entries):
+            logger.info("Data catalog has stale entries; listing data directories")
+            return None
+        files = [Path(entry.path) for entry in entries]
+        return sorted(files, key=lambda path: (dir_order[path.parent], DATA_FILE_SUFFIXES.index(path.suffix)))
+
     def save_ohlcv(
         self,
         df: pd.DataFrame,
         file_path: str,
-        include_datetime: bool = False
+        include_datetime: bool = False,
+        file_format: Optional[str] = None
     ) -> str:
         """
-        儲存 DataFrame 為 CSV
+        儲存 DataFrame 為 CSV 或二進位列式格式
+
+        二進位格式（記憶體映射 / Parquet / Feather）固定寫入 int64 timestamp（毫秒）與 float64 OHLCV，
+        按 timestamp 排序並去除重複時間戳，先寫入臨時文件再原子替換。
 
         Args:
             df: OHLCV DataFrame
             file_path: 儲存路徑
-            include_datetime: 是否包含 datetime 欄位
+            include_datetime: 是否包含 datetime 欄位（僅 CSV；二進位格式由 timestamp 推導）
+            file_format: 'csv' / 'mmap' / 'parquet' / 'feather'（默認根據副檔名判斷）
 
         Returns:
             str: 檔案路徑
@@ -371,6 +584,12 @@ class OHLCVStorage:
             if isinstance(df_to_save.index, pd.DatetimeIndex):
                 df_to_save = df_to_save.reset_index()
 
+            file_format = file_format or storage_format(file_path)
+            if file_format in BINARY_FORMATS.values():
+                saved = self._save_binary(df_to_save, file_path, file_format)
+                _record_ohlcv(saved, df_to_save)
+                return saved
+
             # 選擇要儲存的欄位
             if include_datetime and 'datetime' in df_to_save.columns:
                 columns = ['datetime', 'timestamp', 'open', 'high', 'low', 'close', 'volume']
@@ -384,6 +603,7 @@ class OHLCVStorage:
             # 儲存
             df_to_save.to_csv(file_path, index=False)
             logger.info(f"成功儲存 {len(df_to_save)} 筆數據")
+            _record_ohlcv(file_path, df_to_save)
 
             return file_path
 
@@ -392,6 +612,99 @@ class OHLCVStorage:
             logger.error(error_msg)
             raise Exception(error_msg)
 
+    def _save_binary(self, df: pd.DataFrame, file_path: str, file_format: str) -> str:
+        """寫入二進位格式（int64 timestamp + float64 OHLCV）"""
+        out = normalize_ohlcv(df)
+
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        if file_format == 'mmap':
+            from data.memmap_store import save_memmap_ohlcv
+            save_memmap_ohlcv(out, file_path)
+            logger.info(f"成功儲存 {len(out)} 筆數據 ({file_format})")
+            return file_path
+
+        tmp_path = f"{file_path}.tmp"
+        if file_format == 'parquet':
+            out.to_parquet(tmp_path, index=False, compression='snappy')
+        else:
+            out.to_feather(tmp_path)
+        os.replace(tmp_path, file_path)
+
+        logger.info(f"成功儲存 {len(out)} 筆數據 ({file_format})")
+        return file_path
+
+    def migrate_to_binary(
+        self,
+        directories: Optional[List[Union[str, Path]]] = None,
+        file_format: str = 'parquet',
+        overwrite: bool = False,
+        remove_csv: bool = False
+    ) -> List[Dict[str, str]]:
+        """
+        v0.5: 批量把 CSV 數據文件遷移為二進位列式格式
+
+        每個 SYMBOL_TIMEFRAME.csv 旁會產生同名的 .parquet / .feather / .mmap，
+        之後 load_symbol_data / DataPipeline 會自動優先載入二進位文件。
+        寫入後會重新讀取並核對筆數，核對通過才會（可選）刪除 CSV。
+
+        Args:
+            directories: 要遷移的目錄（默認 historical/binance 與 raw）
+            file_format: 'parquet' / 'feather' / 'mmap'
+            overwrite: 是否覆寫已存在的二進位文件
+            remove_csv: 遷移成功後是否刪除原 CSV
+
+        Returns:
+            每個文件的遷移結果 [{'csv', 'output', 'rows', 'status', 'error'}]，
+            status 為 'migrated' / 'skipped' / 'failed'
+
+        Example:
+            >>> storage = OHLCVStorage()
+            >>> results = storage.migrate_to_binary(file_format='parquet')
+        """
+        if file_format not in BINARY_FORMATS.values():
+            raise ValueError(f"Unsupported binary format: {file_format}")
+
+        suffix = next(s for s, f in BINARY_FORMATS.items() if f == file_format)
+        if directories is None:
+            directories = [self.data_dir / "historical" / "binance", self.data_dir / "raw"]
+
+        results = []
+        for directory in directories:
+            directory = Path(directory)
+            if not directory.exists():
+                continue
+
+            for csv_path in sorted(directory.glob("*_*.csv")):
+                output_path = csv_path.with_suffix(suffix)
+                result = {'csv': str(csv_path), 'output': str(output_path), 'rows': 0, 'error': ''}
+
+                if output_path.exists() and not overwrite:
+                    result['status'] = 'skipped'
+                    results.append(result)
+                    continue
+
+                try:
+                    df = self.load_ohlcv(str(csv_path))
+                    self._save_binary(df.reset_index(), str(output_path), file_format)
+
+                    rows = len(self.load_ohlcv(str(output_path)))
+                    if rows != len(df):
+                        raise Exception(f"筆數不一致: CSV {len(df)} vs {file_format} {rows}")
+
+                    if remove_csv:
+                        csv_path.unlink()
+
+                    result.update(rows=rows, status='migrated')
+                except Exception as e:
+                    logger.error(f"遷移 {csv_path} 失敗: {e}")
+                    result.update(status='failed', error=str(e))
+
+                results.append(result)
+
+        migrated = sum(1 for r in results if r['status'] == 'migrated')
+        logger.info(f"遷移完成: {migrated}/{len(results)} 個文件")
+        return results
+
     def get_ohlcv_info(self, df: pd.DataFrame) -> dict:
         """
         取得 OHLCV DataFrame 的摘要資訊
@@ -446,10 +759,10 @@ def load_ohlcv(
     timezone: str = 'UTC'
 ) -> pd.DataFrame:
     """
-    便捷函數：載入 OHLCV CSV 為 DataFrame
+    便捷函數：載入 OHLCV 數據（CSV / Parquet / Feather）為 DataFrame
 
     Args:
-        file_path: CSV 檔案路徑
+        file_path: 數據檔案路徑
         convert_to_datetime: 是否將 timestamp 轉換為 datetime
         set_datetime_index: 是否將 datetime 設為索引
         timezone: 時區，預設為 UTC
@@ -466,6 +779,33 @@ def load_ohlcv(
     )
 
 
+def save_ohlcv(
+    df: pd.DataFrame,
+    file_path: str,
+    include_datetime: bool = False,
+    file_format: Optional[str] = None
+) -> str:
+    """
+    便捷函數：儲存 OHLCV DataFrame（格式根據副檔名判斷）
+
+    Args:
+        df: OHLCV DataFrame
+        file_path: 儲存路徑（.csv / .parquet / .feather）
+        include_datetime: 是否包含 datetime 欄位（僅 CSV）
+        file_format: 指定格式（可選）
+
+    Returns:
+        str: 檔案路徑
+    """
+    storage = OHLCVStorage()
+    return storage.save_ohlcv(
+        df=df,
+        file_path=file_path,
+        include_datetime=include_datetime,
+        file_format=file_format
+    )
+
+
 if __name__ == "__main__":
     # 測試載入
     import sys
@@ -0,0 +1,438 @@
+"""
+Streaming Resample v0.5
+
+分塊流式重採樣：處理大於記憶體的 OHLCV 數據集
+
+TimeframeManager.resample_ohlcv 需要整個數據集在記憶體中；數年的 1m 數據
+對數百個交易對重採樣時會超出工作機的記憶體。這個模組：
+- 從存儲逐塊讀取源數據（分區數據集逐分區，單一文件按 Parquet row group /
+  Feather record batch / 記憶體映射切片 / CSV chunksize）
+- 每塊獨立聚合，跨塊邊界的未完成 K 線帶到下一塊合併
+- 已完成的目標 K 線逐步寫出（分區數據集按分區寫入，Parquet 按 row group 追加）
+- 源數據追加後增量更新目標數據集（update_partitioned，只重算最後一根 K 線）
+
+記憶體中同時只有一塊源數據、一個目標分區的緩衝，以及一根未完成的 K 線。
+結果與對整個數據集調用 resample_ohlcv 相同。
+
+Version: v0.5
+
+Example:
+    >>> store = PartitionedOHLCVStore()
+    >>> resample_partitioned(store, "BTCUSDT", "1m", "1h")      # 寫入 BTCUSDT/1h
+    >>> resample_file("data/raw/BTCUSDT_1m.parquet", "data/raw/BTCUSDT_1d.parquet", "1m", "1d")
+    >>> store.append("BTCUSDT", "1m", new_bars)
+    >>> update_partitioned(store, "BTCUSDT", "1m", "1h", closed_only=True)
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from data.partitioned_store import PartitionedOHLCVStore, split_by_partition
+from data.storage import OHLCV_COLUMNS, normalize_ohlcv, storage_format
+from data.timeframe_manager import OHLCV_COLUMNS as BAR_COLUMNS, TimeframeManager
+from utils.database import parse_ohlcv_path, record_dataset
+
+logger = logging.getLogger(__name__)
+
+# 每塊讀取的行數（6 個 8 bytes 欄位，約 48 MB）
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+class StreamingResampler:
+    """逐塊重採樣 OHLCV，跨塊的未完成 K 線帶到下一塊
+
+    源數據塊必須按時間順序送入且互不重疊。每塊聚合後，最後一根目標 K 線可能
+    在下一塊繼續，先保留為未完成 K 線；下一塊的第一根 K 線標籤相同時合併
+    （open 取先前、high / low 取極值、close 取後來、volume 相加），否則輸出。
+
+    Args:
+        source_timeframe: 源時間週期
+        target_timeframe: 目標時間週期（不小於源時間週期）
+        manager: 時間週期管理器（默認新建）
+        closed_only: flush 時只輸出已收盤的最後一根 K 線
+
+    Example:
+        >>> resampler = StreamingResampler("1m", "1h")
+        >>> for chunk in chunks:
+        ...     write(resampler.update(chunk))
+        >>> write(resampler.flush())
+    """
+
+    def __init__(
+        self,
+        source_timeframe: str,
+        target_timeframe: str,
+        manager: Optional[TimeframeManager] = None,
+        closed_only: bool = False
+    ):
+        self.manager = manager or TimeframeManager()
+        for label, tf in (("source", source_timeframe), ("target", target_timeframe)):
+            if not self.manager.validate_timeframe(tf):
+                raise ValueError(f"Invalid {label} timeframe: {tf}")
+        if self.manager.get_minutes(target_timeframe) < self.manager.get_minutes(source_timeframe):
+            raise ValueError(
+                f"Cannot resample from {source_timeframe} to {target_timeframe}: "
+                f"target timeframe must be >= source timeframe"
+            )
+
+        self.source_timeframe = source_timeframe
+        self.target_timeframe = target_timeframe
+        self.closed_only = closed_only
+        self._partial: Optional[pd.DataFrame] = None
+        self._last_timestamp: Optional[pd.Timestamp] = None
+
+    @property
+    def partial(self) -> Optional[pd.DataFrame]:
+        """目前未完成的 K 線（單行 DataFrame，沒有時為 None）"""
+        return self._partial
+
+    def update(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """送入下一塊源數據
+
+        Args:
+            chunk: DatetimeIndex 的 OHLCV 數據（晚於之前所有塊）
+
+        Returns:
+            已完成的目標 K 線（可能為空）
+
+        Raises:
+            ValueError: 數據塊與之前的數據重疊或順序錯誤
+        """
+        if chunk.empty:
+            return self._empty()
+
+        first, last = chunk.index.min(), chunk.index.max()
+        if self._last_timestamp is not None and first <= self._last_timestamp:
+            raise ValueError(
+                f"Chunks must be in increasing time order: chunk starts at {first}, "
+                f"previous chunk ended at {self._last_timestamp}"
+            )
+        self._last_timestamp = last
+
+        bars = self.manager.resample_ohlcv(
+            chunk[BAR_COLUMNS], self.source_timeframe, self.target_timeframe
+        )
+        if bars.empty:
+            return self._empty()
+
+        completed = []
+        if self._partial is not None:
+            if bars.index[0] == self._partial.index[0]:
+                bars = self.manager.merge_partial_bar(self._partial, bars)
+            else:
+                completed.append(self._partial)
+        completed.append(bars.iloc[:-1])
+        self._partial = bars.iloc[-1:]
+
+        return pd.concat(completed) if len(completed) > 1 else completed[0]
+
+    def flush(self) -> pd.DataFrame:
+        """輸出最後一根（可能未完成的）K 線並重設狀態
+
+        closed_only 時，最後一根 K 線尚未收盤則不輸出。
+        """
+        partial, self._partial = self._partial, None
+        last_timestamp, self._last_timestamp = self._last_timestamp, None
+        if partial is None:
+            return self._empty()
+        if self.closed_only:
+            partial = self.manager.drop_unclosed(
+                partial, last_timestamp, self.source_timeframe, self.target_timeframe
+            )
+        return partial
+
+    @staticmethod
+    def _empty() -> pd.DataFrame:
+        return pd.DataFrame(
+            {name: pd.Series(dtype="float64") for name in BAR_COLUMNS},
+            index=pd.DatetimeIndex([], tz="UTC", name="datetime")
+        )
+
+
+def resample_stream(
+    chunks: Iterable[pd.DataFrame],
+    source_timeframe: str,
+    target_timeframe: str,
+    manager: Optional[TimeframeManager] = None,
+    closed_only: bool = False
+) -> Iterator[pd.DataFrame]:
+    """流式重採樣：逐塊輸出已完成的目標 K 線，最後輸出未完成的 K 線
+
+    Args:
+        chunks: 按時間順序的源數據塊
+        source_timeframe: 源時間週期
+        target_timeframe: 目標時間週期
+        manager: 時間週期管理器
+        closed_only: 最後一根 K 線未收盤時不輸出
+
+    Yields:
+        非空的目標 K 線 DataFrame
+    """
+    resampler = StreamingResampler(source_timeframe, target_timeframe, manager, closed_only)
+    for chunk in chunks:
+        bars = resampler.update(chunk)
+        if not bars.empty:
+            yield bars
+
+    bars = resampler.flush()
+    if not bars.empty:
+        yield bars
+
+
+def iter_file_chunks(
+    file_path: Union[str, Path],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """逐塊讀取 OHLCV 數據文件（CSV / Parquet / Feather / mmap）
+
+    Parquet 按 row group 批次讀取，Feather 按 record batch 讀取，記憶體映射數據集
+    按行切片（零拷貝），CSV 使用 chunksize；每塊最多 chunk_rows 行。
+
+    Yields:
+        UTC DatetimeIndex（datetime）+ timestamp / OHLCV 欄位的 DataFrame
+    """
+    file_path = Path(file_path)
+    file_format = storage_format(file_path)
+
+    if file_format == 'mmap':
+        from data.memmap_store import MemmapOHLCV
+
+        dataset = MemmapOHLCV.open(file_path)
+        for start in range(0, len(dataset), chunk_rows):
+            yield dataset.iloc(slice(start, start + chunk_rows)).to_frame()
+
+    elif file_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=OHLCV_COLUMNS):
+            yield _chunk_frame(batch.to_pandas())
+
+    elif file_format == 'feather':
+        import pyarrow as pa
+
+        with pa.memory_map(str(file_path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(OHLCV_COLUMNS)
+                for offset in range(0, batch.num_rows, chunk_rows):
+                    yield _chunk_frame(batch.slice(offset, chunk_rows).to_pandas())
+
+    else:
+        for df in pd.read_csv(file_path, chunksize=chunk_rows):
+            missing_columns = set(OHLCV_COLUMNS) - set(df.columns)
+            if missing_columns:
+                raise Exception(f"CSV 缺少必要欄位: {missing_columns}")
+            df = df[OHLCV_COLUMNS].apply(pd.to_numeric, errors='coerce').dropna()
+            if not df.empty:
+                yield _chunk_frame(df.astype({'timestamp': 'int64'}))
+
+
+def resample_partitioned(
+    store: PartitionedOHLCVStore,
+    symbol: str,
+    source_timeframe: str,
+    target_timeframe: str,
+    start_date=None,
+    end_date=None,
+    target_store: Optional[PartitionedOHLCVStore] = None,
+    granularity: Optional[str] = None,
+    closed_only: bool = False
+) -> Dict:
+    """把分區數據集流式重採樣為另一個分區數據集
+
+    源數據逐分區讀取；目標 K 線按目標分區緩衝，分區完成後立即寫入，
+    記憶體中不會同時持有整個源數據集或目標數據集。已存在的目標數據集會被覆蓋。
+
+    Args:
+        store: 源數據存儲
+        symbol: 交易對
+        source_timeframe: 源時間週期
+        target_timeframe: 目標時間週期
+        start_date: 開始日期（可選）
+        end_date: 結束日期（可選）
+        target_store: 目標存儲（默認與源存儲相同）
+        granularity: 目標數據集的分區粒度（默認為目標存儲的默認值）
+        closed_only: 不寫入未收盤的最後一根 K 線
+
+    Returns:
+        目標數據集的 manifest
+
+    Raises:
+        FileNotFoundError: 源數據集不存在
+        ValueError: 源數據集沒有數據
+    """
+    target_store = target_store or store
+    granularity = granularity or target_store.granularity
+    chunks = store.iter_partitions(symbol, source_timeframe, start_date, end_date)
+
+    written = False
+    pending: List[pd.DataFrame] = []
+
+    def write(df: pd.DataFrame) -> None:
+        nonlocal written
+        if written:
+            target_store.append(symbol, target_timeframe, df)
+        else:
+            # 第一次寫入替換已有的目標數據集
+            target_store.write(symbol, target_timeframe, df, granularity)
+            written = True
+
+    for bars in resample_stream(chunks, source_timeframe, target_timeframe, closed_only=closed_only):
+        pending.append(normalize_ohlcv(bars))
+        buffered = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+
+        # 只寫出已完成的目標分區，最後一個分區可能還有後續 K 線
+        parts = list(split_by_partition(buffered, granularity))
+        if len(parts) > 1:
+            write(pd.concat([chunk for _, chunk in parts[:-1]], ignore_index=True))
+            pending = [parts[-1][1]]
+        else:
+            pending = [buffered]
+
+    if pending:
+        write(pd.concat(pending, ignore_index=True))
+    if not written:
+        raise ValueError(f"No {source_timeframe} data to resample for {symbol}")
+
+    manifest = target_store.read_manifest(symbol, target_timeframe)
+    logger.info(
+        f"Resampled {symbol} {source_timeframe} -> {target_timeframe}: "
+        f"{sum(p['rows'] for p in manifest['partitions'])} bars in "
+        f"{len(manifest['partitions'])} partition(s)"
+    )
+    return manifest
+
+
+def update_partitioned(
+    store: PartitionedOHLCVStore,
+    symbol: str,
+    source_timeframe: str,
+    target_timeframe: str,
+    target_store: Optional[PartitionedOHLCVStore] = None,
+    closed_only: bool = False
+) -> List[str]:
+    """源數據集追加新 K 線後，增量更新由它重採樣的目標數據集
+
+    只載入目標數據集最後一根 K 線開始之後的源數據（分區裁剪），重算最後一根
+    K 線並追加新的 K 線；目標數據集只重寫受影響的分區。最後一根 K 線的源數據
+    全部從源數據集重新讀取，因此源數據有缺失 K 線時也不會重複累加。目標數據集不存在時以 resample_partitioned 建立。
+
+    closed_only 時目標數據集只包含已收盤的 K 線，適合持續刷新與實盤：策略讀取的
+    更高時間週期不會包含仍在變化的 K 線。
+
+    Args:
+        store: 源數據存儲
+        symbol: 交易對
+        source_timeframe: 源時間週期
+        target_timeframe: 目標時間週期
+        target_store: 目標存儲（默認與源存儲相同）
+        closed_only: 只寫入已收盤的 K 線
+
+    Returns:
+        被重寫的目標分區鍵列表
+    """
+    target_store = target_store or store
+    if not target_store.exists(symbol, target_timeframe):
+        manifest = resample_partitioned(
+            store, symbol, source_timeframe, target_timeframe,
+            target_store=target_store, closed_only=closed_only
+        )
+        return [p["key"] for p in manifest["partitions"]]
+
+    manager = TimeframeManager()
+    partitions = target_store.read_manifest(symbol, target_timeframe)["partitions"]
+    if not partitions:
+        return []
+
+    last_label = pd.Timestamp(partitions[-1]["end"], unit="ms", tz="UTC")
+    data = store.load(symbol, source_timeframe, start_date=manager.bar_start(last_label, target_timeframe))
+    if data.empty:
+        return []
+
+    # 替換最後一根 K 線（append 覆蓋同標籤的行）並追加新的 K 線
+    updated = manager.resample_ohlcv(data, source_timeframe, target_timeframe, closed_only)[BAR_COLUMNS]
+    if updated.empty:
+        return []
+
+    rewritten = target_store.append(symbol, target_timeframe, updated)
+    logger.info(
+        f"Updated {symbol} {target_timeframe} from {source_timeframe}: "
+        f"{len(updated)} bar(s) from {updated.index[0]}"
+    )
+    return rewritten
+
+
+def resample_file(
+    source_path: Union[str, Path],
+    target_path: Union[str, Path],
+    source_timeframe: str,
+    target_timeframe: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> int:
+    """把單一數據文件流式重採樣為 Parquet 文件
+
+    每批已完成的 K 線作為一個 row group 追加寫入臨時文件，完成後原子替換目標文件。
+    輸出與 OHLCVStorage 的二進位格式相同（int64 timestamp + float64 OHLCV）。
+
+    Args:
+        source_path: 源數據文件（CSV / Parquet / Feather / mmap）
+        target_path: 目標 Parquet 文件
+        source_timeframe: 源時間週期
+        target_timeframe: 目標時間週期
+        chunk_rows: 每塊讀取的行數
+
+    Returns:
+        寫入的目標 K 線數
+
+    Raises:
+        ValueError: 目標文件不是 Parquet
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    target_path = Path(target_path)
+    if storage_format(target_path) != 'parquet':
+        raise ValueError(f"Streaming resample writes Parquet files only: {target_path}")
+
+    schema = pa.schema(
+        [('timestamp', pa.int64())] + [(name, pa.float64()) for name in OHLCV_COLUMNS[1:]]
+    )
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target_path.with_name(target_path.name + ".tmp")
+
+    rows = 0
+    start = end = None
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression='snappy') as writer:
+            chunks = iter_file_chunks(source_path, chunk_rows)
+            for bars in resample_stream(chunks, source_timeframe, target_timeframe):
+                out = normalize_ohlcv(bars)
+                writer.write_table(pa.Table.from_pandas(out, schema=schema, preserve_index=False))
+                rows += len(out)
+                start = out['timestamp'].iloc[0] if start is None else start
+                end = out['timestamp'].iloc[-1]
+        os.replace(tmp_path, target_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    info = parse_ohlcv_path(target_path)
+    if info is not None:
+        record_dataset(target_path, 'ohlcv', start=start, end=end, rows=rows, **info)
+
+    logger.info(f"Resampled {source_path} -> {target_path}: {rows} bars")
+    return rows
+
+
+def _chunk_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """timestamp（毫秒）欄位的數據塊加上 UTC datetime 索引"""
+    df.index = pd.DatetimeIndex(
+        pd.to_datetime(np.asarray(df['timestamp'], dtype='int64'), unit='ms', utc=True),
+        name='datetime'
+    )
+    return df
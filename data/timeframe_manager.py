@@ -1,5 +1,5 @@
 """
-Timeframe Manager v0.4
+Timeframe Manager v0.5
 
 多時間週期管理器 - 支援多種時間週期的轉換和驗證
 
@@ -8,16 +8,29 @@ Timeframe Manager v0.4
 - 時間週期轉換和重採樣
 - 數據對齊和時間校正
 - 時間週期驗證
+- v0.5: 向量化重採樣（按分組邊界 reduceat 聚合）與多時間週期金字塔
+- v0.5: 增量更新更高時間週期（只重算最後一根 K 線）與只輸出已收盤 K 線的模式
+- v0.5: 無前視偏差的多時間週期對齊（searchsorted 整數映射 + 索引取值）
 
-Version: v0.4
+Version: v0.5 (upgraded from v0.4)
 Design Reference: docs/specs/planned/v0.4_strategy_api_spec.md
 """
 
-from typing import Optional, List, Dict
+from typing import Iterable, Optional, List, Dict, Union
+from dataclasses import dataclass
 from enum import Enum
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 
+# OHLCV 欄位（重採樣結果的欄位順序）
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+_NS_PER_DAY = 1440 * _NS_PER_MINUTE
+# 1970-01-04 是星期日：週線與 pandas 的 "W"（W-SUN）一致，週一至週日為一根 K 線，以週日為標籤
+_WEEK_ANCHOR_NS = 3 * _NS_PER_DAY
+
 
 class Timeframe(Enum):
     """標準時間週期枚舉
@@ -96,6 +109,81 @@ class Timeframe(Enum):
         )
 
 
+@dataclass
+class TimeframeAlignment:
+    """多時間週期對齊：每根基準 K 線 → 收盤時最後一根已收盤的另一時間週期 K 線
+
+    indexer[i] 是基準 K 線 i 收盤時（開始時間 + 週期）已經收盤的最後一根
+    其他時間週期 K 線在 higher_index 中的位置，-1 表示還沒有。4h K 線在其開始
+    時間並不可見，要等到 4h 結束後的第一根基準 K 線收盤才可見，因此沒有前視偏差。
+
+    映射只計算一次；之後任意特徵（收盤價、指標）都以 take 按位置取值，
+    不需要按標籤 reindex，也不複製基準數據。
+
+    Attributes:
+        base_index: 基準時間週期的索引
+        higher_index: 其他時間週期的索引（已排序）
+        indexer: int64 位置陣列（長度與 base_index 相同；base_index 已排序時單調不減）
+
+    Example:
+        >>> alignment = manager.build_alignment(data_1h.index, "1h", data_4h.index, "4h")
+        >>> sma_4h = alignment.take(data_4h['close'].rolling(20).mean())
+    """
+    base_index: pd.DatetimeIndex
+    higher_index: pd.DatetimeIndex
+    indexer: np.ndarray
+
+    @property
+    def valid(self) -> np.ndarray:
+        """基準 K 線是否已有可用的其他時間週期 K 線"""
+        return self.indexer >= 0
+
+    @property
+    def nbytes(self) -> int:
+        """映射陣列的大小（DataCache 以此估算記憶體）"""
+        return self.indexer.nbytes
+
+    def take(
+        self,
+        values: Union[np.ndarray, pd.Series, pd.DataFrame],
+        fill_value=np.nan
+    ) -> Union[np.ndarray, pd.Series, pd.DataFrame]:
+        """把其他時間週期的值按映射取到基準 K 線上
+
+        Args:
+            values: 與 higher_index 對齊的 ndarray / Series / DataFrame
+            fill_value: 還沒有已收盤 K 線的位置的值
+
+        Returns:
+            ndarray 輸入返回 ndarray；Series / DataFrame 返回以 base_index 為索引的同類型
+        """
+        if isinstance(values, pd.DataFrame):
+            return pd.DataFrame(
+                {name: self._take(values[name].to_numpy(), fill_value) for name in values.columns},
+                index=self.base_index
+            )
+        if isinstance(values, pd.Series):
+            return pd.Series(self._take(values.to_numpy(), fill_value), index=self.base_index, name=values.name)
+        return self._take(np.asarray(values), fill_value)
+
+    def _take(self, array: np.ndarray, fill_value) -> np.ndarray:
+        if len(array) != len(self.higher_index):
+            raise ValueError(
+                f"Length mismatch: {len(array)} values for {len(self.higher_index)} bars"
+            )
+        if len(array) == 0:
+            return np.full(len(self.indexer), fill_value)
+
+        out = array.take(np.maximum(self.indexer, 0))
+        # 以遮罩填充：base_index 未排序時 -1 不一定只出現在開頭
+        missing = self.indexer < 0
+        if missing.any():
+            if isinstance(fill_value, float) and np.isnan(fill_value) and out.dtype.kind in "iub":
+                out = out.astype("float64")
+            out[missing] = fill_value
+        return out
+
+
 class TimeframeManager:
     """時間週期管理器
 
@@ -195,7 +283,8 @@ class TimeframeManager:
         self,
         data: pd.DataFrame,
         source_timeframe: str,
-        target_timeframe: str
+        target_timeframe: str,
+        closed_only: bool = False
     ) -> pd.DataFrame:
         """重採樣 OHLCV 數據到不同時間週期
 
@@ -203,6 +292,8 @@ class TimeframeManager:
             data: 原始 OHLCV 數據
             source_timeframe: 源時間週期
             target_timeframe: 目標時間週期
+            closed_only: v0.5: 只返回已收盤的 K 線（最後一根 K 線的時間尚未被源數據
+                覆蓋完時丟棄，避免回測 / 實盤使用未完成 K 線造成前視偏差）
 
         Returns:
             重採樣後的 OHLCV 數據
@@ -237,45 +328,328 @@ class TimeframeManager:
         if target_minutes == source_minutes:
             return data.copy()  # 相同時間週期，返回副本
 
-        # 獲取重採樣規則
-        rule = self.RESAMPLE_RULES[target_timeframe]
+        # v0.5: 已排序、無缺失值的數據按分組邊界向量化聚合
+        if self._can_aggregate(data):
+            resampled = self._aggregate_bars(data, target_timeframe)
+        else:
+            # 獲取重採樣規則
+            rule = self.RESAMPLE_RULES[target_timeframe]
+
+            # 重採樣
+            resampled = data.resample(rule).agg({
+                'open': 'first',
+                'high': 'max',
+                'low': 'min',
+                'close': 'last',
+                'volume': 'sum'
+            })
 
-        # 重採樣
-        resampled = data.resample(rule).agg({
-            'open': 'first',
-            'high': 'max',
-            'low': 'min',
-            'close': 'last',
-            'volume': 'sum'
-        })
+            # 移除 NaN 行
+            resampled = resampled.dropna()
 
-        # 移除 NaN 行
-        resampled = resampled.dropna()
+        if closed_only:
+            resampled = self.drop_unclosed(resampled, data.index.max(), source_timeframe, target_timeframe)
 
         return resampled
 
+    def update_resampled(
+        self,
+        resampled: Optional[pd.DataFrame],
+        data: pd.DataFrame,
+        source_timeframe: str,
+        target_timeframe: str,
+        closed_only: bool = False
+    ) -> pd.DataFrame:
+        """v0.5: 增量更新更高時間週期的數據
+
+        新的源 K 線到達時不重建整個序列，之前的 K 線不變。data 可以是以下兩種之一，
+        以它的第一根源 K 線判斷：
+
+        - 從已有序列最後一根 K 線的開始時間（bar_start）或更早開始：只從該時間起
+          重新聚合，替換最後一根並追加新的 K 線。源數據中被修正的 K 線（如重新獲取
+          的最後一根 1m K 線）也會正確反映，不會重複累加。
+        - 只包含尚未聚合的新源 K 線（開始於 bar_start 之後）：最後一根 K 線已收盤時
+          保留並在其後追加；未收盤時把新 K 線合併進去（開盤價不變、最高 / 最低取極值、
+          收盤價取新值、成交量累加）。這種情況 data 不可包含已聚合過的源 K 線。
+
+        closed_only 時未收盤的 K 線不會保留在結果中，因此下次只傳入新 K 線時，必須
+        從最後一根 K 線的結束時間（bar_end）起傳入所有源 K 線（包括上次未收盤部分）。
+
+        Args:
+            resampled: 已有的目標時間週期數據（None 或空時等同 resample_ohlcv）
+            data: 源數據（見上）
+            source_timeframe: 源時間週期
+            target_timeframe: 目標時間週期
+            closed_only: 只保留已收盤的 K 線
+
+        Returns:
+            更新後的目標時間週期數據
+
+        Raises:
+            ValueError: closed_only 時新 K 線落在已收盤的最後一根 K 線內
+
+        Example:
+            >>> manager = TimeframeManager()
+            >>> data_1h = manager.update_resampled(data_1h, new_1m_bars, "1m", "1h")
+        """
+        if resampled is None or resampled.empty:
+            return self.resample_ohlcv(data, source_timeframe, target_timeframe, closed_only)
+
+        start = self.bar_start(resampled.index[-1], target_timeframe)
+        if data.index.tz is None and start.tzinfo is not None:
+            start = start.tz_convert(None)
+        elif data.index.tz is not None and start.tzinfo is None:
+            start = start.tz_localize(data.index.tz)
+
+        if data.index.is_monotonic_increasing:
+            tail = data.iloc[data.index.searchsorted(start, side='left'):]
+        else:
+            tail = data[data.index >= start].sort_index()
+        if tail.empty:
+            return resampled
+
+        head = resampled
+        if list(head.columns) != OHLCV_COLUMNS:
+            head = head[OHLCV_COLUMNS]
+
+        if data.index.min() <= start:
+            # data 覆蓋最後一根 K 線：重新聚合
+            bars = self.resample_ohlcv(tail, source_timeframe, target_timeframe, closed_only)
+            return pd.concat([head.iloc[:-1], bars[OHLCV_COLUMNS]])
+
+        bars = self.resample_ohlcv(tail, source_timeframe, target_timeframe)[OHLCV_COLUMNS]
+        if tail.index[0] >= start + self.get_timedelta(target_timeframe):
+            # 最後一根 K 線已收盤：保留並追加
+            updated = pd.concat([head, bars])
+        elif closed_only:
+            raise ValueError(
+                f"Source bars from {tail.index[0]} overlap the closed bar {resampled.index[-1]}; "
+                f"pass source bars from {start} or from the bar end"
+            )
+        else:
+            # 新 K 線屬於未收盤的最後一根：合併
+            updated = pd.concat([head.iloc[:-1], self.merge_partial_bar(head.iloc[-1:], bars)])
+
+        if closed_only:
+            updated = self.drop_unclosed(updated, tail.index.max(), source_timeframe, target_timeframe)
+        return updated
+
+    def merge_partial_bar(self, partial: pd.DataFrame, bars: pd.DataFrame) -> pd.DataFrame:
+        """把未完成的 K 線合併到後續數據的第一根同標籤 K 線
+
+        Args:
+            partial: 只有一根 K 線的 OHLCV DataFrame（較早的部分）
+            bars: 後續聚合的 K 線，第一根與 partial 同標籤
+
+        Returns:
+            第一根已合併的 bars（副本）
+        """
+        if bars.index[0] != partial.index[0]:
+            raise ValueError(
+                f"Cannot merge bar {partial.index[0]} into bars starting at {bars.index[0]}"
+            )
+        bars = bars.copy()
+        first = bars.iloc[0]
+        previous = partial.iloc[0]
+        bars.iloc[0] = pd.Series({
+            'open': previous['open'],
+            'high': max(previous['high'], first['high']),
+            'low': min(previous['low'], first['low']),
+            'close': first['close'],
+            'volume': previous['volume'] + first['volume'],
+        })[bars.columns]
+        return bars
+
+    def bar_start(self, label: pd.Timestamp, timeframe: str) -> pd.Timestamp:
+        """K 線標籤對應的開始時間
+
+        分鐘 / 小時 / 日線的標籤即開始時間；週線以週日為標籤，開始於該週週一 00:00。
+        """
+        label = pd.Timestamp(label)
+        if timeframe == Timeframe.W1.value:
+            return label.normalize() - pd.Timedelta(days=6)
+        return label
+
+    def bar_end(self, label: pd.Timestamp, timeframe: str) -> pd.Timestamp:
+        """K 線標籤對應的結束時間（不包含）"""
+        return self.bar_start(label, timeframe) + self.get_timedelta(timeframe)
+
+    def drop_unclosed(
+        self,
+        resampled: pd.DataFrame,
+        last_source: pd.Timestamp,
+        source_timeframe: str,
+        target_timeframe: str
+    ) -> pd.DataFrame:
+        """丟棄未收盤的最後一根 K 線
+
+        最後一根源 K 線結束時（last_source + 源週期）尚未到達目標 K 線的結束時間，
+        表示目標 K 線還會有後續數據；之前的 K 線之後都已有源數據，必定已收盤。
+        """
+        if resampled.empty:
+            return resampled
+        source_end = last_source + self.get_timedelta(source_timeframe)
+        if source_end < self.bar_end(resampled.index[-1], target_timeframe):
+            return resampled.iloc[:-1]
+        return resampled
+
+    def build_pyramid(
+        self,
+        data: pd.DataFrame,
+        base_timeframe: str,
+        timeframes: Optional[Iterable[str]] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """從基準數據一次建立多個更高時間週期（多時間週期金字塔）
+
+        每個時間週期由已建立的最大可整除時間週期聚合（1m → 5m → 15m → ... → 1d → 1w），
+        每一層只處理上一層的 K 線，而不是每個時間週期都對基準數據重新 resample。
+        結果與 resample_ohlcv 相同。
+
+        Args:
+            data: 基準時間週期的 OHLCV 數據（DatetimeIndex）
+            base_timeframe: 基準時間週期
+            timeframes: 需要的時間週期（默認為 get_compatible_timeframes(base_timeframe)）
+
+        Returns:
+            {時間週期: OHLCV DataFrame}；基準時間週期直接返回 data（不複製）
+
+        Raises:
+            ValueError: 無效的時間週期，或時間週期小於基準時間週期
+
+        Example:
+            >>> manager = TimeframeManager()
+            >>> pyramid = manager.build_pyramid(data_1m, "1m", ["1h", "4h", "1d"])
+            >>> data_4h = pyramid["4h"]
+        """
+        if not self.validate_timeframe(base_timeframe):
+            raise ValueError(f"Invalid source timeframe: {base_timeframe}")
+
+        if timeframes is None:
+            timeframes = self.get_compatible_timeframes(base_timeframe)
+        timeframes = list(dict.fromkeys(timeframes))
+
+        compatible = self.get_compatible_timeframes(base_timeframe)
+        for tf in timeframes:
+            if not self.validate_timeframe(tf):
+                raise ValueError(f"Invalid target timeframe: {tf}")
+            if tf not in compatible:
+                raise ValueError(
+                    f"Cannot resample from {base_timeframe} to {tf}: "
+                    f"target timeframe must be >= source timeframe"
+                )
+
+        # 數據不適合向量化聚合時（未排序、有缺失值），各時間週期從基準數據重採樣
+        if not self._can_aggregate(data):
+            return {
+                tf: data if tf == base_timeframe else self.resample_ohlcv(data, base_timeframe, tf)
+                for tf in timeframes
+            }
+
+        levels = {base_timeframe: data}
+        for tf in sorted(set(timeframes), key=self.get_minutes):
+            if tf in levels:
+                continue
+            source = self._pyramid_source(levels, tf)
+            levels[tf] = self._aggregate_bars(levels[source], tf)
+
+        return {tf: levels[tf] for tf in timeframes}
+
+    def _pyramid_source(self, levels: Dict[str, pd.DataFrame], target_timeframe: str) -> str:
+        """已建立的層中，分鐘數能整除目標時間週期的最大一層"""
+        target_minutes = self.get_minutes(target_timeframe)
+        return max(
+            (tf for tf in levels if target_minutes % self.get_minutes(tf) == 0),
+            key=self.get_minutes
+        )
+
+    @staticmethod
+    def _can_aggregate(data: pd.DataFrame) -> bool:
+        """數據是否可以按分組邊界向量化聚合
+
+        需要 UTC / 無時區的已排序 DatetimeIndex、完整的 OHLCV 欄位且沒有缺失值；
+        其他情況（如本地時區的日界）使用 pandas resample。
+        """
+        index = data.index
+        if not isinstance(index, pd.DatetimeIndex) or len(index) == 0:
+            return False
+        if index.tz is not None and str(index.tz) != "UTC":
+            return False
+        if not all(col in data.columns for col in OHLCV_COLUMNS):
+            return False
+        return index.is_monotonic_increasing and not data[OHLCV_COLUMNS].isna().to_numpy().any()
+
+    def _aggregate_bars(self, data: pd.DataFrame, target_timeframe: str) -> pd.DataFrame:
+        """按目標時間週期的分組邊界向量化聚合 OHLCV
+
+        K 線已按時間排序，同一分組的 K 線連續；分組起點為標籤改變的位置，
+        high / low / volume 以 np.maximum / np.minimum / np.add 的 reduceat 一次計算，
+        open / close 取分組首尾。只產生有 K 線的分組（與 resample 後 dropna 相同）。
+        """
+        index = data.index
+        labels = self._bar_labels(index.as_unit("ns").asi8, target_timeframe)
+
+        starts = np.flatnonzero(np.concatenate(([True], labels[1:] != labels[:-1])))
+        ends = np.append(starts[1:], len(labels)) - 1
+
+        result_index = pd.DatetimeIndex(labels[starts], tz=index.tz, name=index.name).as_unit(index.unit)
+        return pd.DataFrame({
+            'open': data['open'].to_numpy()[starts],
+            'high': np.maximum.reduceat(data['high'].to_numpy(), starts),
+            'low': np.minimum.reduceat(data['low'].to_numpy(), starts),
+            'close': data['close'].to_numpy()[ends],
+            'volume': np.add.reduceat(data['volume'].to_numpy(), starts),
+        }, index=result_index)
+
+    def _bar_labels(self, timestamps_ns: np.ndarray, timeframe: str) -> np.ndarray:
+        """每個時間戳所屬 K 線的標籤（ns）
+
+        分鐘 / 小時 / 日線：向下取整到週期起點（與 resample 的標籤一致）；
+        週線：該日所在週的週日（W-SUN，週一至週日為一根 K 線）。
+        """
+        if timeframe == Timeframe.W1.value:
+            days = timestamps_ns - timestamps_ns % _NS_PER_DAY
+            return days + (_WEEK_ANCHOR_NS - days) % (7 * _NS_PER_DAY)
+
+        step = self.get_minutes(timeframe) * _NS_PER_MINUTE
+        return timestamps_ns - timestamps_ns % step
+
     def align_timeframes(
         self,
         data1: pd.DataFrame,
         data2: pd.DataFrame,
-        how: str = 'inner'
+        how: str = 'inner',
+        timeframe1: Optional[str] = None,
+        timeframe2: Optional[str] = None
     ) -> tuple:
         """對齊兩個不同時間週期的數據
 
+        提供 timeframe1 / timeframe2 時，'left' / 'right' 使用 build_alignment：
+        另一方的每根 K 線在收盤後才可見（無前視偏差）。不提供時按標籤 reindex
+        並向前填充，較高時間週期的 K 線在其開始時間就可見，只適合不用於交易決策的對齊。
+
         Args:
             data1: 第一個數據集
             data2: 第二個數據集
             how: 對齊方式（'inner', 'outer', 'left', 'right'）
+            timeframe1: data1 的時間週期（v0.5，可選）
+            timeframe2: data2 的時間週期（v0.5，可選）
 
         Returns:
             對齊後的兩個數據集（data1_aligned, data2_aligned）
 
         Example:
             >>> manager = TimeframeManager()
-            >>> data1_aligned, data2_aligned = manager.align_timeframes(
-            ...     data_1h, data_4h, how='inner'
+            >>> data_1h, data_4h_on_1h = manager.align_timeframes(
+            ...     data_1h, data_4h, how='left', timeframe1='1h', timeframe2='4h'
             ... )
         """
+        if timeframe1 and timeframe2 and how in ('left', 'right'):
+            if how == 'left':
+                alignment = self.build_alignment(data1.index, timeframe1, data2.index, timeframe2)
+                return data1, alignment.take(data2)
+            alignment = self.build_alignment(data2.index, timeframe2, data1.index, timeframe1)
+            return alignment.take(data1), data2
+
         # 使用 pandas 的 join 功能對齊索引
         if how == 'inner':
             common_index = data1.index.intersection(data2.index)
@@ -297,6 +671,55 @@ class TimeframeManager:
         else:
             raise ValueError(f"Invalid 'how' parameter: {how}")
 
+    def build_alignment(
+        self,
+        base_index: pd.DatetimeIndex,
+        base_timeframe: str,
+        higher_index: pd.DatetimeIndex,
+        higher_timeframe: str
+    ) -> TimeframeAlignment:
+        """v0.5: 建立無前視偏差的對齊映射
+
+        基準 K 線 i 在 base_index[i] + 基準週期時收盤；此時可用的是結束時間
+        （bar_end）不晚於該時間的其他時間週期 K 線。以 np.searchsorted 在其他時間週期
+        的結束時間上一次找出所有基準 K 線的位置，O(n log m)。
+
+        未完成的最後一根 K 線（結束時間晚於最後一根基準 K 線收盤）永遠不會被映射到。
+
+        Args:
+            base_index: 基準時間週期的 K 線標籤（開始時間，可以未排序）
+            base_timeframe: 基準時間週期
+            higher_index: 其他時間週期的 K 線標籤（需已排序；通常是更高時間週期）
+            higher_timeframe: 其他時間週期
+
+        Returns:
+            TimeframeAlignment
+
+        Raises:
+            ValueError: 無效的時間週期、索引未排序或時區不一致
+        """
+        for tf in (base_timeframe, higher_timeframe):
+            if not self.validate_timeframe(tf):
+                raise ValueError(f"Invalid timeframe: {tf}")
+        if (base_index.tz is None) != (higher_index.tz is None):
+            raise ValueError("Cannot align timezone-aware and timezone-naive indexes")
+        if not higher_index.is_monotonic_increasing:
+            raise ValueError("higher_index must be sorted")
+
+        base_close = base_index.as_unit("ns").asi8 + self.get_minutes(base_timeframe) * _NS_PER_MINUTE
+        higher_end = self._bar_starts(higher_index.as_unit("ns").asi8, higher_timeframe) \
+            + self.get_minutes(higher_timeframe) * _NS_PER_MINUTE
+
+        indexer = np.searchsorted(higher_end, base_close, side='right') - 1
+        return TimeframeAlignment(base_index, higher_index, indexer.astype(np.int64, copy=False))
+
+    @staticmethod
+    def _bar_starts(labels_ns: np.ndarray, timeframe: str) -> np.ndarray:
+        """K 線標籤（ns）對應的開始時間（向量化的 bar_start）"""
+        if timeframe == Timeframe.W1.value:
+            return labels_ns - labels_ns % _NS_PER_DAY - 6 * _NS_PER_DAY
+        return labels_ns
+
     def get_compatible_timeframes(self, base_timeframe: str) -> List[str]:
         """獲取與基準時間週期兼容的時間週期
 
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from typing import Dict
 import logging
 
+from data.quality.gaps import detect_time_gaps
+
 # 設定日誌
 logging.basicConfig(
     level=logging.INFO,
@@ -40,6 +42,7 @@ class OHLCVValidator:
                 - ok: bool 是否通過驗證
                 - total_rows: int 總列數
                 - missing_bars: int 缺少的 K 線數量
+                - gap_count: int 時間缺口數量（v0.5）
                 - errors: list 錯誤訊息
                 - warnings: list 警告訊息
                 - start_date: str 第一筆數據時間
@@ -118,6 +121,7 @@ class OHLCVValidator:
 
             # 5. 計算缺少的 K 線數量
             missing_bars = 0
+            gap_count = 0
             start_date = ""
             end_date = ""
 
@@ -138,11 +142,15 @@ class OHLCVValidator:
                 # 計算理論上應該有的 K 線數量
                 expected_bars = int((end_ts - start_ts) / timeframe_ms) + 1
                 actual_bars = len(df)
-                missing_bars = max(0, expected_bars - actual_bars)
+
+                # 按缺口逐段統計缺少的 K 線（重複時間戳不會抵銷缺口）
+                gaps = detect_time_gaps(df_sorted['timestamp'].to_numpy(), timeframe_ms)
+                missing_bars = gaps.total_missing
+                gap_count = len(gaps)
 
                 if missing_bars > 0:
                     warnings.append(
-                        f"缺少約 {missing_bars} 根 K 線 "
+                        f"缺少 {missing_bars} 根 K 線，共 {gap_count} 個缺口 "
                         f"(預期: {expected_bars}, 實際: {actual_bars})"
                     )
 
@@ -159,6 +167,7 @@ class OHLCVValidator:
                 "ok": ok,
                 "total_rows": total_rows,
                 "missing_bars": missing_bars,
+                "gap_count": gap_count,
                 "errors": errors,
                 "warnings": warnings,
                 "start_date": start_date,
@@ -4,7 +4,7 @@ Data Path Configuration for SuperDog Backtest
 管理數據存儲路徑，支援主專案與SSD分離
 """
 
-import os
+import getpass
 import platform
 from pathlib import Path
 from typing import Dict, Optional
@@ -15,7 +15,14 @@ class DataConfig:
 
     def __init__(self, ssd_name: str = "權志龍的寶藏"):
         self.ssd_name = ssd_name
-        self._base_paths = self._detect_paths()
+        self._paths: Optional[Dict[str, Path]] = None
+
+    @property
+    def _base_paths(self) -> Dict[str, Path]:
+        """路徑在第一次使用時才偵測（import 本模組不會探測磁碟或輸出訊息）"""
+        if self._paths is None:
+            self._paths = self._detect_paths()
+        return self._paths
 
     def _detect_paths(self) -> Dict[str, Path]:
         """自動偵測系統路徑"""
@@ -33,7 +40,7 @@ class DataConfig:
             else:
                 ssd_path = Path("D:/SuperDogData")  # 預設D槽
         else:  # Linux
-            ssd_path = Path(f"/media/{os.getuser()}/{self.ssd_name}/SuperDogData")
+            ssd_path = Path(f"/media/{getpass.getuser()}/{self.ssd_name}/SuperDogData")
 
         # 檢查SSD是否可用
         ssd_volume = Path(f"/Volumes/{self.ssd_name}")
@@ -144,7 +151,7 @@ class DataConfig:
             return "Unknown"
 
 
-# 全局配置實例
+# 全局配置實例（路徑在第一次使用時偵測）
 config = DataConfig()
 
 # 便捷函數
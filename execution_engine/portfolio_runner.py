@@ -5,25 +5,39 @@ Portfolio Runner v0.3
 批量回測執行器，負責執行多個回測任務並聚合結果。
 
 Features:
-- 序列執行多個回測任務
+- 序列或多進程並行執行多個回測任務
+- 成本感知排程（最長任務優先、依數據集分組）與進度/ETA 回報
+- 執行日誌（run journal），中斷後可續跑
 - 錯誤處理（單個失敗不影響其他）
 - 結果聚合和查詢
-- 支援從 YAML 載入配置
+- 支援從 YAML 載入配置（含網格 / 隨機參數搜索空間，惰性展開並去重，可分批執行）
 
 Design Reference: docs/specs/planned/v0.3_portfolio_runner_api.md
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, List, Callable, Iterable, Iterator
 from datetime import datetime
+import hashlib
+import itertools
+import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import time
+import numpy as np
 import pandas as pd
 
 # Backtest engine imports
 from backtest.engine import run_backtest, BacktestResult
 from backtest.position_sizer import AllInSizer, FixedCashSizer, PercentOfEquitySizer
-from data.storage import load_ohlcv
+from data.storage import load_ohlcv, slice_date_range, storage_format
+from data.memmap_store import MemmapOHLCV
 from strategies.registry import get_strategy
+from execution_engine.scheduler import (
+    CostModel, PortfolioProgress, schedule_configs, get_cost_model, dataset_path
+)
+from execution_engine.search_space import iter_run_dicts, count_run_dicts, dedupe_configs
+from execution_engine.run_journal import RunJournal
 
 
 @dataclass
@@ -92,6 +106,32 @@ class RunConfig:
             "strategy_params": self.strategy_params
         }
 
+    def config_hash(self, exclude: Optional[List[str]] = None) -> str:
+        """
+        配置的穩定 hash（用於去重和結果追溯）
+
+        數值統一為 float，因此 leverage=2 與 leverage=2.0 視為相同配置
+
+        Args:
+            exclude: 不參與 hash 的欄位（例如 ["symbol"] 用於跨交易對分組）
+        """
+        config_dict = self.to_dict()
+        for name in exclude or []:
+            config_dict.pop(name, None)
+        payload = json.dumps(_normalize_for_hash(config_dict), sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _normalize_for_hash(value):
+    """遞迴地把 int 轉為 float（bool 除外），使數值相同的配置 hash 一致"""
+    if isinstance(value, dict):
+        return {k: _normalize_for_hash(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_for_hash(v) for v in value]
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
 
 @dataclass
 class SingleRunResult:
@@ -134,15 +174,56 @@ class SingleRunResult:
             return f"<SingleRunResult: {self.strategy}@{self.symbol} [{self.timeframe}] ✗ {self.error}>"
 
 
+class _PortfolioIndex:
+    """
+    PortfolioResult 的查詢索引（內部類）
+
+    - 欄位 hash 索引：strategy / symbol / timeframe → run 索引陣列
+    - 列式指標表：metric → float64 陣列（按需建立並快取，失敗/缺失為 NaN）
+    - to_dataframe 結果快取
+    """
+
+    def __init__(self, runs: List[SingleRunResult]):
+        self.size = len(runs)
+        self.success = np.fromiter((run.success for run in runs), dtype=bool, count=self.size)
+        self.by_strategy = self._build_hash_index(run.strategy for run in runs)
+        self.by_symbol = self._build_hash_index(run.symbol for run in runs)
+        self.by_timeframe = self._build_hash_index(run.timeframe for run in runs)
+        self.metric_columns: Dict[str, np.ndarray] = {}
+        self.dataframes: Dict[bool, pd.DataFrame] = {}
+
+    @staticmethod
+    def _build_hash_index(keys) -> Dict[str, np.ndarray]:
+        buckets: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            buckets.setdefault(key, []).append(i)
+        return {key: np.asarray(indices, dtype=np.int64) for key, indices in buckets.items()}
+
+    def metric_column(self, runs: List[SingleRunResult], metric: str) -> np.ndarray:
+        column = self.metric_columns.get(metric)
+        if column is None:
+            column = np.full(self.size, np.nan)
+            for i in np.flatnonzero(self.success):
+                value = runs[i].get_metric(metric)
+                if value is not None:
+                    column[i] = value
+            self.metric_columns[metric] = column
+        return column
+
+
 @dataclass
 class PortfolioResult:
     """
     批量回測的聚合結果
 
     包含多個 SingleRunResult，並提供查詢、過濾、排序等功能
+
+    查詢使用延遲建立的索引（hash 索引 + 列式指標表），在大量結果上重複查詢的成本很低。
+    索引在 runs 長度改變時自動重建；若原地替換了 runs 中的元素，請調用 invalidate_index()。
     """
     runs: List[SingleRunResult]
     total_time: float = 0.0  # 總耗時（秒）
+    _index: Optional[_PortfolioIndex] = field(default=None, init=False, repr=False, compare=False)
 
     def __len__(self) -> int:
         """返回回測任務數量"""
@@ -156,23 +237,94 @@ class PortfolioResult:
         """支持迭代"""
         return iter(self.runs)
 
+    # === 索引 ===
+
+    def _get_index(self) -> _PortfolioIndex:
+        if self._index is None or self._index.size != len(self.runs):
+            self._index = _PortfolioIndex(self.runs)
+        return self._index
+
+    def invalidate_index(self) -> None:
+        """清除查詢索引（原地修改 runs 後調用）"""
+        self._index = None
+
+    def _take(self, indices: np.ndarray) -> List[SingleRunResult]:
+        return [self.runs[i] for i in indices]
+
+    def get_metric_column(self, metric: str, successful_only: bool = True) -> np.ndarray:
+        """
+        獲取某個 metric 的列式陣列（與 runs 順序一致）
+
+        Args:
+            metric: 指標名稱
+            successful_only: 只返回成功回測的值（否則返回全部，失敗為 NaN）
+
+        Returns:
+            np.ndarray (float64)，返回副本
+        """
+        index = self._get_index()
+        column = index.metric_column(self.runs, metric)
+        return column[index.success] if successful_only else column.copy()
+
     # === 查詢方法 ===
 
     def get_successful_runs(self) -> List[SingleRunResult]:
         """獲取所有成功的回測"""
-        return [run for run in self.runs if run.success]
+        return self._take(np.flatnonzero(self._get_index().success))
 
     def get_failed_runs(self) -> List[SingleRunResult]:
         """獲取所有失敗的回測"""
-        return [run for run in self.runs if not run.success]
+        return self._take(np.flatnonzero(~self._get_index().success))
 
     def get_by_strategy(self, strategy_name: str) -> List[SingleRunResult]:
         """獲取特定策略的所有回測"""
-        return [run for run in self.runs if run.strategy == strategy_name]
+        return self.get_by(strategy=strategy_name)
 
     def get_by_symbol(self, symbol: str) -> List[SingleRunResult]:
         """獲取特定交易對的所有回測"""
-        return [run for run in self.runs if run.symbol == symbol]
+        return self.get_by(symbol=symbol)
+
+    def get_by_timeframe(self, timeframe: str) -> List[SingleRunResult]:
+        """獲取特定時間週期的所有回測"""
+        return self.get_by(timeframe=timeframe)
+
+    def get_by(
+        self,
+        strategy: Optional[str] = None,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None
+    ) -> List[SingleRunResult]:
+        """
+        按 strategy / symbol / timeframe 組合查詢（使用 hash 索引，保持原始順序）
+
+        Example:
+            >>> result.get_by(strategy="simple_sma", timeframe="1h")
+        """
+        return self._take(self._select(strategy, symbol, timeframe))
+
+    def _select(
+        self,
+        strategy: Optional[str] = None,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None
+    ) -> np.ndarray:
+        index = self._get_index()
+        selected: Optional[np.ndarray] = None
+        empty = np.empty(0, dtype=np.int64)
+
+        for value, hash_index in (
+            (strategy, index.by_strategy),
+            (symbol, index.by_symbol),
+            (timeframe, index.by_timeframe),
+        ):
+            if value is None:
+                continue
+            indices = hash_index.get(value, empty)
+            selected = indices if selected is None else np.intersect1d(selected, indices, assume_unique=True)
+
+        if selected is None:
+            return np.arange(index.size)
+        return selected
 
     def filter(self, predicate: Callable[[SingleRunResult], bool]) -> List[SingleRunResult]:
         """自定義過濾"""
@@ -184,6 +336,8 @@ class PortfolioResult:
         """
         按某個 metric 排序，返回最好的 N 個
 
+        使用 argpartition 做部分選擇，只對前 N 個排序
+
         Args:
             metric: 指標名稱（例如: "total_return", "profit_factor"）
             top_n: 返回前 N 個
@@ -191,40 +345,48 @@ class PortfolioResult:
         Returns:
             排序後的列表（降序）
         """
-        successful = self.get_successful_runs()
-        if not successful:
-            return []
-
-        # 按 metric 降序排序
-        sorted_runs = sorted(
-            successful,
-            key=lambda r: r.get_metric(metric, float('-inf')),
-            reverse=True
-        )
-        return sorted_runs[:top_n]
+        return self._take(self._rank(metric, top_n, descending=True))
 
     def get_worst_by(self, metric: str, bottom_n: int = 1) -> List[SingleRunResult]:
         """按某個 metric 排序，返回最差的 N 個"""
-        successful = self.get_successful_runs()
-        if not successful:
-            return []
-
-        sorted_runs = sorted(
-            successful,
-            key=lambda r: r.get_metric(metric, float('inf')),
-            reverse=False
-        )
-        return sorted_runs[:bottom_n]
+        return self._take(self._rank(metric, bottom_n, descending=False))
+
+    def _rank(self, metric: str, n: int, descending: bool) -> np.ndarray:
+        """
+        返回排名前 n 的 run 索引（只包含成功的回測）
+
+        缺失或 NaN 的 metric 排在最後；數值相同時保持原始順序（與穩定排序一致）
+        """
+        index = self._get_index()
+        candidates = np.flatnonzero(index.success)
+        if n <= 0 or len(candidates) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # 統一為「越小越好」的 key
+        values = index.metric_column(self.runs, metric)[candidates]
+        keys = -values if descending else values.copy()
+        keys[np.isnan(keys)] = np.inf
+
+        if n < len(candidates):
+            threshold = keys[np.argpartition(keys, n - 1)[n - 1]]
+            strict = np.flatnonzero(keys < threshold)
+            ties = np.flatnonzero(keys == threshold)[:n - len(strict)]
+            chosen = np.concatenate([strict, ties])
+        else:
+            chosen = np.arange(len(candidates))
+
+        order = chosen[np.lexsort((chosen, keys[chosen]))]
+        return candidates[order]
 
     # === 統計方法 ===
 
     def count_successful(self) -> int:
         """成功的回測數量"""
-        return len(self.get_successful_runs())
+        return int(self._get_index().success.sum())
 
     def count_failed(self) -> int:
         """失敗的回測數量"""
-        return len(self.get_failed_runs())
+        return len(self.runs) - self.count_successful()
 
     def success_rate(self) -> float:
         """成功率"""
@@ -238,6 +400,8 @@ class PortfolioResult:
         """
         轉換為 DataFrame（排行表）
 
+        結果會被快取，每次調用返回副本
+
         Args:
             include_failed: 是否包含失敗的回測
 
@@ -255,6 +419,12 @@ class PortfolioResult:
                 - status: 成功/失敗
                 - error: 錯誤信息（僅失敗時）
         """
+        index = self._get_index()
+        if include_failed not in index.dataframes:
+            index.dataframes[include_failed] = self._build_dataframe(include_failed)
+        return index.dataframes[include_failed].copy()
+
+    def _build_dataframe(self, include_failed: bool) -> pd.DataFrame:
         records = []
 
         for run in self.runs:
@@ -322,38 +492,77 @@ class PortfolioResult:
 def run_portfolio(
     configs: List[RunConfig],
     verbose: bool = False,
-    fail_fast: bool = False
+    fail_fast: bool = False,
+    max_workers: int = 1,
+    cost_model: Optional[CostModel] = None,
+    progress_callback: Optional[Callable[[PortfolioProgress], None]] = None,
+    journal: Optional[RunJournal] = None
 ) -> PortfolioResult:
     """
     批量執行回測任務
 
+    任務按成本模型排程（最長任務優先、相同數據集相鄰），
+    但返回結果的順序與 configs 一致。
+
+    提供 journal 時，每完成一個回測就寫入日誌；日誌中已成功的配置會被跳過，
+    其結果從日誌重建後合併到返回值中（用於中斷後續跑）。
+
     Args:
         configs: 回測配置列表
         verbose: 是否輸出詳細日誌
         fail_fast: 遇到錯誤時是否立即停止（默認 False，繼續執行）
+        max_workers: 並行進程數（默認 1，序列執行）
+        cost_model: 成本模型（默認使用全局實例，會記錄本次執行耗時）
+        progress_callback: 每完成一個回測時調用，參數為 PortfolioProgress
+        journal: 執行日誌（可選），用於記錄結果與跳過已完成的配置
 
     Returns:
         PortfolioResult: 聚合結果
 
     Raises:
-        ValueError: 如果 configs 為空
+        ValueError: 如果 configs 為空或 max_workers < 1
     """
 
     if not configs:
         raise ValueError("configs cannot be empty")
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    cost_model = cost_model or get_cost_model()
+    slots: List[Optional[SingleRunResult]] = [None] * len(configs)
+
+    # 續跑：從日誌恢復已完成的結果
+    if journal is not None:
+        for index, config in enumerate(configs):
+            if journal.is_completed(config):
+                slots[index] = journal.restore(config)
+
+        resumed = sum(1 for run in slots if run is not None)
+        if verbose and resumed:
+            print(f"Resuming: {resumed}/{len(configs)} runs restored from {journal.path}")
+
+    pending = [index for index, run in enumerate(slots) if run is None]
+    order = [pending[i] for i in schedule_configs([configs[index] for index in pending], cost_model)]
+    progress = PortfolioProgress(
+        total=len(order),
+        estimated_costs=[cost_model.estimate_cost(configs[index]) for index in pending]
+    )
+    # progress 內部使用 pending 中的位置
+    progress_position = {index: position for position, index in enumerate(pending)}
 
-    results: List[SingleRunResult] = []
     start_time = time.time()
 
-    for i, config in enumerate(configs, 1):
-        if verbose:
-            print(f"[{i}/{len(configs)}] Running: {config.strategy} on {config.symbol} ({config.timeframe})...")
+    def handle_result(index: int, run_result: SingleRunResult) -> bool:
+        """紀錄結果，返回是否需要停止"""
+        slots[index] = run_result
+        cost_model.record(run_result)
+        progress.update(run_result, progress_position[index])
+        if journal is not None:
+            journal.record(run_result)
 
-        # 執行單次回測
-        run_result = _run_single_backtest(config, verbose=verbose)
-        results.append(run_result)
+        if progress_callback is not None:
+            progress_callback(progress)
 
-        # 失敗處理
         if not run_result.success:
             if verbose:
                 print(f"  ✗ Failed: {run_result.error}")
@@ -362,27 +571,129 @@ def run_portfolio(
                 # 立即停止
                 if verbose:
                     print(f"Stopping due to error (fail_fast=True)")
-                break
+                return True
         else:
             if verbose:
                 total_return = run_result.get_metric('total_return', 0)
-                print(f"  ✓ Success: {total_return:.2%}")
+                print(f"  ✓ Success: {total_return:.2%}  {progress.format_line()}")
+        return False
+
+    if max_workers == 1:
+        for i, index in enumerate(order, 1):
+            config = configs[index]
+            if verbose:
+                print(f"[{i}/{len(order)}] Running: {config.strategy} on {config.symbol} ({config.timeframe})...")
 
+            # 執行單次回測
+            run_result = _run_single_backtest(config, verbose=verbose)
+            if handle_result(index, run_result):
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # 按排程順序提交，最長任務最先開始
+            futures = {
+                executor.submit(_run_single_backtest, configs[index], verbose): index
+                for index in order
+            }
+
+            for future in as_completed(futures):
+                index = futures[future]
+                config = configs[index]
+                if verbose:
+                    print(f"[{progress.completed + 1}/{len(order)}] Finished: {config.strategy} on {config.symbol} ({config.timeframe})")
+
+                if handle_result(index, future.result()):
+                    for queued in futures:
+                        queued.cancel()
+                    break
+
+    results = [run for run in slots if run is not None]
     total_time = time.time() - start_time
 
     if verbose:
         print(f"\nCompleted {len(results)} runs in {total_time:.2f}s")
         print(f"  Successful: {sum(1 for r in results if r.success)}")
         print(f"  Failed: {sum(1 for r in results if not r.success)}")
+        slowest = progress.slowest_runs(3)
+        if slowest:
+            print(f"  Slowest: " + ", ".join(
+                f"{r.strategy}@{r.symbol} [{r.timeframe}] {r.execution_time:.2f}s" for r in slowest
+            ))
 
     return PortfolioResult(runs=results, total_time=total_time)
 
 
-def _run_single_backtest(config: RunConfig, verbose: bool = False) -> SingleRunResult:
+def run_portfolio_batches(
+    configs: Iterable[RunConfig],
+    batch_size: int = 1000,
+    verbose: bool = False,
+    fail_fast: bool = False,
+    **kwargs: Any
+) -> PortfolioResult:
+    """
+    分批執行批量回測（用於大型搜索空間）
+
+    每次只從 configs 取出 batch_size 個 RunConfig 交給 run_portfolio，
+    配合 iter_configs_from_yaml 時不會一次性建立整個搜索空間的配置。
+    成本排程只在同一批次內進行（最長任務優先），批次之間按輸入順序執行；
+    執行日誌 / 成本模型等參數原樣傳給每一批次，因此續跑同樣適用。
+
+    Args:
+        configs: RunConfig 可迭代對象（可以是生成器）
+        batch_size: 每批次的配置數量（默認 1000）
+        verbose: 是否輸出詳細日誌
+        fail_fast: 遇到錯誤時是否立即停止（不再執行後續批次）
+        **kwargs: 其他傳給 run_portfolio 的參數（max_workers, cost_model, journal 等）
+
+    Returns:
+        PortfolioResult: 所有批次的聚合結果
+
+    Raises:
+        ValueError: 如果 configs 為空或 batch_size < 1
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    iterator = iter(configs)
+    runs: List[SingleRunResult] = []
+    total_time = 0.0
+    batch_number = 0
+
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        batch_number += 1
+        if verbose:
+            print(f"Batch {batch_number}: {len(batch)} runs ({len(runs)} finished so far)")
+
+        result = run_portfolio(batch, verbose=verbose, fail_fast=fail_fast, **kwargs)
+        runs.extend(result.runs)
+        total_time += result.total_time
+
+        if fail_fast and result.count_failed() > 0:
+            break
+
+    if batch_number == 0:
+        raise ValueError("configs cannot be empty")
+
+    return PortfolioResult(runs=runs, total_time=total_time)
+
+
+def _run_single_backtest(
+    config: RunConfig,
+    verbose: bool = False,
+    data_fraction: float = 1.0
+) -> SingleRunResult:
     """
     執行單次回測（內部函數）
 
     捕獲所有異常，確保不會中斷批量執行
+
+    Args:
+        config: 回測配置
+        verbose: 是否輸出詳細日誌
+        data_fraction: 只使用日期過濾後數據的前 N% （用於逐步淘汰搜索的低成本評估）
     """
     start_time = time.time()
 
@@ -394,18 +705,23 @@ def _run_single_backtest(config: RunConfig, verbose: bool = False) -> SingleRunR
             raise ValueError(f"Strategy not found: {config.strategy}") from e
 
         # Step 2: 加載數據
-        data_file = f"data/raw/{config.symbol}_{config.timeframe}.csv"
+        data_file = dataset_path(config)
         try:
-            data = load_ohlcv(data_file)
+            data = _load_dataset(data_file)
         except FileNotFoundError:
             raise FileNotFoundError(f"Data file not found: {data_file}")
         except Exception as e:
             raise ValueError(f"Failed to load data: {e}") from e
 
-        # Step 3: 過濾時間範圍
-        if config.start or config.end:
+        # Step 3: 過濾時間範圍（searchsorted 切片，記憶體映射數據集為零拷貝）
+        if isinstance(data, MemmapOHLCV):
+            data = data.slice(config.start or None, config.end or None).to_frame()
+        elif config.start or config.end:
             data = _filter_date_range(data, config.start, config.end)
 
+        if data_fraction < 1.0:
+            data = data.iloc[:max(int(len(data) * data_fraction), 1)]
+
         if len(data) == 0:
             raise ValueError("No data after date filtering")
 
@@ -421,7 +737,8 @@ def _run_single_backtest(config: RunConfig, verbose: bool = False) -> SingleRunR
             position_sizer=position_sizer,
             stop_loss_pct=config.stop_loss_pct,
             take_profit_pct=config.take_profit_pct,
-            leverage=config.leverage
+            leverage=config.leverage,
+            strategy_params=config.strategy_params or None
         )
 
         execution_time = time.time() - start_time
@@ -458,17 +775,38 @@ def _run_single_backtest(config: RunConfig, verbose: bool = False) -> SingleRunR
         )
 
 
+# 最近使用的數據集快取（每個進程各自一份，配合排程的數據集分組使用）
+_DATASET_CACHE_SIZE = 4
+_dataset_cache: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+
+
+def _load_dataset(data_file: str):
+    """
+    載入數據集，重複使用最近載入過的 DataFrame（調用方不得修改返回值）
+
+    記憶體映射數據集（.mmap）只開啟映射並返回 MemmapOHLCV，由調用方切片
+    """
+    if data_file in _dataset_cache:
+        _dataset_cache.move_to_end(data_file)
+        return _dataset_cache[data_file]
+
+    if storage_format(data_file) == "mmap":
+        data = MemmapOHLCV.open(data_file)
+    else:
+        data = load_ohlcv(data_file)
+    _dataset_cache[data_file] = data
+    if len(_dataset_cache) > _DATASET_CACHE_SIZE:
+        _dataset_cache.popitem(last=False)
+    return data
+
+
 def _filter_date_range(
     data: pd.DataFrame,
     start: Optional[str],
     end: Optional[str]
 ) -> pd.DataFrame:
-    """過濾日期範圍"""
-    if start:
-        data = data[data.index >= pd.Timestamp(start)]
-    if end:
-        data = data[data.index <= pd.Timestamp(end)]
-    return data
+    """過濾日期範圍（兩端包含）"""
+    return slice_date_range(data, start or None, end or None)
 
 
 def _build_position_sizer(config: RunConfig):
@@ -496,20 +834,60 @@ def _build_position_sizer(config: RunConfig):
 
 # === YAML 配置支援（可選功能） ===
 
-def load_configs_from_yaml(yaml_path: str) -> List[RunConfig]:
+def iter_configs_from_yaml(yaml_path: str, dedupe: bool = True) -> Iterator[RunConfig]:
     """
-    從 YAML 文件加載配置
+    從 YAML 文件惰性產生配置
+
+    支援顯式的 `runs` 列表以及 `search` 搜索空間（見 execution_engine/search_space.py），
+    搜索空間逐點展開，不會一次性建立所有 RunConfig。
+
+    Args:
+        yaml_path: YAML 文件路徑
+        dedupe: 是否去除重複配置（默認 True）
+
+    Yields:
+        RunConfig
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 配置格式錯誤
+    """
+    data = _read_yaml(yaml_path)
+
+    def build() -> Iterator[RunConfig]:
+        for source, run_dict in iter_run_dicts(data):
+            try:
+                yield RunConfig(**run_dict)
+            except Exception as e:
+                raise ValueError(f"Invalid config at {source}: {e}") from e
+
+    configs = build()
+    if dedupe:
+        configs = dedupe_configs(configs)
+    yield from configs
+
+
+def count_configs_from_yaml(yaml_path: str) -> int:
+    """
+    計算 YAML 文件中的配置數量（去重前），不展開搜索空間
+
+    只解析 runs 列表與 search 規格，可在執行前快速檢查 YAML 格式。
 
     Args:
         yaml_path: YAML 文件路徑
 
     Returns:
-        List[RunConfig]
+        配置數量上限（重複配置在執行時才去除）
 
     Raises:
         FileNotFoundError: 文件不存在
         ValueError: 配置格式錯誤
     """
+    return count_run_dicts(_read_yaml(yaml_path))
+
+
+def _read_yaml(yaml_path: str) -> Dict[str, Any]:
+    """讀取 YAML 配置文件並檢查根節點"""
     import yaml
 
     with open(yaml_path, 'r') as f:
@@ -517,17 +895,24 @@ def load_configs_from_yaml(yaml_path: str) -> List[RunConfig]:
 
     if not isinstance(data, dict):
         raise ValueError("YAML root must be a dict")
+    return data
 
-    runs = data.get("runs", [])
-    if not isinstance(runs, list):
-        raise ValueError("'runs' must be a list")
 
-    configs = []
-    for i, run_dict in enumerate(runs):
-        try:
-            config = RunConfig(**run_dict)
-            configs.append(config)
-        except Exception as e:
-            raise ValueError(f"Invalid config at index {i}: {e}") from e
+def load_configs_from_yaml(yaml_path: str) -> List[RunConfig]:
+    """
+    從 YAML 文件加載配置
+
+    注意：返回列表，會一次性建立搜索空間中所有的 RunConfig。
+    大型參數搜索請改用 iter_configs_from_yaml 搭配 run_portfolio_batches 分批執行。
 
-    return configs
+    Args:
+        yaml_path: YAML 文件路徑
+
+    Returns:
+        List[RunConfig]（已去重）
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 配置格式錯誤
+    """
+    return list(iter_configs_from_yaml(yaml_path))
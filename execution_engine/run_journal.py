@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Run Journal v0.5
+
+批量回測的 append-only 執行日誌，用於中斷後續跑（resume）。
+
+每完成一個回測就追加一行 JSON（JSON Lines），以 RunConfig.config_hash() 為鍵，
+記錄精簡結果（metrics、狀態、錯誤、耗時），不保存權益曲線與交易明細。
+進程被中斷時最多損失正在寫入的最後一行，載入時會略過並截去不完整的行，
+之後追加的紀錄從新的一行開始。
+
+Features:
+- 追加寫入 + flush/fsync，適合可搶佔（preemptible）機器上的長時間批量回測
+- 續跑時跳過已成功的配置，並把日誌中的結果合併回 PortfolioResult
+- 失敗的配置默認會重新執行（可能是暫時性錯誤）
+
+Example:
+    >>> journal = RunJournal("results/sweep.journal.jsonl")
+    >>> result = run_portfolio(configs, journal=journal)
+    >>> # 中斷後再次執行，只會跑尚未完成的配置
+    >>> result = run_portfolio(configs, journal=RunJournal("results/sweep.journal.jsonl"))
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from execution_engine.portfolio_runner import RunConfig, SingleRunResult
+
+
+# 日誌格式版本（寫入每一行，便於日後升級格式）
+JOURNAL_VERSION = 1
+
+
+def _json_default(value: Any) -> Any:
+    """序列化 numpy 標量等非原生類型"""
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class RunJournal:
+    """
+    append-only 回測執行日誌
+
+    Args:
+        path: 日誌文件路徑（JSON Lines）
+        reset: 是否清空已有日誌（重新開始而不是續跑）
+        sync: 每次寫入後是否 fsync（默認 True，確保進程被殺時資料已落盤）
+    """
+
+    def __init__(self, path: str, reset: bool = False, sync: bool = True):
+        self.path = Path(path)
+        self.sync = sync
+        # config_hash -> 最新的紀錄
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self.skipped_lines = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if reset and self.path.exists():
+            self.path.unlink()
+        elif self.path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, config: "RunConfig") -> bool:
+        return config.config_hash() in self._records
+
+    # === 讀取 ===
+
+    def _load(self) -> None:
+        """載入日誌；同一配置出現多次時以最後一次為準"""
+        self._truncate_partial_line()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 中斷時寫了一半的行
+                    self.skipped_lines += 1
+                    continue
+                if isinstance(record, dict) and "hash" in record:
+                    self._records[record["hash"]] = record
+
+    def _truncate_partial_line(self) -> None:
+        """截去中斷時寫了一半的最後一行，避免下一筆紀錄被接在同一行而一併遺失"""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            # 不完整的行計入 skipped_lines
+            self.skipped_lines += 1
+            f.truncate(data.rfind(b"\n") + 1)
+
+    def get(self, config: "RunConfig") -> Optional[Dict[str, Any]]:
+        """獲取配置對應的紀錄（沒有則返回 None）"""
+        return self._records.get(config.config_hash())
+
+    def is_completed(self, config: "RunConfig", retry_failed: bool = True) -> bool:
+        """
+        配置是否已完成（續跑時可跳過）
+
+        Args:
+            config: 回測配置
+            retry_failed: 失敗的紀錄是否視為未完成（默認 True）
+        """
+        record = self.get(config)
+        if record is None:
+            return False
+        return record["success"] or not retry_failed
+
+    def restore(self, config: "RunConfig") -> Optional["SingleRunResult"]:
+        """
+        從日誌重建 SingleRunResult
+
+        重建的結果只有 metrics（equity_curve 為空、trades 為空列表），
+        足夠用於排行、報表和 PortfolioResult 查詢。
+        """
+        from backtest.engine import BacktestResult
+        from execution_engine.portfolio_runner import SingleRunResult
+
+        record = self.get(config)
+        if record is None:
+            return None
+
+        backtest_result = None
+        if record["success"]:
+            backtest_result = BacktestResult(
+                equity_curve=pd.Series(dtype=float),
+                trades=[],
+                metrics=dict(record.get("metrics") or {})
+            )
+
+        timestamp = record.get("timestamp")
+        return SingleRunResult(
+            strategy=config.strategy,
+            symbol=config.symbol,
+            timeframe=config.timeframe,
+            config=config,
+            success=record["success"],
+            backtest_result=backtest_result,
+            error=record.get("error"),
+            execution_time=float(record.get("execution_time", 0.0)),
+            timestamp=datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+        )
+
+    # === 寫入 ===
+
+    def record(self, run_result: "SingleRunResult") -> None:
+        """追加一個已完成的回測結果"""
+        record = {
+            "version": JOURNAL_VERSION,
+            "hash": run_result.config.config_hash(),
+            "config": run_result.config.to_dict(),
+            "success": run_result.success,
+            "error": run_result.error,
+            "execution_time": run_result.execution_time,
+            "timestamp": run_result.timestamp.isoformat(),
+            "metrics": run_result.get_metrics() if run_result.success else None,
+        }
+        line = json.dumps(record, default=_json_default, ensure_ascii=False)
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+
+        self._records[record["hash"]] = record
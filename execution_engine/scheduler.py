@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+Portfolio Scheduler v0.5
+
+批量回測排程器，負責估算任務成本、決定執行順序並追蹤進度。
+
+Features:
+- 成本模型：K 線數量 × 策略歷史單位成本（來自過往 execution_time）
+- 最長任務優先（LPT）排程，降低並行執行的尾端延遲
+- 依數據集分組，提升數據快取命中率
+- 進度 API（完成數、吞吐量、ETA、最慢任務）
+
+Design Reference: docs/specs/planned/v0.3_portfolio_runner_api.md
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import pandas as pd
+
+from data.storage import find_data_file, storage_format
+from data.timeframe_manager import TimeframeManager
+
+if TYPE_CHECKING:
+    from execution_engine.portfolio_runner import RunConfig, SingleRunResult
+
+
+# CSV 每行平均字節數（timestamp + OHLCV，約 60 bytes）
+_BYTES_PER_ROW = 60
+
+# 沒有任何數據可供估算時的默認 K 線數量
+_DEFAULT_BARS = 10000
+
+# 沒有歷史紀錄時的默認單位成本（秒 / K 線）
+_DEFAULT_SECONDS_PER_BAR = 5e-5
+
+
+def dataset_key(config: "RunConfig") -> Tuple[str, str]:
+    """返回配置對應的數據集鍵 (symbol, timeframe)"""
+    return config.symbol, config.timeframe
+
+
+def dataset_path(config: "RunConfig") -> str:
+    """返回配置對應的數據文件路徑（二進位格式優先，默認為 CSV 路徑）"""
+    file_path = find_data_file(["data/raw"], config.symbol, config.timeframe)
+    if file_path is not None:
+        return str(file_path)
+    return f"data/raw/{config.symbol}_{config.timeframe}.csv"
+
+
+def _count_rows(path: str) -> int:
+    """估算數據文件的行數（二進位格式讀取元數據，CSV 按文件大小估算）"""
+    file_format = storage_format(path)
+    if file_format == "mmap":
+        from data.memmap_store import MemmapOHLCV
+        return len(MemmapOHLCV.open(path))
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_metadata(path).num_rows
+    if file_format == "feather":
+        import pyarrow.feather as feather
+        return feather.read_table(path, columns=["timestamp"], memory_map=True).num_rows
+    return os.path.getsize(path) // _BYTES_PER_ROW
+
+
+class CostModel:
+    """
+    回測成本模型
+
+    成本 = 估算 K 線數量 × 策略單位成本（秒 / K 線）。
+    單位成本由已完成回測的 execution_time 累積而來，可選擇保存到 JSON 文件，
+    供之後的批量回測沿用。
+
+    Example:
+        >>> model = CostModel(history_path="cost_history.json")
+        >>> cost = model.estimate_cost(config)
+        >>> model.record(run_result)
+        >>> model.save()
+    """
+
+    def __init__(self, history_path: Optional[str] = None):
+        """
+        Args:
+            history_path: 成本歷史 JSON 文件路徑（None 表示只保存在記憶體）
+        """
+        self.history_path = history_path
+        # strategy -> {"seconds": 累計秒數, "bars": 累計 K 線數}
+        self._history: Dict[str, Dict[str, float]] = {}
+        self._bar_cache: Dict[Tuple[str, str], int] = {}
+
+        if history_path and os.path.exists(history_path):
+            self.load(history_path)
+
+    # === 估算 ===
+
+    def estimate_bars(self, config: "RunConfig") -> int:
+        """
+        估算回測的 K 線數量
+
+        優先使用 start/end 日期範圍，否則根據數據文件大小估算
+        """
+        minutes = self._timeframe_minutes(config.timeframe)
+
+        if config.start and config.end and minutes:
+            span = pd.Timestamp(config.end) - pd.Timestamp(config.start)
+            return max(int(span.total_seconds() / 60 / minutes), 1)
+
+        key = dataset_key(config)
+        if key not in self._bar_cache:
+            path = dataset_path(config)
+            if os.path.exists(path):
+                self._bar_cache[key] = max(_count_rows(path), 1)
+            else:
+                self._bar_cache[key] = _DEFAULT_BARS
+        return self._bar_cache[key]
+
+    def seconds_per_bar(self, strategy: str) -> float:
+        """返回策略的單位成本（沒有歷史時使用全體平均或默認值）"""
+        entry = self._history.get(strategy)
+        if entry and entry["bars"] > 0:
+            return entry["seconds"] / entry["bars"]
+
+        total_seconds = sum(e["seconds"] for e in self._history.values())
+        total_bars = sum(e["bars"] for e in self._history.values())
+        if total_bars > 0:
+            return total_seconds / total_bars
+        return _DEFAULT_SECONDS_PER_BAR
+
+    def estimate_cost(self, config: "RunConfig") -> float:
+        """估算單次回測耗時（秒）"""
+        return self.estimate_bars(config) * self.seconds_per_bar(config.strategy)
+
+    # === 紀錄 ===
+
+    def record(self, run_result: "SingleRunResult") -> None:
+        """根據已完成的回測更新策略單位成本（只紀錄成功的回測）"""
+        if not run_result.success or run_result.backtest_result is None:
+            return
+
+        bars = len(run_result.backtest_result.equity_curve)
+        if bars <= 0:
+            return
+
+        entry = self._history.setdefault(run_result.strategy, {"seconds": 0.0, "bars": 0})
+        entry["seconds"] += run_result.execution_time
+        entry["bars"] += bars
+
+    def save(self, path: Optional[str] = None) -> None:
+        """保存成本歷史到 JSON 文件"""
+        path = path or self.history_path
+        if not path:
+            raise ValueError("history_path is required to save cost history")
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self._history, f, indent=2)
+
+    def load(self, path: str) -> None:
+        """從 JSON 文件載入成本歷史"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if not isinstance(data, dict):
+            raise ValueError("Cost history must be a dict")
+
+        self._history = {
+            name: {"seconds": float(entry["seconds"]), "bars": int(entry["bars"])}
+            for name, entry in data.items()
+        }
+
+    def _timeframe_minutes(self, timeframe: str) -> Optional[int]:
+        # 兼容測試用的 "1h_test" 之類的命名
+        base = timeframe.split("_")[0]
+        return TimeframeManager.TIMEFRAME_MINUTES.get(base)
+
+
+def schedule_configs(
+    configs: List["RunConfig"],
+    cost_model: Optional[CostModel] = None
+) -> List[int]:
+    """
+    決定回測任務的執行順序
+
+    規則：
+    1. 相同數據集 (symbol, timeframe) 的任務排在一起，提升快取命中率
+    2. 數據集分組按組內最長任務的估算成本降序排列（LPT）
+    3. 組內任務按估算成本降序排列
+
+    Args:
+        configs: 回測配置列表
+        cost_model: 成本模型（默認使用全局實例）
+
+    Returns:
+        configs 的索引列表（執行順序）
+    """
+    cost_model = cost_model or get_cost_model()
+    costs = [cost_model.estimate_cost(config) for config in configs]
+
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, config in enumerate(configs):
+        groups.setdefault(dataset_key(config), []).append(i)
+
+    ordered_groups = sorted(
+        groups.values(),
+        key=lambda indices: max(costs[i] for i in indices),
+        reverse=True
+    )
+
+    order: List[int] = []
+    for indices in ordered_groups:
+        order.extend(sorted(indices, key=lambda i: costs[i], reverse=True))
+    return order
+
+
+class PortfolioProgress:
+    """
+    批量回測進度追蹤
+
+    run_portfolio 每完成一個回測就會調用 update()，並把本對象傳給 progress_callback。
+
+    Example:
+        >>> def on_progress(progress):
+        ...     print(progress.format_line())
+        >>> run_portfolio(configs, progress_callback=on_progress)
+    """
+
+    def __init__(self, total: int, estimated_costs: Optional[List[float]] = None):
+        """
+        Args:
+            total: 任務總數
+            estimated_costs: 每個任務的估算成本（秒），用於 ETA 計算
+        """
+        self.total = total
+        self.estimated_costs = estimated_costs
+        self.completed = 0
+        self.failed = 0
+        self.start_time = time.time()
+        self._remaining_cost = sum(estimated_costs) if estimated_costs else 0.0
+        self._completed_cost = 0.0
+        self._durations: List[Tuple[float, "SingleRunResult"]] = []
+
+    def update(self, run_result: "SingleRunResult", index: Optional[int] = None) -> None:
+        """紀錄一個已完成的回測"""
+        self.completed += 1
+        if not run_result.success:
+            self.failed += 1
+
+        if self.estimated_costs is not None and index is not None:
+            cost = self.estimated_costs[index]
+            self._remaining_cost -= cost
+            self._completed_cost += cost
+
+        self._durations.append((run_result.execution_time, run_result))
+
+    @property
+    def remaining(self) -> int:
+        """尚未完成的任務數"""
+        return self.total - self.completed
+
+    @property
+    def elapsed(self) -> float:
+        """已耗時（秒）"""
+        return time.time() - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        """吞吐量（回測數 / 秒）"""
+        elapsed = self.elapsed
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """
+        預估剩餘時間（秒）
+
+        有成本估算時按「已完成估算成本 / 實際耗時」比例推算，否則按吞吐量推算
+        """
+        if self.completed == 0:
+            return None
+        if self.remaining == 0:
+            return 0.0
+
+        if self.estimated_costs is not None and self._completed_cost > 0:
+            rate = self._completed_cost / self.elapsed
+            return max(self._remaining_cost, 0.0) / rate if rate > 0 else None
+
+        throughput = self.throughput
+        return self.remaining / throughput if throughput > 0 else None
+
+    def slowest_runs(self, n: int = 5) -> List["SingleRunResult"]:
+        """返回耗時最長的 N 個回測"""
+        ranked = sorted(self._durations, key=lambda item: item[0], reverse=True)
+        return [run for _, run in ranked[:n]]
+
+    def snapshot(self) -> Dict[str, float]:
+        """返回當前進度的字典快照"""
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "remaining": self.remaining,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "eta": self.eta,
+        }
+
+    def format_line(self) -> str:
+        """格式化為單行進度文字"""
+        eta = self.eta
+        eta_str = f"{eta:.1f}s" if eta is not None else "N/A"
+        return (
+            f"[{self.completed}/{self.total}] "
+            f"{self.throughput:.2f} runs/s, ETA {eta_str}"
+        )
+
+    def __repr__(self) -> str:
+        return f"<PortfolioProgress: {self.completed}/{self.total} completed, {self.failed} failed>"
+
+
+# 全局成本模型實例（在同一進程內的多次 run_portfolio 之間累積歷史）
+_global_cost_model = CostModel()
+
+
+def get_cost_model() -> CostModel:
+    """獲取全局成本模型實例"""
+    return _global_cost_model
+
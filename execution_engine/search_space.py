@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Search Space v0.5
+
+聲明式參數搜索空間，在 YAML 中描述網格 / 隨機採樣，並以生成器惰性展開為 RunConfig。
+
+Features:
+- 網格搜索（grid）：所有維度的笛卡爾積
+- 隨機採樣（random）：每個維度獨立採樣 N 次（可指定 seed）
+- 維度類型：固定值、列表、range、uniform、randint、choice
+- 支援 strategy_params、symbol、timeframe、SL/TP、leverage 等所有 RunConfig 欄位
+- 惰性展開 + 自動去重（相同配置只產生一次）
+
+YAML 範例:
+    runs:
+      - strategy: simple_sma
+        symbol: BTCUSDT
+        timeframe: 1h
+
+    search:
+      - strategy: kawamoku_demo
+        mode: grid
+        symbol: [BTCUSDT, ETHUSDT]
+        timeframe: [1h, 4h]
+        stop_loss_pct: {range: [0.01, 0.03, 0.01]}
+        strategy_params:
+          ma_short: {range: [5, 20, 5]}
+          ma_long: [50, 100]
+
+      - strategy: kawamoku_demo
+        mode: random
+        samples: 200
+        seed: 42
+        symbol: BTCUSDT
+        timeframe: 1h
+        leverage: {randint: [1, 5]}
+        take_profit_pct: {uniform: [0.02, 0.10]}
+
+Design Reference: docs/specs/planned/v0.3_portfolio_runner_api.md §7
+"""
+
+import itertools
+import random
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# range 展開時的小數位數（避免 0.1 + 0.2 之類的浮點誤差造成重複配置）
+_RANGE_PRECISION = 10
+
+# 維度規格的關鍵字
+_DIMENSION_KEYS = {"values", "range", "choice", "uniform", "randint"}
+
+
+class Dimension:
+    """
+    搜索空間的單一維度
+
+    Args:
+        name: 欄位路徑（例如 "symbol" 或 "strategy_params.ma_short"）
+        spec: YAML 中的維度規格
+    """
+
+    def __init__(self, name: str, spec: Any):
+        self.name = name
+        self.kind, self.values, self.bounds = self._parse(spec)
+
+    @property
+    def is_discrete(self) -> bool:
+        """是否為離散維度（可用於網格搜索）"""
+        return self.values is not None
+
+    def __len__(self) -> int:
+        if not self.is_discrete:
+            raise ValueError(f"Dimension '{self.name}' is continuous and has no size")
+        return len(self.values)
+
+    def sample(self, rng: random.Random) -> Any:
+        """隨機採樣一個值"""
+        if self.kind == "uniform":
+            low, high = self.bounds
+            return rng.uniform(low, high)
+        if self.kind == "randint":
+            low, high = self.bounds
+            return rng.randint(low, high)
+        return rng.choice(self.values)
+
+    def _parse(self, spec: Any) -> Tuple[str, Optional[List[Any]], Optional[Tuple[float, float]]]:
+        if isinstance(spec, list):
+            if not spec:
+                raise ValueError(f"Dimension '{self.name}' cannot be an empty list")
+            return "values", list(spec), None
+
+        if not isinstance(spec, dict):
+            return "fixed", [spec], None
+
+        keys = set(spec.keys()) & _DIMENSION_KEYS
+        if len(keys) != 1 or len(spec) != 1:
+            raise ValueError(
+                f"Dimension '{self.name}' must have exactly one of: {', '.join(sorted(_DIMENSION_KEYS))}"
+            )
+        kind = keys.pop()
+        arg = spec[kind]
+
+        if kind in ("values", "choice"):
+            if not isinstance(arg, list) or not arg:
+                raise ValueError(f"Dimension '{self.name}': '{kind}' must be a non-empty list")
+            return kind, list(arg), None
+
+        if kind == "range":
+            return kind, _expand_range(self.name, arg), None
+
+        # uniform / randint
+        if not isinstance(arg, list) or len(arg) != 2:
+            raise ValueError(f"Dimension '{self.name}': '{kind}' must be [low, high]")
+        low, high = arg
+        if low > high:
+            raise ValueError(f"Dimension '{self.name}': low must be <= high")
+        if kind == "randint":
+            # randint 是離散的，網格模式下展開為所有整數
+            return kind, list(range(int(low), int(high) + 1)), (int(low), int(high))
+        return kind, None, (float(low), float(high))
+
+
+def _expand_range(name: str, arg: Any) -> List[Any]:
+    """展開 range: [start, stop, step]（包含 stop）"""
+    if not isinstance(arg, list) or len(arg) not in (2, 3):
+        raise ValueError(f"Dimension '{name}': 'range' must be [start, stop] or [start, stop, step]")
+
+    start, stop = arg[0], arg[1]
+    step = arg[2] if len(arg) == 3 else 1
+    if step <= 0:
+        raise ValueError(f"Dimension '{name}': range step must be positive")
+    if start > stop:
+        raise ValueError(f"Dimension '{name}': range start must be <= stop")
+
+    is_int = all(isinstance(v, int) and not isinstance(v, bool) for v in (start, stop, step))
+    count = int((stop - start) / step + 1e-9) + 1
+
+    if is_int:
+        return [start + i * step for i in range(count)]
+    return [round(start + i * step, _RANGE_PRECISION) for i in range(count)]
+
+
+class SearchSpace:
+    """
+    參數搜索空間
+
+    從 YAML 的單個 search 項目構建，迭代時惰性產生 RunConfig 的參數字典。
+
+    Example:
+        >>> space = SearchSpace({"strategy": "simple_sma", "symbol": ["BTCUSDT", "ETHUSDT"],
+        ...                      "timeframe": "1h"})
+        >>> len(space)
+        2
+        >>> for run_dict in space:
+        ...     config = RunConfig(**run_dict)
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        if not isinstance(spec, dict):
+            raise ValueError("Search space must be a dict")
+
+        spec = dict(spec)
+        self.mode = spec.pop("mode", "grid")
+        self.samples = spec.pop("samples", None)
+        self.seed = spec.pop("seed", None)
+
+        if self.mode not in ("grid", "random"):
+            raise ValueError(f"Unknown search mode: {self.mode}")
+        if self.mode == "random" and (not isinstance(self.samples, int) or self.samples <= 0):
+            raise ValueError("Random search requires a positive integer 'samples'")
+
+        strategy_params = spec.pop("strategy_params", {}) or {}
+        if not isinstance(strategy_params, dict):
+            raise ValueError("'strategy_params' must be a dict")
+
+        self.dimensions: List[Dimension] = [Dimension(name, value) for name, value in spec.items()]
+        self.dimensions += [
+            Dimension(f"strategy_params.{name}", value) for name, value in strategy_params.items()
+        ]
+
+        if self.mode == "grid":
+            continuous = [d.name for d in self.dimensions if not d.is_discrete]
+            if continuous:
+                raise ValueError(
+                    f"Grid search cannot expand continuous dimensions: {continuous}"
+                )
+
+    def __len__(self) -> int:
+        """展開後的點數（去重前）"""
+        if self.mode == "random":
+            return self.samples
+
+        size = 1
+        for dimension in self.dimensions:
+            size *= len(dimension)
+        return size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self.mode == "grid":
+            axes = [dimension.values for dimension in self.dimensions]
+            for point in itertools.product(*axes):
+                yield self._build(point)
+        else:
+            rng = random.Random(self.seed)
+            for _ in range(self.samples):
+                yield self._build([dimension.sample(rng) for dimension in self.dimensions])
+
+    def _build(self, point) -> Dict[str, Any]:
+        run_dict: Dict[str, Any] = {}
+        strategy_params: Dict[str, Any] = {}
+
+        for dimension, value in zip(self.dimensions, point):
+            if dimension.name.startswith("strategy_params."):
+                strategy_params[dimension.name.split(".", 1)[1]] = value
+            else:
+                run_dict[dimension.name] = value
+
+        if strategy_params:
+            run_dict["strategy_params"] = strategy_params
+        return run_dict
+
+
+def _parse_yaml_data(data: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[SearchSpace]]:
+    """解析 YAML 內容中的 runs 列表與 search 項目（只解析規格，不展開）"""
+    runs = data.get("runs", [])
+    if not isinstance(runs, list):
+        raise ValueError("'runs' must be a list")
+
+    searches = data.get("search", [])
+    if not isinstance(searches, list):
+        raise ValueError("'search' must be a list")
+
+    spaces = []
+    for i, spec in enumerate(searches):
+        try:
+            spaces.append(SearchSpace(spec))
+        except Exception as e:
+            raise ValueError(f"Invalid search space at search[{i}]: {e}") from e
+    return runs, spaces
+
+
+def iter_run_dicts(data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    惰性迭代 YAML 內容中的所有回測配置字典
+
+    Yields:
+        (來源描述, 配置字典)，來源描述用於錯誤訊息（例如 "runs[3]"、"search[0]"）
+    """
+    runs, spaces = _parse_yaml_data(data)
+
+    for i, run_dict in enumerate(runs):
+        yield f"index {i}", run_dict
+
+    for i, space in enumerate(spaces):
+        for run_dict in space:
+            yield f"search[{i}]", run_dict
+
+
+def count_run_dicts(data: Dict[str, Any]) -> int:
+    """
+    不展開搜索空間，計算 YAML 內容中的配置數量（去重前）
+
+    會解析所有 search 項目，規格錯誤在執行任何回測前就會拋出 ValueError。
+    """
+    runs, spaces = _parse_yaml_data(data)
+    return len(runs) + sum(len(space) for space in spaces)
+
+
+def dedupe_configs(configs, seen: Optional[Set[str]] = None):
+    """
+    惰性去重，相同 config_hash() 的配置只保留第一個
+
+    Args:
+        configs: RunConfig 可迭代對象
+        seen: 已見過的 hash 集合（可選，用於跨多次調用去重）
+    """
+    seen = set() if seen is None else seen
+    for config in configs:
+        key = config.config_hash()
+        if key in seen:
+            continue
+        seen.add(key)
+        yield config
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Successive Halving Search v0.5
+
+逐步淘汰（successive halving）參數搜索，用於大型參數空間的回測。
+
+流程：
+1. 所有候選先用低成本評估（數據前段 / 部分交易對）
+2. 按指標排序，只保留前 1/eta
+3. 倖存者晉級到更長的數據 / 更多交易對，重複直到完整評估
+
+候選定義：除 symbol 以外完全相同的 RunConfig 視為同一候選，
+候選分數為其所有已評估交易對的指標平均值（失敗視為最差）。
+
+Features:
+- 兩種預算維度：數據前段比例（prefix）或交易對子集（symbols，按 seed 隨機排列交易對，避免 YAML 順序偏差）
+- 支援多進程並行；同一個進程池貫穿所有輪次，worker 內的數據集快取可重複使用
+- 返回每一輪的分數與倖存者，以及最終完整評估的 PortfolioResult
+
+Example:
+    >>> configs = load_configs_from_yaml("configs/kawamoku_sweep.yml")
+    >>> result = successive_halving_search(configs, metric="total_return", eta=3, max_workers=8)
+    >>> for configs, score in result.best(5):
+    ...     print(configs[0].strategy_params, score)
+"""
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from execution_engine.portfolio_runner import (
+    RunConfig, SingleRunResult, PortfolioResult, _run_single_backtest
+)
+from execution_engine.scheduler import schedule_configs
+
+
+@dataclass
+class RungResult:
+    """
+    單輪評估結果
+
+    Attributes:
+        index: 輪次（從 0 開始）
+        fraction: 本輪預算比例（數據比例或交易對比例）
+        scores: 候選索引 -> 分數
+        survivors: 晉級到下一輪的候選索引（按分數排序）
+        runs: 本輪所有回測結果
+        elapsed: 本輪耗時（秒）
+    """
+    index: int
+    fraction: float
+    scores: Dict[int, float]
+    survivors: List[int]
+    runs: List[SingleRunResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+@dataclass
+class SearchResult:
+    """
+    逐步淘汰搜索的結果
+
+    Attributes:
+        candidates: 候選列表（每個候選是一組只有 symbol 不同的 RunConfig）
+        rungs: 每一輪的結果
+        metric: 排序指標
+        maximize: 是否越大越好
+        total_time: 總耗時（秒）
+    """
+    candidates: List[List[RunConfig]]
+    rungs: List[RungResult]
+    metric: str
+    maximize: bool = True
+    total_time: float = 0.0
+
+    def best(self, top_n: int = 1) -> List[Tuple[List[RunConfig], float]]:
+        """返回最後一輪分數最好的 N 個候選 [(configs, score), ...]"""
+        if not self.rungs:
+            return []
+        final = self.rungs[-1]
+        return [(self.candidates[i], final.scores[i]) for i in final.survivors[:top_n]]
+
+    def to_portfolio_result(self) -> PortfolioResult:
+        """最後一輪（完整評估）的回測結果"""
+        if not self.rungs:
+            return PortfolioResult(runs=[], total_time=self.total_time)
+        return PortfolioResult(runs=list(self.rungs[-1].runs), total_time=self.total_time)
+
+    @property
+    def total_runs(self) -> int:
+        """所有輪次的回測次數"""
+        return sum(len(rung.runs) for rung in self.rungs)
+
+    def budget_used(self) -> float:
+        """消耗的預算（以完整回測次數計）"""
+        return sum(rung.fraction * len(rung.runs) for rung in self.rungs)
+
+    def summary(self) -> str:
+        """生成簡短摘要"""
+        full_budget = sum(len(configs) for configs in self.candidates)
+        lines = [
+            "Successive Halving Summary:",
+            f"  Candidates: {len(self.candidates)}",
+            f"  Rungs: {len(self.rungs)}",
+            f"  Total runs: {self.total_runs}",
+            f"  Budget used: {self.budget_used():.1f} / {full_budget} full runs",
+            f"  Total time: {self.total_time:.2f}s",
+        ]
+        for rung in self.rungs:
+            lines.append(
+                f"  Rung {rung.index}: fraction={rung.fraction:.3f}, "
+                f"evaluated={len(rung.scores)}, survivors={len(rung.survivors)}, "
+                f"time={rung.elapsed:.2f}s"
+            )
+        return "\n".join(lines)
+
+
+def successive_halving_search(
+    configs: List[RunConfig],
+    metric: str = "total_return",
+    maximize: bool = True,
+    eta: int = 3,
+    min_fraction: float = 0.05,
+    budget: str = "prefix",
+    max_workers: int = 1,
+    verbose: bool = False,
+    seed: Optional[int] = 0
+) -> SearchResult:
+    """
+    執行逐步淘汰搜索
+
+    輪數 R 由候選數量與 min_fraction 決定：R = min(⌊log_eta(N)⌋, ⌊log_eta(1/min_fraction)⌋) + 1，
+    第 i 輪的預算比例為 eta^(i - R + 1)，最後一輪為完整評估。
+
+    budget="symbols" 時，交易對先以 seed 打亂成一個固定順序，每輪取該順序的前段：
+    所有候選在同一輪使用相同的交易對子集（公平比較），後一輪的子集包含前一輪的子集，
+    而且不會總是偏向 YAML 中排在前面的交易對。
+
+    Args:
+        configs: 回測配置列表（通常由 YAML 搜索空間展開）
+        metric: 排序指標（例如 "total_return", "profit_factor"）
+        maximize: 指標是否越大越好
+        eta: 每輪保留 1/eta 的候選
+        min_fraction: 第一輪的最小預算比例
+        budget: 預算維度，"prefix"（數據前段）或 "symbols"（交易對子集）
+        max_workers: 並行進程數（默認 1，序列執行）
+        verbose: 是否輸出每輪進度
+        seed: 交易對子集的隨機種子（默認 0，可重現；None 表示每次不同）
+
+    Returns:
+        SearchResult
+
+    Raises:
+        ValueError: 參數無效
+    """
+    if not configs:
+        raise ValueError("configs cannot be empty")
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    if not 0 < min_fraction <= 1:
+        raise ValueError("min_fraction must be in (0, 1]")
+    if budget not in ("prefix", "symbols"):
+        raise ValueError(f"Unknown budget type: {budget}")
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    candidates = _group_candidates(configs)
+    num_rungs = _num_rungs(len(candidates), eta, min_fraction)
+    symbol_order = _symbol_order(candidates, seed)
+
+    start_time = time.time()
+    rungs: List[RungResult] = []
+    alive = list(range(len(candidates)))
+
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        for rung_index in range(num_rungs):
+            fraction = float(eta) ** (rung_index - num_rungs + 1)
+            rung_start = time.time()
+
+            tasks = _build_tasks(candidates, alive, fraction, budget, symbol_order)
+            runs = _evaluate(tasks, executor, max_workers)
+
+            scores = _score(alive, tasks, runs, metric, maximize)
+            ranked = sorted(alive, key=lambda i: scores[i], reverse=maximize)
+
+            is_last = rung_index == num_rungs - 1
+            keep = len(ranked) if is_last else max(math.ceil(len(ranked) / eta), 1)
+            survivors = ranked[:keep]
+
+            rungs.append(RungResult(
+                index=rung_index,
+                fraction=fraction,
+                scores=scores,
+                survivors=survivors,
+                runs=runs,
+                elapsed=time.time() - rung_start
+            ))
+
+            if verbose:
+                print(
+                    f"[Rung {rung_index + 1}/{num_rungs}] fraction={fraction:.3f} "
+                    f"evaluated {len(alive)} candidates ({len(runs)} runs), "
+                    f"{len(survivors)} promoted in {time.time() - rung_start:.2f}s"
+                )
+
+            alive = survivors
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return SearchResult(
+        candidates=candidates,
+        rungs=rungs,
+        metric=metric,
+        maximize=maximize,
+        total_time=time.time() - start_time
+    )
+
+
+def _group_candidates(configs: List[RunConfig]) -> List[List[RunConfig]]:
+    """把只有 symbol 不同的配置合併為同一候選（保持輸入順序）"""
+    groups: Dict[str, List[RunConfig]] = {}
+    for config in configs:
+        groups.setdefault(config.config_hash(exclude=["symbol"]), []).append(config)
+    return list(groups.values())
+
+
+def _symbol_order(candidates: List[List[RunConfig]], seed: Optional[int]) -> Dict[str, int]:
+    """以 seed 打亂所有交易對，返回 symbol -> 排名（symbols 預算按此順序取子集）"""
+    symbols = list(dict.fromkeys(config.symbol for group in candidates for config in group))
+    random.Random(seed).shuffle(symbols)
+    return {symbol: rank for rank, symbol in enumerate(symbols)}
+
+
+def _num_rungs(num_candidates: int, eta: int, min_fraction: float) -> int:
+    """計算輪數"""
+    by_candidates = int(math.floor(math.log(num_candidates, eta) + 1e-9)) if num_candidates > 1 else 0
+    by_budget = int(math.floor(math.log(1 / min_fraction, eta) + 1e-9))
+    return min(by_candidates, by_budget) + 1
+
+
+def _build_tasks(
+    candidates: List[List[RunConfig]],
+    alive: List[int],
+    fraction: float,
+    budget: str,
+    symbol_order: Optional[Dict[str, int]] = None
+) -> List[Tuple[int, RunConfig, float]]:
+    """構建本輪的 (候選索引, 配置, 數據比例) 任務列表
+
+    symbols 預算按 symbol_order 的排名取前段（未提供時為輸入順序）。
+    """
+    tasks = []
+    for i in alive:
+        group = candidates[i]
+        if budget == "prefix":
+            tasks.extend((i, config, fraction) for config in group)
+        else:
+            if symbol_order is not None:
+                group = sorted(group, key=lambda config: symbol_order[config.symbol])
+            count = max(math.ceil(len(group) * fraction), 1)
+            tasks.extend((i, config, 1.0) for config in group[:count])
+    return tasks
+
+
+def _evaluate(
+    tasks: List[Tuple[int, RunConfig, float]],
+    executor: Optional[ProcessPoolExecutor],
+    max_workers: int
+) -> List[SingleRunResult]:
+    """執行任務（相同數據集相鄰，提升 worker 快取命中率），返回與 tasks 對齊的結果"""
+    order = schedule_configs([config for _, config, _ in tasks])
+    ordered = [tasks[i] for i in order]
+
+    if executor is None:
+        ordered_runs = [_run_single_backtest(config, data_fraction=fraction) for _, config, fraction in ordered]
+    else:
+        ordered_runs = list(executor.map(
+            _run_single_backtest,
+            [config for _, config, _ in ordered],
+            [False] * len(ordered),
+            [fraction for _, _, fraction in ordered],
+            chunksize=max(len(ordered) // (max_workers * 4), 1)
+        ))
+
+    runs: List[Optional[SingleRunResult]] = [None] * len(tasks)
+    for position, run in zip(order, ordered_runs):
+        runs[position] = run
+    return runs
+
+
+def _score(
+    alive: List[int],
+    tasks: List[Tuple[int, RunConfig, float]],
+    runs: List[SingleRunResult],
+    metric: str,
+    maximize: bool
+) -> Dict[int, float]:
+    """計算每個候選的平均指標（失敗或缺失視為最差）"""
+    worst = float("-inf") if maximize else float("inf")
+    values: Dict[int, List[float]] = {i: [] for i in alive}
+
+    for (i, _, _), run in zip(tasks, runs):
+        value = run.get_metric(metric) if run.success else None
+        if value is None or value != value:  # None 或 NaN
+            value = worst
+        values[i].append(float(value))
+
+    return {i: (sum(v) / len(v) if v else worst) for i, v in values.items()}
@@ -9,6 +9,8 @@ Strategy Dependency Checker v0.4
 - 外部依賴檢查（Python 包、系統資源等）
 - 修復建議和錯誤處理
 
+v0.5: 數據源與數據量檢查優先查詢數據目錄（utils/database.py），不再掃描文件
+
 Version: v0.4
 Design Reference: docs/specs/planned/v0.4_strategy_api_spec.md
 """
@@ -20,6 +22,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 
 from strategies.api_v2 import BaseStrategy, DataSource, DataRequirement
+from utils.database import DataCatalog, get_catalog
 
 
 @dataclass
@@ -144,14 +147,30 @@ class DependencyChecker:
         ...     print(result.format_report())
     """
 
-    def __init__(self, data_config: Optional[Dict] = None):
+    def __init__(self, data_config: Optional[Dict] = None, catalog: Optional[DataCatalog] = None):
         """初始化相依性檢查器
 
         Args:
             data_config: 數據配置字典（可選）
+            catalog: 數據目錄（默認使用全局數據目錄）
         """
         self.data_config = data_config or {}
-        self._available_data_sources = self._detect_available_data_sources()
+        self._catalog = catalog
+        self._detected_sources: Optional[List[DataSource]] = None
+
+    @property
+    def catalog(self) -> DataCatalog:
+        """數據目錄（第一次使用時才獲取，建構檢查器不會探測數據路徑）"""
+        if self._catalog is None:
+            self._catalog = get_catalog()
+        return self._catalog
+
+    @property
+    def _available_data_sources(self) -> List[DataSource]:
+        """可用的數據源（第一次使用時檢測）"""
+        if self._detected_sources is None:
+            self._detected_sources = self._detect_available_data_sources()
+        return self._detected_sources
 
     def _detect_available_data_sources(self) -> List[DataSource]:
         """檢測可用的數據源
@@ -160,17 +179,18 @@ class DependencyChecker:
             可用的數據源列表
 
         Note:
-            v0.4 目前只支援 OHLCV
-            v0.5 將支援更多數據源
+            OHLCV 總是可用；v0.5 永續數據源在數據目錄中有記錄時可用
         """
         available = [DataSource.OHLCV]  # OHLCV 總是可用
 
-        # v0.5: 檢測其他數據源
-        # if self._check_funding_data_available():
-        #     available.append(DataSource.FUNDING)
-        #
-        # if self._check_oi_data_available():
-        #     available.append(DataSource.OPEN_INTEREST)
+        # v0.5: 其他數據源由數據目錄查詢（索引查詢，不掃描文件）
+        for value in self.catalog.sources():
+            try:
+                source = DataSource(value)
+            except ValueError:
+                continue
+            if source not in available:
+                available.append(source)
 
         return available
 
@@ -358,6 +378,20 @@ class DependencyChecker:
             >>> if not is_available:
             ...     print(error)
         """
+        # v0.5: 數據目錄有最新記錄時直接比較行數，不讀取文件
+        entries = [
+            entry for entry in self.catalog.find(DataSource.OHLCV.value, symbol=symbol, timeframe=timeframe)
+            if entry.rows is not None and entry.is_current()
+        ]
+        if entries:
+            rows = max(entry.rows for entry in entries)
+            if rows < min_periods:
+                return False, (
+                    f"Insufficient data: {rows} bars available, "
+                    f"but {min_periods} required"
+                )
+            return True, None
+
         # 檢查數據文件是否存在
         data_file = Path(f"data/raw/{symbol}_{timeframe}.csv")
 
@@ -369,6 +403,12 @@ class DependencyChecker:
             import pandas as pd
             data = pd.read_csv(data_file)
 
+            # 記錄到數據目錄（位於目錄根目錄之下時），下次檢查不再讀取文件
+            try:
+                self.catalog.register_frame(data_file, DataSource.OHLCV.value, symbol, data, timeframe=timeframe)
+            except Exception:
+                pass  # 目錄不可寫時不影響檢查結果
+
             if len(data) < min_periods:
                 return False, (
                     f"Insufficient data: {len(data)} bars available, "
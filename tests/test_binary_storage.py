@@ -0,0 +1,144 @@
+"""
+Binary OHLCV Storage Tests
+
+測試 v0.5 二進位列式存儲：
+- Parquet / Feather 讀寫與 CSV 結果一致
+- 同名文件優先載入二進位格式
+- CSV → 二進位批量遷移（含 CLI）
+- DataPipeline 載入二進位文件
+
+Version: v0.5
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from click.testing import CliRunner
+
+from data.storage import OHLCVStorage, find_data_file, save_ohlcv, load_ohlcv
+from data.pipeline import DataPipeline
+from cli.main import cli
+
+
+TEST_CSV = Path("data/raw/BTCUSDT_1h_test.csv")
+
+
+class TestBinaryStorage(unittest.TestCase):
+    """測試 Parquet / Feather 讀寫"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.storage = OHLCVStorage(data_dir=self.tmp_dir)
+        self.csv_df = self.storage.load_ohlcv(str(TEST_CSV))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_round_trip_matches_csv(self):
+        """測試二進位格式載入結果與 CSV 一致"""
+        for suffix in (".parquet", ".feather"):
+            path = str(self.tmp_dir / f"BTCUSDT_1h{suffix}")
+            save_ohlcv(self.csv_df, path)
+
+            df = load_ohlcv(path)
+            pd.testing.assert_frame_equal(df, self.csv_df)
+            self.assertEqual(df["timestamp"].dtype, np.int64)
+            self.assertEqual(df["close"].dtype, np.float64)
+
+            # 其他載入選項
+            flat = load_ohlcv(path, set_datetime_index=False)
+            self.assertEqual(list(flat.columns)[0], "datetime")
+            raw = load_ohlcv(path, convert_to_datetime=False)
+            self.assertEqual(list(raw.columns), ["timestamp", "open", "high", "low", "close", "volume"])
+
+    def test_save_sorts_dedupes_and_derives_timestamp(self):
+        """測試寫入時排序、去重，並可從 datetime 索引推導 timestamp"""
+        df = self.csv_df.drop(columns=["timestamp"])
+        shuffled = pd.concat([df.iloc[::-1], df.iloc[:5]])
+
+        path = str(self.tmp_dir / "BTCUSDT_1h.parquet")
+        self.storage.save_ohlcv(shuffled, path)
+
+        loaded = load_ohlcv(path)
+        self.assertEqual(len(loaded), len(self.csv_df))
+        self.assertTrue(loaded.index.is_monotonic_increasing)
+        np.testing.assert_array_equal(loaded["timestamp"].values, self.csv_df["timestamp"].values)
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+    def test_find_data_file_prefers_binary(self):
+        """測試同名文件優先使用二進位格式"""
+        raw_dir = self.tmp_dir / "raw"
+        raw_dir.mkdir()
+        shutil.copy(TEST_CSV, raw_dir / "BTCUSDT_1h.csv")
+
+        self.assertEqual(find_data_file([raw_dir], "BTCUSDT", "1h").suffix, ".csv")
+
+        save_ohlcv(self.csv_df, str(raw_dir / "BTCUSDT_1h.parquet"))
+        self.assertEqual(find_data_file([raw_dir], "BTCUSDT", "1h").suffix, ".parquet")
+        self.assertIsNone(find_data_file([raw_dir], "ETHUSDT", "1h"))
+
+        available = self.storage.list_available_data()
+        self.assertEqual(len(available), 1)
+        self.assertTrue(available[0]["file_path"].endswith(".parquet"))
+
+        df = self.storage.load_symbol_data("BTCUSDT", "1h")
+        self.assertEqual(len(df), len(self.csv_df))
+
+    def test_migrate_to_binary(self):
+        """測試 CSV 批量遷移"""
+        raw_dir = self.tmp_dir / "raw"
+        raw_dir.mkdir()
+        shutil.copy(TEST_CSV, raw_dir / "BTCUSDT_1h.csv")
+        (raw_dir / "BROKEN_1h.csv").write_text("foo,bar\n1,2\n")
+
+        results = self.storage.migrate_to_binary(file_format="feather")
+        status = {Path(r["csv"]).name: r["status"] for r in results}
+        self.assertEqual(status, {"BTCUSDT_1h.csv": "migrated", "BROKEN_1h.csv": "failed"})
+        self.assertTrue((raw_dir / "BTCUSDT_1h.feather").exists())
+
+        # 再次遷移會跳過已存在的文件
+        results = self.storage.migrate_to_binary(directories=[raw_dir], file_format="feather")
+        self.assertEqual(results[1]["status"], "skipped")
+
+        results = self.storage.migrate_to_binary(
+            directories=[raw_dir], file_format="feather", overwrite=True, remove_csv=True
+        )
+        self.assertEqual(results[1]["status"], "migrated")
+        self.assertEqual(results[1]["rows"], len(self.csv_df))
+        self.assertFalse((raw_dir / "BTCUSDT_1h.csv").exists())
+
+        with self.assertRaises(ValueError):
+            self.storage.migrate_to_binary(file_format="hdf5")
+
+    def test_pipeline_loads_binary(self):
+        """測試 DataPipeline 載入二進位文件"""
+        raw_dir = self.tmp_dir / "raw"
+        raw_dir.mkdir()
+        save_ohlcv(self.csv_df, str(raw_dir / "BTCUSDT_1h.parquet"))
+
+        pipeline = DataPipeline(data_dir=self.tmp_dir, enable_cache=False)
+        df = pipeline._load_ohlcv_from_file("BTCUSDT", "1h")
+
+        self.assertEqual(list(df.columns), ["open", "high", "low", "close", "volume"])
+        self.assertIsInstance(df.index, pd.DatetimeIndex)
+        np.testing.assert_array_equal(df["close"].values, self.csv_df["close"].values)
+
+    def test_cli_migrate(self):
+        """測試 superdog migrate 命令"""
+        shutil.copy(TEST_CSV, self.tmp_dir / "BTCUSDT_1h.csv")
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["migrate", "-d", str(self.tmp_dir)])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Migrated 1/1 files", result.output)
+        self.assertTrue((self.tmp_dir / "BTCUSDT_1h.parquet").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
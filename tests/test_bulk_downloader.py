@@ -0,0 +1,166 @@
+# 測試並發下載器與令牌桶限流 (v0.5)
+
+import sys
+import os
+import tempfile
+import threading
+sys.path.append(os.path.abspath("."))
+
+import ccxt
+import pandas as pd
+
+from data.bulk_downloader import BulkDownloader, DownloadTask, TokenBucket, build_download_tasks
+from data.fetcher import OHLCVFetcher, kline_request_weight
+from data.storage import load_ohlcv
+
+HOUR_MS = 60 * 60 * 1000
+
+
+class MockExchange:
+    """本地模擬交易所：每小時一根 K 線，可注入限流錯誤"""
+
+    rateLimit = 1000
+    enableRateLimit = True
+
+    def __init__(self, fail_first=()):
+        self.calls = []
+        self.fail_first = set(fail_first)
+        self.lock = threading.Lock()
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        with self.lock:
+            self.calls.append((symbol, timeframe, since))
+            if symbol in self.fail_first:
+                self.fail_first.discard(symbol)
+                raise ccxt.RateLimitExceeded("429 Too Many Requests")
+
+        step = HOUR_MS if timeframe == "1h" else 4 * HOUR_MS
+        start = -(-since // step) * step
+        base = 100.0 if symbol.startswith("BTC") else 10.0
+        return [
+            [start + i * step, base, base + 1, base - 1, base + i, 1.0]
+            for i in range(limit)
+        ]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _make_fetcher(exchange):
+    fetcher = OHLCVFetcher.__new__(OHLCVFetcher)
+    fetcher.exchange_name = "mock"
+    fetcher.exchange = exchange
+    fetcher.retry_base_delay = 0.001
+    return fetcher
+
+
+def test_token_bucket_refill_and_wait():
+    """令牌不足時按補充速率等待"""
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=10, refill_rate=5, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire(10) == 0
+    assert not bucket.try_acquire(1)
+
+    # 透支 5 個令牌需要等待 1 秒
+    assert abs(bucket.acquire(5) - 1.0) < 1e-9
+    assert abs(clock.now - 1.0) < 1e-9
+
+    clock.now += 10
+    assert bucket.available == 10
+
+    try:
+        bucket.acquire(11)
+        assert False, "Should reject weight above capacity"
+    except ValueError:
+        pass
+
+    per_minute = TokenBucket.per_minute(1200)
+    assert per_minute.capacity == 1200 and per_minute.refill_rate == 20
+
+    assert kline_request_weight(100) == 1
+    assert kline_request_weight(1000) == 5
+
+    print("OK test_token_bucket_refill_and_wait passed")
+
+
+def test_bulk_download_concurrent_with_retry():
+    """多交易對並發下載，共享限流器並重試 429 錯誤"""
+    exchange = MockExchange(fail_first={"ETH/USDT"})
+    limiter = TokenBucket(capacity=1000, refill_rate=1000)
+    completed = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tasks = build_download_tasks(["BTCUSDT", "ETHUSDT"], ["1h", "4h"], directory=tmp_dir)
+        assert tasks[0].market_symbol == "BTC/USDT"
+        assert tasks[0].save_path.endswith("BTCUSDT_1h.csv")
+
+        downloader = BulkDownloader(
+            fetcher=_make_fetcher(exchange),
+            limiter=limiter,
+            max_workers=4,
+            on_complete=completed.append
+        )
+        # 共享令牌桶取代 ccxt 內建限流
+        assert exchange.enableRateLimit is False
+
+        results = downloader.download(tasks, start_date="2024-01-01", end_date="2024-03-01")
+
+        assert [r.task for r in results] == tasks
+        assert all(r.success for r in results), [r.error for r in results]
+        assert len(completed) == 4
+
+        hours = (pd.Timestamp("2024-03-01") - pd.Timestamp("2024-01-01")) // pd.Timedelta(hours=1)
+        df = load_ohlcv(os.path.join(tmp_dir, "ETHUSDT_1h.csv"))
+        assert len(df) == hours
+        assert df["close"].iloc[0] == 10.0
+        assert len(load_ohlcv(os.path.join(tmp_dir, "BTCUSDT_4h.csv"))) == hours // 4
+
+        # 每個請求都按權重扣除令牌（1000 根 K 線 = 5）
+        assert limiter.acquired == 5 * len(exchange.calls)
+
+        # 再次執行只追加新 K 線
+        results = downloader.download(tasks, start_date="2024-01-01", end_date="2024-03-02")
+        assert all(r.success and not r.full_download for r in results)
+        assert results[0].new_rows == 24
+
+    print("OK test_bulk_download_concurrent_with_retry passed")
+
+
+def test_bulk_download_reports_failures():
+    """單個任務失敗不影響其他任務"""
+    exchange = MockExchange(fail_first={"BTC/USDT"})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tasks = [
+            DownloadTask("BTC/USDT", "1h", os.path.join(tmp_dir, "BTCUSDT_1h.csv")),
+            DownloadTask("ETH/USDT", "1h", os.path.join(tmp_dir, "ETHUSDT_1h.csv")),
+        ]
+        downloader = BulkDownloader(
+            fetcher=_make_fetcher(exchange),
+            limiter=TokenBucket(capacity=100, refill_rate=1000),
+            max_retries=1
+        )
+        results = downloader.download(tasks, start_date="2024-01-01", end_date="2024-01-02")
+
+        assert not results[0].success and "429" in results[0].error
+        assert results[1].success and results[1].new_rows == 24
+        assert not os.path.exists(tasks[0].save_path)
+
+    print("OK test_bulk_download_reports_failures passed")
+
+
+if __name__ == "__main__":
+    test_token_bucket_refill_and_wait()
+    test_bulk_download_concurrent_with_retry()
+    test_bulk_download_reports_failures()
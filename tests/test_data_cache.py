@@ -0,0 +1,147 @@
+"""
+Data Cache Tests
+
+測試 v0.5 按記憶體預算淘汰的 LRU 數據快取：
+- LRU 順序、記憶體與項目數上限
+- 命中 / 未命中 / 淘汰統計
+- 淘汰回調
+- DataPipeline 整合（get_cache_stats、set_cache_limits）
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data.cache import DataCache, estimate_nbytes
+from data.storage import load_ohlcv, save_ohlcv
+from data.pipeline import DataPipeline
+
+
+TEST_CSV = Path("data/raw/BTCUSDT_1h_test.csv")
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=rows, freq="h", tz="UTC")
+    return pd.DataFrame({"close": np.arange(rows, dtype=np.float64)}, index=index)
+
+
+class TestDataCache(unittest.TestCase):
+    """測試 DataCache"""
+
+    def test_lru_eviction_by_bytes(self):
+        """測試超出記憶體預算時淘汰最久未使用的項目"""
+        size = estimate_nbytes(_frame(100))
+        evicted = []
+        cache = DataCache(max_bytes=size * 2, on_evict=lambda k, v, r: evicted.append((k, r)))
+
+        cache.put("a", _frame(100))
+        cache.put("b", _frame(100))
+        self.assertIsNotNone(cache.get("a"))  # a 變為最近使用
+        cache.put("c", _frame(100))
+
+        self.assertEqual(cache.keys(), ["a", "c"])
+        self.assertEqual(evicted, [("b", "capacity")])
+        self.assertEqual(cache.total_bytes, size * 2)
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["evictions"], 1)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertAlmostEqual(cache.stats()["hit_rate"], 0.5)
+
+    def test_item_limit_oversized_and_replace(self):
+        """測試項目數上限、超大項目與覆寫"""
+        evicted = []
+        cache = DataCache(max_bytes=10_000, max_items=2, on_evict=lambda k, v, r: evicted.append((k, r)))
+
+        self.assertFalse(cache.put("huge", _frame(10_000)))
+        self.assertNotIn("huge", cache)
+        self.assertEqual(cache.rejected, 1)
+
+        cache.put("a", _frame(10))
+        cache.put("a", _frame(20))
+        self.assertEqual(len(cache["a"]), 20)
+        self.assertEqual(cache.total_bytes, estimate_nbytes(_frame(20)))
+
+        cache.put("b", _frame(10))
+        cache.put("c", _frame(10))
+        self.assertEqual(cache.keys(), ["b", "c"])
+
+        cache.resize(max_bytes=None, max_items=1)
+        self.assertEqual(cache.keys(), ["c"])
+
+        cache.pop("c")
+        cache.put("d", _frame(10))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.total_bytes, 0)
+        self.assertEqual(
+            evicted,
+            [("a", "replaced"), ("a", "capacity"), ("b", "capacity"), ("c", "removed"), ("d", "cleared")]
+        )
+
+    def test_callback_errors_are_isolated(self):
+        """測試淘汰回調出錯不影響快取"""
+        cache = DataCache(max_items=1, on_evict=lambda k, v, r: 1 / 0)
+        calls = []
+        cache.add_eviction_callback(lambda k, v, r: calls.append(k))
+
+        cache.put("a", _frame(5))
+        cache.put("b", _frame(5))
+        self.assertEqual(cache.keys(), ["b"])
+        self.assertEqual(calls, ["a"])
+
+
+class TestPipelineCacheLimits(unittest.TestCase):
+    """測試 DataPipeline 的快取上限"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        df = load_ohlcv(str(TEST_CSV))
+        for symbol in ("BTCUSDT", "ETHUSDT", "BNBUSDT"):
+            save_ohlcv(df, str(self.tmp_dir / "raw" / f"{symbol}_1h.parquet"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_pipeline_evicts_and_reports_stats(self):
+        """測試 preload 受快取上限限制並回報統計"""
+        evicted = []
+        pipeline = DataPipeline(
+            data_dir=self.tmp_dir,
+            cache_max_items=2,
+            on_cache_evict=lambda k, v, r: evicted.append(k),
+            enable_validated_cache=False
+        )
+
+        success, failed = pipeline.preload_data(["BTCUSDT", "ETHUSDT", "BNBUSDT"], ["1h"])
+        self.assertEqual((success, failed), (3, 0))
+        self.assertEqual(evicted, ["BTCUSDT_1h"])
+
+        pipeline._load_ohlcv("ETHUSDT", "1h")
+        stats = pipeline.get_cache_stats()
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(stats["keys"], ["BNBUSDT_1h", "ETHUSDT_1h"])
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 3)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertGreater(stats["memory_mb"], 0)
+        self.assertEqual(stats["max_mb"], 2048)
+
+        pipeline.set_cache_limits(max_mb=None, max_items=1)
+        self.assertEqual(pipeline.get_cache_stats()["keys"], ["ETHUSDT_1h"])
+
+        pipeline.set_cache_limits(max_mb=0.001)
+        self.assertEqual(pipeline.get_cache_stats()["count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,302 @@
+"""
+Data Catalog Tests
+
+測試 v0.5 SQLite 數據目錄：
+- 記錄、查詢、時間範圍覆蓋與缺失區間
+- 掃描已有文件（增量）
+- 存儲寫入路徑自動記錄、list_available_data 使用目錄查詢
+- DependencyChecker 以目錄查詢可用數據源與數據量
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data.fetcher import OHLCVFetcher
+from data.perpetual import FundingRateData
+from data.perpetual.basis import BasisData
+from data.perpetual.liquidations import LiquidationData
+from data.perpetual.long_short_ratio import LongShortRatioData
+from data.perpetual.open_interest import OpenInterestData
+from data.storage import OHLCVStorage
+from strategies.api_v2 import DataSource
+from strategies.dependency_checker import DependencyChecker
+from utils.database import QUALITY_PASSED, QUALITY_UNCHECKED, DataCatalog
+
+
+def _make_ohlcv(start: str, periods: int, freq: str = "1h") -> pd.DataFrame:
+    """生成 OHLCV 測試數據"""
+    index = pd.date_range(start, periods=periods, freq=freq)
+    close = np.linspace(100, 200, periods)
+    return pd.DataFrame({
+        "timestamp": index,
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": np.ones(periods),
+    })
+
+
+def _ms(value: str) -> int:
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+class CatalogTestCase(unittest.TestCase):
+    """使用臨時目錄作為數據根目錄，並替換全局數據目錄"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp()).resolve()
+        self.catalog = DataCatalog(self.tmp_dir / "catalog.sqlite", root=self.tmp_dir)
+        patcher = mock.patch("utils.database._global_catalog", self.catalog)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _touch(self, relative: str) -> Path:
+        path = self.tmp_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+        return path
+
+
+class TestDataCatalog(CatalogTestCase):
+    """測試記錄與查詢"""
+
+    def test_read_does_not_create_database(self):
+        """測試沒有記錄時查詢返回空結果且不建立文件"""
+        self.assertEqual(self.catalog.find(), [])
+        self.assertIsNone(self.catalog.coverage("ohlcv", "BTCUSDT"))
+        self.assertFalse(self.catalog.is_indexed())
+        self.assertFalse(self.catalog.db_path.exists())
+
+    def test_register_and_find(self):
+        """測試記錄後按條件查詢"""
+        path = self._touch("raw/BTCUSDT_1h.csv")
+        self.catalog.register(path, "ohlcv", "BTCUSDT", timeframe="1h",
+                              start="2024-01-01", end="2024-01-31", rows=721)
+        self._touch("raw/ETHUSDT_1h.csv")
+        self.catalog.register(self.tmp_dir / "raw/ETHUSDT_1h.csv", "ohlcv", "ETHUSDT", timeframe="1h")
+
+        entries = self.catalog.find("ohlcv", symbol="BTCUSDT")
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].rows, 721)
+        self.assertEqual(entries[0].start_ms, _ms("2024-01-01"))
+        self.assertEqual(entries[0].quality, QUALITY_UNCHECKED)
+        self.assertTrue(entries[0].is_current())
+        self.assertEqual(len(self.catalog.find(timeframe="1h")), 2)
+
+    def test_outside_root_not_recorded(self):
+        """測試根目錄之外的路徑不被記錄"""
+        with tempfile.TemporaryDirectory() as other:
+            path = Path(other) / "BTCUSDT_1h.csv"
+            path.write_text("x")
+            self.assertIsNone(self.catalog.register(path, "ohlcv", "BTCUSDT", timeframe="1h"))
+        self.assertEqual(self.catalog.find(), [])
+
+    def test_quality_kept_until_file_changes(self):
+        """測試文件未改變時重新記錄保留品質狀態，改變後重設"""
+        path = self._touch("raw/BTCUSDT_1h.csv")
+        self.catalog.register(path, "ohlcv", "BTCUSDT", timeframe="1h")
+        self.assertTrue(self.catalog.set_quality(path, QUALITY_PASSED))
+
+        self.catalog.register(path, "ohlcv", "BTCUSDT", timeframe="1h")
+        self.assertEqual(self.catalog.get(path).quality, QUALITY_PASSED)
+
+        path.write_text("changed")
+        self.assertFalse(self.catalog.get(path).is_current())
+        self.catalog.register(path, "ohlcv", "BTCUSDT", timeframe="1h")
+        self.assertEqual(self.catalog.get(path).quality, QUALITY_UNCHECKED)
+
+    def test_coverage_and_missing_ranges(self):
+        """測試多個數據集的時間範圍合併與缺失區間"""
+        for name, start, end in [("a", "2024-01-01", "2024-01-10"),
+                                 ("b", "2024-01-05", "2024-01-20"),
+                                 ("c", "2024-02-01", "2024-02-10")]:
+            path = self._touch(f"perpetual/funding_rate/binance/{name}.manifest.json")
+            self.catalog.register(path, "funding_rate", "BTCUSDT", start=start, end=end, rows=10)
+
+        self.assertEqual(self.catalog.coverage("funding_rate", "BTCUSDT"),
+                         (_ms("2024-01-01"), _ms("2024-02-10"), 30))
+        self.assertEqual(
+            self.catalog.missing_ranges("funding_rate", "BTCUSDT", "2023-12-30", "2024-02-15"),
+            [(_ms("2023-12-30"), _ms("2024-01-01") - 1),
+             (_ms("2024-01-20") + 1, _ms("2024-02-01") - 1),
+             (_ms("2024-02-10") + 1, _ms("2024-02-15"))]
+        )
+        self.assertEqual(self.catalog.missing_ranges("funding_rate", "BTCUSDT", "2024-01-02", "2024-01-15"), [])
+        self.assertEqual(self.catalog.missing_ranges("funding_rate", "ETHUSDT", "2024-01-01", "2024-01-02"),
+                         [(_ms("2024-01-01"), _ms("2024-01-02"))])
+
+    def test_scan_indexes_existing_files(self):
+        """測試掃描已有文件、跳過未改變的文件並刪除已不存在的記錄"""
+        df = _make_ohlcv("2024-01-01", 48)
+        raw = self.tmp_dir / "raw"
+        raw.mkdir()
+        df.assign(timestamp=df["timestamp"].astype("int64") // 1_000_000).to_csv(raw / "BTCUSDT_1h.csv", index=False)
+        df.to_parquet(raw / "ETHUSDT_4h.parquet", index=False)
+        (raw / "notes.csv").write_text("x")
+
+        self.assertEqual(self.catalog.scan(), 2)
+        self.assertTrue(self.catalog.is_indexed())
+        self.assertEqual(self.catalog.coverage("ohlcv", "ETHUSDT", "4h"),
+                         (_ms("2024-01-01"), _ms("2024-01-02 23:00"), 48))
+        self.assertEqual(self.catalog.find("ohlcv", symbol="BTCUSDT")[0].rows, 48)
+
+        # 增量：未改變的文件不重新索引
+        self.assertEqual(self.catalog.scan(), 0)
+
+        (raw / "BTCUSDT_1h.csv").unlink()
+        self.catalog.scan()
+        self.assertEqual([e.symbol for e in self.catalog.find()], ["ETHUSDT"])
+
+
+class TestSavePaths(CatalogTestCase):
+    """測試存儲寫入路徑維護數據目錄"""
+
+    def test_save_ohlcv_records_dataset(self):
+        """測試 save_ohlcv 記錄交易所、時間範圍與行數"""
+        storage = OHLCVStorage(data_dir=self.tmp_dir)
+        path = self.tmp_dir / "historical" / "binance" / "BTCUSDT_1h.parquet"
+        path.parent.mkdir(parents=True)
+
+        storage.save_ohlcv(_make_ohlcv("2024-01-01", 24), str(path))
+
+        entry = self.catalog.get(path)
+        self.assertIsNotNone(entry)
+        self.assertEqual((entry.symbol, entry.timeframe, entry.exchange), ("BTCUSDT", "1h", "binance"))
+        self.assertEqual(entry.rows, 24)
+        self.assertEqual(entry.end_ms, _ms("2024-01-01 23:00"))
+
+    def test_list_available_data_uses_catalog(self):
+        """測試已索引時 list_available_data 不列目錄"""
+        storage = OHLCVStorage(data_dir=self.tmp_dir)
+        raw = self.tmp_dir / "raw"
+        raw.mkdir()
+        storage.save_ohlcv(_make_ohlcv("2024-01-01", 24), str(raw / "BTCUSDT_1h.csv"))
+        storage.save_ohlcv(_make_ohlcv("2024-01-01", 24), str(raw / "BTCUSDT_1h.parquet"))
+        self.catalog.scan()
+
+        with mock.patch.object(Path, "glob", side_effect=AssertionError("directory listed")):
+            available = storage.list_available_data()
+
+        self.assertEqual(len(available), 1)
+        self.assertEqual(available[0]['symbol'], "BTCUSDT")
+        # 二進位格式優先
+        self.assertTrue(available[0]['file_path'].endswith(".parquet"))
+
+    def test_fetcher_csv_writes_recorded(self):
+        """測試下載器的 CSV 寫入與追加維護數據目錄，list_available_data 列出新下載的文件"""
+        storage = OHLCVStorage(data_dir=self.tmp_dir)
+        historical = self.tmp_dir / "historical" / "binance"
+        storage.save_ohlcv(_make_ohlcv("2024-01-01", 24), str(historical / "BTCUSDT_1h.parquet"))
+        self.catalog.scan()
+
+        fetcher = OHLCVFetcher.__new__(OHLCVFetcher)
+        df = _make_ohlcv("2024-01-01", 48)
+        df["timestamp"] = df["timestamp"].astype("int64") // 1_000_000
+        path = str(historical / "ETHUSDT_1h.csv")
+        fetcher._save_atomic(df.iloc[:24], path)
+
+        with mock.patch.object(Path, "glob", side_effect=AssertionError("directory listed")):
+            symbols = [item['symbol'] for item in storage.list_available_data()]
+        self.assertEqual(symbols, ["BTCUSDT", "ETHUSDT"])
+
+        fetcher._append_csv(df.iloc[24:], path)
+        entry = self.catalog.get(path)
+        self.assertTrue(entry.is_current())
+        self.assertEqual((entry.rows, entry.end_ms), (48, _ms("2024-01-02 23:00")))
+        self.assertEqual(entry.start_ms, _ms("2024-01-01"))
+
+    def test_stale_entries_fall_back_to_listing(self):
+        """測試記錄過期（文件在記錄後被修改）時列目錄"""
+        storage = OHLCVStorage(data_dir=self.tmp_dir)
+        raw = self.tmp_dir / "raw"
+        raw.mkdir()
+        storage.save_ohlcv(_make_ohlcv("2024-01-01", 24), str(raw / "BTCUSDT_1h.csv"))
+        self.catalog.scan()
+
+        with open(raw / "BTCUSDT_1h.csv", "a") as f:
+            f.write("\n")
+        _make_ohlcv("2024-01-01", 24).to_csv(raw / "ETHUSDT_1h.csv", index=False)
+
+        symbols = [item['symbol'] for item in storage.list_available_data()]
+        self.assertEqual(sorted(symbols), ["BTCUSDT", "ETHUSDT"])
+
+    def test_perpetual_save_records_manifest(self):
+        """測試永續數據保存後一個數據集一條記錄"""
+        handler = FundingRateData(storage_path=self.tmp_dir / "perpetual" / "funding_rate")
+        timestamps = pd.date_range("2024-01-01", "2024-01-10", freq="8h")
+        df = pd.DataFrame({"timestamp": timestamps, "symbol": "BTCUSDT", "funding_rate": 0.0001})
+
+        handler.save(df.iloc[:15], "BTCUSDT", "binance")
+        handler.save(df.iloc[10:], "BTCUSDT", "binance")
+
+        entries = self.catalog.find("funding_rate", symbol="BTCUSDT")
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].exchange, "binance")
+        self.assertEqual(entries[0].rows, len(df))
+        self.assertEqual(self.catalog.coverage("funding_rate", "BTCUSDT")[:2],
+                         (_ms("2024-01-01"), _ms("2024-01-10")))
+
+
+class TestDependencyCheckerCatalog(CatalogTestCase):
+    """測試 DependencyChecker 的目錄查詢"""
+
+    def test_available_sources_from_catalog(self):
+        """測試可用數據源包含目錄中有記錄的永續數據源，且延遲到第一次使用才檢測"""
+        checker = DependencyChecker(catalog=self.catalog)
+        self.assertIsNone(checker._detected_sources)
+
+        path = self._touch("perpetual/funding_rate/binance/BTCUSDT_funding_rate.manifest.json")
+        self.catalog.register(path, "funding_rate", "BTCUSDT")
+
+        self.assertEqual(checker._available_data_sources, [DataSource.OHLCV, DataSource.FUNDING])
+
+    def test_check_data_availability_uses_catalog(self):
+        """測試目錄有最新記錄時只比較行數，不讀取文件"""
+        path = self._touch("raw/BTCUSDT_1h.csv")
+        self.catalog.register(path, "ohlcv", "BTCUSDT", timeframe="1h", rows=500)
+        checker = DependencyChecker(catalog=self.catalog)
+
+        with mock.patch("pandas.read_csv", side_effect=AssertionError("file read")):
+            self.assertEqual(checker.check_data_availability("BTCUSDT", "1h", 200), (True, None))
+            ok, message = checker.check_data_availability("BTCUSDT", "1h", 1000)
+
+        self.assertFalse(ok)
+        self.assertIn("500 bars available", message)
+
+    def test_every_perpetual_source_detected(self):
+        """測試每個永續數據源保存或掃描後記錄的 source 都對應 DataSource"""
+        handlers = {
+            DataSource.FUNDING_RATE: FundingRateData,
+            DataSource.OPEN_INTEREST: OpenInterestData,
+            DataSource.BASIS: BasisData,
+            DataSource.LIQUIDATIONS: LiquidationData,
+            DataSource.LONG_SHORT_RATIO: LongShortRatioData,
+        }
+        timestamps = pd.date_range("2024-01-01", periods=10, freq="1h")
+        df = pd.DataFrame({"timestamp": timestamps, "symbol": "BTCUSDT", "value": 1.0})
+        for source, handler in handlers.items():
+            handler(storage_path=self.tmp_dir / "perpetual" / handler.__module__.rsplit(".", 1)[1]) \
+                .save(df, "BTCUSDT", "binance")
+
+        expected = [DataSource.OHLCV] + sorted(handlers, key=lambda source: source.value)
+        self.assertEqual(DependencyChecker(catalog=self.catalog)._available_data_sources, expected)
+
+        # 從文件重新索引得到相同的 source
+        rescanned = DataCatalog(self.tmp_dir / "rescan.sqlite", root=self.tmp_dir)
+        rescanned.scan()
+        self.assertEqual(DependencyChecker(catalog=rescanned)._available_data_sources, expected)
+        rescanned.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,323 @@
+# 測試 OHLCVFetcher 增量更新 (v0.5)
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath("."))
+
+import pandas as pd
+
+from data.fetcher import OHLCVFetcher
+from data.storage import load_ohlcv, save_ohlcv
+from data.partitioned_store import PartitionedOHLCVStore
+
+HOUR_MS = 60 * 60 * 1000
+
+
+class FakeExchange:
+    """模擬交易所：每小時一根 K 線，close 等於小時序號"""
+
+    rateLimit = 0
+
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        self.calls.append(since)
+        start = -(-since // HOUR_MS) * HOUR_MS
+        candles = []
+        ts = start
+        while ts <= self.now_ms and len(candles) < limit:
+            n = float(ts // HOUR_MS)
+            candles.append([ts, n, n + 1, n - 1, n, 1.0])
+            ts += HOUR_MS
+        return candles
+
+
+FAR_FUTURE = "2099-01-01"
+
+
+def _make_fetcher(now_ms, start_ms):
+    """建立使用 FakeExchange 的 fetcher；start_date 一律對應 start_ms"""
+    fetcher = OHLCVFetcher.__new__(OHLCVFetcher)
+    fetcher.exchange_name = "fake"
+    fetcher.exchange = FakeExchange(now_ms)
+    fetcher._date_to_milliseconds = (
+        lambda date_str: 4070908800000 if date_str == FAR_FUTURE else start_ms
+    )
+    return fetcher
+
+
+def test_update_csv_appends_only_new_candles():
+    """增量更新只下載並追加新 K 線"""
+    start_ms = int(pd.Timestamp("2024-01-01").timestamp() * 1000)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "BTCUSDT_1h.csv")
+
+        fetcher = _make_fetcher(start_ms + 2500 * HOUR_MS, start_ms)
+        result = fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, start_date="2024-01-01",
+                                      end_date=FAR_FUTURE)
+        assert result["full_download"]
+        assert result["new_rows"] == 2501
+        # 3 頁數據 + 1 次返回空頁
+        assert len(fetcher.exchange.calls) == 4
+
+        # 交易所多了 10 根 K 線
+        fetcher.exchange = FakeExchange(start_ms + 2510 * HOUR_MS)
+        result = fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, end_date=FAR_FUTURE)
+        assert not result["full_download"]
+        assert result["new_rows"] == 10
+        assert fetcher.exchange.calls[0] == start_ms + 2501 * HOUR_MS
+
+        df = load_ohlcv(path)
+        assert len(df) == 2511
+        assert df["timestamp"].is_unique and df["timestamp"].is_monotonic_increasing
+
+        # 交易所沒有新數據時文件不變
+        size = os.path.getsize(path)
+        fetcher.exchange = FakeExchange(start_ms + 2510 * HOUR_MS)
+        result = fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, end_date=FAR_FUTURE)
+        assert result["new_rows"] == 0
+        assert result["last_timestamp"] == start_ms + 2510 * HOUR_MS
+        assert os.path.getsize(path) == size
+
+    print("OK test_update_csv_appends_only_new_candles passed")
+
+
+def test_update_excludes_open_candle():
+    """未指定 end_date 時只保存已收盤的 K 線"""
+    now_hour = int(pd.Timestamp.now(tz="UTC").timestamp() * 1000) // HOUR_MS * HOUR_MS
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "BTCUSDT_1h.parquet")
+        fetcher = _make_fetcher(now_hour, now_hour - 5 * HOUR_MS)
+
+        result = fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, start_date="x")
+        # 當前小時的 K 線尚未收盤
+        assert result["new_rows"] == 5
+        assert result["last_timestamp"] == now_hour - HOUR_MS
+        assert len(load_ohlcv(path)) == 5
+
+    print("OK test_update_excludes_open_candle passed")
+
+
+def test_truncated_csv_tail_is_repaired():
+    """中斷寫入留下的不完整行會被截斷後重新下載"""
+    start_ms = int(pd.Timestamp("2024-01-01").timestamp() * 1000)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "BTCUSDT_1h.csv")
+        fetcher = _make_fetcher(start_ms + 20 * HOUR_MS, start_ms)
+        fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, start_date="2024-01-01",
+                             end_date=FAR_FUTURE)
+
+        with open(path, "a") as f:
+            f.write(f"{start_ms + 21 * HOUR_MS},1.0,2.")
+
+        assert fetcher._last_stored_timestamp(path) == start_ms + 20 * HOUR_MS
+        with open(path) as f:
+            assert f.read().endswith("\n")
+
+        fetcher.exchange = FakeExchange(start_ms + 22 * HOUR_MS)
+        result = fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, end_date=FAR_FUTURE)
+        assert result["new_rows"] == 2
+        assert len(load_ohlcv(path)) == 23
+
+        header_only = os.path.join(tmp_dir, "empty.csv")
+        with open(header_only, "w") as f:
+            f.write("timestamp,open,high,low,close,volume\n")
+        assert fetcher._last_stored_timestamp(header_only) is None
+
+    print("OK test_truncated_csv_tail_is_repaired passed")
+
+
+def test_update_csv_with_datetime_column():
+    """include_datetime 保存的 CSV（datetime 為第一欄）按標題行定位 timestamp 並按原欄位順序追加"""
+    start_ms = int(pd.Timestamp("2024-01-01").timestamp() * 1000)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "BTCUSDT_1h.csv")
+        fetcher = _make_fetcher(start_ms + 20 * HOUR_MS, start_ms)
+        fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, start_date="2024-01-01",
+                             end_date=FAR_FUTURE)
+        save_ohlcv(load_ohlcv(path), path, include_datetime=True)
+
+        assert fetcher._last_stored_timestamp(path) == start_ms + 20 * HOUR_MS
+
+        fetcher.exchange = FakeExchange(start_ms + 25 * HOUR_MS)
+        result = fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, start_date="2024-01-10",
+                                      end_date=FAR_FUTURE)
+        assert not result["full_download"]
+        assert result["new_rows"] == 5
+
+        with open(path) as f:
+            assert f.readline().startswith("datetime,timestamp,")
+        df = load_ohlcv(path)
+        assert len(df) == 26
+        assert df["timestamp"].iloc[0] == start_ms
+        assert (df.index.asi8 // 1_000_000 == df["timestamp"].to_numpy()).all()
+
+    print("OK test_update_csv_with_datetime_column passed")
+
+
+def test_update_partitioned_store():
+    """分區存儲的增量更新只重寫最新分區"""
+    start_ms = int(pd.Timestamp("2024-01-01", tz="UTC").timestamp() * 1000)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = PartitionedOHLCVStore(root=tmp_dir)
+        fetcher = _make_fetcher(start_ms + 24 * 40 * HOUR_MS, start_ms)
+
+        fetcher.update_ohlcv("BTC/USDT", "1h", store=store, start_date="2024-01-01", end_date=FAR_FUTURE)
+        keys = [p["key"] for p in store.read_manifest("BTCUSDT", "1h")["partitions"]]
+        assert keys == ["2024-01", "2024-02"]
+
+        fetcher.exchange = FakeExchange(start_ms + 24 * 41 * HOUR_MS)
+        result = fetcher.update_ohlcv("BTC/USDT", "1h", store=store, end_date=FAR_FUTURE)
+        assert result["new_rows"] == 24
+        assert len(store.load("BTCUSDT", "1h")) == 24 * 41 + 1
+
+        try:
+            fetcher.update_ohlcv("BTC/USDT", "1h")
+            assert False, "Should require save_path or store"
+        except ValueError:
+            pass
+
+    print("OK test_update_partitioned_store passed")
+
+
+def test_parallel_range_split_matches_sequential():
+    """按區段並行分頁的結果與順序分頁一致"""
+    start_ms = int(pd.Timestamp("2024-01-01").timestamp() * 1000)
+    end_ms = start_ms + 10_500 * HOUR_MS
+
+    fetcher = _make_fetcher(end_ms, start_ms)
+    sequential = fetcher._fetch_range("BTC/USDT", "1h", start_ms, end_ms)
+
+    fetcher.exchange = FakeExchange(end_ms)
+    parallel = fetcher._fetch_range("BTC/USDT", "1h", start_ms, end_ms, workers=4)
+
+    pd.testing.assert_frame_equal(sequential, parallel)
+    assert len(parallel) == 10_500
+
+    # 11 頁切成 6 個區段，每個區段的起點都對齊整頁
+    chunks = fetcher._split_range(start_ms, end_ms, HOUR_MS, 3)
+    assert len(chunks) == 6
+    assert chunks[0][0] == start_ms and chunks[-1][1] == end_ms
+    assert all((b - start_ms) % (1000 * HOUR_MS) == 0 for _, b in chunks[:-1])
+    assert fetcher._split_range(start_ms, start_ms + 500 * HOUR_MS, HOUR_MS, 4) == [
+        (start_ms, start_ms + 500 * HOUR_MS)
+    ]
+
+    print("OK test_parallel_range_split_matches_sequential passed")
+
+
+def test_parallel_range_split_before_listing():
+    """上市前的區段沒有數據時不影響其他區段"""
+    start_ms = int(pd.Timestamp("2024-01-01").timestamp() * 1000)
+    listing_ms = start_ms + 4_200 * HOUR_MS
+    end_ms = start_ms + 8_000 * HOUR_MS
+
+    class ListedExchange(FakeExchange):
+        def fetch_ohlcv(self, symbol, timeframe, since, limit):
+            return super().fetch_ohlcv(symbol, timeframe, max(since, listing_ms), limit)
+
+    fetcher = _make_fetcher(end_ms, start_ms)
+    fetcher.exchange = ListedExchange(end_ms)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "NEWUSDT_1h.parquet")
+        result = fetcher.update_ohlcv("NEW/USDT", "1h", save_path=path, start_date="2024-01-01",
+                                      end_date=FAR_FUTURE, workers=4)
+        assert result["new_rows"] == 3_801
+
+        df = load_ohlcv(path)
+        assert df["timestamp"].iloc[0] == listing_ms
+        assert df["timestamp"].is_unique and df["timestamp"].is_monotonic_increasing
+        assert (df["timestamp"].diff().dropna() == HOUR_MS).all()
+
+    print("OK test_parallel_range_split_before_listing passed")
+
+
+def test_repair_gaps_backfills_only_missing_bars():
+    """缺口回補只下載覆蓋缺口的頁並只寫入缺失的 K 線"""
+    start_ms = int(pd.Timestamp("2024-01-01").timestamp() * 1000)
+    fetcher = _make_fetcher(start_ms + 9_999 * HOUR_MS, start_ms)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "BTCUSDT_1h.parquet")
+        fetcher.update_ohlcv("BTC/USDT", "1h", save_path=path, start_date="2024-01-01", end_date=FAR_FUTURE)
+        full = load_ohlcv(path)
+
+        # 前段有三個相近的小缺口，後段有一個遠處的缺口；已有數據標記為 -1 以確認不被覆蓋
+        holes = [10, 11, 50, 300, 301, 302, 8_000]
+        broken = full.drop(full.index[holes]).copy()
+        broken["volume"] = -1.0
+        save_ohlcv(broken, path)
+
+        fetcher.exchange = FakeExchange(start_ms + 9_999 * HOUR_MS)
+        result = fetcher.repair_gaps("BTC/USDT", "1h", save_path=path)
+        assert result["gaps"] == 4
+        assert result["missing_bars"] == 7
+        # 前三個缺口合併為一個請求範圍
+        assert result["ranges"] == 2
+        assert result["requests"] == 2
+        assert fetcher.exchange.calls == [start_ms + 10 * HOUR_MS, start_ms + 8_000 * HOUR_MS]
+        assert result["filled_rows"] == 7
+        assert result["remaining_bars"] == 0
+
+        repaired = load_ohlcv(path)
+        assert len(repaired) == len(full)
+        assert (repaired["timestamp"].to_numpy() == full["timestamp"].to_numpy()).all()
+        assert (repaired["volume"].iloc[holes] == 1.0).all()
+        assert (repaired["volume"].drop(repaired.index[holes]) == -1.0).all()
+
+        # 沒有缺口時不發出請求
+        fetcher.exchange = FakeExchange(start_ms + 9_999 * HOUR_MS)
+        assert fetcher.repair_gaps("BTC/USDT", "1h", save_path=path)["ranges"] == 0
+        assert fetcher.exchange.calls == []
+
+    print("OK test_repair_gaps_backfills_only_missing_bars passed")
+
+
+def test_repair_gaps_partitioned_store_with_outage():
+    """交易所停機造成的缺口無法回補，計入 remaining_bars"""
+    start_ms = int(pd.Timestamp("2024-01-01").timestamp() * 1000)
+    outage = set(range(start_ms + 100 * HOUR_MS, start_ms + 105 * HOUR_MS, HOUR_MS))
+
+    class OutageExchange(FakeExchange):
+        def fetch_ohlcv(self, symbol, timeframe, since, limit):
+            candles = super().fetch_ohlcv(symbol, timeframe, since, limit)
+            return [c for c in candles if c[0] not in outage]
+
+    fetcher = _make_fetcher(start_ms + 1_999 * HOUR_MS, start_ms)
+    fetcher.exchange = OutageExchange(start_ms + 1_999 * HOUR_MS)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = PartitionedOHLCVStore(tmp_dir)
+        fetcher.update_ohlcv("BTC/USDT", "1h", store=store, start_date="2024-01-01", end_date=FAR_FUTURE)
+        df = store.load("BTCUSDT", "1h")
+        store.write("BTCUSDT", "1h", df.drop(df.index[[20, 1_500]]))
+
+        result = fetcher.repair_gaps("BTC/USDT", "1h", store=store)
+        assert result["gaps"] == 3
+        assert result["missing_bars"] == 7
+        assert result["filled_rows"] == 2
+        assert result["remaining_bars"] == 5
+        assert len(store.load("BTCUSDT", "1h")) == len(df)
+
+    print("OK test_repair_gaps_partitioned_store_with_outage passed")
+
+
+if __name__ == "__main__":
+    test_update_csv_appends_only_new_candles()
+    test_update_excludes_open_candle()
+    test_truncated_csv_tail_is_repaired()
+    test_update_csv_with_datetime_column()
+    test_update_partitioned_store()
+    test_parallel_range_split_matches_sequential()
+    test_parallel_range_split_before_listing()
+    test_repair_gaps_backfills_only_missing_bars()
+    test_repair_gaps_partitioned_store_with_outage()
@@ -0,0 +1,250 @@
+"""
+Incremental Resample Tests
+
+測試 v0.5 更高時間週期的增量更新：
+- update_resampled 逐批追加源 K 線的結果與整體重採樣相同
+- 只傳入新的源 K 線時合併進未收盤的最後一根，已收盤的最後一根保留
+- 修正過的源 K 線不會重複累加
+- closed_only 模式只保留已收盤的 K 線
+- 分區數據集的增量更新（update_partitioned）
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data.partitioned_store import PartitionedOHLCVStore
+from data.streaming_resample import update_partitioned
+from data.timeframe_manager import OHLCV_COLUMNS, TimeframeManager
+
+
+def _make_minutes(days: int = 10, start: str = "2024-01-29 00:00", seed: int = 0) -> pd.DataFrame:
+    """生成帶缺失 K 線的 1m OHLCV 數據"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=days * 1440, freq="1min", tz="UTC", name="datetime")
+    close = 100 + rng.standard_normal(len(index)).cumsum()
+    df = pd.DataFrame({
+        'open': close + rng.standard_normal(len(index)) * 0.1,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': rng.random(len(index)),
+    }, index=index)
+    drop = rng.choice(len(df), len(df) // 50, replace=False)
+    return df.drop(df.index[drop])
+
+
+class TestUpdateResampled(unittest.TestCase):
+    """測試 TimeframeManager.update_resampled"""
+
+    def setUp(self):
+        self.manager = TimeframeManager()
+        self.data = _make_minutes()
+
+    def _replay(self, timeframe: str, cuts, appended_only: bool) -> pd.DataFrame:
+        """按 cuts 分批到達源 K 線
+
+        appended_only 時每批只傳入新到達的源 K 線，否則傳入覆蓋最後一根目標 K 線的源數據
+        （從它開始時間之前的一根源 K 線起，使缺失的第一分鐘不被誤判為只有新 K 線）
+        """
+        resampled = None
+        previous = 0
+        for end in list(cuts) + [len(self.data)]:
+            if appended_only:
+                available = self.data.iloc[previous:end]
+            else:
+                available = self.data.iloc[:end]
+                if resampled is not None and not resampled.empty:
+                    start = self.manager.bar_start(resampled.index[-1], timeframe)
+                    available = available.iloc[max(available.index.searchsorted(start) - 1, 0):]
+            resampled = self.manager.update_resampled(resampled, available, "1m", timeframe)
+            previous = end
+        return resampled
+
+    def test_matches_full_resample(self):
+        """測試逐批更新與整體重採樣相同（重新聚合與只傳入新 K 線兩種方式）"""
+        rng = np.random.default_rng(1)
+        cuts = np.sort(rng.choice(np.arange(1, len(self.data)), 30, replace=False))
+
+        for tf in ["5m", "1h", "4h", "1d", "1w"]:
+            for appended_only in (False, True):
+                with self.subTest(timeframe=tf, appended_only=appended_only):
+                    pd.testing.assert_frame_equal(
+                        self._replay(tf, cuts, appended_only), self.manager.resample_ohlcv(self.data, "1m", tf),
+                        check_freq=False
+                    )
+
+    def test_appended_bars_merge_into_partial_bar(self):
+        """測試只傳入新 K 線時合併進未收盤的最後一根，不丟失已聚合的部分"""
+        index = pd.date_range("2024-01-01 08:00", periods=60, freq="1min", tz="UTC")
+        data = pd.DataFrame({
+            'open': np.arange(600.0, 660.0), 'high': np.arange(601.0, 661.0),
+            'low': np.arange(599.0, 659.0), 'close': np.arange(600.5, 660.5), 'volume': 1.0,
+        }, index=index)
+
+        resampled = self.manager.resample_ohlcv(data.iloc[:30], "1m", "1h")
+        updated = self.manager.update_resampled(resampled, data.iloc[30:], "1m", "1h")
+
+        self.assertEqual(len(updated), 1)
+        self.assertEqual(updated['open'].iloc[0], 600.0)
+        self.assertEqual(updated['volume'].iloc[0], 60.0)
+        pd.testing.assert_frame_equal(updated, self.manager.resample_ohlcv(data, "1m", "1h"), check_freq=False)
+
+    def test_closed_last_bar_kept(self):
+        """測試最後一根已收盤時保留並在其後追加"""
+        hourly = self.manager.resample_ohlcv(self.data.loc[:"2024-01-29 08:59"], "1m", "1h")
+        minutes = self.data.loc["2024-01-29 09:00":"2024-01-29 10:30"]
+
+        updated = self.manager.update_resampled(hourly, minutes, "1m", "1h")
+
+        pd.testing.assert_frame_equal(
+            updated, self.manager.resample_ohlcv(self.data.loc[:"2024-01-29 10:30"], "1m", "1h"),
+            check_freq=False
+        )
+
+    def test_only_recent_bars_recomputed(self):
+        """測試只重新聚合最後一根目標 K 線之後的源數據"""
+        full = self.manager.resample_ohlcv(self.data.iloc[:5000], "1m", "1h")
+
+        with mock.patch.object(self.manager, "resample_ohlcv", wraps=self.manager.resample_ohlcv) as resample:
+            updated = self.manager.update_resampled(full, self.data.iloc[:5100], "1m", "1h")
+
+        source = resample.call_args.args[0]
+        self.assertEqual(source.index[0], full.index[-1])
+        self.assertLessEqual(len(source), 160)
+        pd.testing.assert_frame_equal(
+            updated, self.manager.resample_ohlcv(self.data.iloc[:5100], "1m", "1h"), check_freq=False
+        )
+
+    def test_revised_source_bar(self):
+        """測試重新獲取並修正的最後一根源 K 線不會重複累加"""
+        first = self.data.iloc[:100]
+        resampled = self.manager.resample_ohlcv(first, "1m", "1h")
+
+        revised = self.data.iloc[:110].copy()
+        revised.iloc[99, revised.columns.get_loc('volume')] += 5.0
+        updated = self.manager.update_resampled(resampled, revised, "1m", "1h")
+
+        pd.testing.assert_frame_equal(updated, self.manager.resample_ohlcv(revised, "1m", "1h"), check_freq=False)
+
+    def test_no_new_bars(self):
+        """測試沒有新的源數據時返回原序列"""
+        resampled = self.manager.resample_ohlcv(self.data, "1m", "1h")
+        empty = self.data.iloc[:0]
+        self.assertIs(self.manager.update_resampled(resampled, empty, "1m", "1h"), resampled)
+
+
+class TestClosedOnly(unittest.TestCase):
+    """測試只輸出已收盤的 K 線"""
+
+    def setUp(self):
+        self.manager = TimeframeManager()
+        index = pd.date_range("2024-01-01 00:00", periods=150, freq="1min", tz="UTC")
+        self.data = pd.DataFrame({
+            'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 1.0
+        }, index=index)
+
+    def test_drops_unclosed_bar(self):
+        """測試最後一根未收盤的 K 線被丟棄"""
+        result = self.manager.resample_ohlcv(self.data, "1m", "1h", closed_only=True)
+        self.assertEqual(list(result.index.hour), [0, 1])
+        self.assertEqual(len(self.manager.resample_ohlcv(self.data, "1m", "1h")), 3)
+
+    def test_keeps_bar_closed_by_last_source_bar(self):
+        """測試最後一根源 K 線是目標 K 線的最後一分鐘時保留"""
+        result = self.manager.resample_ohlcv(self.data.iloc[:120], "1m", "1h", closed_only=True)
+        self.assertEqual(list(result.index.hour), [0, 1])
+
+    def test_week_bar_end(self):
+        """測試週線的收盤時間（週日 24:00）"""
+        label = pd.Timestamp("2024-01-07", tz="UTC")
+        self.assertEqual(self.manager.bar_start(label, "1w"), pd.Timestamp("2024-01-01", tz="UTC"))
+        self.assertEqual(self.manager.bar_end(label, "1w"), pd.Timestamp("2024-01-08", tz="UTC"))
+
+    def test_incremental_closed_only(self):
+        """測試增量更新在 closed_only 模式下不輸出未完成 K 線"""
+        data = _make_minutes(days=3)
+        resampled = None
+        for end in range(500, len(data) + 500, 500):
+            resampled = self.manager.update_resampled(resampled, data.iloc[:end], "1m", "4h", closed_only=True)
+            last_source = data.index[min(end, len(data)) - 1]
+            self.assertLessEqual(
+                self.manager.bar_end(resampled.index[-1], "4h"), last_source + pd.Timedelta(minutes=1)
+            )
+
+        pd.testing.assert_frame_equal(
+            resampled, self.manager.resample_ohlcv(data, "1m", "4h", closed_only=True), check_freq=False
+        )
+
+    def test_incremental_closed_only_appended_bars(self):
+        """測試 closed_only 只傳入新 K 線時從最後一根的結束時間起傳入，落在已收盤 K 線內時報錯"""
+        data = _make_minutes(days=3)
+        resampled = None
+        for end in range(500, len(data) + 500, 500):
+            start = 0 if resampled is None else data.index.searchsorted(
+                self.manager.bar_end(resampled.index[-1], "4h")
+            )
+            resampled = self.manager.update_resampled(
+                resampled, data.iloc[start:end], "1m", "4h", closed_only=True
+            )
+
+        pd.testing.assert_frame_equal(
+            resampled, self.manager.resample_ohlcv(data, "1m", "4h", closed_only=True), check_freq=False
+        )
+        with self.assertRaises(ValueError):
+            self.manager.update_resampled(resampled, data.iloc[-10:], "1m", "4h", closed_only=True)
+
+
+class TestUpdatePartitioned(unittest.TestCase):
+    """測試分區數據集的增量更新"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.store = PartitionedOHLCVStore(root=self.tmp_dir / "binance")
+        self.data = _make_minutes(days=20, start="2024-01-20 00:00")
+        self.manager = TimeframeManager()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _load(self, timeframe: str) -> pd.DataFrame:
+        return self.store.load("BTCUSDT", timeframe)[OHLCV_COLUMNS]
+
+    def test_append_then_update(self):
+        """測試源數據追加後只更新最後的目標分區"""
+        self.store.write("BTCUSDT", "1m", self.data.iloc[:20000])
+        update_partitioned(self.store, "BTCUSDT", "1m", "1h")
+
+        self.store.append("BTCUSDT", "1m", self.data.iloc[20000:])
+        rewritten = update_partitioned(self.store, "BTCUSDT", "1m", "1h")
+
+        self.assertEqual(rewritten, ["2024-02"])
+        pd.testing.assert_frame_equal(
+            self._load("1h"), self.manager.resample_ohlcv(self.data, "1m", "1h"), check_freq=False
+        )
+
+    def test_closed_only(self):
+        """測試 closed_only 的目標數據集不包含未收盤的 K 線"""
+        cut = int(self.data.index.searchsorted(pd.Timestamp("2024-01-31 13:30", tz="UTC")))
+        self.store.write("BTCUSDT", "1m", self.data.iloc[:cut])
+        update_partitioned(self.store, "BTCUSDT", "1m", "4h", closed_only=True)
+        self.assertEqual(self._load("4h").index[-1], pd.Timestamp("2024-01-31 08:00", tz="UTC"))
+
+        self.store.append("BTCUSDT", "1m", self.data.iloc[cut:])
+        update_partitioned(self.store, "BTCUSDT", "1m", "4h", closed_only=True)
+
+        pd.testing.assert_frame_equal(
+            self._load("4h"), self.manager.resample_ohlcv(self.data, "1m", "4h", closed_only=True),
+            check_freq=False
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Lazy Initialization Tests
+
+測試 v0.5 延遲建立：
+- import data.pipeline 不建立全局管道、不匯入永續數據模組與 requests
+- DataPipeline 的永續數據處理器在第一次使用時建立
+- LazyConnectors 只在存取時建立連接器
+- DataConfig 在第一次使用時才偵測路徑
+
+Version: v0.5
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from data.exchanges import BinanceConnector, LazyConnectors
+from data.pipeline import DataPipeline
+from data_config import DataConfig
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestLazyImport(unittest.TestCase):
+    """測試 import 無副作用"""
+
+    def test_import_pipeline_is_lazy(self):
+        """測試 import data.pipeline 不建立全局管道與連接器"""
+        code = (
+            "import json, sys\n"
+            "import data.pipeline as p\n"
+            "from data_config import config\n"
+            "print(json.dumps({\n"
+            "    'pipeline': p._global_pipeline is not None,\n"
+            "    'paths': config._paths is not None,\n"
+            "    'perpetual': 'data.perpetual' in sys.modules,\n"
+            "    'requests': 'requests' in sys.modules,\n"
+            "}))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout
+        state = json.loads(output.strip().splitlines()[-1])
+        self.assertEqual(state, {'pipeline': False, 'paths': False, 'perpetual': False, 'requests': False})
+
+
+class TestLazyComponents(unittest.TestCase):
+    """測試延遲建立的元件"""
+
+    def test_pipeline_handlers_created_on_first_use(self):
+        """測試永續數據處理器在第一次使用時建立並重用"""
+        pipeline = DataPipeline(data_dir=Path("/nonexistent"), enable_validated_cache=False)
+        self.assertNotIn("funding_rate_data", vars(pipeline))
+
+        with mock.patch("data.perpetual.FundingRateData") as factory:
+            handler = pipeline.funding_rate_data
+            self.assertIs(pipeline.funding_rate_data, handler)
+            factory.assert_called_once_with()
+
+    def test_lazy_connectors(self):
+        """測試連接器只在存取時建立"""
+        created = []
+
+        def factory():
+            created.append(1)
+            return mock.Mock(spec=BinanceConnector)
+
+        connectors = LazyConnectors({'binance': factory, 'okx': factory})
+        self.assertIn('okx', connectors)
+        self.assertEqual(list(connectors.keys()), ['binance', 'okx'])
+        self.assertEqual(len(connectors), 2)
+        self.assertEqual(created, [])
+
+        self.assertIs(connectors['binance'], connectors.get('binance'))
+        self.assertEqual(len(created), 1)
+        self.assertEqual(list(connectors.created()), ['binance'])
+        self.assertIsNone(connectors.get('bybit'))
+
+    def test_data_config_detects_paths_on_first_use(self):
+        """測試 DataConfig 在第一次使用時才偵測路徑"""
+        with mock.patch.object(DataConfig, "_detect_paths", return_value={
+            "project": Path("/p"), "ssd": Path("/d"), "data": Path("/d")
+        }) as detect:
+            cfg = DataConfig()
+            detect.assert_not_called()
+            self.assertEqual(cfg.data_root, Path("/d"))
+            self.assertEqual(cfg.historical_data, Path("/d/historical"))
+            detect.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
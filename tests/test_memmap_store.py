@@ -0,0 +1,132 @@
+"""
+Memory-Mapped OHLCV Store Tests
+
+測試 v0.5 記憶體映射數據集：
+- 寫入 / 開啟 / 行數校驗
+- searchsorted 日期切片（零拷貝）
+- 與 load_ohlcv / DataPipeline / portfolio runner 的整合
+- slice_date_range 與原本布林遮罩結果一致
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data.storage import OHLCVStorage, save_ohlcv, load_ohlcv, slice_date_range
+from data.memmap_store import MemmapOHLCV, save_memmap_ohlcv
+from data.pipeline import DataPipeline
+from execution_engine.portfolio_runner import _filter_date_range
+
+
+TEST_CSV = Path("data/raw/BTCUSDT_1h_test.csv")
+
+
+class TestMemmapStore(unittest.TestCase):
+    """測試記憶體映射數據集"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.df = load_ohlcv(str(TEST_CSV))
+        self.path = self.tmp_dir / "raw" / "BTCUSDT_1h.mmap"
+        save_ohlcv(self.df, str(self.path))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_open_and_to_frame(self):
+        """測試開啟數據集並轉換為與 CSV 相同的 DataFrame"""
+        dataset = MemmapOHLCV.open(self.path)
+
+        self.assertEqual(len(dataset), len(self.df))
+        self.assertIsInstance(dataset["close"], np.memmap)
+        pd.testing.assert_frame_equal(dataset.to_frame(), self.df)
+        pd.testing.assert_frame_equal(load_ohlcv(str(self.path)), self.df)
+
+    def test_slice_is_zero_copy(self):
+        """測試日期切片返回共享記憶體的視圖"""
+        dataset = MemmapOHLCV.open(self.path)
+        window = dataset.slice("2023-01-05", "2023-01-10")
+        frame = window.to_frame()
+
+        expected = self.df[(self.df.index >= pd.Timestamp("2023-01-05", tz="UTC")) &
+                           (self.df.index <= pd.Timestamp("2023-01-10", tz="UTC"))]
+        pd.testing.assert_frame_equal(frame, expected)
+
+        self.assertTrue(np.shares_memory(window["close"], dataset["close"]))
+        self.assertTrue(np.shares_memory(frame["close"].to_numpy(), dataset["close"]))
+
+        self.assertEqual(len(dataset.slice("2030-01-01")), 0)
+        self.assertEqual(len(dataset.slice(end="2020-01-01")), 0)
+        self.assertEqual(len(dataset.slice()), len(dataset))
+
+    def test_overwrite_and_validation(self):
+        """測試覆寫數據集與輸入校驗"""
+        save_ohlcv(self.df.iloc[:10], str(self.path))
+        self.assertEqual(len(MemmapOHLCV.open(self.path)), 10)
+        self.assertFalse(self.path.with_name(self.path.name + ".old").exists())
+
+        unsorted = self.df.iloc[::-1].reset_index(drop=True)
+        with self.assertRaises(ValueError):
+            save_memmap_ohlcv(unsorted, self.tmp_dir / "bad.mmap")
+
+        with self.assertRaises(FileNotFoundError):
+            MemmapOHLCV.open(self.tmp_dir / "missing.mmap")
+
+    def test_pipeline_uses_memmap(self):
+        """測試 DataPipeline 快取映射並只轉換所需窗口"""
+        pipeline = DataPipeline(data_dir=self.tmp_dir)
+        df = pipeline._load_ohlcv("BTCUSDT", "1h", start_date="2023-01-05", end_date="2023-01-06")
+
+        self.assertEqual(list(df.columns), ["open", "high", "low", "close", "volume"])
+        self.assertEqual(len(df), 25)
+        self.assertIsInstance(pipeline._cache["BTCUSDT_1h"], MemmapOHLCV)
+
+        stats = pipeline.get_cache_stats()
+        self.assertEqual(stats["count"], 1)
+        self.assertGreater(stats["mapped_mb"], 0)
+
+    def test_migrate_to_mmap(self):
+        """測試 CSV 遷移為記憶體映射數據集"""
+        raw_dir = self.tmp_dir / "migrate"
+        raw_dir.mkdir()
+        shutil.copy(TEST_CSV, raw_dir / "BTCUSDT_1h.csv")
+
+        results = OHLCVStorage(self.tmp_dir).migrate_to_binary(directories=[raw_dir], file_format="mmap")
+        self.assertEqual(results[0]["status"], "migrated")
+        self.assertEqual(len(MemmapOHLCV.open(raw_dir / "BTCUSDT_1h.mmap")), len(self.df))
+
+
+class TestSliceDateRange(unittest.TestCase):
+    """測試 searchsorted 日期切片"""
+
+    def setUp(self):
+        self.df = load_ohlcv(str(TEST_CSV))
+
+    def test_matches_boolean_mask(self):
+        """測試與布林遮罩結果一致（兩端包含，無時區日期視為 UTC）"""
+        start, end = "2023-01-03 05:00", "2023-01-20"
+        expected = self.df[(self.df.index >= pd.Timestamp(start, tz="UTC")) &
+                           (self.df.index <= pd.Timestamp(end, tz="UTC"))]
+
+        pd.testing.assert_frame_equal(slice_date_range(self.df, start, end), expected)
+        pd.testing.assert_frame_equal(_filter_date_range(self.df, start, end), expected)
+        self.assertIs(slice_date_range(self.df), self.df)
+
+    def test_naive_index_and_unsorted_fallback(self):
+        """測試無時區索引與未排序索引"""
+        naive = self.df.tz_localize(None)
+        self.assertEqual(len(slice_date_range(naive, "2023-01-02", "2023-01-02 23:00")), 24)
+
+        shuffled = self.df.iloc[::-1]
+        result = slice_date_range(shuffled, "2023-01-02", "2023-01-02 23:00")
+        self.assertEqual(len(result), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
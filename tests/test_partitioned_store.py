@@ -0,0 +1,139 @@
+"""
+Partitioned OHLCV Store Tests
+
+測試 v0.5 按時間分區的歷史數據：
+- 按月 / 按年分區寫入與 manifest
+- 分區裁剪（只開啟相關分區）
+- 追加只重寫受影響的分區
+- OHLCVStorage / DataPipeline 整合
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data.storage import OHLCVStorage, load_ohlcv
+from data.partitioned_store import PartitionedOHLCVStore
+from data.pipeline import DataPipeline
+
+
+def _make_ohlcv(start: str, periods: int, freq: str = "6h") -> pd.DataFrame:
+    """生成跨多個月份的 OHLCV 測試數據"""
+    index = pd.date_range(start, periods=periods, freq=freq, tz="UTC", name="datetime")
+    close = 100 + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        "timestamp": (index - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1),
+        "open": close - 0.5,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": np.full(periods, 10.0),
+    }, index=index)
+
+
+class TestPartitionedStore(unittest.TestCase):
+    """測試分區存儲"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.root = self.tmp_dir / "historical" / "binance"
+        self.store = PartitionedOHLCVStore(root=self.root)
+        # 2023-11-01 起 6 小時一根，共 4 個月
+        self.df = _make_ohlcv("2023-11-01", 4 * 31 * 4)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_write_and_manifest(self):
+        """測試按月分區與 manifest 時間範圍"""
+        manifest = self.store.write("BTCUSDT", "6h", self.df)
+
+        keys = [p["key"] for p in manifest["partitions"]]
+        self.assertEqual(keys, ["2023-11", "2023-12", "2024-01", "2024-02", "2024-03"])
+        self.assertEqual(sum(p["rows"] for p in manifest["partitions"]), len(self.df))
+        for partition in manifest["partitions"]:
+            self.assertLessEqual(partition["start"], partition["end"])
+            self.assertTrue((self.root / "BTCUSDT" / "6h" / partition["file"]).exists())
+
+        pd.testing.assert_frame_equal(self.store.load("BTCUSDT", "6h"), self.df, check_freq=False)
+
+        yearly = self.store.write("BTCUSDT", "6h", self.df, granularity="year")
+        self.assertEqual([p["key"] for p in yearly["partitions"]], ["2023", "2024"])
+        # 舊的按月分區文件已刪除
+        self.assertEqual(len(list((self.root / "BTCUSDT" / "6h").glob("*.parquet"))), 2)
+
+    def test_partition_pruning(self):
+        """測試只開啟與日期範圍重疊的分區"""
+        self.store.write("BTCUSDT", "6h", self.df)
+
+        selected = self.store.partitions("BTCUSDT", "6h", "2024-01-10", "2024-02-05")
+        self.assertEqual([p["key"] for p in selected], ["2024-01", "2024-02"])
+
+        with mock.patch("data.partitioned_store.pd.read_parquet", wraps=pd.read_parquet) as reader:
+            df = self.store.load("BTCUSDT", "6h", start_date="2024-01-10", end_date="2024-02-05")
+        self.assertEqual(reader.call_count, 2)
+
+        expected = self.df[(self.df.index >= pd.Timestamp("2024-01-10", tz="UTC")) &
+                           (self.df.index <= pd.Timestamp("2024-02-05", tz="UTC"))]
+        pd.testing.assert_frame_equal(df, expected, check_freq=False)
+
+        empty = self.store.load("BTCUSDT", "6h", start_date="2030-01-01")
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(list(empty.columns), list(self.df.columns))
+
+    def test_append_rewrites_latest_partition_only(self):
+        """測試追加只重寫受影響的分區"""
+        self.store.write("BTCUSDT", "6h", self.df.iloc[:-10])
+        before = {p["key"]: p for p in self.store.read_manifest("BTCUSDT", "6h")["partitions"]}
+
+        # 最後 10 根加上 1 根重複（價格更新）
+        update = self.df.iloc[-11:].copy()
+        update.loc[update.index[0], "close"] = 999.0
+
+        with mock.patch.object(self.store, "_write_partition", wraps=self.store._write_partition) as writer:
+            rewritten = self.store.append("BTCUSDT", "6h", update)
+
+        self.assertEqual(rewritten, ["2024-03"])
+        self.assertEqual(writer.call_count, 1)
+
+        after = {p["key"]: p for p in self.store.read_manifest("BTCUSDT", "6h")["partitions"]}
+        self.assertEqual(after["2024-01"], before["2024-01"])
+        self.assertEqual(after["2024-03"]["rows"], before["2024-03"]["rows"] + 10)
+
+        loaded = self.store.load("BTCUSDT", "6h")
+        self.assertEqual(len(loaded), len(self.df))
+        self.assertEqual(loaded["close"].iloc[-11], 999.0)
+
+    def test_storage_and_pipeline_integration(self):
+        """測試 OHLCVStorage 與 DataPipeline 優先使用分區數據"""
+        self.store.import_file("BTCUSDT", "1h", "data/raw/BTCUSDT_1h_test.csv")
+        csv_df = load_ohlcv("data/raw/BTCUSDT_1h_test.csv")
+
+        storage = OHLCVStorage(data_dir=self.tmp_dir)
+        df = storage.load_symbol_data("BTCUSDT", "1h", start_date="2023-01-05", end_date="2023-01-06")
+        self.assertEqual(len(df), 25)
+        np.testing.assert_array_equal(df["close"].values, csv_df.loc["2023-01-05":"2023-01-06 00:00", "close"].values)
+
+        pipeline = DataPipeline(data_dir=self.tmp_dir)
+        ohlcv = pipeline._load_ohlcv("BTCUSDT", "1h", start_date="2023-01-05", end_date="2023-01-06")
+        self.assertEqual(list(ohlcv.columns), ["open", "high", "low", "close", "volume"])
+        self.assertEqual(len(ohlcv), 25)
+        self.assertIn("BTCUSDT_1h_2023-01-05_2023-01-06", pipeline._cache)
+
+    def test_invalid_granularity(self):
+        """測試無效的分區粒度"""
+        with self.assertRaises(ValueError):
+            PartitionedOHLCVStore(root=self.root, granularity="week")
+        with self.assertRaises(FileNotFoundError):
+            self.store.read_manifest("ETHUSDT", "1h")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+"""
+Concurrent Strategy Data Loading Tests
+
+測試 v0.5 DataPipeline.load_strategy_data_concurrent：
+- 各數據源並行載入（延遲重疊）
+- 與順序載入相同的 required / optional 語義
+- 各數據源 / 整體超時
+
+以及多交易對並行載入、並行預載入與背景預取（DataPrefetcher）
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from data.pipeline import DataPipeline
+from data.prefetch import PrefetchRequest
+from data.storage import load_ohlcv, save_ohlcv
+from strategies.api_v2 import DataRequirement, DataSource
+
+
+TEST_CSV = Path("data/raw/BTCUSDT_1h_test.csv")
+
+PERPETUAL_LOADERS = {
+    DataSource.FUNDING_RATE: "_load_funding_rate",
+    DataSource.OPEN_INTEREST: "_load_open_interest",
+    DataSource.BASIS: "_load_basis",
+    DataSource.LIQUIDATIONS: "_load_liquidations",
+    DataSource.LONG_SHORT_RATIO: "_load_long_short_ratio",
+}
+
+
+class _Strategy:
+    """只提供數據需求的策略"""
+
+    def __init__(self, requirements):
+        self.requirements = requirements
+
+    def get_data_requirements(self):
+        return self.requirements
+
+
+def _slow_loader(delay, value=None, error=None):
+    def load(symbol, timeframe, start_date=None, end_date=None):
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return value
+    return load
+
+
+class TestConcurrentLoad(unittest.TestCase):
+    """測試並行載入策略數據"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        save_ohlcv(load_ohlcv(str(TEST_CSV)), str(self.tmp_dir / "raw" / "BTCUSDT_1h.parquet"))
+        self.pipeline = DataPipeline(data_dir=self.tmp_dir, enable_validated_cache=False)
+        self.frame = pd.DataFrame({"value": [1.0, 2.0]})
+
+        # 品質檢查與本測試無關
+        for name in ("check_funding_rate", "check_open_interest"):
+            patcher = mock.patch.object(self.pipeline.quality_controller, name)
+            patcher.start().return_value.passed = True
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _patch_loaders(self, loaders):
+        for source, loader in loaders.items():
+            patcher = mock.patch.object(self.pipeline, PERPETUAL_LOADERS[source], side_effect=loader)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_sources_load_in_parallel(self):
+        """測試六個數據源的延遲互相重疊，結果與順序載入一致"""
+        self._patch_loaders({source: _slow_loader(0.2, self.frame) for source in PERPETUAL_LOADERS})
+        strategy = _Strategy([DataRequirement(DataSource.OHLCV)] +
+                             [DataRequirement(source) for source in PERPETUAL_LOADERS])
+
+        started = time.perf_counter()
+        result = self.pipeline.load_strategy_data_concurrent(strategy, "BTCUSDT", "1h")
+        elapsed = time.perf_counter() - started
+
+        self.assertTrue(result.success, result.error)
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(
+            list(result.data),
+            ["ohlcv", "funding_rate", "open_interest", "basis", "liquidations", "long_short_ratio"]
+        )
+        self.assertEqual(set(result.metadata["load_seconds"]), set(result.data))
+
+        sequential = self.pipeline.load_strategy_data(strategy, "BTCUSDT", "1h")
+        self.assertTrue(sequential.success, sequential.error)
+        self.assertEqual(list(sequential.data), list(result.data))
+        self.assertEqual(sequential.metadata["rows"], result.metadata["rows"])
+        pd.testing.assert_frame_equal(sequential.data["ohlcv"], result.data["ohlcv"])
+
+    def test_required_and_optional_semantics(self):
+        """測試缺失 / 出錯的必要與可選數據源"""
+        self._patch_loaders({
+            DataSource.FUNDING_RATE: _slow_loader(0.0, None),
+            DataSource.BASIS: _slow_loader(0.0, error=RuntimeError("disk error")),
+            DataSource.OPEN_INTEREST: _slow_loader(0.0, None),
+        })
+
+        optional = _Strategy([
+            DataRequirement(DataSource.OHLCV),
+            DataRequirement(DataSource.FUNDING_RATE, required=False),
+            DataRequirement(DataSource.BASIS, required=False),
+            DataRequirement(DataSource.VOLUME_PROFILE, required=False),
+        ])
+        for load in (self.pipeline.load_strategy_data, self.pipeline.load_strategy_data_concurrent):
+            result = load(optional, "BTCUSDT", "1h")
+            self.assertTrue(result.success)
+            self.assertEqual(result.warnings, [
+                "Optional funding rate data not found for BTCUSDT",
+                "Error loading optional basis: disk error",
+                "Data source volume_profile not supported yet, skipping",
+            ])
+
+        required = _Strategy([
+            DataRequirement(DataSource.OHLCV),
+            DataRequirement(DataSource.OPEN_INTEREST),
+            DataRequirement(DataSource.BASIS),
+        ])
+        for load in (self.pipeline.load_strategy_data, self.pipeline.load_strategy_data_concurrent):
+            result = load(required, "BTCUSDT", "1h")
+            self.assertFalse(result.success)
+            self.assertEqual(result.error, "Required open interest data not found for BTCUSDT")
+
+        result = self.pipeline.load_strategy_data_concurrent(required, "INVALID", "1h")
+        self.assertEqual(result.error, "Invalid symbol: INVALID")
+
+    def test_timeouts(self):
+        """測試數據源超時：可選記為警告、必要使整體失敗"""
+        self._patch_loaders({
+            DataSource.LIQUIDATIONS: _slow_loader(1.0, self.frame),
+            DataSource.FUNDING_RATE: _slow_loader(0.0, self.frame),
+        })
+        strategy = _Strategy([
+            DataRequirement(DataSource.OHLCV),
+            DataRequirement(DataSource.LIQUIDATIONS, required=False),
+            DataRequirement(DataSource.FUNDING_RATE),
+        ])
+
+        started = time.perf_counter()
+        result = self.pipeline.load_strategy_data_concurrent(
+            strategy, "BTCUSDT", "1h", source_timeouts={DataSource.LIQUIDATIONS: 0.1}
+        )
+        self.assertLess(time.perf_counter() - started, 0.8)
+        self.assertTrue(result.success)
+        self.assertEqual(list(result.data), ["ohlcv", "funding_rate"])
+        self.assertTrue(result.warnings[0].startswith("Error loading optional liquidations: timed out"))
+
+        strategy.requirements[1] = DataRequirement(DataSource.LIQUIDATIONS)
+        result = self.pipeline.load_strategy_data_concurrent(strategy, "BTCUSDT", "1h", timeout=0.1)
+        self.assertFalse(result.success)
+        self.assertTrue(result.error.startswith("Error loading liquidations: timed out"))
+
+
+class TestParallelSymbolsAndPrefetch(unittest.TestCase):
+    """測試多交易對並行載入與背景預取"""
+
+    SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT"]
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        df = load_ohlcv(str(TEST_CSV))
+        for symbol in self.SYMBOLS:
+            save_ohlcv(df, str(self.tmp_dir / "raw" / f"{symbol}_1h.parquet"))
+        self.pipeline = DataPipeline(data_dir=self.tmp_dir, enable_validated_cache=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _slow_ohlcv(self, delay):
+        load = self.pipeline._load_ohlcv
+
+        def slow(*args, **kwargs):
+            time.sleep(delay)
+            return load(*args, **kwargs)
+
+        patcher = mock.patch.object(self.pipeline, "_load_ohlcv", side_effect=slow)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parallel_multiple_symbols_and_preload(self):
+        """測試多交易對與預載入並行執行且結果順序不變"""
+        self._slow_ohlcv(0.2)
+        strategy = _Strategy([DataRequirement(DataSource.OHLCV)])
+        symbols = self.SYMBOLS + ["XRPUSDT"]
+
+        started = time.perf_counter()
+        results = self.pipeline.load_multiple_symbols(strategy, symbols, "1h", max_workers=5)
+        self.assertLess(time.perf_counter() - started, 0.6)
+        self.assertEqual(list(results), symbols)
+        self.assertEqual([r.success for r in results.values()], [True] * 4 + [False])
+
+        self.pipeline.clear_cache()
+        started = time.perf_counter()
+        self.assertEqual(self.pipeline.preload_data(self.SYMBOLS, ["1h", "4h"], max_workers=8), (4, 4))
+        self.assertLess(time.perf_counter() - started, 0.6)
+        self.assertEqual(self.pipeline.get_cache_stats()["count"], 4)
+
+    def test_prefetch_overlaps_processing(self):
+        """測試處理當前數據集時後續數據集已在背景載入"""
+        self._slow_ohlcv(0.15)
+        schedule = [(symbol, "1h") for symbol in self.SYMBOLS]
+        schedule.append(PrefetchRequest("XRPUSDT", "1h", "2023-01-01", "2023-01-05"))
+
+        delivered = []
+        started = time.perf_counter()
+        with self.pipeline.prefetch(schedule, depth=2) as prefetcher:
+            for request, df in prefetcher:
+                delivered.append((request.symbol, df is not None))
+                time.sleep(0.15)  # 模擬回測
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(delivered, [(s, True) for s in self.SYMBOLS] + [("XRPUSDT", False)])
+        # 順序執行約為 5 * 0.3 秒
+        self.assertLess(elapsed, 1.2)
+        stats = prefetcher.stats()
+        self.assertEqual(stats["delivered"], 5)
+        self.assertGreaterEqual(stats["ready"], 3)
+
+    def test_prefetch_custom_loader_and_early_exit(self):
+        """測試自訂載入函數、載入錯誤與提前結束"""
+        calls = []
+
+        def loader(request):
+            calls.append(request.symbol)
+            if request.symbol == "ETHUSDT":
+                raise RuntimeError("boom")
+            return request.symbol
+
+        with self.pipeline.prefetch([(s, "1h") for s in self.SYMBOLS], depth=1, loader=loader) as prefetcher:
+            self.assertEqual(next(prefetcher)[1], "BTCUSDT")
+            self.assertIsNone(next(prefetcher)[1])
+        time.sleep(0.05)
+
+        # 提前結束後不再提交新的預取
+        self.assertLessEqual(len(calls), 3)
+        self.assertEqual(list(prefetcher), [])
+
+        with self.assertRaises(ValueError):
+            self.pipeline.prefetch([], depth=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Tests for indexed PortfolioResult queries
+
+Design Reference: execution_engine/portfolio_runner.py (PortfolioResult)
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath("."))
+
+import numpy as np
+
+from execution_engine.portfolio_runner import RunConfig, SingleRunResult, PortfolioResult
+
+
+class _FakeBacktestResult:
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+
+def _make_run(i, strategy, symbol, timeframe, total_return=None, success=True):
+    config = RunConfig(strategy=strategy, symbol=symbol, timeframe=timeframe,
+                       initial_cash=10000 + i)
+    common = dict(strategy=strategy, symbol=symbol, timeframe=timeframe, config=config)
+    if not success:
+        return SingleRunResult(success=False, error=f"error {i}", **common)
+    metrics = {"num_trades": i}
+    if total_return is not None:
+        metrics["total_return"] = total_return
+    return SingleRunResult(success=True, backtest_result=_FakeBacktestResult(metrics),
+                           execution_time=0.1, **common)
+
+
+def _make_result(n=200, seed=0):
+    rng = np.random.RandomState(seed)
+    runs = []
+    for i in range(n):
+        strategy = ["sma", "kawamoku", "breakout"][i % 3]
+        symbol = ["BTCUSDT", "ETHUSDT"][i % 2]
+        timeframe = ["1h", "4h", "1d", "15m"][i % 4]
+        success = i % 7 != 0
+        # 大量重複值，用來驗證並列時的排序穩定性
+        total_return = float(rng.randint(0, 10)) / 10 if i % 11 else None
+        runs.append(_make_run(i, strategy, symbol, timeframe, total_return, success))
+    return PortfolioResult(runs=runs)
+
+
+def _reference_best(result, metric, n):
+    successful = [r for r in result.runs if r.success]
+    return sorted(successful, key=lambda r: r.get_metric(metric, float('-inf')), reverse=True)[:n]
+
+
+def _reference_worst(result, metric, n):
+    successful = [r for r in result.runs if r.success]
+    return sorted(successful, key=lambda r: r.get_metric(metric, float('inf')))[:n]
+
+
+def test_best_and_worst_match_stable_sort():
+    """Test argpartition ranking matches the stable sort it replaces"""
+    result = _make_result()
+
+    for n in (1, 3, 10, 50, 171, 500):
+        assert result.get_best_by("total_return", n) == _reference_best(result, "total_return", n), n
+        assert result.get_worst_by("total_return", n) == _reference_worst(result, "total_return", n), n
+
+    assert result.get_best_by("total_return", 0) == []
+    assert PortfolioResult(runs=[]).get_best_by("total_return", 5) == []
+
+    print("OK test_best_and_worst_match_stable_sort passed")
+
+
+def test_hash_index_queries():
+    """Test strategy / symbol / timeframe lookups keep input order"""
+    result = _make_result()
+
+    assert result.get_by_strategy("sma") == [r for r in result.runs if r.strategy == "sma"]
+    assert result.get_by_symbol("ETHUSDT") == [r for r in result.runs if r.symbol == "ETHUSDT"]
+    assert result.get_by_timeframe("4h") == [r for r in result.runs if r.timeframe == "4h"]
+    assert result.get_by_strategy("unknown") == []
+
+    combined = result.get_by(strategy="kawamoku", symbol="BTCUSDT", timeframe="1h")
+    expected = [
+        r for r in result.runs
+        if r.strategy == "kawamoku" and r.symbol == "BTCUSDT" and r.timeframe == "1h"
+    ]
+    assert combined == expected
+    assert result.get_by() == result.runs
+
+    assert result.count_successful() == sum(r.success for r in result.runs)
+    assert result.count_failed() == sum(not r.success for r in result.runs)
+    assert result.get_failed_runs() == [r for r in result.runs if not r.success]
+
+    print("OK test_hash_index_queries passed")
+
+
+def test_metric_column_and_dataframe_cache():
+    """Test columnar metric access and cached DataFrame copies"""
+    result = _make_result(n=30)
+
+    column = result.get_metric_column("total_return", successful_only=False)
+    assert len(column) == 30
+    assert np.isnan(column[0])  # 失敗的回測
+    assert len(result.get_metric_column("total_return")) == result.count_successful()
+
+    df = result.to_dataframe()
+    assert len(df) == result.count_successful()
+    df.loc[:, "strategy"] = "modified"
+    assert (result.to_dataframe()["strategy"] != "modified").all(), "Cached DataFrame should not be mutated"
+    assert len(result.to_dataframe(include_failed=True)) == 30
+
+    print("OK test_metric_column_and_dataframe_cache passed")
+
+
+def test_index_rebuilt_after_append():
+    """Test the index tracks changes to runs"""
+    result = _make_result(n=20)
+    assert result.count_successful() == 17
+    best_before = result.get_best_by("total_return")[0]
+
+    result.runs.append(_make_run(99, "sma", "SOLUSDT", "1h", total_return=100.0))
+    assert result.count_successful() == 18
+    assert result.get_by_symbol("SOLUSDT")[0].config.initial_cash == 10099
+    assert result.get_best_by("total_return")[0] is result.runs[-1]
+    assert len(result.to_dataframe()) == 18
+
+    # 原地替換需要手動清除索引
+    result.runs[-1] = best_before
+    result.invalidate_index()
+    assert result.get_by_symbol("SOLUSDT") == []
+
+    print("OK test_index_rebuilt_after_append passed")
+
+
+if __name__ == "__main__":
+    print("Running PortfolioResult Index Tests...")
+    print("=" * 60)
+
+    test_best_and_worst_match_stable_sort()
+    test_hash_index_queries()
+    test_metric_column_and_dataframe_cache()
+    test_index_rebuilt_after_append()
+
+    print("\n" + "=" * 60)
+    print("SUCCESS All PortfolioResult Index tests passed!")
+    print("=" * 60)
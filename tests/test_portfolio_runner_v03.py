@@ -9,7 +9,7 @@ import os
 sys.path.append(os.path.abspath("."))
 
 from execution_engine.portfolio_runner import (
-    RunConfig, SingleRunResult, PortfolioResult, run_portfolio,
+    RunConfig, SingleRunResult, PortfolioResult, run_portfolio, run_portfolio_batches,
     load_configs_from_yaml, _build_position_sizer
 )
 from backtest.position_sizer import AllInSizer, FixedCashSizer, PercentOfEquitySizer
@@ -116,6 +116,49 @@ def test_run_portfolio_with_failures():
     print("OK test_run_portfolio_with_failures passed")
 
 
+def test_run_portfolio_batches():
+    """Test batched execution pulls configs lazily and keeps input order"""
+    from unittest import mock
+    import execution_engine.portfolio_runner as portfolio_runner
+
+    pulled = []
+
+    def generate():
+        for cash in [10000, 20000, 30000, 40000, 50000]:
+            pulled.append(cash)
+            yield RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test", initial_cash=cash)
+
+    batch_sizes = []
+
+    def run_batch(configs, **kwargs):
+        # 執行批次時生成器只被取到當前批次為止
+        assert len(pulled) == len(batch_sizes) * 2 + len(configs)
+        batch_sizes.append(len(configs))
+        return run_portfolio(configs, **kwargs)
+
+    with mock.patch.object(portfolio_runner, "run_portfolio", side_effect=run_batch):
+        result = run_portfolio_batches(generate(), batch_size=2)
+
+    assert batch_sizes == [2, 2, 1], f"Should run batches of 2, 2, 1, got {batch_sizes}"
+    assert [r.config.initial_cash for r in result] == [10000, 20000, 30000, 40000, 50000]
+    assert result.count_successful() == 5
+
+    failing = [
+        RunConfig(strategy="invalid_strategy", symbol="BTCUSDT", timeframe="1h_test"),
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test"),
+    ]
+    result = run_portfolio_batches(iter(failing), batch_size=1, fail_fast=True)
+    assert len(result) == 1, "fail_fast should stop before the next batch"
+
+    try:
+        run_portfolio_batches(iter([]))
+        assert False, "Should raise ValueError for empty configs"
+    except ValueError:
+        pass
+
+    print("OK test_run_portfolio_batches passed")
+
+
 # === Result Object Tests (4 tests) ===
 
 def test_portfolio_result_to_dataframe():
@@ -350,12 +393,13 @@ if __name__ == "__main__":
     print("=" * 60)
 
     try:
-        # Core tests (5)
+        # Core tests (6)
         test_run_single_backtest_success()
         test_run_single_backtest_strategy_not_found()
         test_run_single_backtest_data_not_found()
         test_run_multiple_backtests()
         test_run_portfolio_with_failures()
+        test_run_portfolio_batches()
 
         # Result object tests (4)
         test_portfolio_result_to_dataframe()
@@ -369,7 +413,7 @@ if __name__ == "__main__":
         test_position_sizer_config()
 
         print("\n" + "=" * 60)
-        print("SUCCESS All 12 Portfolio Runner tests passed!")
+        print("SUCCESS All 13 Portfolio Runner tests passed!")
         print("=" * 60)
 
     except AssertionError as e:
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Tests for Portfolio Scheduler v0.5
+
+成本模型、LPT 排程、進度追蹤，以及 run_portfolio 的並行執行
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.abspath("."))
+
+from execution_engine.portfolio_runner import RunConfig, run_portfolio
+from execution_engine.scheduler import (
+    CostModel, PortfolioProgress, schedule_configs
+)
+
+
+def test_cost_model_estimate_bars_from_date_range():
+    """Test bar estimation from start/end"""
+    model = CostModel()
+    config_1h = RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h",
+                          start="2024-01-01", end="2024-01-02")
+    config_1m = RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1m",
+                          start="2024-01-01", end="2024-01-02")
+
+    assert model.estimate_bars(config_1h) == 24
+    assert model.estimate_bars(config_1m) == 1440
+    assert model.estimate_cost(config_1m) > model.estimate_cost(config_1h)
+
+    print("OK test_cost_model_estimate_bars_from_date_range passed")
+
+
+def test_cost_model_record_and_persist():
+    """Test cost history recording and JSON persistence"""
+    model = CostModel()
+    result = run_portfolio(
+        [RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test")],
+        cost_model=model
+    )
+    assert result[0].success
+
+    bars = len(result[0].backtest_result.equity_curve)
+    expected = result[0].execution_time / bars
+    assert abs(model.seconds_per_bar("simple_sma") - expected) < 1e-12
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cost_history.json")
+        model.save(path)
+
+        with open(path) as f:
+            assert "simple_sma" in json.load(f)
+
+        restored = CostModel(history_path=path)
+        assert abs(restored.seconds_per_bar("simple_sma") - expected) < 1e-12
+
+    print("OK test_cost_model_record_and_persist passed")
+
+
+def test_schedule_longest_first_grouped_by_dataset():
+    """Test LPT ordering with dataset grouping"""
+    configs = [
+        RunConfig(strategy="simple_sma", symbol="ETHUSDT", timeframe="1d",
+                  start="2024-01-01", end="2024-02-01"),
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1m",
+                  start="2024-01-01", end="2024-01-02"),
+        RunConfig(strategy="simple_sma", symbol="ETHUSDT", timeframe="1d",
+                  start="2024-01-01", end="2024-12-01"),
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1m",
+                  start="2024-01-01", end="2024-01-10"),
+    ]
+
+    order = schedule_configs(configs, CostModel())
+
+    # 1m 數據集最長，排在前面；組內按成本降序；相同數據集相鄰
+    assert order == [3, 1, 2, 0], f"Unexpected order: {order}"
+
+    print("OK test_schedule_longest_first_grouped_by_dataset passed")
+
+
+def test_progress_tracking():
+    """Test progress callback, ETA and slowest runs"""
+    configs = [
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test"),
+        RunConfig(strategy="invalid_strategy", symbol="BTCUSDT", timeframe="1h_test"),
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test", leverage=2.0),
+    ]
+    snapshots = []
+
+    def on_progress(progress: PortfolioProgress):
+        snapshots.append(progress.snapshot())
+
+    result = run_portfolio(configs, cost_model=CostModel(), progress_callback=on_progress)
+
+    assert len(snapshots) == 3
+    assert [s["completed"] for s in snapshots] == [1, 2, 3]
+    assert snapshots[-1]["failed"] == 1
+    assert snapshots[-1]["remaining"] == 0
+    assert snapshots[-1]["eta"] == 0.0
+
+    # 結果順序與輸入一致
+    assert [r.strategy for r in result] == [c.strategy for c in configs]
+    assert not result[1].success
+
+    progress = PortfolioProgress(total=2)
+    progress.update(result[0])
+    progress.update(result[2])
+    slowest = progress.slowest_runs(1)
+    assert slowest[0].execution_time == max(result[0].execution_time, result[2].execution_time)
+
+    print("OK test_progress_tracking passed")
+
+
+def test_run_portfolio_parallel():
+    """Test parallel execution keeps input order"""
+    configs = [
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test"),
+        RunConfig(strategy="invalid_strategy", symbol="BTCUSDT", timeframe="1h_test"),
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test", initial_cash=20000),
+    ]
+
+    result = run_portfolio(configs, max_workers=2, cost_model=CostModel())
+
+    assert len(result) == 3
+    assert result.count_successful() == 2
+    assert [r.config.initial_cash for r in result] == [10000.0, 10000.0, 20000.0]
+    assert not result[1].success
+
+    print("OK test_run_portfolio_parallel passed")
+
+
+def test_run_portfolio_invalid_workers():
+    """Test max_workers validation"""
+    config = RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test")
+    try:
+        run_portfolio([config], max_workers=0)
+        assert False, "Should raise ValueError for max_workers < 1"
+    except ValueError as e:
+        assert "max_workers" in str(e)
+
+    print("OK test_run_portfolio_invalid_workers passed")
+
+
+if __name__ == "__main__":
+    print("Running Portfolio Scheduler Tests...")
+    print("=" * 60)
+
+    test_cost_model_estimate_bars_from_date_range()
+    test_cost_model_record_and_persist()
+    test_schedule_longest_first_grouped_by_dataset()
+    test_progress_tracking()
+    test_run_portfolio_parallel()
+    test_run_portfolio_invalid_workers()
+
+    print("\n" + "=" * 60)
+    print("SUCCESS All Portfolio Scheduler tests passed!")
+    print("=" * 60)
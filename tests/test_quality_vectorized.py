@@ -0,0 +1,151 @@
+"""
+Vectorized Quality Check Tests
+
+測試 v0.5 向量化的 check_ohlcv：
+- 與逐列 pandas 篩選的結果一致（問題順序、數量、受影響行）
+- AffectedRows 緊湊儲存（區段 / 位圖）
+- 抽樣模式
+
+Version: v0.5
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data.quality import AffectedRows, DataQualityController, IssueSeverity
+
+
+def _frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=rows, freq="h", tz="UTC")
+    close = 100 + np.cumsum(rng.normal(0, 0.5, rows))
+    open_ = close + rng.normal(0, 0.2, rows)
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + 0.5,
+        "low": np.minimum(open_, close) - 0.5,
+        "close": close,
+        "volume": rng.uniform(1, 10, rows),
+    }, index=index)
+
+
+def _broken_frame() -> pd.DataFrame:
+    df = _frame(500)
+    df.iloc[3, df.columns.get_loc("high")] = 0.0
+    df.iloc[10:14, df.columns.get_loc("close")] = np.nan
+    df.iloc[20, df.columns.get_loc("volume")] = np.nan
+    df.iloc[30, df.columns.get_loc("low")] = -1.0
+    df.iloc[40, df.columns.get_loc("open")] = 10_000.0
+    return df.drop(df.index[[100, 101, 250]])
+
+
+def _reference_issues(df: pd.DataFrame, multiplier: float) -> list:
+    """逐列 pandas 篩選的參考實現（category, 受影響行標籤）"""
+    issues = []
+    cols = ["open", "high", "low", "close", "volume"]
+    for col in cols:
+        issues.append(("missing_data", df[df[col].isnull()].index.tolist()))
+    for mask in (df["high"] < df["low"], df["high"] < df["open"], df["high"] < df["close"],
+                 df["low"] > df["open"], df["low"] > df["close"]):
+        issues.append(("price_logic", df[mask].index.tolist()))
+    for col in cols:
+        issues.append(("negative_value", df[df[col] < 0].index.tolist()))
+    for col in cols[:4]:
+        issues.append(("zero_value", df[df[col] == 0].index.tolist()))
+    for col in cols[:4]:
+        q1, q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+        iqr = q3 - q1
+        mask = (df[col] < q1 - multiplier * iqr) | (df[col] > q3 + multiplier * iqr)
+        issues.append(("outlier", df[mask].index.tolist()))
+    return [issue for issue in issues if issue[1]]
+
+
+class TestAffectedRows(unittest.TestCase):
+    """測試 AffectedRows"""
+
+    def test_ranges_and_bitmap(self):
+        """測試區段與位圖兩種表示展開結果一致"""
+        index = pd.date_range("2024-01-01", periods=1000, freq="min")
+
+        contiguous = np.zeros(1000, dtype=bool)
+        contiguous[100:400] = True
+        rows = AffectedRows(contiguous, index)
+        self.assertEqual(len(rows), 300)
+        self.assertEqual(rows.ranges().tolist(), [[100, 400]])
+        self.assertEqual(rows.nbytes, 16)
+        self.assertEqual(rows.tolist(), index[100:400].tolist())
+
+        scattered = np.zeros(1000, dtype=bool)
+        scattered[::3] = True
+        rows = AffectedRows(scattered, index)
+        self.assertEqual(rows.nbytes, 125)
+        np.testing.assert_array_equal(rows.positions(), np.arange(0, 1000, 3))
+        np.testing.assert_array_equal(rows.mask(), scattered)
+        self.assertEqual(len(rows.ranges()), 334)
+        self.assertEqual(rows, index[::3].tolist())
+
+        empty = AffectedRows(np.zeros(10, dtype=bool), index[:10])
+        self.assertFalse(empty)
+        self.assertEqual(empty.tolist(), [])
+
+
+class TestVectorizedCheck(unittest.TestCase):
+    """測試向量化 check_ohlcv"""
+
+    def test_matches_reference(self):
+        """測試與逐列 pandas 篩選結果一致"""
+        df = _broken_frame()
+        controller = DataQualityController()
+        result = controller.check_ohlcv(df)
+
+        row_issues = [issue for issue in result.issues if issue.category != "time_gap"]
+        expected = _reference_issues(df, controller.OUTLIER_MULTIPLIER)
+        self.assertEqual(
+            [(issue.category, issue.affected_rows.tolist()) for issue in row_issues],
+            expected
+        )
+
+        self.assertFalse(result.passed)
+        self.assertEqual(result.issues[-1].category, "time_gap")
+        volume = [i for i in row_issues if i.category == "missing_data" and i.affected_columns == ["volume"]]
+        self.assertEqual(volume[0].severity, IssueSeverity.WARNING)
+        self.assertEqual(volume[0].metadata["null_count"], 1)
+        self.assertFalse(result.metadata["sampled"])
+
+    def test_clean_and_non_numeric(self):
+        """測試乾淨數據與全 NaN 欄位"""
+        self.assertEqual(DataQualityController().check_ohlcv(_frame(200)).issues, [])
+
+        df = _frame(50)
+        df["open"] = None
+        result = DataQualityController().check_ohlcv(df)
+        self.assertEqual([i.category for i in result.issues], ["missing_data"])
+        self.assertEqual(len(result.issues[0].affected_rows), 50)
+
+    def test_sampled_mode(self):
+        """測試抽樣模式只檢查部分行，時間缺口仍檢查全部"""
+        df = _frame(10_000)
+        df.iloc[0, df.columns.get_loc("high")] = 0.0
+        df = df.drop(df.index[5000:5003])
+
+        controller = DataQualityController(sample_size=1000)
+        self.assertEqual(controller.settings()["sample_size"], 1000)
+        result = controller.check_ohlcv(df)
+
+        self.assertTrue(result.metadata["sampled"])
+        self.assertEqual(result.metadata["checked_rows"], 1000)
+        price = [i for i in result.issues if i.category == "price_logic"]
+        self.assertTrue(price)
+        self.assertIn("(sampled)", price[0].description)
+        self.assertEqual(price[0].affected_rows.tolist(), [df.index[0]])
+        self.assertIn("time_gap", [i.category for i in result.issues])
+
+        # 行數不超過抽樣大小時不抽樣
+        small = DataQualityController(sample_size=1000).check_ohlcv(_frame(500))
+        self.assertFalse(small.metadata["sampled"])
+
+
+if __name__ == "__main__":
+    unittest.main()
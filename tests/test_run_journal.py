@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Tests for the portfolio run journal (resume support)
+
+Design Reference: execution_engine/run_journal.py
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.abspath("."))
+
+import yaml
+from click.testing import CliRunner
+
+from cli.main import cli
+from execution_engine.portfolio_runner import RunConfig, run_portfolio
+from execution_engine.run_journal import RunJournal
+from execution_engine.scheduler import CostModel
+
+
+def _configs():
+    return [
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test"),
+        RunConfig(strategy="invalid_strategy", symbol="BTCUSDT", timeframe="1h_test"),
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test", leverage=2.0),
+    ]
+
+
+def test_journal_records_and_restores():
+    """Test completed runs are journaled and restored with metrics"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sweep.journal.jsonl")
+        configs = _configs()
+
+        original = run_portfolio(configs, journal=RunJournal(path))
+
+        journal = RunJournal(path)
+        assert len(journal) == 3
+        assert journal.is_completed(configs[0])
+        assert not journal.is_completed(configs[1]), "Failed runs are retried by default"
+        assert journal.is_completed(configs[1], retry_failed=False)
+
+        restored = journal.restore(configs[0])
+        assert restored.success
+        assert restored.config is configs[0]
+        assert restored.get_metrics() == original[0].get_metrics()
+        assert restored.timestamp == original[0].timestamp
+
+    print("OK test_journal_records_and_restores passed")
+
+
+def test_resume_skips_completed_runs():
+    """Test resume only runs missing configs and keeps input order"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sweep.journal.jsonl")
+        configs = _configs()
+
+        # 模擬中斷：只完成了第一個回測
+        run_portfolio(configs[:1], journal=RunJournal(path))
+
+        executed = []
+        result = run_portfolio(
+            configs,
+            journal=RunJournal(path),
+            progress_callback=lambda progress: executed.append(progress.completed)
+        )
+
+        assert executed == [1, 2], f"Only 2 runs should execute, got {executed}"
+        assert len(result) == 3
+        assert [r.config for r in result] == configs
+        assert result[0].success and not result[1].success and result[2].success
+        assert result.get_best_by("total_return")[0].success
+
+    print("OK test_resume_skips_completed_runs passed")
+
+
+def test_truncated_last_line_is_ignored():
+    """Test a partially written line from a killed process is skipped"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sweep.journal.jsonl")
+        configs = _configs()
+
+        run_portfolio(configs[:1], journal=RunJournal(path))
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"version": 1, "hash": "abc", "succ')
+
+        journal = RunJournal(path)
+        assert len(journal) == 1
+        assert journal.skipped_lines == 1
+        assert journal.is_completed(configs[0])
+
+        # 續跑後追加的紀錄不會與不完整的行合併
+        run_portfolio(configs[2:], journal=journal)
+        journal = RunJournal(path)
+        assert len(journal) == 2
+        assert journal.skipped_lines == 0
+        assert journal.is_completed(configs[2])
+
+        assert len(RunJournal(path, reset=True)) == 0
+        assert not os.path.exists(path)
+
+    print("OK test_truncated_last_line_is_ignored passed")
+
+
+def test_cli_portfolio_resume():
+    """Test superdog portfolio --resume"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yaml_path = os.path.join(tmp_dir, "sweep.yml")
+        journal_path = os.path.join(tmp_dir, "sweep.journal.jsonl")
+        cost_path = os.path.join(tmp_dir, "cost_history.json")
+        with open(yaml_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump({"runs": [
+                {"strategy": "simple_sma", "symbol": "BTCUSDT", "timeframe": "1h_test"},
+                {"strategy": "simple_sma", "symbol": "BTCUSDT", "timeframe": "1h_test", "leverage": 2},
+            ]}, f)
+
+        runner = CliRunner()
+        # 不指定 --journal / --resume / --cost-history 時不寫任何文件
+        result = runner.invoke(cli, ["portfolio", "-c", yaml_path])
+        assert result.exit_code == 0, result.output
+        assert sorted(os.listdir(tmp_dir)) == ["sweep.yml"]
+
+        result = runner.invoke(cli, ["portfolio", "-c", yaml_path, "--cost-history", cost_path,
+                                     "--journal", journal_path])
+        assert result.exit_code == 0, result.output
+        assert len(RunJournal(journal_path)) == 2
+        # 執行耗時保存到成本歷史，下次排程沿用
+        assert CostModel(history_path=cost_path).seconds_per_bar("simple_sma") > 0
+        with open(cost_path, encoding="utf-8") as f:
+            assert "simple_sma" in json.load(f)
+
+        # --resume 默認使用 <配置檔案>.journal.jsonl
+        result = runner.invoke(cli, ["portfolio", "-c", yaml_path, "--cost-history", cost_path, "--resume"])
+        assert result.exit_code == 0, result.output
+        assert "Resumed 2/2 runs already completed" in result.output
+        assert "PORTFOLIO BACKTEST REPORT" in result.output
+
+        # 不續跑時重新執行，舊日誌改名為 .bak 保留
+        result = runner.invoke(cli, ["portfolio", "-c", yaml_path, "--cost-history", cost_path,
+                                     "--journal", journal_path])
+        assert result.exit_code == 0, result.output
+        assert len(RunJournal(journal_path + ".bak")) == 2
+        assert len(RunJournal(journal_path)) == 2
+
+    print("OK test_cli_portfolio_resume passed")
+
+
+if __name__ == "__main__":
+    print("Running Run Journal Tests...")
+    print("=" * 60)
+
+    test_journal_records_and_restores()
+    test_resume_skips_completed_runs()
+    test_truncated_last_line_is_ignored()
+    test_cli_portfolio_resume()
+
+    print("\n" + "=" * 60)
+    print("SUCCESS All Run Journal tests passed!")
+    print("=" * 60)
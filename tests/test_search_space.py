@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""Tests for declarative search spaces in portfolio YAML
+
+Design Reference: execution_engine/search_space.py
+"""
+
+import sys
+import os
+import types
+import tempfile
+sys.path.append(os.path.abspath("."))
+
+from execution_engine.portfolio_runner import (
+    RunConfig, load_configs_from_yaml, iter_configs_from_yaml, count_configs_from_yaml
+)
+from execution_engine.search_space import SearchSpace
+
+
+def _write_yaml(content: str) -> str:
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as f:
+        f.write(content)
+        return f.name
+
+
+def test_grid_search_space():
+    """Test grid expansion over fields and strategy_params"""
+    space = SearchSpace({
+        "strategy": "simple_sma",
+        "symbol": ["BTCUSDT", "ETHUSDT"],
+        "timeframe": "1h",
+        "stop_loss_pct": {"range": [0.01, 0.03, 0.01]},
+        "strategy_params": {
+            "fast_period": {"range": [5, 15, 5]},
+            "slow_period": [20, 50],
+        },
+    })
+
+    assert len(space) == 2 * 3 * 3 * 2, f"Unexpected size: {len(space)}"
+
+    points = list(space)
+    assert len(points) == len(space)
+    assert {p["stop_loss_pct"] for p in points} == {0.01, 0.02, 0.03}
+    assert {p["strategy_params"]["fast_period"] for p in points} == {5, 10, 15}
+    assert all(p["timeframe"] == "1h" for p in points)
+
+    print("OK test_grid_search_space passed")
+
+
+def test_random_search_space_is_reproducible():
+    """Test random sampling with seed"""
+    spec = {
+        "mode": "random",
+        "samples": 20,
+        "seed": 7,
+        "strategy": "simple_sma",
+        "symbol": "BTCUSDT",
+        "timeframe": "1h",
+        "leverage": {"randint": [1, 5]},
+        "take_profit_pct": {"uniform": [0.02, 0.1]},
+    }
+
+    first = list(SearchSpace(spec))
+    second = list(SearchSpace(spec))
+
+    assert len(first) == 20
+    assert first == second, "Same seed should produce same samples"
+    assert all(1 <= p["leverage"] <= 5 for p in first)
+    assert all(0.02 <= p["take_profit_pct"] <= 0.1 for p in first)
+
+    print("OK test_random_search_space_is_reproducible passed")
+
+
+def test_invalid_search_space():
+    """Test validation errors"""
+    invalid_specs = [
+        {"mode": "grid", "strategy": "s", "take_profit_pct": {"uniform": [0.1, 0.2]}},
+        {"mode": "random", "strategy": "s"},
+        {"mode": "bayes", "strategy": "s"},
+        {"strategy": "s", "leverage": {"range": [3, 1]}},
+        {"strategy": "s", "leverage": {"range": [1, 3], "values": [1]}},
+        {"strategy": "s", "symbol": []},
+    ]
+
+    for spec in invalid_specs:
+        try:
+            SearchSpace(spec)
+            assert False, f"Should raise ValueError for {spec}"
+        except ValueError:
+            pass
+
+    print("OK test_invalid_search_space passed")
+
+
+def test_yaml_search_lazy_and_deduplicated():
+    """Test YAML search expansion is lazy and deduplicated"""
+    yaml_path = _write_yaml("""
+runs:
+  - strategy: simple_sma
+    symbol: BTCUSDT
+    timeframe: 1h
+    leverage: 2
+
+search:
+  - strategy: simple_sma
+    symbol: BTCUSDT
+    timeframe: [1h, 4h]
+    leverage: {range: [1, 3]}
+  - strategy: simple_sma
+    symbol: BTCUSDT
+    timeframe: 1h
+    leverage: [1.0, 2.0]
+""")
+
+    try:
+        configs = iter_configs_from_yaml(yaml_path)
+        assert isinstance(configs, types.GeneratorType), "Should return a generator"
+
+        first = next(configs)
+        assert first.leverage == 2
+
+        configs = load_configs_from_yaml(yaml_path)
+        # runs: 1 個；search[0]: 2 x 3 = 6 個（其中 1h/leverage=2 與 runs 重複）；
+        # search[1]: 2 個全部重複
+        assert len(configs) == 6, f"Should have 6 unique configs, got {len(configs)}"
+        assert len({c.config_hash() for c in configs}) == 6
+    finally:
+        os.remove(yaml_path)
+
+    print("OK test_yaml_search_lazy_and_deduplicated passed")
+
+
+def test_yaml_search_invalid_config_reports_source():
+    """Test errors point to the search entry"""
+    yaml_path = _write_yaml("""
+search:
+  - strategy: simple_sma
+    symbol: BTCUSDT
+    timeframe: 1h
+    leverage: [1, 500]
+""")
+
+    try:
+        load_configs_from_yaml(yaml_path)
+        assert False, "Should raise ValueError for leverage=500"
+    except ValueError as e:
+        assert "search[0]" in str(e), f"Error should mention search[0]: {e}"
+    finally:
+        os.remove(yaml_path)
+
+    print("OK test_yaml_search_invalid_config_reports_source passed")
+
+
+def test_count_configs_without_expanding():
+    """Test counting parses search specs but never expands them"""
+    from unittest import mock
+
+    yaml_path = _write_yaml("""
+runs:
+  - strategy: simple_sma
+    symbol: BTCUSDT
+    timeframe: 1h
+
+search:
+  - strategy: simple_sma
+    symbol: BTCUSDT
+    timeframe: 1h
+    strategy_params:
+      sma_period: {range: [1, 100000]}
+  - strategy: simple_sma
+    mode: random
+    samples: 50
+    symbol: BTCUSDT
+    timeframe: 1h
+    leverage: {uniform: [1, 3]}
+""")
+    bad_path = _write_yaml("""
+search:
+  - strategy: simple_sma
+    mode: random
+""")
+
+    try:
+        with mock.patch.object(SearchSpace, "__iter__", side_effect=AssertionError("expanded")):
+            assert count_configs_from_yaml(yaml_path) == 1 + 100000 + 50
+
+        try:
+            count_configs_from_yaml(bad_path)
+            assert False, "Should raise ValueError for random search without samples"
+        except ValueError as e:
+            assert "search[0]" in str(e), f"Error should mention search[0]: {e}"
+    finally:
+        os.remove(yaml_path)
+        os.remove(bad_path)
+
+    print("OK test_count_configs_without_expanding passed")
+
+
+def test_config_hash_normalizes_numbers():
+    """Test config_hash treats 2 and 2.0 as the same value"""
+    a = RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h",
+                  leverage=2, strategy_params={"period": 20})
+    b = RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h",
+                  leverage=2.0, strategy_params={"period": 20.0})
+    c = RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h", leverage=3)
+
+    assert a.config_hash() == b.config_hash()
+    assert a.config_hash() != c.config_hash()
+
+    print("OK test_config_hash_normalizes_numbers passed")
+
+
+if __name__ == "__main__":
+    print("Running Search Space Tests...")
+    print("=" * 60)
+
+    test_grid_search_space()
+    test_random_search_space_is_reproducible()
+    test_invalid_search_space()
+    test_yaml_search_lazy_and_deduplicated()
+    test_yaml_search_invalid_config_reports_source()
+    test_count_configs_without_expanding()
+    test_config_hash_normalizes_numbers()
+
+    print("\n" + "=" * 60)
+    print("SUCCESS All Search Space tests passed!")
+    print("=" * 60)
@@ -0,0 +1,185 @@
+"""
+Perpetual Segment Store Tests
+
+測試 v0.5 永續數據存儲的 manifest 索引：
+- 舊文件自動索引、範圍裁剪與 timestamp 下推過濾
+- 重疊文件壓實為不重疊、已排序、已去重的分段
+- 數據處理器 save / load 整合
+
+Version: v0.5
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data.perpetual import FundingRateData, LiquidationData, SegmentStore
+
+
+def _make_funding(start: str, end: str, rate: float) -> pd.DataFrame:
+    """生成 8 小時一筆的資金費率測試數據"""
+    timestamps = pd.date_range(start, end, freq="8h")
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "symbol": "BTCUSDT",
+        "funding_rate": np.full(len(timestamps), rate),
+    })
+
+
+def _save_legacy(directory: Path, df: pd.DataFrame) -> Path:
+    """按舊版 save 的命名直接寫入文件（不經過 manifest）"""
+    directory.mkdir(parents=True, exist_ok=True)
+    start, end = df["timestamp"].min(), df["timestamp"].max()
+    path = directory / f"BTCUSDT_funding_rate_{start:%Y%m%d}_{end:%Y%m%d}.parquet"
+    df.to_parquet(path, index=False)
+    return path
+
+
+class TestSegmentStore(unittest.TestCase):
+    """測試 manifest 索引與壓實"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.directory = self.tmp_dir / "binance"
+        self.store = SegmentStore(self.directory, "BTCUSDT_funding_rate")
+
+        # 一月與一月中至二月中重疊，三月獨立
+        _save_legacy(self.directory, _make_funding("2024-01-01", "2024-01-20", 1.0))
+        _save_legacy(self.directory, _make_funding("2024-01-10", "2024-02-10", 2.0))
+        _save_legacy(self.directory, _make_funding("2024-03-01", "2024-03-31", 3.0))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_index_existing_files(self):
+        """測試 manifest 之外的文件在第一次讀取時被索引"""
+        segments = self.store.segments()
+        self.assertEqual(len(segments), 3)
+        self.assertTrue(self.store.manifest_path.exists())
+        self.assertEqual(sum(s["rows"] for s in segments), 58 + 94 + 91)
+
+    def test_range_pruning(self):
+        """測試只開啟與範圍重疊的分段"""
+        self.assertEqual(len(self.store.segments("2024-03-05", "2024-03-10")), 1)
+        self.assertEqual(len(self.store.segments("2024-02-15", "2024-02-20")), 0)
+
+        with mock.patch("data.perpetual.segment_store.pd.read_parquet", wraps=pd.read_parquet) as reader:
+            df = self.store.read("20240305", "20240310")
+
+        self.assertEqual(reader.call_count, 1)
+        # 謂詞下推到 timestamp
+        self.assertIsNotNone(reader.call_args.kwargs["filters"])
+        self.assertEqual(df["timestamp"].min(), pd.Timestamp("2024-03-05"))
+        self.assertEqual(df["timestamp"].max(), pd.Timestamp("2024-03-10"))
+
+    def test_read_overlapping_deduplicates(self):
+        """測試未壓實的重疊文件讀取時排序去重，較新的文件優先"""
+        df = self.store.read("20240105", "20240115")
+        self.assertTrue(df["timestamp"].is_monotonic_increasing)
+        self.assertTrue(df["timestamp"].is_unique)
+        self.assertEqual(len(df), 31)
+        overlap = df[df["timestamp"] >= pd.Timestamp("2024-01-10")]
+        self.assertTrue((overlap["funding_rate"] == 2.0).all())
+
+    def test_compact(self):
+        """測試壓實合併重疊文件，結果與壓實前相同"""
+        before = self.store.read()
+
+        new_files = self.store.compact()
+
+        self.assertEqual(new_files, ["BTCUSDT_funding_rate_20240101_20240210.parquet"])
+        self.assertEqual(
+            sorted(p.name for p in self.directory.glob("*.parquet")),
+            ["BTCUSDT_funding_rate_20240101_20240210.parquet",
+             "BTCUSDT_funding_rate_20240301_20240331.parquet"]
+        )
+        segments = self.store.segments()
+        self.assertTrue(all(s["sorted"] for s in segments))
+        self.assertLess(segments[0]["end"], segments[1]["start"])
+        pd.testing.assert_frame_equal(self.store.read(), before)
+
+        # 已壓實時不再重寫
+        self.assertEqual(self.store.compact(), [])
+
+    def test_external_rewrite_is_reindexed(self):
+        """測試被外部改寫的文件重新索引"""
+        self.store.segments()
+        path = _save_legacy(self.directory, _make_funding("2024-03-01", "2024-03-05", 4.0))
+
+        manifest = json.loads(self.store.manifest_path.read_text())
+        self.assertEqual(len(manifest["segments"]), 3)
+
+        segment = [s for s in self.store.segments() if s["file"] == path.name][0]
+        self.assertEqual(segment["rows"], 13)
+
+
+class TestHandlerIntegration(unittest.TestCase):
+    """測試數據處理器 save / load"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_funding_rate_save_compacts(self):
+        """測試重疊保存被壓實，load 不返回重複行"""
+        handler = FundingRateData(storage_path=self.tmp_dir)
+        handler.save(_make_funding("2024-01-01", "2024-01-20", 1.0), "BTCUSDT", "binance")
+        path = handler.save(_make_funding("2024-01-10", "2024-02-10", 2.0), "BTCUSDT", "binance")
+
+        self.assertTrue(path.exists())
+        self.assertEqual(len(list((self.tmp_dir / "binance").glob("*.parquet"))), 1)
+
+        df = handler.load("BTCUSDT", "binance")
+        self.assertTrue(df["timestamp"].is_unique)
+        self.assertEqual(df["timestamp"].min(), pd.Timestamp("2024-01-01"))
+        self.assertEqual(df["timestamp"].max(), pd.Timestamp("2024-02-10"))
+
+        jan = handler.load("BTCUSDT", "binance", start_date="20240101", end_date="20240131")
+        self.assertEqual(jan["timestamp"].max(), pd.Timestamp("2024-01-31"))
+
+    def test_same_range_save_does_not_overwrite(self):
+        """測試同名保存不覆蓋已有分段"""
+        handler = FundingRateData(storage_path=self.tmp_dir)
+        first = _make_funding("2024-01-01", "2024-01-31", 1.0)
+        partial = first.iloc[[0, -1]].assign(funding_rate=2.0)
+
+        handler.save(first, "BTCUSDT", "binance")
+        handler.save(partial, "BTCUSDT", "binance")
+
+        df = handler.load("BTCUSDT", "binance")
+        self.assertEqual(len(df), len(first))
+        self.assertEqual(df["funding_rate"].iloc[0], 2.0)
+        self.assertEqual(df["funding_rate"].iloc[1], 1.0)
+
+    def test_liquidations_keep_same_timestamp_events(self):
+        """測試同一時間戳的不同爆倉不被去重"""
+        handler = LiquidationData(storage_path=self.tmp_dir)
+        ts = pd.Timestamp("2024-01-01 00:00")
+        df = pd.DataFrame({
+            "timestamp": [ts, ts, ts + pd.Timedelta(minutes=1)],
+            "side": ["long", "short", "long"],
+            "size": [1.0, 2.0, 3.0],
+        })
+
+        handler.save(df, "BTCUSDT", "binance")
+        handler.save(df.iloc[1:], "BTCUSDT", "binance")
+
+        self.assertEqual(len(handler.load("BTCUSDT", "binance")), 3)
+
+    def test_missing_data(self):
+        """測試沒有數據時返回空 DataFrame"""
+        handler = FundingRateData(storage_path=self.tmp_dir)
+        (self.tmp_dir / "binance").mkdir()
+        self.assertTrue(handler.load("BTCUSDT", "binance").empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
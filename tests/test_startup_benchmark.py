@@ -0,0 +1,129 @@
+"""
+CLI Startup Benchmark Tests
+
+測試 v0.5 CLI 啟動量測：
+- -X importtime 輸出解析
+- 預算檢查與基準寫入
+- cli/main.py 只在命令內導入回測 / 執行引擎等子系統
+
+Version: v0.5
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from cli.startup_benchmark import (
+    PROJECT_ROOT,
+    StartupCase,
+    StartupMeasurement,
+    check_budgets,
+    default_cases,
+    load_baseline,
+    parse_importtime,
+    save_baseline,
+)
+
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | io
+import time:        50 |         50 |     pandas._libs
+import time:       400 |        450 |   pandas.core
+import time:      1000 |       1450 | pandas
+import time:        80 |         80 | click
+"""
+
+
+class TestParseImporttime(unittest.TestCase):
+    """測試 importtime 解析"""
+
+    def test_parse(self):
+        """測試只加總頂層導入，並按累計時間排序"""
+        result = parse_importtime(IMPORTTIME_OUTPUT)
+        self.assertEqual(result['modules'], 6)
+        self.assertAlmostEqual(result['import_ms'], (420 + 1450 + 80) / 1000)
+        self.assertEqual(list(result['top_imports']), ['pandas', 'io', 'click'])
+        self.assertEqual(result['top_imports']['pandas'], 1.4)
+
+    def test_parse_ignores_program_output(self):
+        """測試忽略非 importtime 的 stderr 內容"""
+        result = parse_importtime("Traceback (most recent call last):\n" + IMPORTTIME_OUTPUT)
+        self.assertEqual(result['modules'], 6)
+
+
+class TestBudgets(unittest.TestCase):
+    """測試預算檢查與基準文件"""
+
+    def test_check_budgets(self):
+        """測試超出預算與非零退出狀態都會失敗"""
+        cases = [StartupCase("fast", ["-c", "pass"], 100.0),
+                 StartupCase("slow", ["-c", "pass"], 100.0),
+                 StartupCase("untracked", ["-c", "pass"])]
+        measurements = [StartupMeasurement("fast", 50.0, 10.0, 20),
+                        StartupMeasurement("slow", 150.0, 10.0, 20),
+                        StartupMeasurement("untracked", 5000.0, 10.0, 20, returncode=2)]
+
+        failures = check_budgets(measurements, cases)
+        self.assertEqual(len(failures), 2)
+        self.assertIn("slow", failures[0])
+        self.assertIn("status 2", failures[1])
+
+    def test_save_baseline_keeps_existing_budgets(self):
+        """測試更新基準時保留已有預算，新項目按量測值設定預算"""
+        cases = [StartupCase("a", ["-c", "pass"]), StartupCase("b", ["-c", "pass"])]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "baseline.json"
+            path.write_text(json.dumps({'cases': {'a': {'argv': ["-c", "pass"], 'budget_ms': 123.0}}}))
+
+            save_baseline([StartupMeasurement("a", 500.0, 1.0, 1),
+                           StartupMeasurement("b", 500.0, 1.0, 1)], cases, path)
+            baseline = load_baseline(path)
+
+        self.assertEqual(baseline['cases']['a']['budget_ms'], 123.0)
+        self.assertEqual(baseline['cases']['a']['wall_ms'], 500.0)
+        self.assertEqual(baseline['cases']['b']['budget_ms'], 1000.0)
+
+    def test_default_cases_cover_subcommands(self):
+        """測試默認項目包含每個子命令"""
+        from cli.main import cli
+
+        names = {case.name for case in default_cases()}
+        self.assertIn("superdog_cli", names)
+        for command in cli.commands:
+            self.assertIn(f"cli {command} --help", names)
+
+    def test_baseline_file_covers_default_cases(self):
+        """測試提交的基準文件涵蓋所有默認項目且都有預算"""
+        baseline = load_baseline()
+        for case in default_cases():
+            self.assertIn(case.name, baseline['cases'])
+            self.assertIsNotNone(baseline['cases'][case.name]['budget_ms'])
+
+
+class TestLazyCliImports(unittest.TestCase):
+    """測試 CLI 只在命令內導入子系統"""
+
+    def test_help_does_not_import_subsystems(self):
+        """測試 cli/main.py --help 不導入 pandas、回測與執行引擎"""
+        code = (
+            "import json, sys\n"
+            "from click.testing import CliRunner\n"
+            "from cli.main import cli\n"
+            "CliRunner().invoke(cli, ['run', '--help'])\n"
+            "print(json.dumps(sorted(m for m in ('pandas', 'backtest.engine', 'execution_engine',\n"
+            "    'reports.text_reporter', 'strategies.registry', 'strategies.registry_v2') if m in sys.modules)))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(json.loads(output.strip().splitlines()[-1]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Streaming Resample Tests
+
+測試 v0.5 分塊流式重採樣：
+- 任意切塊（包括在 K 線中間切開）的結果與整體重採樣相同
+- 各種數據文件格式的逐塊讀取
+- 分區數據集與 Parquet 文件的逐步寫出
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data.partitioned_store import PartitionedOHLCVStore
+from data.storage import OHLCVStorage
+from data.streaming_resample import (
+    StreamingResampler,
+    iter_file_chunks,
+    resample_file,
+    resample_partitioned,
+    resample_stream,
+)
+from data.timeframe_manager import TimeframeManager
+
+
+def _make_minutes(days: int = 75, seed: int = 0) -> pd.DataFrame:
+    """生成帶缺失 K 線、跨越數個月的 1m OHLCV 數據（load_ohlcv 格式）"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-20 00:03", periods=days * 1440, freq="1min", tz="UTC", name="datetime")
+    close = 100 + rng.standard_normal(len(index)).cumsum()
+    df = pd.DataFrame({
+        'timestamp': index.asi8 // 1_000_000,
+        'open': close + rng.standard_normal(len(index)) * 0.1,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': rng.random(len(index)),
+    }, index=index)
+    drop = rng.choice(len(df), len(df) // 50, replace=False)
+    return df.drop(df.index[drop])
+
+
+class TestStreamingResampler(unittest.TestCase):
+    """測試跨塊的未完成 K 線"""
+
+    def setUp(self):
+        self.manager = TimeframeManager()
+        self.data = _make_minutes(days=20)
+
+    def test_matches_full_resample(self):
+        """測試任意位置切塊的結果與整體重採樣相同"""
+        rng = np.random.default_rng(1)
+        cuts = np.sort(rng.choice(np.arange(1, len(self.data)), 40, replace=False))
+        chunks = [self.data.iloc[a:b] for a, b in zip(np.r_[0, cuts], np.r_[cuts, len(self.data)])]
+
+        for tf in ["5m", "1h", "4h", "1d", "1w"]:
+            with self.subTest(timeframe=tf):
+                streamed = pd.concat(list(resample_stream(chunks, "1m", tf)))
+                pd.testing.assert_frame_equal(
+                    streamed, self.manager.resample_ohlcv(self.data, "1m", tf), check_freq=False
+                )
+
+    def test_partial_bar_carried(self):
+        """測試在 K 線中間切開時，未完成的 K 線在下一塊合併"""
+        full = self.manager.resample_ohlcv(self.data.iloc[:200], "1m", "1h")
+        resampler = StreamingResampler("1m", "1h")
+
+        first = resampler.update(self.data.iloc[:90])
+        self.assertEqual(len(first), 1)
+        self.assertEqual(resampler.partial.index[0], full.index[1])
+        self.assertLess(resampler.partial['volume'].iloc[0], full['volume'].iloc[1])
+
+        second = resampler.update(self.data.iloc[90:200])
+        pd.testing.assert_frame_equal(pd.concat([first, second]), full.iloc[:-1], check_freq=False)
+        pd.testing.assert_frame_equal(resampler.flush(), full.iloc[-1:], check_freq=False)
+        self.assertIsNone(resampler.partial)
+
+    def test_out_of_order_chunks(self):
+        """測試重疊或倒序的數據塊"""
+        resampler = StreamingResampler("1m", "1h")
+        resampler.update(self.data.iloc[100:200])
+        with self.assertRaises(ValueError):
+            resampler.update(self.data.iloc[150:300])
+
+    def test_invalid_timeframes(self):
+        """測試目標時間週期小於源時間週期"""
+        with self.assertRaises(ValueError):
+            StreamingResampler("1h", "5m")
+
+
+class TestFileChunks(unittest.TestCase):
+    """測試數據文件的逐塊讀取與 Parquet 輸出"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.storage = OHLCVStorage(data_dir=self.tmp_dir)
+        self.data = _make_minutes(days=5)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_iter_file_chunks(self):
+        """測試各格式逐塊讀取的結果與一次載入相同"""
+        for suffix in (".parquet", ".feather", ".mmap", ".csv"):
+            with self.subTest(format=suffix):
+                path = self.tmp_dir / f"BTCUSDT_1m{suffix}"
+                self.storage.save_ohlcv(self.data, str(path))
+
+                chunks = list(iter_file_chunks(path, chunk_rows=1000))
+
+                self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+                combined = pd.concat(chunks)
+                expected = self.storage.load_ohlcv(str(path))
+                np.testing.assert_array_equal(combined.index.asi8, expected.index.asi8)
+                np.testing.assert_allclose(combined['close'].to_numpy(), expected['close'].to_numpy())
+
+    def test_resample_file(self):
+        """測試流式重採樣到 Parquet 文件"""
+        source = self.tmp_dir / "BTCUSDT_1m.parquet"
+        target = self.tmp_dir / "BTCUSDT_4h.parquet"
+        self.storage.save_ohlcv(self.data, str(source))
+
+        rows = resample_file(source, target, "1m", "4h", chunk_rows=777)
+
+        result = self.storage.load_ohlcv(str(target))
+        expected = TimeframeManager().resample_ohlcv(self.data, "1m", "4h")
+        self.assertEqual(rows, len(expected))
+        pd.testing.assert_frame_equal(
+            result[['open', 'high', 'low', 'close', 'volume']], expected,
+            check_freq=False, check_names=False
+        )
+        self.assertFalse(target.with_name(target.name + ".tmp").exists())
+
+    def test_resample_file_requires_parquet(self):
+        """測試目標文件必須是 Parquet"""
+        with self.assertRaises(ValueError):
+            resample_file(self.tmp_dir / "BTCUSDT_1m.csv", self.tmp_dir / "BTCUSDT_1h.csv", "1m", "1h")
+
+
+class TestResamplePartitioned(unittest.TestCase):
+    """測試分區數據集之間的流式重採樣"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.store = PartitionedOHLCVStore(root=self.tmp_dir / "binance")
+        self.data = _make_minutes()
+        self.store.write("BTCUSDT", "1m", self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_resample_partitioned(self):
+        """測試逐分區讀取並按目標分區寫出，結果與整體重採樣相同"""
+        with mock.patch.object(self.store, "load", side_effect=AssertionError("full load")), \
+                mock.patch.object(self.store, "append", wraps=self.store.append) as append:
+            manifest = resample_partitioned(self.store, "BTCUSDT", "1m", "1h")
+
+        self.assertEqual([p["key"] for p in manifest["partitions"]], ["2024-01", "2024-02", "2024-03", "2024-04"])
+        # 第一個分區以 write 寫入（替換已有數據集），之後每個分區追加一次
+        self.assertEqual(append.call_count, 3)
+
+        expected = TimeframeManager().resample_ohlcv(self.data, "1m", "1h")
+        result = self.store.load("BTCUSDT", "1h")
+        pd.testing.assert_frame_equal(
+            result[['open', 'high', 'low', 'close', 'volume']], expected, check_freq=False
+        )
+
+    def test_week_crossing_partitions(self):
+        """測試跨越源分區邊界的週線"""
+        target_store = PartitionedOHLCVStore(root=self.tmp_dir / "derived", granularity="year")
+        resample_partitioned(self.store, "BTCUSDT", "1m", "1w", target_store=target_store)
+
+        expected = TimeframeManager().resample_ohlcv(self.data, "1m", "1w")
+        result = target_store.load("BTCUSDT", "1w")
+        pd.testing.assert_frame_equal(
+            result[['open', 'high', 'low', 'close', 'volume']], expected, check_freq=False
+        )
+
+    def test_date_range(self):
+        """測試只重採樣日期範圍內的數據"""
+        resample_partitioned(self.store, "BTCUSDT", "1m", "1d", "2024-02-10", "2024-02-20 23:59")
+
+        result = self.store.load("BTCUSDT", "1d")
+        self.assertEqual(len(result), 11)
+        self.assertEqual(result.index[0], pd.Timestamp("2024-02-10", tz="UTC"))
+
+    def test_missing_data(self):
+        """測試源數據集沒有數據"""
+        with self.assertRaises(ValueError):
+            resample_partitioned(self.store, "BTCUSDT", "1m", "1h", "2030-01-01", "2030-02-01")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""Tests for successive halving parameter search
+
+Design Reference: execution_engine/successive_halving.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.abspath("."))
+
+from execution_engine.portfolio_runner import RunConfig, run_portfolio
+from execution_engine.successive_halving import (
+    successive_halving_search, _build_tasks, _group_candidates, _num_rungs, _symbol_order
+)
+
+
+SMA_PERIODS = [5, 10, 20, 40, 80, 120, 160, 200, 240]
+
+
+def _sma_configs():
+    return [
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test",
+                  strategy_params={"sma_period": period})
+        for period in SMA_PERIODS
+    ]
+
+
+def test_strategy_params_reach_strategy():
+    """Test RunConfig.strategy_params is passed to the strategy"""
+    result = run_portfolio([
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test",
+                  strategy_params={"sma_period": 5}),
+        RunConfig(strategy="simple_sma", symbol="BTCUSDT", timeframe="1h_test",
+                  strategy_params={"sma_period": 200}),
+    ])
+
+    assert result.count_successful() == 2
+    trades_fast = result[0].get_metric("num_trades")
+    trades_slow = result[1].get_metric("num_trades")
+    assert trades_fast > trades_slow, f"SMA5 should trade more than SMA200: {trades_fast} vs {trades_slow}"
+
+    print("OK test_strategy_params_reach_strategy passed")
+
+
+def test_num_rungs():
+    """Test rung count limited by candidates and min_fraction"""
+    assert _num_rungs(1, 3, 0.01) == 1
+    assert _num_rungs(9, 3, 0.01) == 3
+    assert _num_rungs(50000, 3, 0.1) == 3
+    assert _num_rungs(50000, 3, 0.001) == 7
+
+    print("OK test_num_rungs passed")
+
+
+def test_successive_halving_prefix():
+    """Test prefix-budget successive halving schedule"""
+    result = successive_halving_search(_sma_configs(), eta=3, min_fraction=0.1)
+
+    assert len(result.rungs) == 3
+    assert [len(r.scores) for r in result.rungs] == [9, 3, 1]
+    assert abs(result.rungs[0].fraction - 1 / 9) < 1e-12
+    assert result.rungs[-1].fraction == 1.0
+
+    # 前段評估只使用部分數據
+    full_bars = len(result.rungs[-1].runs[0].backtest_result.equity_curve)
+    prefix_bars = len(result.rungs[0].runs[0].backtest_result.equity_curve)
+    assert prefix_bars == int(full_bars / 9)
+
+    # 每輪倖存者都來自上一輪
+    for previous, current in zip(result.rungs, result.rungs[1:]):
+        assert set(current.scores) == set(previous.survivors)
+
+    # 最後一輪為完整評估，且分數與 run_portfolio 一致
+    best_configs, best_score = result.best(1)[0]
+    check = run_portfolio(best_configs)
+    assert abs(check[0].get_metric("total_return") - best_score) < 1e-12
+
+    assert result.budget_used() < len(SMA_PERIODS)
+    assert len(result.to_portfolio_result()) == 1
+
+    print("OK test_successive_halving_prefix passed")
+
+
+def test_successive_halving_parallel_matches_serial():
+    """Test process-pool search gives the same ranking"""
+    serial = successive_halving_search(_sma_configs(), eta=3, min_fraction=0.1)
+    parallel = successive_halving_search(_sma_configs(), eta=3, min_fraction=0.1, max_workers=2)
+
+    assert [r.survivors for r in serial.rungs] == [r.survivors for r in parallel.rungs]
+
+    print("OK test_successive_halving_parallel_matches_serial passed")
+
+
+def test_symbol_budget_tasks():
+    """Test symbol-subsample budget groups configs across symbols"""
+    configs = [
+        RunConfig(strategy="simple_sma", symbol=symbol, timeframe="1h",
+                  strategy_params={"sma_period": period})
+        for period in (10, 20)
+        for symbol in ("BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT")
+    ]
+
+    candidates = _group_candidates(configs)
+    assert len(candidates) == 2
+    assert all(len(group) == 4 for group in candidates)
+
+    tasks = _build_tasks(candidates, [0, 1], 0.5, "symbols")
+    assert len(tasks) == 4
+    assert all(fraction == 1.0 for _, _, fraction in tasks)
+    assert [config.symbol for i, config, _ in tasks if i == 0] == ["BTCUSDT", "ETHUSDT"]
+
+    print("OK test_symbol_budget_tasks passed")
+
+
+def test_symbol_budget_seeded_subset():
+    """Test symbol subsets follow a seeded order shared by all candidates"""
+    symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT", "ADAUSDT"]
+    configs = [
+        RunConfig(strategy="simple_sma", symbol=symbol, timeframe="1h",
+                  strategy_params={"sma_period": period})
+        for period in (10, 20)
+        for symbol in symbols
+    ]
+    candidates = _group_candidates(configs)
+
+    order = _symbol_order(candidates, seed=0)
+    assert sorted(order) == sorted(symbols)
+    assert order == _symbol_order(candidates, seed=0), "Same seed should give the same order"
+
+    subsets = {}
+    for fraction in (1 / 3, 2 / 3, 1.0):
+        tasks = _build_tasks(candidates, [0, 1], fraction, "symbols", order)
+        per_candidate = [[config.symbol for i, config, _ in tasks if i == c] for c in (0, 1)]
+        assert per_candidate[0] == per_candidate[1], "Candidates should share the symbol subset"
+        subsets[fraction] = per_candidate[0]
+
+    assert subsets[1 / 3] == subsets[2 / 3][:2] and subsets[2 / 3] == subsets[1.0][:4]
+    assert sorted(subsets[1.0]) == sorted(symbols)
+
+    # 不同 seed 的第一輪子集不會都是 YAML 中的前兩個交易對
+    first = {tuple(sorted(
+        config.symbol for _, config, _ in
+        _build_tasks(candidates, [0], 1 / 3, "symbols", _symbol_order(candidates, seed))
+    )) for seed in range(10)}
+    assert len(first) > 1
+
+    print("OK test_symbol_budget_seeded_subset passed")
+
+
+def test_failed_candidates_ranked_last():
+    """Test failed runs are scored as worst"""
+    configs = _sma_configs()[:2] + [
+        RunConfig(strategy="nonexistent_strategy", symbol="BTCUSDT", timeframe="1h_test")
+    ]
+
+    result = successive_halving_search(configs, eta=2, min_fraction=0.5)
+
+    assert len(result.rungs[0].survivors) == 2
+    assert 2 not in result.rungs[0].survivors
+    assert result.rungs[0].scores[2] == float("-inf")
+
+    print("OK test_failed_candidates_ranked_last passed")
+
+
+def test_invalid_arguments():
+    """Test argument validation"""
+    configs = _sma_configs()
+    for kwargs in ({"eta": 1}, {"min_fraction": 0}, {"budget": "time"}, {"max_workers": 0}):
+        try:
+            successive_halving_search(configs, **kwargs)
+            assert False, f"Should raise ValueError for {kwargs}"
+        except ValueError:
+            pass
+
+    print("OK test_invalid_arguments passed")
+
+
+if __name__ == "__main__":
+    print("Running Successive Halving Tests...")
+    print("=" * 60)
+
+    test_strategy_params_reach_strategy()
+    test_num_rungs()
+    test_successive_halving_prefix()
+    test_successive_halving_parallel_matches_serial()
+    test_symbol_budget_tasks()
+    test_symbol_budget_seeded_subset()
+    test_failed_candidates_ranked_last()
+    test_invalid_arguments()
+
+    print("\n" + "=" * 60)
+    print("SUCCESS All Successive Halving tests passed!")
+    print("=" * 60)
@@ -0,0 +1,147 @@
+"""
+Time Gap Detection Tests
+
+測試 v0.5 向量化時間缺口檢測與補洞計劃：
+- 與逐個時間差迭代的結果一致
+- 缺口陣列、缺失 K 線數量、時間戳是否落在缺口內
+- 補洞計劃合併相近缺口、不拉長遠處缺口
+- DataQualityController / OHLCVValidator 整合
+
+Version: v0.5
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data.quality import DataQualityController, detect_time_gaps, plan_gap_repairs
+from data.quality.gaps import timeframe_to_ms
+from data.validator import validate_ohlcv_csv
+
+MINUTE_MS = 60 * 1000
+
+
+def _minute_index(rows: int, holes) -> pd.DatetimeIndex:
+    index = pd.date_range("2024-01-01", periods=rows, freq="min", tz="UTC")
+    return index.delete(holes)
+
+
+def _reference_gaps(index: pd.DatetimeIndex, expected=None, threshold=2.0) -> list:
+    """原本逐個時間差迭代的實現"""
+    diffs = index[1:] - index[:-1]
+    interval = diffs.median() if expected is None else pd.Timedelta(expected)
+    return [
+        (index[i], index[i + 1], diff)
+        for i, diff in enumerate(diffs)
+        if diff > interval * threshold
+    ]
+
+
+class TestDetectTimeGaps(unittest.TestCase):
+    """測試 detect_time_gaps"""
+
+    def test_matches_reference(self):
+        """測試與逐個迭代的結果一致"""
+        index = _minute_index(5_000, [10, 11, 12, 400, 401, 2_000, 2_001, 2_002, 2_003])
+        self.assertEqual(detect_time_gaps(index, threshold=2.0).to_tuples(), _reference_gaps(index))
+        self.assertEqual(
+            DataQualityController()._detect_time_gaps(index, "1min"),
+            _reference_gaps(index, "1min")
+        )
+
+    def test_gap_arrays(self):
+        """測試缺口陣列、缺失數量與包含判斷"""
+        index = _minute_index(1_000, [5, 6, 7, 500])
+        gaps = detect_time_gaps(index, "1m")
+        start = int(index[0].timestamp() * 1000)
+
+        np.testing.assert_array_equal(gaps.starts, [start + 4 * MINUTE_MS, start + 499 * MINUTE_MS])
+        np.testing.assert_array_equal(gaps.ends, [start + 8 * MINUTE_MS, start + 501 * MINUTE_MS])
+        np.testing.assert_array_equal(gaps.missing_bars, [3, 1])
+        self.assertEqual(gaps.total_missing, 4)
+        self.assertEqual(gaps.tz, "UTC")
+
+        probe = start + np.array([4, 5, 7, 8, 500, 501]) * MINUTE_MS
+        np.testing.assert_array_equal(gaps.contains(probe), [False, True, True, False, True, False])
+
+        # 毫秒陣列輸入（未排序、含重複）
+        ms = np.concatenate([gaps.ends, (index.asi8 // 1_000_000)[::-1]])
+        same = detect_time_gaps(ms, MINUTE_MS)
+        np.testing.assert_array_equal(same.starts, gaps.starts)
+        self.assertIsNone(same.tz)
+
+        self.assertEqual(len(detect_time_gaps(index[:1], "1m")), 0)
+
+    def test_timeframe_to_ms(self):
+        """測試時間週期解析"""
+        self.assertEqual(timeframe_to_ms("1m"), MINUTE_MS)
+        self.assertEqual(timeframe_to_ms("4h"), 240 * MINUTE_MS)
+        self.assertEqual(timeframe_to_ms("90min"), 90 * MINUTE_MS)
+        self.assertEqual(timeframe_to_ms(pd.Timedelta(days=1)), 1_440 * MINUTE_MS)
+        with self.assertRaises(ValueError):
+            timeframe_to_ms("1M")
+
+
+class TestPlanGapRepairs(unittest.TestCase):
+    """測試補洞計劃"""
+
+    def test_merges_nearby_gaps(self):
+        """測試相近缺口合併、遠處缺口分開"""
+        holes = [10, 20, 30, 31, 900, 5_000, 5_001, 5_002, 20_000]
+        gaps = detect_time_gaps(_minute_index(30_000, holes), "1m")
+        plan = plan_gap_repairs(gaps, page_limit=1_000)
+
+        self.assertEqual([r.gap_count for r in plan], [4, 1, 1])
+        self.assertEqual([r.missing_bars for r in plan], [5, 3, 1])
+        self.assertEqual([r.requests for r in plan], [1, 1, 1])
+        self.assertEqual(sum(r.missing_bars for r in plan), gaps.total_missing)
+
+        start = int(pd.Timestamp("2024-01-01", tz="UTC").timestamp() * 1000)
+        self.assertEqual(plan[0].start, start + 10 * MINUTE_MS)
+        self.assertEqual(plan[0].end, start + 901 * MINUTE_MS)
+
+    def test_large_gap_spans_pages(self):
+        """測試超過一頁的缺口"""
+        gaps = detect_time_gaps(_minute_index(10_000, list(range(100, 2_600))), "1m")
+        plan = plan_gap_repairs(gaps, page_limit=1_000)
+        self.assertEqual(len(plan), 1)
+        self.assertEqual(plan[0].missing_bars, 2_500)
+        self.assertEqual(plan[0].requests, 3)
+        self.assertEqual(plan_gap_repairs(detect_time_gaps(_minute_index(10, []), "1m")), [])
+
+
+class TestIntegration(unittest.TestCase):
+    """測試品質控制器與驗證器整合"""
+
+    def test_quality_check_metadata(self):
+        """測試 check_ohlcv 的時間缺口 metadata"""
+        index = _minute_index(500, [100, 101, 102])
+        df = pd.DataFrame({c: 1.0 for c in ["open", "high", "low", "close", "volume"]}, index=index)
+        issue = DataQualityController().check_ohlcv(df).issues[0]
+
+        self.assertEqual(issue.category, "time_gap")
+        self.assertEqual(issue.metadata["gap_count"], 1)
+        self.assertEqual(issue.metadata["missing_bars"], 3)
+        self.assertEqual(issue.metadata["gaps"], _reference_gaps(index))
+
+    def test_validator_missing_bars(self):
+        """測試驗證器按缺口統計缺少的 K 線（重複時間戳不抵銷缺口）"""
+        index = _minute_index(100, [10, 11, 50])
+        ms = index.asi8 // 1_000_000
+        ms = np.concatenate([ms, ms[:3]])
+        df = pd.DataFrame({"timestamp": ms, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "TEST_1m.csv")
+            df.to_csv(path, index=False)
+            report = validate_ohlcv_csv(path, timeframe="1m")
+
+        self.assertEqual(report["missing_bars"], 3)
+        self.assertEqual(report["gap_count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
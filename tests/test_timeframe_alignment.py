@@ -0,0 +1,222 @@
+"""
+Timeframe Alignment Tests
+
+測試 v0.5 無前視偏差的多時間週期對齊：
+- 更高時間週期的 K 線在收盤前不可見
+- searchsorted 映射與逐根計算一致（含缺失 K 線、週線）
+- take 對 ndarray / Series / DataFrame 取值
+- align_timeframes 的 left / right 對齊與 DataPipeline 的 alignments 元數據
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data.pipeline import DataPipeline
+from data.storage import load_ohlcv, save_ohlcv
+from data.timeframe_manager import TimeframeAlignment, TimeframeManager
+from strategies.api_v2 import DataRequirement, DataSource
+
+
+TEST_CSV = Path("data/raw/BTCUSDT_1h_test.csv")
+
+
+def _make_bars(periods: int = 24 * 30, freq: str = "1h", start: str = "2024-01-03 05:00",
+               seed: int = 0) -> pd.DataFrame:
+    """生成帶缺失 K 線的 OHLCV 數據"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=periods, freq=freq, tz="UTC")
+    close = 100 + rng.standard_normal(len(index)).cumsum()
+    df = pd.DataFrame({
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': rng.random(len(index)),
+    }, index=index)
+    drop = rng.choice(len(df), len(df) // 10, replace=False)
+    return df.drop(df.index[drop])
+
+
+def _brute_force(manager: TimeframeManager, base: pd.DataFrame, base_tf: str,
+                 higher: pd.DataFrame, higher_tf: str) -> np.ndarray:
+    """逐根計算：基準 K 線收盤時最後一根已收盤的更高時間週期 K 線"""
+    ends = [manager.bar_end(label, higher_tf) for label in higher.index]
+    result = []
+    for label in base.index:
+        close = manager.bar_end(label, base_tf)
+        closed = [i for i, end in enumerate(ends) if end <= close]
+        result.append(closed[-1] if closed else -1)
+    return np.array(result)
+
+
+class TestBuildAlignment(unittest.TestCase):
+    """測試 TimeframeManager.build_alignment"""
+
+    def setUp(self):
+        self.manager = TimeframeManager()
+        self.data = _make_bars()
+
+    def test_no_lookahead(self):
+        """測試 4h K 線在收盤後才可見"""
+        data_4h = self.manager.resample_ohlcv(self.data, "1h", "4h")
+        alignment = self.manager.build_alignment(self.data.index, "1h", data_4h.index, "4h")
+
+        for i, label in enumerate(self.data.index):
+            j = alignment.indexer[i]
+            if j >= 0:
+                self.assertLessEqual(
+                    self.manager.bar_end(data_4h.index[j], "4h"), label + pd.Timedelta(hours=1)
+                )
+        # 08:00 的 1h K 線在 09:00 收盤，08:00 開始的 4h K 線還未收盤
+        position = self.data.index.get_loc(pd.Timestamp("2024-01-04 08:00", tz="UTC"))
+        self.assertEqual(data_4h.index[alignment.indexer[position]], pd.Timestamp("2024-01-04 04:00", tz="UTC"))
+
+    def test_matches_brute_force(self):
+        """測試映射與逐根計算一致"""
+        for tf in ["4h", "1d", "1w"]:
+            with self.subTest(timeframe=tf):
+                higher = self.manager.resample_ohlcv(self.data, "1h", tf)
+                alignment = self.manager.build_alignment(self.data.index, "1h", higher.index, tf)
+                np.testing.assert_array_equal(
+                    alignment.indexer, _brute_force(self.manager, self.data, "1h", higher, tf)
+                )
+
+    def test_unclosed_last_bar_not_used(self):
+        """測試未收盤的最後一根更高時間週期 K 線不會被映射"""
+        data = self.data.loc[:"2024-01-10 13:00"]
+        data_1d = self.manager.resample_ohlcv(data, "1h", "1d")
+        alignment = self.manager.build_alignment(data.index, "1h", data_1d.index, "1d")
+        self.assertEqual(alignment.indexer.max(), len(data_1d) - 2)
+
+    def test_timezone_mismatch(self):
+        """測試時區不一致與無效時間週期"""
+        naive = self.data.index.tz_localize(None)
+        with self.assertRaises(ValueError):
+            self.manager.build_alignment(naive, "1h", self.data.index, "4h")
+        with self.assertRaises(ValueError):
+            self.manager.build_alignment(self.data.index, "1h", self.data.index, "2h")
+
+
+class TestAlignmentTake(unittest.TestCase):
+    """測試 TimeframeAlignment.take"""
+
+    def setUp(self):
+        manager = TimeframeManager()
+        self.data = _make_bars(periods=48)
+        self.data_4h = manager.resample_ohlcv(self.data, "1h", "4h")
+        self.alignment = manager.build_alignment(self.data.index, "1h", self.data_4h.index, "4h")
+        self.missing = int((~self.alignment.valid).sum())
+
+    def test_take_series(self):
+        """測試 Series 取值在基準索引上，尚無已收盤 K 線處為 NaN"""
+        result = self.alignment.take(self.data_4h['close'])
+
+        self.assertIsInstance(result, pd.Series)
+        self.assertTrue(result.index.equals(self.data.index))
+        self.assertGreater(self.missing, 0)
+        self.assertTrue(result.iloc[:self.missing].isna().all())
+        np.testing.assert_array_equal(
+            result.iloc[self.missing:].to_numpy(),
+            self.data_4h['close'].to_numpy()[self.alignment.indexer[self.missing:]]
+        )
+
+    def test_take_dataframe_and_ndarray(self):
+        """測試 DataFrame 與 ndarray 取值，整數陣列在填充 NaN 時轉為 float"""
+        frame = self.alignment.take(self.data_4h)
+        self.assertEqual(list(frame.columns), list(self.data_4h.columns))
+        pd.testing.assert_series_equal(frame['volume'], self.alignment.take(self.data_4h['volume']))
+
+        positions = self.alignment.take(np.arange(len(self.data_4h)))
+        self.assertEqual(positions.dtype, np.float64)
+        np.testing.assert_array_equal(
+            positions, np.where(self.alignment.valid, self.alignment.indexer, np.nan)
+        )
+        self.assertEqual(self.alignment.take(np.arange(len(self.data_4h)), fill_value=-1).dtype.kind, "i")
+
+    def test_unsorted_base_index(self):
+        """測試基準索引未排序時，沒有已收盤 K 線的位置不在開頭也會被填充"""
+        order = np.random.default_rng(1).permutation(len(self.data))
+        shuffled = self.data.iloc[order]
+        alignment = TimeframeManager().build_alignment(shuffled.index, "1h", self.data_4h.index, "4h")
+        # 缺失位置分散在有效位置之間
+        self.assertGreater(np.flatnonzero(~alignment.valid).max(), np.flatnonzero(alignment.valid).min())
+
+        result = alignment.take(self.data_4h['close'])
+        expected = self.alignment.take(self.data_4h['close']).iloc[order]
+        pd.testing.assert_series_equal(result, expected)
+        np.testing.assert_array_equal(
+            alignment.take(np.arange(len(self.data_4h)), fill_value=-1),
+            np.where(alignment.valid, alignment.indexer, -1)
+        )
+
+    def test_length_mismatch(self):
+        """測試取值數據長度與更高時間週期不一致"""
+        with self.assertRaises(ValueError):
+            self.alignment.take(np.zeros(len(self.data_4h) + 1))
+
+
+class TestAlignTimeframes(unittest.TestCase):
+    """測試 align_timeframes"""
+
+    def setUp(self):
+        self.manager = TimeframeManager()
+        self.data = _make_bars(periods=96)
+        self.data_4h = self.manager.resample_ohlcv(self.data, "1h", "4h")
+
+    def test_left_with_timeframes(self):
+        """測試提供時間週期時 left 對齊只使用已收盤的 K 線"""
+        base, aligned = self.manager.align_timeframes(
+            self.data, self.data_4h, how='left', timeframe1="1h", timeframe2="4h"
+        )
+        self.assertIs(base, self.data)
+        alignment = self.manager.build_alignment(self.data.index, "1h", self.data_4h.index, "4h")
+        pd.testing.assert_frame_equal(aligned, alignment.take(self.data_4h))
+
+        # 舊的標籤向前填充在 4h K 線開始時就可見
+        _, leaked = self.manager.align_timeframes(self.data, self.data_4h, how='left')
+        self.assertFalse(leaked['close'].equals(aligned['close']))
+
+    def test_right_with_timeframes(self):
+        """測試 right 對齊與 left 對稱"""
+        aligned, base = self.manager.align_timeframes(
+            self.data_4h, self.data, how='right', timeframe1="4h", timeframe2="1h"
+        )
+        self.assertIs(base, self.data)
+        self.assertTrue(aligned.index.equals(self.data.index))
+
+
+class TestPipelineAlignments(unittest.TestCase):
+    """測試 DataPipeline 的 alignments 元數據"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        save_ohlcv(load_ohlcv(str(TEST_CSV)), str(self.tmp_dir / "raw" / "BTCUSDT_1h.parquet"))
+        self.pipeline = DataPipeline(data_dir=self.tmp_dir, enable_validated_cache=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_alignments_metadata(self):
+        """測試其他時間週期需求附帶到主時間週期的對齊映射"""
+        strategy = mock.Mock()
+        strategy.get_data_requirements.return_value = [
+            DataRequirement(DataSource.OHLCV),
+            DataRequirement(DataSource.OHLCV, timeframe="4h"),
+        ]
+
+        result = self.pipeline.load_strategy_data(strategy, "BTCUSDT", "1h")
+
+        self.assertTrue(result.success, result.error)
+        alignment = result.metadata['alignments']["4h"]
+        self.assertIsInstance(alignment, TimeframeAlignment)
+        self.assertEqual(len(alignment.indexer), len(result.data['ohlcv']))
+        self.assertTrue(alignment.higher_index.equals(result.data['ohlcv_4h'].index))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+Timeframe Pyramid Tests
+
+測試 v0.5 多時間週期金字塔：
+- 向量化聚合與 pandas resample 結果一致（含缺失 K 線、UTC 時區、週線）
+- 缺失值等不適合向量化的數據退回 resample
+- DataPipeline.load_timeframes 快取與策略的多時間週期需求
+
+Version: v0.5
+"""
+
+import shutil
+import tempfile
+import unittest
+import warnings
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data.pipeline import DataPipeline
+from data.storage import load_ohlcv, save_ohlcv
+from data.timeframe_manager import TimeframeManager
+from strategies.api_v2 import DataRequirement, DataSource
+
+
+TEST_CSV = Path("data/raw/BTCUSDT_1h_test.csv")
+
+AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def _make_minutes(days: int = 20, start: str = "2024-01-03 00:07", tz=None, seed: int = 0) -> pd.DataFrame:
+    """生成帶缺失 K 線的 1m OHLCV 數據"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=days * 1440, freq="1min", tz=tz)
+    close = 100 + rng.standard_normal(len(index)).cumsum()
+    df = pd.DataFrame({
+        'open': close + rng.standard_normal(len(index)) * 0.1,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': rng.random(len(index)),
+    }, index=index)
+    # 移除部分 K 線（包括整段缺失，使部分分組沒有數據）
+    drop = rng.choice(len(df), len(df) // 20, replace=False)
+    df = df.drop(df.index[drop])
+    return df.drop(df.index[3000:3500])
+
+
+def _resample(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return df.resample(TimeframeManager.RESAMPLE_RULES[timeframe]).agg(AGG).dropna()
+
+
+class TestVectorizedResample(unittest.TestCase):
+    """測試向量化聚合"""
+
+    def setUp(self):
+        self.manager = TimeframeManager()
+        self.data = _make_minutes()
+
+    def test_matches_pandas_resample(self):
+        """測試各時間週期與 pandas resample 一致"""
+        for tf in ["5m", "15m", "30m", "1h", "4h", "1d", "1w"]:
+            with self.subTest(timeframe=tf):
+                pd.testing.assert_frame_equal(
+                    self.manager.resample_ohlcv(self.data, "1m", tf), _resample(self.data, tf),
+                    check_freq=False
+                )
+
+    def test_utc_index(self):
+        """測試 UTC 時區保留並與 resample 一致"""
+        data = _make_minutes(days=10, tz="UTC")
+        result = self.manager.resample_ohlcv(data, "1m", "4h")
+        self.assertEqual(str(result.index.tz), "UTC")
+        pd.testing.assert_frame_equal(result, _resample(data, "4h"), check_freq=False)
+
+    def test_missing_values_fall_back_to_resample(self):
+        """測試有缺失值時使用 resample（first / last 跳過 NaN）"""
+        data = self.data.copy()
+        data.iloc[0, data.columns.get_loc('open')] = np.nan
+
+        with mock.patch.object(TimeframeManager, "_aggregate_bars") as aggregate:
+            result = self.manager.resample_ohlcv(data, "1m", "1h")
+
+        aggregate.assert_not_called()
+        self.assertEqual(result['open'].iloc[0], data['open'].iloc[1])
+
+
+class TestBuildPyramid(unittest.TestCase):
+    """測試多時間週期金字塔"""
+
+    def setUp(self):
+        self.manager = TimeframeManager()
+        self.data = _make_minutes()
+
+    def test_all_compatible_timeframes(self):
+        """測試默認建立所有兼容時間週期，基準時間週期不複製"""
+        pyramid = self.manager.build_pyramid(self.data, "1m")
+
+        self.assertEqual(list(pyramid), self.manager.get_compatible_timeframes("1m"))
+        self.assertIs(pyramid["1m"], self.data)
+        for tf in ["5m", "1h", "4h", "1d", "1w"]:
+            with self.subTest(timeframe=tf):
+                pd.testing.assert_frame_equal(pyramid[tf], _resample(self.data, tf), check_freq=False)
+
+    def test_cascades_from_largest_built_level(self):
+        """測試每層從已建立的最大可整除層聚合"""
+        sources = []
+        original = TimeframeManager._aggregate_bars
+
+        def record(manager, data, tf):
+            sources.append((len(data), tf))
+            return original(manager, data, tf)
+
+        with mock.patch.object(TimeframeManager, "_aggregate_bars", autospec=True, side_effect=record):
+            pyramid = self.manager.build_pyramid(self.data, "1m", ["4h", "1h", "1w"])
+
+        self.assertEqual(list(pyramid), ["4h", "1h", "1w"])
+        # 1h ← 1m，4h ← 1h，1w ← 4h
+        self.assertEqual([tf for _, tf in sources], ["1h", "4h", "1w"])
+        self.assertEqual(sources[1][0], len(pyramid["1h"]))
+        self.assertEqual(sources[2][0], len(pyramid["4h"]))
+        pd.testing.assert_frame_equal(pyramid["1w"], _resample(self.data, "1w"), check_freq=False)
+
+    def test_invalid_timeframes(self):
+        """測試小於基準的時間週期與無效時間週期"""
+        with self.assertRaises(ValueError):
+            self.manager.build_pyramid(self.data, "1h", ["15m"])
+        with self.assertRaises(ValueError):
+            self.manager.build_pyramid(self.data, "1m", ["2h"])
+
+
+class TestPipelineTimeframes(unittest.TestCase):
+    """測試 DataPipeline 的多時間週期視圖"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        save_ohlcv(load_ohlcv(str(TEST_CSV)), str(self.tmp_dir / "raw" / "BTCUSDT_1h.parquet"))
+        self.pipeline = DataPipeline(data_dir=self.tmp_dir, enable_validated_cache=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_load_timeframes_cached(self):
+        """測試視圖只聚合一次，之後從快取取得"""
+        with mock.patch.object(
+            self.pipeline.timeframe_manager, "build_pyramid",
+            wraps=self.pipeline.timeframe_manager.build_pyramid
+        ) as build:
+            views = self.pipeline.load_timeframes("BTCUSDT", "1h", ["1h", "4h", "1d"])
+            again = self.pipeline.load_timeframes("BTCUSDT", "1h", ["4h", "1d"])
+
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(list(views), ["1h", "4h", "1d"])
+        self.assertIs(again["4h"], views["4h"])
+        pd.testing.assert_frame_equal(views["4h"], _resample(views["1h"], "4h"), check_freq=False)
+
+    def test_strategy_timeframe_requirement(self):
+        """測試策略的其他時間週期需求記錄在 ohlcv_{時間週期}"""
+        strategy = mock.Mock()
+        strategy.get_data_requirements.return_value = [
+            DataRequirement(DataSource.OHLCV),
+            DataRequirement(DataSource.OHLCV, timeframe="4h"),
+        ]
+
+        for load in (self.pipeline.load_strategy_data, self.pipeline.load_strategy_data_concurrent):
+            with self.subTest(loader=load.__name__):
+                result = load(strategy, "BTCUSDT", "1h")
+                self.assertTrue(result.success, result.error)
+                self.assertEqual(set(result.data), {"ohlcv", "ohlcv_4h"})
+                self.assertEqual(result.metadata['timeframe'], "1h")
+                pd.testing.assert_frame_equal(
+                    result.data["ohlcv_4h"], _resample(result.data["ohlcv"], "4h"), check_freq=False
+                )
+
+    def test_required_timeframes_warm_cache(self):
+        """測試 _load_ohlcv 的 required_timeframes 預先建立視圖"""
+        self.pipeline._load_ohlcv("BTCUSDT", "1h", ["4h"])
+
+        with mock.patch.object(self.pipeline.timeframe_manager, "build_pyramid") as build:
+            views = self.pipeline.load_timeframes("BTCUSDT", "1h", ["4h"])
+
+        build.assert_not_called()
+        self.assertIn("4h", views)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Validated OHLCV Cache Tests
+
+測試 v0.5 已驗證 OHLCV 的持久化快取：
+- 數據源指紋（內容雜湊、目錄數據集）
+- 控制器設定 / 日期範圍變化時失效
+- QualityCheckResult 摘要的序列化
+- DataPipeline 命中時跳過品質檢查
+
+Version: v0.5
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from data.pipeline import DataPipeline
+from data.quality import DataQualityController, QualityCheckResult, ValidatedOHLCVCache
+from data.storage import load_ohlcv, save_ohlcv
+
+
+TEST_CSV = Path("data/raw/BTCUSDT_1h_test.csv")
+
+
+class TestValidatedOHLCVCache(unittest.TestCase):
+    """測試 ValidatedOHLCVCache"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.source = self.tmp_dir / "BTCUSDT_1h.csv"
+        shutil.copy(TEST_CSV, self.source)
+        self.cache = ValidatedOHLCVCache(self.tmp_dir / "cache")
+        self.controller = DataQualityController()
+        self.df = load_ohlcv(str(self.source))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_roundtrip_and_invalidation(self):
+        """測試寫入、讀取以及數據源 / 設定變化時失效"""
+        settings = self.controller.settings()
+        result = self.controller.check_ohlcv(self.df)
+
+        self.assertIsNone(self.cache.get(self.source, settings))
+        self.cache.put(self.source, settings, self.df, result)
+
+        df, summary = self.cache.get(self.source, settings)
+        pd.testing.assert_frame_equal(df, self.df)
+        self.assertEqual(summary.passed, result.passed)
+        self.assertEqual(len(summary.issues), len(result.issues))
+
+        # 不同日期範圍或設定是不同的條目
+        self.assertIsNone(self.cache.get(self.source, settings, "2023-01-05"))
+        self.assertIsNone(self.cache.get(self.source, {**settings, 'strict_mode': True}))
+
+        # 只更新修改時間、內容不變時仍然命中
+        os.utime(self.source, (0, 0))
+        self.assertIsNotNone(self.cache.get(self.source, settings))
+
+        # 內容改變後失效
+        with open(self.source, "a") as f:
+            f.write("1999999999000,1,1,1,1,1\n")
+        self.assertIsNone(self.cache.get(self.source, settings))
+
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(self.cache.clear(), 1)
+
+    def test_directory_fingerprint_and_pruning(self):
+        """測試目錄數據集指紋與條目數上限"""
+        mmap_path = self.tmp_dir / "BTCUSDT_1h.mmap"
+        save_ohlcv(self.df, str(mmap_path))
+        before = self.cache.source_fingerprint(mmap_path)
+        save_ohlcv(self.df.iloc[:10], str(mmap_path))
+        self.assertNotEqual(before, self.cache.source_fingerprint(mmap_path))
+
+        cache = ValidatedOHLCVCache(self.tmp_dir / "small", max_entries=2)
+        result = self.controller.check_ohlcv(self.df)
+        for end in ("2023-01-02", "2023-01-03", "2023-01-04"):
+            cache.put(self.source, {}, self.df, result, end_date=end)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_result_only_entries(self):
+        """測試只保存檢查結果的條目與完整條目互不影響"""
+        settings = self.controller.settings()
+        result = self.controller.check_ohlcv(self.df)
+
+        self.assertIsNone(self.cache.get_result(self.source, settings))
+        self.cache.put_result(self.source, settings, result)
+        self.assertEqual(self.cache.get_result(self.source, settings).passed, result.passed)
+        self.assertIsNone(self.cache.get(self.source, settings))
+        self.assertIsNone(self.cache.get_result(self.source, settings, "2023-01-05"))
+        self.assertEqual(list(self.cache.cache_dir.glob("*.parquet")), [])
+
+    def test_corrupted_entry_is_discarded(self):
+        """測試損壞的條目被丟棄"""
+        settings = self.controller.settings()
+        key = self.cache.put(self.source, settings, self.df, self.controller.check_ohlcv(self.df))
+        (self.cache.cache_dir / f"{key}.parquet").write_bytes(b"broken")
+
+        self.assertIsNone(self.cache.get(self.source, settings))
+        self.assertFalse((self.cache.cache_dir / f"{key}.json").exists())
+
+    def test_quality_result_serialization(self):
+        """測試 QualityCheckResult 摘要序列化"""
+        broken = self.df.copy()
+        broken.iloc[3, broken.columns.get_loc("high")] = 0.0
+        result = self.controller.check_ohlcv(broken)
+
+        restored = QualityCheckResult.from_dict(result.to_dict())
+        self.assertFalse(restored.passed)
+        self.assertEqual(restored.critical_count, result.critical_count)
+        self.assertEqual(restored.get_summary(), result.get_summary())
+        self.assertEqual(
+            [issue.metadata["affected_count"] for issue in restored.issues],
+            [len(issue.affected_rows) for issue in result.issues]
+        )
+
+
+class TestPipelineValidatedCache(unittest.TestCase):
+    """測試 DataPipeline 使用驗證快取"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        save_ohlcv(load_ohlcv(str(TEST_CSV)), str(self.tmp_dir / "raw" / "BTCUSDT_1h.parquet"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_repeated_loads_skip_validation(self):
+        """測試重複載入（包括新進程 / 新管道）跳過品質檢查"""
+        first = DataPipeline(data_dir=self.tmp_dir)
+        expected = first._load_ohlcv("BTCUSDT", "1h", start_date="2023-01-05", end_date="2023-01-10")
+
+        second = DataPipeline(data_dir=self.tmp_dir)
+        with mock.patch.object(second.quality_controller, "check_ohlcv") as check, \
+                mock.patch.object(second, "_load_ohlcv_from_file") as load_file:
+            df = second._load_ohlcv("BTCUSDT", "1h", start_date="2023-01-05", end_date="2023-01-10")
+            check.assert_not_called()
+            # 沒有載入原始數據
+            load_file.assert_not_called()
+        pd.testing.assert_frame_equal(df, expected)
+
+        # 已驗證的完整數據集存入記憶體快取，其他日期範圍直接切片
+        self.assertEqual(second.get_cache_stats()["keys"], ["BTCUSDT_1h"])
+        with mock.patch.object(second.validated_cache, "get") as get:
+            other = second._load_ohlcv("BTCUSDT", "1h", start_date="2023-01-12", end_date="2023-01-15")
+            get.assert_not_called()
+        self.assertEqual(other.index[0], pd.Timestamp("2023-01-12", tz="UTC"))
+        # 驗證快取只有完整數據集一個條目（不按日期範圍分別保存）
+        self.assertEqual(second.validated_cache.stats()["entries"], 1)
+
+        disabled = DataPipeline(data_dir=self.tmp_dir, enable_validated_cache=False)
+        with mock.patch.object(disabled.quality_controller, "check_ohlcv",
+                               wraps=disabled.quality_controller.check_ohlcv) as check:
+            disabled._load_ohlcv("BTCUSDT", "1h", start_date="2023-01-05", end_date="2023-01-10")
+            check.assert_called_once()
+
+    def test_mmap_windows_skip_validation(self):
+        """測試記憶體映射窗口的檢查結果被保存，重複載入直接返回窗口"""
+        mmap_dir = Path(tempfile.mkdtemp(dir=self.tmp_dir))
+        save_ohlcv(load_ohlcv(str(TEST_CSV)), str(mmap_dir / "raw" / "BTCUSDT_1h.mmap"))
+        window = {"start_date": "2023-01-05", "end_date": "2023-01-10"}
+
+        first = DataPipeline(data_dir=mmap_dir)
+        controller = first.quality_controller
+        with mock.patch.object(controller, "check_ohlcv", wraps=controller.check_ohlcv) as check:
+            expected = first._load_ohlcv("BTCUSDT", "1h", **window)
+            first._load_ohlcv("BTCUSDT", "1h", **window)
+            check.assert_called_once()
+        # 只保存檢查結果，沒有 Parquet 副本
+        self.assertEqual(first.validated_cache.stats()["entries"], 1)
+        self.assertEqual(list(first.validated_cache.cache_dir.glob("*.parquet")), [])
+
+        second = DataPipeline(data_dir=mmap_dir)
+        with mock.patch.object(second.quality_controller, "check_ohlcv") as check, \
+                mock.patch.object(second.quality_controller, "clean_ohlcv") as clean:
+            df = second._load_ohlcv("BTCUSDT", "1h", **window)
+            check.assert_not_called()
+            clean.assert_not_called()
+        pd.testing.assert_frame_equal(df, expected)
+
+        # 保存的結果未通過時只重新清理，不重新檢查
+        failed = QualityCheckResult(passed=False)
+        second.validated_cache.put_result(
+            mmap_dir / "raw" / "BTCUSDT_1h.mmap", second._validation_settings(), failed, "2023-01-12"
+        )
+        with mock.patch.object(second.quality_controller, "check_ohlcv") as check, \
+                mock.patch.object(second.quality_controller, "clean_ohlcv",
+                                  wraps=second.quality_controller.clean_ohlcv) as clean:
+            second._load_ohlcv("BTCUSDT", "1h", start_date="2023-01-12")
+            check.assert_not_called()
+            clean.assert_called_once()
+
+    def test_preload_fills_memory_cache(self):
+        """測試新進程的 preload_data 從驗證快取填入記憶體快取，之後的載入命中記憶體快取"""
+        DataPipeline(data_dir=self.tmp_dir)._load_ohlcv("BTCUSDT", "1h")
+
+        pipeline = DataPipeline(data_dir=self.tmp_dir)
+        self.assertEqual(pipeline.preload_data(["BTCUSDT"], ["1h"]), (1, 0))
+        self.assertEqual(pipeline.get_cache_stats()["count"], 1)
+
+        for day in range(5, 25):
+            pipeline._load_ohlcv("BTCUSDT", "1h", start_date=f"2023-01-{day:02d}")
+        self.assertEqual(pipeline.get_cache_stats()["hits"], 20)
+        self.assertEqual(pipeline.validated_cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
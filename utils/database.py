@@ -0,0 +1,728 @@
+"""
+Data Catalog v0.5
+
+本地 SQLite 數據目錄：記錄數據根目錄下每個已存儲的數據集
+
+找出有哪些數據原本需要列目錄（OHLCVStorage.list_available_data、
+DependencyChecker）並逐一讀取文件；SSD 上有上萬個文件時掃描需要數秒。
+這個模組把每個數據集（OHLCV 與永續數據源）的交易對、交易所、時間週期、
+時間範圍、行數、文件指紋與品質狀態寫入 SQLite，可用性檢查與日期範圍規劃
+因此變成索引查詢。
+
+目錄由存儲的寫入路徑維護：
+- OHLCVStorage.save_ohlcv（CSV / Parquet / Feather / mmap）
+- PartitionedOHLCVStore.write / append（分區數據集目錄）
+- 永續數據處理器的 save（SegmentStore manifest，一個數據集一條記錄）
+- DataPipeline 驗證完整數據集後記錄品質狀態
+
+在寫入路徑之外複製進來的文件用 scan() 增量索引（大小與修改時間不變的文件跳過）。
+只有位於目錄根目錄（默認 config.data_root）之下的文件會被記錄。
+
+Version: v0.5
+
+Example:
+    >>> catalog = get_catalog()
+    >>> catalog.scan()                                   # 第一次使用時索引已有文件
+    >>> catalog.coverage("ohlcv", "BTCUSDT", "1h")       # (start_ms, end_ms, rows)
+    >>> catalog.missing_ranges("funding_rate", "BTCUSDT", "2024-01-01", "2024-06-30")
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 目錄文件名（位於數據根目錄）
+CATALOG_FILE = "catalog.sqlite"
+
+# 結構版本（不相容時重建目錄）
+SCHEMA_VERSION = 1
+
+# 品質狀態
+QUALITY_UNCHECKED = "unchecked"
+QUALITY_PASSED = "passed"
+QUALITY_FAILED = "failed"
+
+# 永續數據源：perpetual/{目錄}/{exchange}/ 目錄名稱 -> 記錄的 source（DataSource 的值）
+PERPETUAL_SOURCES = {
+    "funding_rate": "funding_rate",
+    "open_interest": "open_interest",
+    "basis": "basis",
+    "liquidations": "liquidations",
+    "long_short_ratio": "long_short",
+}
+
+# 可索引的 OHLCV 文件副檔名（與 data.storage.DATA_FILE_SUFFIXES 相同）
+_OHLCV_SUFFIXES = (".mmap", ".parquet", ".feather", ".csv")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    exchange TEXT,
+    timeframe TEXT,
+    start_ms INTEGER,
+    end_ms INTEGER,
+    rows INTEGER,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    quality TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_datasets_lookup ON datasets (source, symbol, timeframe);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "path", "source", "symbol", "exchange", "timeframe", "start_ms", "end_ms",
+    "rows", "size", "mtime_ns", "quality", "updated_at"
+)
+
+
+@dataclass
+class CatalogEntry:
+    """目錄中的一個數據集
+
+    Attributes:
+        path: 數據集路徑（文件、.mmap / 分區數據集目錄或永續數據 manifest）
+        source: 數據源（'ohlcv', 'funding_rate', ...）
+        symbol: 交易對
+        exchange: 交易所（可選）
+        timeframe: 時間週期（OHLCV）或時間間隔（持倉量 / 多空比，可選）
+        start_ms: 第一筆數據的 UTC 毫秒時間戳
+        end_ms: 最後一筆數據的 UTC 毫秒時間戳
+        rows: 行數
+        size: 記錄時的文件大小
+        mtime_ns: 記錄時的修改時間
+        quality: 品質狀態（'unchecked' / 'passed' / 'failed'）
+        updated_at: 記錄時間（Unix 秒）
+    """
+    path: str
+    source: str
+    symbol: str
+    exchange: Optional[str]
+    timeframe: Optional[str]
+    start_ms: Optional[int]
+    end_ms: Optional[int]
+    rows: Optional[int]
+    size: int
+    mtime_ns: int
+    quality: str
+    updated_at: float
+
+    @property
+    def fingerprint(self) -> str:
+        """文件指紋（大小 + 修改時間）"""
+        return f"{self.size}:{self.mtime_ns}"
+
+    def is_current(self) -> bool:
+        """數據集在記錄之後是否未被修改（不存在或已改變時返回 False）"""
+        try:
+            return _fingerprint(Path(self.path)) == (self.size, self.mtime_ns)
+        except OSError:
+            return False
+
+
+class DataCatalog:
+    """SQLite 數據目錄
+
+    讀取操作在目錄文件不存在時返回空結果，不會建立文件；第一次寫入時才建立。
+
+    Args:
+        db_path: SQLite 文件路徑
+        root: 目錄根目錄（只記錄其下的數據集，默認為 db_path 所在目錄）
+    """
+
+    def __init__(self, db_path: Union[str, Path], root: Optional[Union[str, Path]] = None):
+        self.db_path = Path(db_path)
+        self.root = Path(root or self.db_path.parent).resolve()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    # === 連線 ===
+
+    def _connect(self, create: bool = True) -> Optional[sqlite3.Connection]:
+        """返回連線（create=False 且目錄文件不存在時返回 None）"""
+        if self._conn is not None:
+            return self._conn
+        if not create and not self.db_path.exists():
+            return None
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            logger.warning(f"Rebuilding data catalog {self.db_path} (schema {version} -> {SCHEMA_VERSION})")
+            conn.executescript("DROP TABLE IF EXISTS datasets; DROP TABLE IF EXISTS catalog_meta;")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        """關閉連線"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def covers(self, path: Union[str, Path]) -> bool:
+        """路徑是否位於目錄根目錄之下"""
+        try:
+            Path(path).resolve().relative_to(self.root)
+            return True
+        except ValueError:
+            return False
+
+    # === 寫入 ===
+
+    def register(
+        self,
+        path: Union[str, Path],
+        source: str,
+        symbol: str,
+        timeframe: Optional[str] = None,
+        exchange: Optional[str] = None,
+        start=None,
+        end=None,
+        rows: Optional[int] = None,
+        quality: Optional[str] = None
+    ) -> Optional[CatalogEntry]:
+        """記錄（或更新）一個數據集
+
+        quality 為 None 時：文件未改變則保留原品質狀態，否則重設為 'unchecked'。
+
+        Returns:
+            CatalogEntry；路徑不在根目錄之下時返回 None（不記錄）
+        """
+        if not self.covers(path):
+            return None
+
+        path = Path(path).resolve()
+        size, mtime_ns = _fingerprint(path)
+
+        with self._lock:
+            conn = self._connect()
+            if quality is None:
+                previous = self._get(conn, str(path))
+                unchanged = previous is not None and (previous.size, previous.mtime_ns) == (size, mtime_ns)
+                quality = previous.quality if unchanged else QUALITY_UNCHECKED
+
+            entry = CatalogEntry(
+                path=str(path),
+                source=source,
+                symbol=symbol,
+                exchange=exchange,
+                timeframe=timeframe,
+                start_ms=_to_ms(start) if start is not None else None,
+                end_ms=_to_ms(end) if end is not None else None,
+                rows=int(rows) if rows is not None else None,
+                size=size,
+                mtime_ns=mtime_ns,
+                quality=quality,
+                updated_at=time.time(),
+            )
+            conn.execute(
+                f"INSERT OR REPLACE INTO datasets ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [getattr(entry, name) for name in _COLUMNS]
+            )
+            conn.commit()
+        return entry
+
+    def register_frame(
+        self,
+        path: Union[str, Path],
+        source: str,
+        symbol: str,
+        df,
+        timeframe: Optional[str] = None,
+        exchange: Optional[str] = None,
+        quality: Optional[str] = None
+    ) -> Optional[CatalogEntry]:
+        """用剛寫入的 DataFrame 記錄數據集（時間範圍與行數取自記憶體中的數據，不重新讀取文件）"""
+        start, end = _frame_extent(df)
+        return self.register(path, source, symbol, timeframe, exchange, start, end, len(df), quality)
+
+    def register_append(
+        self,
+        path: Union[str, Path],
+        source: str,
+        symbol: str,
+        df,
+        appended_bytes: int,
+        timeframe: Optional[str] = None,
+        exchange: Optional[str] = None
+    ) -> Optional[CatalogEntry]:
+        """追加寫入後更新記錄
+
+        追加前的記錄仍是最新時（記錄的大小 = 現在的大小 - 追加的字節數），在其上
+        擴展時間範圍並累加行數，不重新讀取文件；否則 OHLCV 文件重新讀取時間範圍。
+
+        Args:
+            path: 數據文件路徑
+            source: 數據源
+            symbol: 交易對
+            df: 追加的 DataFrame
+            appended_bytes: 追加寫入的字節數
+            timeframe: 時間週期（可選）
+            exchange: 交易所（可選）
+        """
+        if not self.covers(path):
+            return None
+
+        previous = self.get(path)
+        size, _ = _fingerprint(Path(path).resolve())
+        if previous is None or previous.rows is None or previous.size != size - appended_bytes:
+            if source == 'ohlcv' and parse_ohlcv_path(path) is not None:
+                return self.register(path, **_describe_ohlcv_file(Path(path)))
+            return self.register(path, source, symbol, timeframe, exchange)
+
+        start, end = _frame_extent(df)
+        starts = [value for value in (previous.start_ms, start) if value is not None]
+        ends = [value for value in (previous.end_ms, end) if value is not None]
+        return self.register(
+            path, source, symbol, timeframe, exchange,
+            start=min(_to_ms(value) for value in starts) if starts else None,
+            end=max(_to_ms(value) for value in ends) if ends else None,
+            rows=previous.rows + len(df)
+        )
+
+    def set_quality(self, path: Union[str, Path], status: str) -> bool:
+        """更新數據集的品質狀態
+
+        Returns:
+            是否有對應的記錄
+        """
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return False
+            cursor = conn.execute(
+                "UPDATE datasets SET quality = ?, updated_at = ? WHERE path = ?",
+                (status, time.time(), str(Path(path).resolve()))
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def remove(self, path: Union[str, Path]) -> bool:
+        """刪除數據集記錄"""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return False
+            cursor = conn.execute("DELETE FROM datasets WHERE path = ?", (str(Path(path).resolve()),))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def prune(self) -> int:
+        """刪除文件已不存在的記錄
+
+        Returns:
+            刪除的記錄數
+        """
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return 0
+            missing = [
+                (path,) for (path,) in conn.execute("SELECT path FROM datasets")
+                if not os.path.exists(path)
+            ]
+            conn.executemany("DELETE FROM datasets WHERE path = ?", missing)
+            conn.commit()
+        return len(missing)
+
+    # === 查詢 ===
+
+    def get(self, path: Union[str, Path]) -> Optional[CatalogEntry]:
+        """按路徑查詢"""
+        with self._lock:
+            conn = self._connect(create=False)
+            return self._get(conn, str(Path(path).resolve())) if conn is not None else None
+
+    def find(
+        self,
+        source: Optional[str] = None,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        exchange: Optional[str] = None
+    ) -> List[CatalogEntry]:
+        """按條件查詢數據集（None 表示不限）
+
+        Returns:
+            按 source, symbol, timeframe, path 排序的記錄
+        """
+        where, params = _where(source=source, symbol=symbol, timeframe=timeframe, exchange=exchange)
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return []
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM datasets{where} "
+                f"ORDER BY source, symbol, timeframe, path",
+                params
+            ).fetchall()
+        return [CatalogEntry(*row) for row in rows]
+
+    def sources(self, symbol: Optional[str] = None) -> List[str]:
+        """有數據的數據源"""
+        where, params = _where(symbol=symbol)
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return []
+            rows = conn.execute(
+                f"SELECT DISTINCT source FROM datasets{where} ORDER BY source", params
+            ).fetchall()
+        return [source for (source,) in rows]
+
+    def coverage(
+        self,
+        source: str,
+        symbol: str,
+        timeframe: Optional[str] = None,
+        exchange: Optional[str] = None
+    ) -> Optional[Tuple[int, int, int]]:
+        """數據集的整體時間範圍與行數
+
+        Returns:
+            (start_ms, end_ms, rows)，沒有記錄時返回 None
+        """
+        where, params = _where(source=source, symbol=symbol, timeframe=timeframe, exchange=exchange)
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return None
+            start_ms, end_ms, rows = conn.execute(
+                f"SELECT MIN(start_ms), MAX(end_ms), SUM(rows) FROM datasets{where}", params
+            ).fetchone()
+        if start_ms is None:
+            return None
+        return int(start_ms), int(end_ms), int(rows or 0)
+
+    def missing_ranges(
+        self,
+        source: str,
+        symbol: str,
+        start,
+        end,
+        timeframe: Optional[str] = None,
+        exchange: Optional[str] = None
+    ) -> List[Tuple[int, int]]:
+        """[start, end] 中沒有任何數據集覆蓋的區間（用於規劃下載範圍）
+
+        各數據集的時間範圍先合併，再從請求範圍中扣除；不考慮數據集內部的缺口
+        （缺口見 data.quality.detect_time_gaps）。
+
+        Returns:
+            [(start_ms, end_ms)]，按時間排序
+        """
+        start_ms, end_ms = _to_ms(start), _to_ms(end)
+        where, params = _where(source=source, symbol=symbol, timeframe=timeframe, exchange=exchange)
+        with self._lock:
+            conn = self._connect(create=False)
+            intervals = [] if conn is None else conn.execute(
+                f"SELECT start_ms, end_ms FROM datasets{where}"
+                f"{' AND' if where else ' WHERE'} start_ms IS NOT NULL AND end_ms >= ? AND start_ms <= ? "
+                f"ORDER BY start_ms",
+                params + [start_ms, end_ms]
+            ).fetchall()
+
+        missing = []
+        cursor = start_ms
+        for interval_start, interval_end in intervals:
+            if interval_start > cursor:
+                missing.append((cursor, interval_start - 1))
+            cursor = max(cursor, interval_end + 1)
+            if cursor > end_ms:
+                break
+        if cursor <= end_ms:
+            missing.append((cursor, end_ms))
+        return missing
+
+    def is_indexed(self) -> bool:
+        """根目錄是否已完整掃描過（之後由寫入路徑保持最新）"""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return False
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'scanned_at'").fetchone()
+        return row is not None
+
+    # === 掃描 ===
+
+    def scan(self, directories: Optional[Iterable[Union[str, Path]]] = None) -> int:
+        """索引根目錄下已有的數據集（大小與修改時間未變的數據集跳過）
+
+        識別的目錄結構：
+        - historical/{exchange}/{SYMBOL}_{TF}.{csv,parquet,feather,mmap}
+        - historical/{exchange}/{SYMBOL}/{TF}/manifest.json（分區數據集）
+        - raw/{SYMBOL}_{TF}.{csv,parquet,feather,mmap}
+        - perpetual/{source}/{exchange}/{dataset}.manifest.json（永續數據）
+
+        Args:
+            directories: 只掃描這些目錄（默認掃描整個根目錄，並刪除已不存在的記錄）
+
+        Returns:
+            新增或更新的記錄數
+        """
+        targets = [Path(d) for d in directories] if directories is not None else [self.root]
+        indexed = {entry.path: entry for entry in self.find()}
+
+        updated = 0
+        for path, describe in self._discover(targets):
+            previous = indexed.get(str(path.resolve()))
+            if previous is not None and previous.is_current():
+                continue
+            try:
+                if self.register(path, **describe(path)) is not None:
+                    updated += 1
+            except Exception as e:
+                logger.warning(f"Cannot index {path}: {e}")
+
+        if directories is None:
+            self.prune()
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('scanned_at', ?)",
+                    (str(time.time()),)
+                )
+                conn.commit()
+
+        logger.info(f"Data catalog scan: {updated} dataset(s) indexed")
+        return updated
+
+    def _discover(self, targets: List[Path]):
+        """列出 (路徑, 描述函數)，描述函數返回 register 的參數"""
+        for target in targets:
+            if not target.exists():
+                continue
+            for manifest in target.rglob("*.manifest.json"):
+                if manifest.parent.parent.name in PERPETUAL_SOURCES:
+                    yield manifest, _describe_perpetual
+
+            directories = [target] + [p for p in target.rglob("*") if p.is_dir() and p.suffix != ".mmap"]
+            for directory in directories:
+                if (directory / "manifest.json").exists():
+                    yield directory, _describe_partitioned
+                # 單一文件數據集只存在於 raw/ 與 historical/{exchange}/
+                if directory.name != "raw" and directory.parent.name != "historical":
+                    continue
+                for path in directory.iterdir():
+                    if path.suffix in _OHLCV_SUFFIXES and _parse_ohlcv_name(path) is not None:
+                        yield path, _describe_ohlcv_file
+
+    # === 內部 ===
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, path: str) -> Optional[CatalogEntry]:
+        row = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM datasets WHERE path = ?", (path,)
+        ).fetchone()
+        return CatalogEntry(*row) if row is not None else None
+
+
+# === 全局目錄 ===
+
+_global_catalog: Optional[DataCatalog] = None
+_global_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> DataCatalog:
+    """獲取全局數據目錄（位於 config.data_root，第一次使用時建立）"""
+    global _global_catalog
+    if _global_catalog is None:
+        with _global_catalog_lock:
+            if _global_catalog is None:
+                from data_config import config
+                _global_catalog = DataCatalog(config.data_root / CATALOG_FILE, root=config.data_root)
+    return _global_catalog
+
+
+def record_dataset(path: Union[str, Path], source: str, symbol: str, df=None, **kwargs) -> None:
+    """寫入路徑使用的記錄函數：失敗只記錄警告，不影響數據保存
+
+    Args:
+        path: 數據集路徑
+        source: 數據源
+        symbol: 交易對
+        df: 剛寫入的 DataFrame（提供時用於計算時間範圍與行數）
+        **kwargs: register 的其他參數（timeframe, exchange, start, end, rows）
+    """
+    try:
+        catalog = get_catalog()
+        if df is not None:
+            catalog.register_frame(path, source, symbol, df, **kwargs)
+        else:
+            catalog.register(path, source, symbol, **kwargs)
+    except Exception as e:
+        logger.warning(f"Cannot record {path} in data catalog: {e}")
+
+
+def record_appended(
+    path: Union[str, Path],
+    source: str,
+    symbol: str,
+    df,
+    appended_bytes: int,
+    **kwargs
+) -> None:
+    """追加寫入路徑使用的記錄函數：失敗只記錄警告（見 DataCatalog.register_append）"""
+    try:
+        get_catalog().register_append(path, source, symbol, df, appended_bytes, **kwargs)
+    except Exception as e:
+        logger.warning(f"Cannot record {path} in data catalog: {e}")
+
+
+def parse_ohlcv_path(path: Union[str, Path]) -> Optional[Dict[str, Optional[str]]]:
+    """從 OHLCV 文件路徑解析 symbol / timeframe / exchange
+
+    {SYMBOL}_{TF}.{ext}；位於 historical/{exchange}/ 之下時記錄交易所。
+
+    Returns:
+        {'symbol', 'timeframe', 'exchange'}，無法解析時返回 None
+    """
+    path = Path(path)
+    parsed = _parse_ohlcv_name(path)
+    if parsed is None:
+        return None
+    symbol, timeframe = parsed
+    exchange = path.parent.name if path.parent.parent.name == "historical" else None
+    return {'symbol': symbol, 'timeframe': timeframe, 'exchange': exchange}
+
+
+def _parse_ohlcv_name(path: Path) -> Optional[Tuple[str, str]]:
+    parts = path.stem.rsplit("_", 1)
+    if len(parts) != 2 or not parts[0] or not parts[1]:
+        return None
+    symbol, timeframe = parts
+    if not symbol.isalnum() or not timeframe[:-1].isdigit():
+        return None
+    return symbol, timeframe
+
+
+def _fingerprint(path: Path) -> Tuple[int, int]:
+    """(大小, 修改時間)；目錄數據集使用其 manifest / meta 文件"""
+    if path.is_dir():
+        for name in ("manifest.json", "meta.json"):
+            if (path / name).exists():
+                path = path / name
+                break
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _to_ms(value) -> int:
+    """轉換為 UTC 毫秒時間戳（數值視為毫秒，無時區的時間視為 UTC）"""
+    import pandas as pd
+
+    kind = getattr(getattr(value, "dtype", None), "kind", None)
+    if isinstance(value, (int, float)) or kind in ("i", "u", "f"):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return ts.value // 1_000_000
+
+
+def _frame_extent(df) -> Tuple[Any, Any]:
+    """DataFrame 的時間範圍（timestamp 欄位優先，其次為 DatetimeIndex）"""
+    import pandas as pd
+
+    if len(df) == 0:
+        return None, None
+    if "timestamp" in df.columns:
+        values = df["timestamp"]
+        return values.min(), values.max()
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df.index.min(), df.index.max()
+    return None, None
+
+
+def _where(**conditions) -> Tuple[str, List[Any]]:
+    clauses = [f"{name} = ?" for name, value in conditions.items() if value is not None]
+    params = [value for value in conditions.values() if value is not None]
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _describe_ohlcv_file(path: Path) -> Dict[str, Any]:
+    """讀取 OHLCV 文件的時間範圍（Parquet 只讀 metadata）"""
+    info = parse_ohlcv_path(path)
+    start = end = rows = None
+
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        metadata = pq.read_metadata(path)
+        rows = metadata.num_rows
+        column = metadata.schema.names.index("timestamp") if "timestamp" in metadata.schema.names else None
+        stats = [
+            metadata.row_group(i).column(column).statistics
+            for i in range(metadata.num_row_groups)
+        ] if column is not None else []
+        if stats and all(s is not None and s.has_min_max for s in stats):
+            start, end = min(s.min for s in stats), max(s.max for s in stats)
+    else:
+        from data.storage import OHLCVStorage
+
+        df = OHLCVStorage(path.parent).load_ohlcv(str(path))
+        rows = len(df)
+        start, end = _frame_extent(df)
+
+    return {**info, 'source': 'ohlcv', 'start': start, 'end': end, 'rows': rows}
+
+
+def _describe_partitioned(path: Path) -> Dict[str, Any]:
+    """分區數據集：從 manifest 讀取時間範圍與行數"""
+    import json
+
+    with open(path / "manifest.json", "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    partitions = manifest.get("partitions", [])
+    return {
+        'source': 'ohlcv',
+        'symbol': manifest["symbol"],
+        'timeframe': manifest["timeframe"],
+        'exchange': path.parent.parent.name,
+        'start': min((p["start"] for p in partitions), default=None),
+        'end': max((p["end"] for p in partitions), default=None),
+        'rows': sum(p["rows"] for p in partitions),
+    }
+
+
+def _describe_perpetual(path: Path) -> Dict[str, Any]:
+    """永續數據集：從 SegmentStore manifest 讀取時間範圍與行數"""
+    import json
+
+    directory = path.parent.parent.name
+    dataset = path.name[:-len(".manifest.json")]
+    symbol, _, interval = dataset.partition(f"_{directory}")
+
+    with open(path, "r", encoding="utf-8") as f:
+        segments = [s for s in json.load(f).get("segments", []) if s["rows"] > 0]
+    return {
+        'source': PERPETUAL_SOURCES[directory],
+        'symbol': symbol,
+        'timeframe': interval.lstrip("_") or None,
+        'exchange': path.parent.name,
+        'start': min((s["start"] for s in segments), default=None),
+        'end': max((s["end"] for s in segments), default=None),
+        'rows': sum(s["rows"] for s in segments),
+    }